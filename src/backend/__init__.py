@@ -6,7 +6,19 @@ Includes PDF parsing capabilities.
 """
 
 from .client import SiliconFlowClient
+from .async_client import AsyncSiliconFlowClient
 from .pipeline import TranslationPipeline
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter
+from .glossary_matcher import GlossaryMatcher
+from .tokenizer import get_token_counter, get_model_token_budget
+from .metrics import MetricsRegistry, get_metrics_registry
+from .endpoint_router import Endpoint, EndpointRouter
+from .run_journal import RunJournal
+from .incremental import ParagraphMap
+from .document import Document
+from .translation_result import TranslationResult
+from .translation_memory import TranslationMemory
 from .parser_interface import (
     ParserFactory,
     create_parser,
@@ -14,6 +26,7 @@ from .parser_interface import (
     parse_pdf_file,
     parse_pdf_url,
     parse_pdf_with_window,
+    iter_pdf_windows,
     get_default_parser_config
 )
 from .config_loader import (
@@ -25,13 +38,29 @@ from .config_loader import (
 
 __all__ = [
     "SiliconFlowClient",
+    "AsyncSiliconFlowClient",
     "TranslationPipeline",
+    "ResponseCache",
+    "RateLimiter",
+    "GlossaryMatcher",
+    "get_token_counter",
+    "get_model_token_budget",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "Endpoint",
+    "EndpointRouter",
+    "RunJournal",
+    "ParagraphMap",
+    "Document",
+    "TranslationResult",
+    "TranslationMemory",
     "ParserFactory",
     "create_parser",
     "parse_pdf",
     "parse_pdf_file",
     "parse_pdf_url",
     "parse_pdf_with_window",
+    "iter_pdf_windows",
     "get_default_parser_config",
     # Config loader exports
     "load_environment_config",
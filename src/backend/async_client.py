@@ -0,0 +1,571 @@
+"""
+Asynchronous SiliconFlow API Client built on AsyncOpenAI
+
+All clients running on the same event loop share one pooled httpx transport
+(HTTP/2 when the optional h2 package is installed), so several documents and
+pipeline stages can keep their connections warm instead of opening a new TLS
+session per pipeline.
+"""
+
+import asyncio
+import time
+import importlib.util
+import os
+import weakref
+from typing import List, Dict, Optional, Any
+
+import httpx
+from openai import AsyncOpenAI
+
+from .client import _SiliconFlowClientBase, _StreamAccumulator
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter
+from .metrics import MetricsRegistry
+from .endpoint_router import Endpoint, EndpointRouter
+
+# HTTP/2 support in httpx requires the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One shared transport per event loop - httpx connections cannot cross loops
+_SHARED_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled httpx.AsyncClient for the running event loop
+
+    The pool size is read from SILICONFLOW_MAX_CONNECTIONS (default: 20) and
+    HTTP/2 is enabled unless SILICONFLOW_HTTP2 is set to 0 or h2 is missing.
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    loop = asyncio.get_running_loop()
+    http_client = _SHARED_HTTP_CLIENTS.get(loop)
+    if http_client is None or http_client.is_closed:
+        max_connections = int(os.getenv("SILICONFLOW_MAX_CONNECTIONS", "20"))
+        use_http2 = HTTP2_AVAILABLE and os.getenv("SILICONFLOW_HTTP2", "1") != "0"
+        http_client = httpx.AsyncClient(
+            http2=use_http2,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        _SHARED_HTTP_CLIENTS[loop] = http_client
+    return http_client
+
+
+async def close_shared_async_http_client() -> None:
+    """Close the shared transport of the running event loop"""
+    loop = asyncio.get_running_loop()
+    http_client = _SHARED_HTTP_CLIENTS.pop(loop, None)
+    if http_client is not None and not http_client.is_closed:
+        await http_client.aclose()
+
+
+class AsyncSiliconFlowClient(_SiliconFlowClientBase):
+    """Asynchronous client for SiliconFlow API with streaming support"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        router: Optional[EndpointRouter] = None
+    ):
+        """
+        Initialize asynchronous SiliconFlow client
+
+        Args:
+            api_key: API key (reads from SILICONFLOW_API_KEY env var if not provided)
+            base_url: Base URL (reads from SILICONFLOW_BASE_URL env var if not provided)
+            http_client: Optional httpx.AsyncClient (uses the shared per-loop pool if not provided)
+            max_concurrency: Maximum number of windows processed in parallel by the
+                             windowed methods (default: 8)
+            cache: Response cache to use (uses the shared on-disk cache if not provided)
+            use_cache: Set to False to bypass the response cache
+                       (reads from LLM_CACHE_ENABLED env var if not provided)
+            rate_limiter: RPM/TPM limiter shared by all requests (uses the limiter
+                          configured by SILICONFLOW_RPM / SILICONFLOW_TPM if not provided)
+            metrics: Registry for per-stage request metrics (uses the process-wide registry if not provided)
+            router: Endpoints to spread requests over (uses LLM_ENDPOINTS if not provided,
+                    otherwise the single endpoint given by api_key / base_url)
+        """
+        super().__init__(api_key, base_url, cache, use_cache, rate_limiter, metrics, router)
+        self.http_client = http_client
+        self.max_concurrency = max(1, max_concurrency)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+    def _get_client(self, endpoint: Optional[Endpoint] = None) -> AsyncOpenAI:
+        """
+        Get the AsyncOpenAI client of an endpoint bound to the running event loop
+
+        Args:
+            endpoint: Endpoint to connect to (default: the first endpoint of the router)
+
+        Returns:
+            AsyncOpenAI client
+        """
+        endpoint = endpoint or self.router.endpoints[0]
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(endpoint.name)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=endpoint.api_key,
+                base_url=endpoint.base_url,
+                timeout=60.0,  # Set a longer timeout for streaming
+                http_client=self.http_client or get_shared_async_http_client()
+            )
+            clients[endpoint.name] = client
+        return client
+
+    async def _stream_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 0.7,
+        stream_print: bool = False,
+        enable_thinking: bool = False,
+        stage: str = "chat",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send chat completion request, continuing responses truncated at max_tokens
+
+        A response with finish_reason "length" is continued with a follow-up request that
+        carries the partial output (up to LLM_MAX_CONTINUATIONS times) and the parts are
+        stitched together. Truncations are counted per stage in self.continuation_stats.
+
+        Args:
+            model: Model identifier (e.g., "Pro/moonshotai/Kimi-K2.5")
+            messages: Message list with role and content
+            temperature: Response randomness (0-2)
+            max_tokens: Maximum tokens to generate per request
+            top_p: Nucleus sampling threshold (0-1)
+            stream_print: If True, stream and print the output in real-time
+            enable_thinking: If True, enable reasoning_content extraction
+            stage: Pipeline stage the request belongs to (e.g., "translate")
+            **kwargs: Additional parameters
+
+        Returns:
+            Response dictionary with content, reasoning_content and metadata
+            ("continuations" is set when the response was continued)
+        """
+        result = await self._stream_single_completion(
+            model, messages, temperature, max_tokens, top_p, stream_print, enable_thinking, stage, **kwargs
+        )
+
+        continuations = 0
+        while self._should_continue(result, continuations):
+            continuations += 1
+            if stream_print:
+                print(f"\n[Response truncated at max_tokens - continuing ({continuations}/{self.max_continuations})]")
+            part = await self._stream_single_completion(
+                model, self._build_continuation_messages(messages, result["content"]),
+                temperature, max_tokens, top_p, stream_print, False, stage, **kwargs
+            )
+            self._merge_continuation(result, part)
+
+        self._record_continuations(stage, continuations, result.get("finish_reason") == "length")
+        if continuations:
+            result["continuations"] = continuations
+        return result
+
+    async def _stream_single_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 0.7,
+        stream_print: bool = False,
+        enable_thinking: bool = False,
+        stage: str = "chat",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send one chat completion request with streaming (60s timeout with 3 retries)
+
+        Identical requests are answered from the response cache when it is enabled.
+        Latency, time-to-first-token, throughput and usage are recorded in self.metrics.
+
+        Args:
+            model: Model identifier (e.g., "Pro/moonshotai/Kimi-K2.5")
+            messages: Message list with role and content
+            temperature: Response randomness (0-2)
+            max_tokens: Maximum tokens to generate
+            top_p: Nucleus sampling threshold (0-1)
+            stream_print: If True, stream and print the output in real-time
+            enable_thinking: If True, enable reasoning_content extraction
+            **kwargs: Additional parameters
+
+        Returns:
+            Response dictionary with content, reasoning_content and metadata
+        """
+        request = self._begin_completion(
+            model, messages, temperature, max_tokens, top_p, stream_print, enable_thinking, stage, kwargs
+        )
+        cached = await asyncio.to_thread(self.cache.get, request.cache_key) if request.cache_key is not None else None
+        if cached is not None:
+            return self._cached_completion(request, cached)
+
+        # Streaming completion with 60s timeout and 3 retries, failing over between endpoints
+        for attempt in range(self._MAX_RETRIES + 1):
+            endpoint = await self.router.acquire_async(exclude=request.failed_endpoints)
+            cache_key = self._endpoint_cache_key(request, endpoint)
+            cached = await asyncio.to_thread(self.cache.get, cache_key) if cache_key is not None else None
+            if cached is not None:
+                return self._cached_completion(request, cached, endpoint)
+            if endpoint.rate_limiter is not None:
+                request.rate_limit_wait += await endpoint.rate_limiter.acquire_async(request.estimated_tokens)
+            request_start = time.perf_counter()
+            try:
+                stream = await self._get_client(endpoint).chat.completions.create(
+                    model=endpoint.model or model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=request.max_tokens,
+                    top_p=top_p,
+                    stream=True,
+                    **request.request_kwargs
+                )
+                break  # Success exit the retry loop
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                self.router.release(endpoint)
+                raise
+            except Exception as e:
+                wait_time, block_seconds = self._handle_attempt_error(request, endpoint, e, attempt)
+                if block_seconds:
+                    # Pausing takes the limiter's lock - keep it off the event loop
+                    await endpoint.rate_limiter.block_for_async(block_seconds)
+                await asyncio.sleep(wait_time)
+
+        accumulator = _StreamAccumulator(model, stream_print, enable_thinking)
+        try:
+            async for chunk in stream:
+                accumulator.add_chunk(chunk)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            self.router.release(endpoint)
+            raise
+        except Exception as e:
+            self.router.release(endpoint, error=e)
+            raise
+
+        result = self._finish_completion(request, endpoint, accumulator, request_start, attempt)
+        if endpoint.rate_limiter is not None:
+            await endpoint.rate_limiter.reconcile_async(
+                request.estimated_tokens, self._actual_tokens(request.estimated_tokens, result)
+            )
+        if request.cache_key is not None and self._should_cache_response(result):
+            await asyncio.to_thread(self.cache.put, request.cache_key, result)
+        return result
+
+    async def extract_proper_nouns(
+        self,
+        model: str,
+        text: str,
+        context: Optional[str] = None,
+        stream_print: bool = False
+    ) -> List[str]:
+        """
+        Extract proper nouns from text using streaming
+
+        Args:
+            model: Model identifier
+            text: Text to analyze
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+
+        Returns:
+            List of extracted proper nouns
+        """
+        messages = self._build_proper_nouns_messages(text, context)
+        response = await self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=2000, stream_print=stream_print, stage="noun_extraction")
+        return self._parse_proper_nouns_response(response)
+
+    async def generate_glossary(
+        self,
+        model: str,
+        proper_nouns: List[str],
+        target_language: str = "中文",
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        existing_glossary: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Generate translation glossary for proper nouns using streaming
+
+        Args:
+            model: Model identifier
+            proper_nouns: List of proper nouns to translate
+            target_language: Target language
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+            existing_glossary: Existing glossary entries to use for partial word matching
+
+        Returns:
+            Dictionary mapping original terms to translations
+        """
+        final_result, messages, max_tokens = self._prepare_glossary_request(
+            proper_nouns, target_language, context, stream_print, existing_glossary
+        )
+        if final_result is not None:
+            return final_result
+
+        response = await self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=max_tokens, stream_print=stream_print, stage="glossary")
+        return self._parse_glossary_response(response, proper_nouns, existing_glossary)
+
+    async def translate_text(
+        self,
+        model: str,
+        text: str,
+        source_language: str = "English",
+        target_language: str = "中文",
+        glossary: Optional[Dict[str, str]] = None,
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        detected_terms: Optional[List[str]] = None,
+        use_hyperlink_format: bool = False,
+        glossary_mode: Optional[str] = None,
+        related_terms: Optional[bool] = None,
+        glossary_report: Optional[Dict[str, Any]] = None,
+        preceding_text: Optional[str] = None,
+        paragraph_tags: bool = False
+    ) -> str:
+        """
+        Translate text using LLM with streaming
+
+        Args:
+            model: Model identifier
+            text: Text to translate
+            source_language: Source language
+            target_language: Target language
+            glossary: Translation glossary with term->translation mapping
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+            detected_terms: Glossary terms detected in the current text chunk
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            glossary_mode: "full" sends the whole glossary, "detected" only the detected
+                           and related terms (reads from TRANSLATION_GLOSSARY_MODE env var if not provided)
+            related_terms: Include partial-word matches of detected terms in "detected" mode
+            glossary_report: Optional dictionary filled with glossary prompt token savings
+            preceding_text: Source text before this chunk, sent as read-only context
+                            (not translated, not part of the output)
+            paragraph_tags: If True, the text is tagged with paragraph ID markers to echo back
+
+        Returns:
+            Translated text
+        """
+        messages, max_tokens = self._build_translation_request(
+            text, source_language, target_language, glossary, context,
+            detected_terms, use_hyperlink_format,
+            glossary_mode, related_terms, glossary_report, preceding_text, paragraph_tags
+        )
+
+        response = await self._stream_chat_completion(
+            model,
+            messages,
+            temperature=0.4,
+            max_tokens=max_tokens,
+            stream_print=stream_print,
+            stage="translate"
+        )
+
+        return response["content"]
+
+    async def update_translation_with_glossary(
+        self,
+        model: str,
+        translated_text: str,
+        glossary: Dict[str, str],
+        context: Optional[str] = None,
+        stream_print: bool = False
+    ) -> str:
+        """
+        Update translated text to use glossary terms using streaming
+
+        Args:
+            model: Model identifier
+            translated_text: Previously translated text
+            glossary: Translation glossary with term->translation mapping
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+
+        Returns:
+            Updated translated text
+        """
+        request = self._build_glossary_update_request(translated_text, glossary, context)
+        if request is None:
+            return translated_text
+        messages, max_tokens = request
+
+        response = await self._stream_chat_completion(
+            model,
+            messages,
+            temperature=0.2,
+            max_tokens=max_tokens,
+            stream_print=stream_print,
+            stage="post_edit"
+        )
+
+        return self._fix_link_targets(response["content"])
+
+    async def optimize_pdf_text_formatting(
+        self,
+        model: str,
+        extracted_text: str,
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        window_char_limit: int = 8000,
+        overlap_paragraphs: int = 2
+    ) -> str:
+        """
+        Optimize PDF extracted text formatting using LLM with sliding window
+
+        Windows are processed concurrently (at most self.max_concurrency at a time)
+        and merged in their original order.
+
+        Args:
+            model: Model identifier
+            extracted_text: Text extracted from PDF that may have formatting issues
+            context: Additional context about the document (e.g., document type, content summary)
+            stream_print: If True, print progress information
+            window_char_limit: Maximum characters per window (default: 8000)
+            overlap_paragraphs: Number of paragraphs to overlap between windows (default: 2)
+
+        Returns:
+            Formatting-optimized text
+        """
+        windows = self._create_formatting_windows(extracted_text, window_char_limit, overlap_paragraphs)
+
+        if not windows:
+            return extracted_text
+
+        if stream_print:
+            print(f"  Processing text in {len(windows)} windows (max {window_char_limit} chars each, "
+                  f"{overlap_paragraphs} paragraph overlap, {self.max_concurrency} concurrent)...")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        completed = 0
+
+        async def format_window(idx: int) -> str:
+            nonlocal completed
+            messages, max_tokens = self._build_formatting_request(windows[idx][0], context)
+            async with semaphore:
+                response = await self._stream_chat_completion(
+                    model,
+                    messages,
+                    temperature=0.1,
+                    max_tokens=max_tokens,
+                    stream_print=False,  # Disable stream_print for each window to avoid confusion
+                    stage="formatting"
+                )
+            completed += 1
+            if stream_print:
+                _, start, end = windows[idx]
+                print(f"    ✓ Window {idx + 1}/{len(windows)} optimized "
+                      f"(paragraphs {start + 1}-{end}, {completed}/{len(windows)} completed)")
+            return response["content"]
+
+        translations = await asyncio.gather(*(format_window(idx) for idx in range(len(windows))))
+
+        if stream_print:
+            print(f"  Merging {len(translations)} optimized windows...")
+
+        merged_text = self._merge_formatting_windows(windows, list(translations), overlap_paragraphs)
+
+        if stream_print:
+            print(f"  ✓ Formatting optimization completed")
+
+        return merged_text
+
+    async def align_bilingual_text(
+        self,
+        model: str,
+        english_text: str,
+        chinese_text: str,
+        stream_print: bool = False,
+        window_char_limit: int = 4000,
+        overlap_chars: int = 500
+    ) -> str:
+        """
+        Align English and Chinese text using LLM with sliding window approach
+
+        Long texts are split into windows that are aligned concurrently (at most
+        self.max_concurrency at a time) and merged in their original order.
+
+        Args:
+            model: Model identifier
+            english_text: Original English text
+            chinese_text: Translated Chinese text
+            stream_print: If True, stream and print LLM output in real-time
+            window_char_limit: Maximum characters per window (default: 4000)
+            overlap_chars: Characters to overlap between windows (default: 500)
+
+        Returns:
+            Bilingual aligned text
+        """
+        en_paragraphs = self._split_alignment_paragraphs(english_text)
+        cn_paragraphs = self._split_alignment_paragraphs(chinese_text)
+
+        if not en_paragraphs or not cn_paragraphs:
+            return chinese_text  # Fallback to Chinese only
+
+        # If text is short enough, process in one go
+        if len(chinese_text) <= window_char_limit:
+            messages, max_tokens = self._build_full_alignment_request(english_text, chinese_text)
+            response = await self._stream_chat_completion(
+                model,
+                messages,
+                temperature=0.2,
+                max_tokens=max_tokens,
+                stream_print=stream_print,
+                stage="alignment"
+            )
+            return response["content"]
+
+        if stream_print:
+            print(f"  Aligning bilingual text using sliding windows (max {window_char_limit} chars, {overlap_chars} overlap)...")
+
+        cn_windows = self._create_alignment_windows(chinese_text, window_char_limit, overlap_chars)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def align_window(idx: int) -> str:
+            cn_window, start, end = cn_windows[idx]
+            messages, max_tokens = self._build_window_alignment_request(
+                english_text, cn_window, start, end, window_char_limit
+            )
+            async with semaphore:
+                response = await self._stream_chat_completion(
+                    model,
+                    messages,
+                    temperature=0.2,
+                    max_tokens=max_tokens,
+                    stream_print=False,  # Disable stream_print for individual windows
+                    stage="alignment"
+                )
+            if stream_print:
+                print(f"    ✓ Window {idx + 1}/{len(cn_windows)} aligned (chars {start}-{end})")
+            return response["content"]
+
+        aligned_sections = await asyncio.gather(*(align_window(idx) for idx in range(len(cn_windows))))
+
+        if stream_print:
+            print(f"  Merging {len(aligned_sections)} aligned sections...")
+
+        merged_result = self._merge_aligned_sections(list(aligned_sections))
+
+        if stream_print:
+            print(f"  ✓ Bilingual alignment completed")
+
+        return merged_result
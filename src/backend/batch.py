@@ -0,0 +1,171 @@
+"""
+Batch Translation of Product Lines
+
+Collects the PDFs of a batch from a directory or a manifest, removes paragraphs
+repeated across books (boilerplate, shared stat blocks) before noun extraction,
+and reports per-book and aggregate throughput.
+
+A manifest is a text file with one PDF path per line ("#" starts a comment), or a
+JSON list of paths or of objects {"pdf": ..., "context": ..., "name": ...}.
+Relative paths are resolved against the manifest's directory.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    from .incremental import paragraph_hash
+except ImportError:
+    from backend.incremental import paragraph_hash
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+BATCH_GLOSSARY_FILE = "batch_glossary.txt"
+
+
+@dataclass
+class BatchItem:
+    """One PDF of a batch"""
+    pdf_path: str
+    name: str
+    context: Optional[str] = None
+
+
+def _unique_names(items: List[BatchItem]) -> List[BatchItem]:
+    """Make output names unique by appending _2, _3, ... to repeated names"""
+    seen: Dict[str, int] = {}
+    for item in items:
+        count = seen.get(item.name, 0) + 1
+        seen[item.name] = count
+        if count > 1:
+            item.name = f"{item.name}_{count}"
+    return items
+
+
+def collect_batch_inputs(source: Union[str, Path]) -> List[BatchItem]:
+    """
+    Collect the PDFs of a batch
+
+    Args:
+        source: Directory with PDF files (not searched recursively) or manifest file
+
+    Returns:
+        Batch items in directory order or manifest order
+
+    Raises:
+        FileNotFoundError: If the source or a PDF listed in the manifest does not exist
+        ValueError: If no PDF is found or the manifest is malformed
+    """
+    source = Path(source).expanduser()
+    if source.is_dir():
+        pdfs = sorted(path for path in source.iterdir() if path.is_file() and path.suffix.lower() == ".pdf")
+        items = [BatchItem(str(path), path.stem) for path in pdfs]
+    elif source.is_file():
+        items = []
+        base_dir = source.parent
+        if source.suffix.lower() == ".json":
+            with open(source, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if not isinstance(entries, list):
+                raise ValueError(f"Manifest {source} must contain a list of PDFs")
+        else:
+            with open(source, "r", encoding="utf-8") as f:
+                entries = [line.split("#", 1)[0].strip() for line in f]
+            entries = [entry for entry in entries if entry]
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"pdf": entry}
+            if not isinstance(entry, dict) or not entry.get("pdf"):
+                raise ValueError(f"Manifest {source}: invalid entry {entry!r}")
+            path = Path(entry["pdf"]).expanduser()
+            if not path.is_absolute():
+                path = base_dir / path
+            if not path.is_file():
+                raise FileNotFoundError(f"Manifest {source}: PDF not found: {path}")
+            items.append(BatchItem(str(path), entry.get("name") or path.stem, entry.get("context")))
+    else:
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    if not items:
+        raise ValueError(f"No PDF files found in {source}")
+    return _unique_names(items)
+
+
+def unique_paragraphs(paragraph_lists: Sequence[Sequence[str]]) -> Tuple[List[str], int]:
+    """
+    Remove paragraphs repeated within or across books, ignoring whitespace differences
+
+    Args:
+        paragraph_lists: Paragraphs of every book
+
+    Returns:
+        Tuple of (first occurrence of every paragraph in book order, total number of paragraphs)
+    """
+    seen = set()
+    unique = []
+    total = 0
+    for paragraphs in paragraph_lists:
+        total += len(paragraphs)
+        for paragraph in paragraphs:
+            key = paragraph_hash(paragraph)
+            if key not in seen:
+                seen.add(key)
+                unique.append(paragraph)
+    return unique, total
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return round(amount / seconds, 1) if seconds > 0 else 0.0
+
+
+def summarize_throughput(
+    books: List[Dict[str, Any]],
+    wall_seconds: float,
+    stage_seconds: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Compute per-book and aggregate throughput
+
+    Args:
+        books: One dictionary per book with name, status, characters, paragraphs,
+               windows, parse_seconds and translate_seconds
+        wall_seconds: Wall-clock time of the whole batch
+        stage_seconds: Wall-clock time of every batch stage
+
+    Returns:
+        Dictionary with the books (characters_per_second added) and the aggregate totals
+    """
+    for book in books:
+        book["characters_per_second"] = _rate(book.get("characters", 0), book.get("translate_seconds", 0.0))
+    done = [book for book in books if book["status"] == "translated"]
+    characters = sum(book["characters"] for book in done)
+    # Sum of per-book translation times over wall time: how many books were effectively translated at once
+    busy = sum(book["translate_seconds"] for book in done)
+    translate_wall = (stage_seconds or {}).get("translate", wall_seconds)
+    return {
+        "books": books,
+        "aggregate": {
+            "books": len(books),
+            "translated": len(done),
+            "failed": len(books) - len(done),
+            "pages": sum(book.get("pages", 0) for book in done),
+            "paragraphs": sum(book.get("paragraphs", 0) for book in done),
+            "characters": characters,
+            "windows": sum(book.get("windows", 0) for book in done),
+            "wall_seconds": round(wall_seconds, 3),
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in (stage_seconds or {}).items()},
+            "characters_per_second": _rate(characters, wall_seconds),
+            "books_in_parallel": round(busy / translate_wall, 2) if translate_wall > 0 else 0.0
+        }
+    }
+
+
+__all__ = [
+    "BatchItem",
+    "collect_batch_inputs",
+    "unique_paragraphs",
+    "summarize_throughput",
+    "BATCH_SUMMARY_FILE",
+    "BATCH_GLOSSARY_FILE",
+]
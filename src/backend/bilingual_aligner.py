@@ -0,0 +1,307 @@
+"""
+Bilingual Paragraph Aligner
+
+Pairs source paragraphs with translated paragraphs locally, in the manner of
+Gale & Church (1993). A dynamic program over "beads" (1-1, 1-0, 0-1, 2-1, 1-2 and
+2-2 paragraph groups) minimizes the sum of:
+
+- a length cost: the translated length against the length expected from the
+  document-wide length ratio, modelled as a normal distribution
+- the bead prior
+- an anchor cost: glossary terms found in the source whose translation is in the
+  target, hyperlink targets ("[艾奥梅黛](Iomedae)"), numbers and markdown headings
+
+The search is restricted to a band around the length-proportional diagonal, so a whole book aligns in
+seconds. Insertions, deletions, 2-2 beads, improbable lengths and beads whose
+anchors contradict each other are marked low-confidence, for an optional LLM pass.
+"""
+
+import bisect
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# Handle both package and direct imports
+try:
+    from .glossary_matcher import get_glossary_matcher
+except ImportError:
+    from backend.glossary_matcher import get_glossary_matcher
+
+# "local" aligns by length and anchors (LLM only for low-confidence spans), "llm" aligns every window with the LLM
+ALIGNMENT_MODES = ("local", "llm")
+
+# Prior probability of each bead (source paragraphs, target paragraphs), from Gale & Church
+BEAD_PRIORS: Dict[Tuple[int, int], float] = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099 / 2,
+    (0, 1): 0.0099 / 2,
+    (2, 1): 0.089 / 2,
+    (1, 2): 0.089 / 2,
+    (2, 2): 0.011,
+}
+
+# Variance of the translated length per source character, at a length ratio of 1
+LENGTH_VARIANCE = 6.8
+
+# Cost added for anchors that contradict each other, subtracted for anchors that agree
+ANCHOR_WEIGHT = 3.0
+
+# Length cost above which a bead is low-confidence (about a 1-in-400 length deviation)
+LOW_CONFIDENCE_COST = 6.0
+
+# Half-width of the search band around the length diagonal, in paragraphs
+ALIGNMENT_BAND = 30
+
+_LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_NUMBER_PATTERN = re.compile(r"\d+")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$", re.DOTALL)
+_SQRT2 = math.sqrt(2.0)
+
+
+def is_bilingual_llm_fallback_enabled() -> bool:
+    """
+    Check the BILINGUAL_LLM_FALLBACK opt-out flag
+
+    Returns:
+        False if BILINGUAL_LLM_FALLBACK is set to 0/false/no, True otherwise
+    """
+    return os.getenv("BILINGUAL_LLM_FALLBACK", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass
+class AlignedPair:
+    """Source and target paragraph indices aligned to each other"""
+    source: List[int] = field(default_factory=list)
+    target: List[int] = field(default_factory=list)
+    cost: float = 0.0
+    confident: bool = True
+
+
+class BilingualAligner:
+    """Length- and anchor-based paragraph aligner"""
+
+    def __init__(self, glossary: Optional[Dict[str, str]] = None):
+        """
+        Initialize aligner
+
+        Args:
+            glossary: Translation glossary with term->translation mapping, used as anchors
+        """
+        self.glossary = {
+            term: translation for term, translation in (glossary or {}).items()
+            if translation and translation != term
+        }
+
+    def _anchors(
+        self,
+        sources: Sequence[str],
+        targets: Sequence[str]
+    ) -> Tuple[List[FrozenSet[str]], List[FrozenSet[str]]]:
+        """Anchor keys of every source and target paragraph"""
+        # Hyperlink targets name the source term ("Iomedae", "Lord_of_Graves")
+        target_links = [
+            [link.replace("_", " ") for _, link in _LINK_PATTERN.findall(text)] for text in targets
+        ]
+        vocabulary = list(self.glossary) + sorted({link for links in target_links for link in links})
+        source_matcher = get_glossary_matcher(vocabulary)
+        translation_terms: Dict[str, List[str]] = {}
+        for term, translation in self.glossary.items():
+            translation_terms.setdefault(translation, []).append(term)
+        target_matcher = get_glossary_matcher(list(translation_terms), word_boundaries=False)
+
+        def keys(text: str, terms: Sequence[str]) -> FrozenSet[str]:
+            found = {term.lower() for term in terms}
+            found.update("#" + number for number in _NUMBER_PATTERN.findall(text))
+            if text.startswith("#"):
+                found.add("<heading>")
+            return frozenset(found)
+
+        source_anchors = [keys(text, source_matcher.detect(text)) for text in sources]
+        target_anchors = []
+        for text, links in zip(targets, target_links):
+            terms = list(links)
+            for translation in target_matcher.detect(_LINK_PATTERN.sub(r"\1", text)):
+                terms.extend(translation_terms[translation])
+            # Link targets are URLs: their numbers are not part of the text
+            target_anchors.append(keys(_LINK_PATTERN.sub(r"\1", text), terms))
+        return source_anchors, target_anchors
+
+    def align(self, sources: Sequence[str], targets: Sequence[str]) -> List[AlignedPair]:
+        """
+        Align source and target paragraphs
+
+        Args:
+            sources: Source paragraphs
+            targets: Translated paragraphs
+
+        Returns:
+            Aligned pairs covering every paragraph in order
+        """
+        num_sources, num_targets = len(sources), len(targets)
+        if not num_sources or not num_targets:
+            return (
+                [AlignedPair([idx], [], 0.0, False) for idx in range(num_sources)]
+                + [AlignedPair([], [idx], 0.0, False) for idx in range(num_targets)]
+            )
+
+        # Prefix sums of paragraph lengths (hyperlink URLs do not count)
+        source_sums = [0]
+        for text in sources:
+            source_sums.append(source_sums[-1] + len(text))
+        target_sums = [0]
+        for text in targets:
+            target_sums.append(target_sums[-1] + len(_LINK_PATTERN.sub(r"\1", text)))
+        ratio = target_sums[-1] / max(1, source_sums[-1]) or 1.0
+        variance = LENGTH_VARIANCE * ratio * ratio
+        source_anchors, target_anchors = self._anchors(sources, targets)
+        prior_costs = {bead: -math.log(prior) for bead, prior in BEAD_PRIORS.items()}
+
+        # Anchor keys of the paragraph groups ending at each position, for groups of 0, 1 and 2 paragraphs
+        empty: FrozenSet[str] = frozenset()
+        source_groups = [
+            [empty] * (num_sources + 1),
+            [empty] + source_anchors,
+            [empty, empty] + [a | b for a, b in zip(source_anchors, source_anchors[1:])],
+        ]
+        target_groups = [
+            [empty] * (num_targets + 1),
+            [empty] + target_anchors,
+            [empty, empty] + [a | b for a, b in zip(target_anchors, target_anchors[1:])],
+        ]
+        erfc, log, sqrt = math.erfc, math.log, math.sqrt
+
+        def bead_cost(i: int, j: int, di: int, dj: int) -> Tuple[float, float, float]:
+            """Length cost, anchor cost and anchor agreement (Dice coefficient, -1 without anchors)"""
+            source_length = source_sums[i] - source_sums[i - di]
+            target_length = target_sums[j] - target_sums[j - dj]
+            mean = (source_length + target_length / ratio) / 2
+            delta = (target_length - source_length * ratio) / sqrt((mean if mean > 1.0 else 1.0) * variance)
+            length_cost = -log(max(erfc((delta if delta > 0 else -delta) / _SQRT2), 1e-300))
+            source_keys, target_keys = source_groups[di][i], target_groups[dj][j]
+            if source_keys and target_keys:
+                dice = 2 * len(source_keys & target_keys) / (len(source_keys) + len(target_keys))
+                return length_cost, ANCHOR_WEIGHT * (1 - 2 * dice), dice
+            if source_keys or target_keys:
+                return length_cost, ANCHOR_WEIGHT / 2, -1.0
+            return length_cost, 0.0, -1.0
+
+        # Band around the length diagonal: row i covers target positions [low[i], high[i]] around
+        # the target paragraph where the translated length reaches the expected length of source[:i]
+        band = ALIGNMENT_BAND
+        centers = [bisect.bisect_left(target_sums, length * ratio) for length in source_sums]
+        low = [max(0, center - band) for center in centers]
+        high = [min(num_targets, center + band) for center in centers]
+        high[num_sources] = num_targets
+
+        infinity = float("inf")
+        costs: List[List[float]] = []
+        back: List[List[Tuple[int, int]]] = []
+        beads = [(di, dj, prior_cost) for (di, dj), prior_cost in prior_costs.items()]
+        for i in range(num_sources + 1):
+            row_low = low[i]
+            row_costs = [infinity] * (high[i] - row_low + 1)
+            row_back: List[Tuple[int, int]] = [(0, 0)] * len(row_costs)
+            for j in range(row_low, high[i] + 1):
+                if i == 0 and j == 0:
+                    row_costs[0] = 0.0
+                    continue
+                best, best_bead = infinity, (0, 0)
+                for di, dj, prior_cost in beads:
+                    pi, pj = i - di, j - dj
+                    if pi < 0 or pj < 0:
+                        continue
+                    if pi == i:
+                        if pj < row_low:
+                            continue
+                        previous = row_costs[pj - row_low]
+                    else:
+                        if not low[pi] <= pj <= high[pi]:
+                            continue
+                        previous = costs[pi][pj - low[pi]]
+                    if previous == infinity:
+                        continue
+                    length_cost, anchor_cost, _ = bead_cost(i, j, di, dj)
+                    total = previous + length_cost + anchor_cost + prior_cost
+                    if total < best:
+                        best, best_bead = total, (di, dj)
+                row_costs[j - row_low] = best
+                row_back[j - row_low] = best_bead
+            costs.append(row_costs)
+            back.append(row_back)
+
+        if costs[num_sources][num_targets - low[num_sources]] == infinity:
+            # Paragraph counts too different for the band: one unaligned block
+            return [AlignedPair(list(range(num_sources)), list(range(num_targets)), infinity, False)]
+
+        pairs: List[AlignedPair] = []
+        i, j = num_sources, num_targets
+        while i > 0 or j > 0:
+            di, dj = back[i][j - low[i]]
+            length_cost, anchor_cost, dice = bead_cost(i, j, di, dj)
+            # Confident: a 1-1, 2-1 or 1-2 bead of plausible length whose anchors do not contradict
+            confident = (di, dj) in ((1, 1), (2, 1), (1, 2)) and length_cost <= LOW_CONFIDENCE_COST and dice != 0
+            pairs.append(AlignedPair(
+                list(range(i - di, i)), list(range(j - dj, j)), length_cost + anchor_cost + prior_costs[(di, dj)],
+                confident
+            ))
+            i, j = i - di, j - dj
+        pairs.reverse()
+        return pairs
+
+
+def find_low_confidence_spans(pairs: Sequence[AlignedPair], max_gap: int = 1) -> List[Tuple[int, int]]:
+    """
+    Group low-confidence pairs into spans
+
+    Args:
+        pairs: Aligned pairs
+        max_gap: Confident pairs between two low-confidence pairs that still join their spans (default: 1)
+
+    Returns:
+        List of (first, end) half-open ranges of pair indices
+    """
+    spans: List[Tuple[int, int]] = []
+    for idx, pair in enumerate(pairs):
+        if pair.confident:
+            continue
+        if spans and idx - spans[-1][1] <= max_gap:
+            spans[-1] = (spans[-1][0], idx + 1)
+        else:
+            spans.append((idx, idx + 1))
+    return spans
+
+
+def render_aligned_pair(sources: Sequence[str], targets: Sequence[str]) -> str:
+    """
+    Render aligned paragraphs as bilingual markdown
+
+    Headings are merged as "## 中文标题 (English Title)"; other source paragraphs
+    are quoted, each followed by the translated paragraphs.
+
+    Args:
+        sources: Source paragraphs of the pair
+        targets: Translated paragraphs of the pair
+
+    Returns:
+        Bilingual markdown
+    """
+    if len(sources) == 1 and len(targets) == 1:
+        source_heading = _HEADING_PATTERN.match(sources[0])
+        target_heading = _HEADING_PATTERN.match(targets[0])
+        if source_heading and target_heading:
+            return f"{target_heading.group(1)} {target_heading.group(2).strip()} ({source_heading.group(2).strip()})"
+    parts = ["> " + source.replace("\n", "\n> ") for source in sources]
+    parts.extend(targets)
+    return "\n\n".join(parts)
+
+
+__all__ = [
+    "AlignedPair",
+    "BilingualAligner",
+    "find_low_confidence_spans",
+    "render_aligned_pair",
+    "is_bilingual_llm_fallback_enabled",
+    "ALIGNMENT_MODES",
+]
@@ -5,17 +5,31 @@ SiliconFlow API Client for LLM operations with streaming support
 from openai import OpenAI
 import os
 import re
-from typing import List, Dict, Optional, Any, Iterator, Tuple
+from typing import List, Dict, Optional, Any, Iterator, Set, Tuple
 from pathlib import Path
 import time
+import threading
 from functools import wraps
 
 # Import shared configuration loader
 from .config_loader import load_environment_config
+from .response_cache import ResponseCache, is_cache_enabled, get_default_response_cache
+from .rate_limiter import RateLimiter, get_default_rate_limiter
+from .tokenizer import count_tokens, count_message_tokens, get_model_token_budget
+from .glossary_matcher import get_glossary_matcher
+from .similarity_engine import get_similarity_engine, NUMPY_AVAILABLE
+from .metrics import MetricsRegistry, get_metrics_registry
+from .endpoint_router import Endpoint, EndpointRouter, get_default_endpoint_router
 
 # Load environment variables using shared loader
 load_environment_config()
 
+# Minimum trigram Jaccard similarity for "similar spelling" hints in glossary requests
+SIMILAR_SPELLING_THRESHOLD = 0.5
+
+# Maximum similar-spelling hints per term
+SIMILAR_SPELLING_HINTS = 2
+
 
 def retry_on_error(max_retries: int = 3, timeout_seconds: int = 60):
     """
@@ -51,231 +65,633 @@ def retry_on_error(max_retries: int = 3, timeout_seconds: int = 60):
     return decorator
 
 
-class SiliconFlowClient:
-    """Client for SiliconFlow API with streaming support"""
+class _StreamAccumulator:
+    """Collects streamed chat completion chunks into a response dictionary"""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(self, model: str, stream_print: bool = False, enable_thinking: bool = False):
         """
-        Initialize SiliconFlow client
+        Initialize stream accumulator
+
+        Args:
+            model: Requested model identifier (used when the stream does not report one)
+            stream_print: If True, print the output in real-time
+            enable_thinking: If True, collect reasoning_content
+        """
+        self.model = model
+        self.stream_print = stream_print
+        self.enable_thinking = enable_thinking
+        self.content_buffer: List[str] = []
+        self.reasoning_content_buffer: List[str] = []
+        self.model_name: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.first_content_received = False
+        self.first_reasoning_received = False
+        self.usage_reported = False
+        # perf_counter timestamps of the first and last streamed token
+        self.first_token_at: Optional[float] = None
+        self.last_token_at: Optional[float] = None
+
+    def add_chunk(self, chunk) -> None:
+        """
+        Process a single streamed chunk
+
+        Args:
+            chunk: ChatCompletionChunk from the OpenAI SDK
+        """
+        if not self.model_name and chunk.model:
+            self.model_name = chunk.model
+
+        # Get usage if available (some models return this in final chunk)
+        if hasattr(chunk, 'usage') and chunk.usage:
+            usage = chunk.usage
+            self.usage_reported = True
+            if isinstance(usage, dict):
+                if usage.get('prompt_tokens'):
+                    self.prompt_tokens = usage['prompt_tokens']
+                if usage.get('completion_tokens'):
+                    self.completion_tokens = usage['completion_tokens']
+            else:
+                if hasattr(usage, 'prompt_tokens') and usage.prompt_tokens:
+                    self.prompt_tokens = usage.prompt_tokens
+                if hasattr(usage, 'completion_tokens') and usage.completion_tokens:
+                    self.completion_tokens = usage.completion_tokens
+
+        # The usage-only chunk at the end of a stream carries no choices
+        if not chunk.choices:
+            return
+
+        delta = chunk.choices[0].delta
+
+        if getattr(delta, 'content', None) or getattr(delta, 'reasoning_content', None):
+            self.last_token_at = time.perf_counter()
+            if self.first_token_at is None:
+                self.first_token_at = self.last_token_at
+
+        # Accumulate reasoning content if enable_thinking
+        if self.enable_thinking and hasattr(delta, 'reasoning_content') and delta.reasoning_content:
+            # Clear the loading indicator before printing first reasoning
+            if self.stream_print and not self.first_reasoning_received:
+                print("\r" + " " * 30 + "\r", end='', flush=True)
+                print("\n--- Reasoning ---", end='', flush=True)
+                self.first_reasoning_received = True
+
+            reasoning_content = delta.reasoning_content
+            self.reasoning_content_buffer.append(reasoning_content)
+            self.completion_tokens += 1
+
+            # Print reasoning content in real-time if enable_thinking
+            if self.stream_print:
+                print(reasoning_content, end='', flush=True)
+
+        # Accumulate content and print immediately when received
+        if hasattr(delta, 'content') and delta.content:
+            # Clear the loading indicator before printing first content
+            if self.stream_print and not self.first_content_received:
+                print("\r" + " " * 30 + "\r", end='', flush=True)
+                # Print reasoning section heading if reasoning exists
+                if self.reasoning_content_buffer:
+                    print("\n--- Reasoning ---\n" + "".join(self.reasoning_content_buffer) + "\n--- Response ---")
+                self.first_content_received = True
+
+            content = delta.content
+            self.content_buffer.append(content)
+            self.completion_tokens += 1  # Rough token count estimation
+
+            # Print content in real-time as soon as it's received
+            if self.stream_print:
+                print(content, end='', flush=True)
+
+        # Capture finish reason
+        if chunk.choices[0].finish_reason:
+            self.finish_reason = chunk.choices[0].finish_reason
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Build the response dictionary from the collected chunks
+
+        Returns:
+            Response dictionary with content, reasoning_content and metadata
+        """
+        # Add newline if we were printing
+        if self.stream_print and self.content_buffer:
+            print()
+
+        full_content = "".join(self.content_buffer)
+        full_reasoning_content = "".join(self.reasoning_content_buffer) if self.reasoning_content_buffer else None
+
+        result = {
+            "content": full_content,
+            "model": self.model_name or self.model,
+            "usage": {
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens
+            },
+            "finish_reason": self.finish_reason
+        }
+
+        # Add reasoning_content if enable_thinking and it exists
+        if self.enable_thinking and full_reasoning_content:
+            result["reasoning_content"] = full_reasoning_content
+
+        return result
+
+
+
+class _CompletionRequest:
+    """Per-request state shared by the synchronous and asynchronous retry loops"""
+
+    def __init__(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        top_p: float,
+        stream_print: bool,
+        enable_thinking: bool,
+        stage: str,
+        kwargs: Dict[str, Any],
+        request_kwargs: Dict[str, Any],
+        estimated_tokens: int,
+        sent_model: Optional[str]
+    ):
+        """
+        Initialize completion request state
+
+        Args:
+            model: Requested model identifier
+            messages: Message list with role and content
+            temperature: Response randomness (0-2)
+            max_tokens: Maximum tokens to generate, already fitted to the context window
+            top_p: Nucleus sampling threshold (0-1)
+            stream_print: If True, stream and print the output in real-time
+            enable_thinking: If True, enable reasoning_content extraction
+            stage: Pipeline stage the request belongs to (metrics tag)
+            kwargs: Additional parameters given by the caller
+            request_kwargs: Additional parameters actually sent (may gain or lose stream_options)
+            estimated_tokens: Prompt tokens reserved from the rate limiter
+            sent_model: Model sent to every endpoint, or None if endpoints override it differently
+        """
+        self.model = model
+        self.messages = messages
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.top_p = top_p
+        self.stream_print = stream_print
+        self.enable_thinking = enable_thinking
+        self.stage = stage
+        self.kwargs = kwargs
+        self.request_kwargs = request_kwargs
+        self.estimated_tokens = estimated_tokens
+        self.sent_model = sent_model
+        self.cache_key: Optional[str] = None
+        self.rate_limit_wait = 0.0
+        self.failed_endpoints: Set[str] = set()
+
+# Glossary prompt modes for translate_text
+GLOSSARY_MODES = ("full", "detected")
+
+
+class _SiliconFlowClientBase:
+    """
+    Shared configuration, prompt construction and response parsing for the
+    synchronous and asynchronous SiliconFlow clients
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        router: Optional[EndpointRouter] = None
+    ):
+        """
+        Initialize SiliconFlow client configuration
 
         Args:
             api_key: API key (reads from SILICONFLOW_API_KEY env var if not provided)
             base_url: Base URL (reads from SILICONFLOW_BASE_URL env var if not provided)
+            cache: Response cache to use (uses the shared on-disk cache if not provided)
+            use_cache: Set to False to bypass the response cache
+                       (reads from LLM_CACHE_ENABLED env var if not provided)
+            rate_limiter: RPM/TPM limiter shared by all requests (uses the limiter
+                          configured by SILICONFLOW_RPM / SILICONFLOW_TPM if not provided)
+            metrics: Registry for per-stage request metrics (uses the process-wide registry if not provided)
+            router: Endpoints to spread requests over (uses LLM_ENDPOINTS if not provided,
+                    otherwise the single endpoint given by api_key / base_url)
         """
-        self.api_key = api_key or os.getenv("SILICONFLOW_API_KEY")
-        self.base_url = base_url or os.getenv("SILICONFLOW_BASE_URL", "https://api.siliconflow.cn/v1")
+        router = router or get_default_endpoint_router()
+        primary = router.endpoints[0] if router is not None else None
+        self.api_key = api_key or os.getenv("SILICONFLOW_API_KEY") or (primary.api_key if primary else None)
+        self.base_url = base_url or os.getenv("SILICONFLOW_BASE_URL") or (
+            primary.base_url if primary else "https://api.siliconflow.cn/v1"
+        )
 
         if not self.api_key:
             raise ValueError("SILICONFLOW_API_KEY must be provided")
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-            timeout=60.0  # Set a longer timeout for streaming
+        if use_cache is None:
+            use_cache = is_cache_enabled()
+        self.cache: Optional[ResponseCache] = (cache or get_default_response_cache()) if use_cache else None
+        self.rate_limiter = rate_limiter or get_default_rate_limiter(self.api_key)
+        # Every request is routed; without configured endpoints the router only holds this client's endpoint
+        self.router = router or EndpointRouter([
+            Endpoint(self.base_url, self.api_key, name="default", rate_limiter=self.rate_limiter)
+        ])
+
+        # Responses cut off at max_tokens are continued up to this many times
+        self.max_continuations = int(os.getenv("LLM_MAX_CONTINUATIONS", "2"))
+        self.continuation_stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+
+        self.metrics = metrics or get_metrics_registry()
+        # Ask for usage in the final stream chunk; disabled automatically if the endpoint rejects it
+        self.stream_usage = os.getenv("SILICONFLOW_STREAM_USAGE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    def _response_cache_key(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        top_p: float,
+        enable_thinking: bool,
+        extra: Dict[str, Any]
+    ) -> Optional[str]:
+        """Build the response cache key for a request, or None if caching is disabled"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            enable_thinking=enable_thinking,
+            extra=extra
         )
 
     @staticmethod
-    def _execute_stream_request(client: OpenAI, model: str, messages: List[Dict[str, str]],
-                                 temperature: float, max_tokens: Optional[int],
-                                 top_p: float, **kwargs):
+    def _replay_cached_response(cached: Dict[str, Any], stream_print: bool) -> Dict[str, Any]:
+        """Print a cached response the way a streamed one would be shown"""
+        if stream_print:
+            print("\r[cached response]          ")
+            print(cached.get("content", ""))
+        cached["cached"] = True
+        return cached
+
+    def _should_cache_response(self, result: Dict[str, Any]) -> bool:
+        """Only complete, non-empty responses are worth replaying"""
+        return (
+            self.cache is not None
+            and bool(result.get("content"))
+            and result.get("finish_reason") not in ("content_filter", "error")
+        )
+
+    @staticmethod
+    def _retry_wait_time(error: Exception, attempt: int) -> Tuple[float, bool]:
         """
-        Execute a streaming request with timeout - used internally for retry logic
+        Get the backoff before the next attempt
 
         Args:
-            client: OpenAI client instance with timeout configured
-            model: Model identifier
-            messages: Message list
-            temperature: Temperature setting
-            max_tokens: Max tokens
-            top_p: Top_p setting
-            **kwargs: Additional parameters
+            error: Exception raised by the request
+            attempt: Zero-based attempt number
 
         Returns:
-            Stream object
+            Tuple of (seconds to wait, True if the API rejected the request with 429)
         """
-        return client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            top_p=top_p,
-            stream=True,
-            **kwargs
+        wait_time = 2 ** attempt  # Exponential backoff
+        if getattr(error, "status_code", None) != 429:
+            return wait_time, False
+
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(float(retry_after), 0.0), True
+        except (TypeError, ValueError):
+            return wait_time, True
+
+    def _prepare_request_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add stream_options so the API reports exact usage at the end of the stream"""
+        request_kwargs = dict(kwargs)
+        if self.stream_usage and "stream_options" not in request_kwargs:
+            request_kwargs["stream_options"] = {"include_usage": True}
+        return request_kwargs
+
+    def _disable_stream_usage(self, error: Exception, request_kwargs: Dict[str, Any], kwargs: Dict[str, Any]) -> bool:
+        """
+        Drop stream_options we added when the endpoint rejects the request
+
+        Returns:
+            True if the request should be retried without stream_options
+        """
+        if getattr(error, "status_code", None) not in (400, 422):
+            return False
+        if "stream_options" not in request_kwargs or "stream_options" in kwargs:
+            return False
+        self.stream_usage = False
+        request_kwargs.pop("stream_options")
+        return True
+
+    def _record_stream_metrics(
+        self,
+        stage: str,
+        accumulator: _StreamAccumulator,
+        request_start: float,
+        request_end: float,
+        retries: int,
+        rate_limit_wait: float
+    ) -> None:
+        """Record latency, time-to-first-token, throughput and usage of a finished stream"""
+        first, last = accumulator.first_token_at, accumulator.last_token_at
+        self.metrics.record_request(
+            stage,
+            latency=request_end - request_start,
+            ttft=first - request_start if first is not None else None,
+            prompt_tokens=accumulator.prompt_tokens,
+            completion_tokens=accumulator.completion_tokens,
+            generation_seconds=last - first if first is not None and last is not None else None,
+            retries=retries,
+            usage_reported=accumulator.usage_reported,
+            rate_limit_wait=rate_limit_wait
         )
 
-    def _stream_chat_completion(
+    @staticmethod
+    def _actual_tokens(estimated_tokens: int, result: Dict[str, Any]) -> int:
+        """Total tokens of a finished request, estimated when the stream reported no usage"""
+        return result["usage"]["total_tokens"] or estimated_tokens + count_tokens(result.get("content", ""))
+
+    def _reconcile_rate_limit(self, endpoint: Endpoint, estimated_tokens: int, result: Dict[str, Any]) -> None:
+        """Correct the endpoint limiter's token estimate with the usage of a finished request"""
+        if endpoint.rate_limiter is None:
+            return
+        endpoint.rate_limiter.reconcile(estimated_tokens, self._actual_tokens(estimated_tokens, result))
+
+    def _record_request_error(
+        self,
+        endpoint: Endpoint,
+        error: Exception,
+        attempt: int,
+        failed_endpoints: Set[str]
+    ) -> Tuple[float, float]:
+        """
+        Report a failed attempt to the router and decide how to back off
+
+        Args:
+            endpoint: Endpoint the attempt was sent to
+            error: Exception raised by the request
+            attempt: Zero-based attempt number
+            failed_endpoints: Names of endpoints that failed for this request (updated)
+
+        Returns:
+            Tuple of (seconds to sleep, seconds the endpoint's rate limiter must pause its users)
+        """
+        wait_time, rate_limited = self._retry_wait_time(error, attempt)
+        self.router.release(endpoint, error=error, cooldown=wait_time if rate_limited else 0.0)
+        failed_endpoints.add(endpoint.name)
+        if rate_limited and endpoint.rate_limiter is not None:
+            # Pause every user of the quota; the next acquire() waits it out
+            return 0.0, wait_time
+        if self.router.has_alternative(failed_endpoints):
+            return 0.0, 0.0
+        return wait_time, 0.0
+
+    # Attempts after the first one before a request fails
+    _MAX_RETRIES = 3
+
+    def _begin_completion(
         self,
         model: str,
         messages: List[Dict[str, str]],
-        temperature: float = 0.7,
-        max_tokens: Optional[int] = None,
-        top_p: float = 0.7,
-        stream_print: bool = False,
-        enable_thinking: bool = False,
-        **kwargs
-    ) -> Dict[str, Any]:
+        temperature: float,
+        max_tokens: Optional[int],
+        top_p: float,
+        stream_print: bool,
+        enable_thinking: bool,
+        stage: str,
+        kwargs: Dict[str, Any]
+    ) -> _CompletionRequest:
         """
-        Send chat completion request with streaming (60s timeout with 3 retries)
+        Prepare a completion request before its first attempt
 
-        Args:
-            model: Model identifier (e.g., "Pro/moonshotai/Kimi-K2.5")
-            messages: Message list with role and content
-            temperature: Response randomness (0-2)
-            max_tokens: Maximum tokens to generate
-            top_p: Nucleus sampling threshold (0-1)
-            stream_print: If True, stream and print the output in real-time
-            enable_thinking: If True, enable reasoning_content extraction
-            **kwargs: Additional parameters
+        Fits max_tokens to the model's context window and builds the response cache key
+        when every endpoint is sent the same model.
 
         Returns:
-            Response dictionary with content, reasoning_content and metadata
+            Request state for the retry loop (cache_key set if the cache can be checked now)
         """
-        # Print messages and waiting indicator before making the request
         if stream_print:
-            print("\n--- User Messages ---")
-            for msg in messages:
-                role = msg.get('role', 'unknown').upper()
-                content = msg.get('content', '')
-                print(f"[{role}]: {content[:200]}{'...' if len(content) > 200 else ''}")
-            print("---------------------")
-            print("  [Waiting for response...] ", end='', flush=True)
-
-        # Streaming completion with 60s timeout and 3 retries
-        max_retries = 3
-        for attempt in range(max_retries + 1):
-            try:
-                stream = self._execute_stream_request(
-                    self.client, model, messages,
-                    temperature, max_tokens, top_p, **kwargs
-                )
-                break  # Success exit the retry loop
-            except Exception as e:
-                if attempt < max_retries:
-                    error_msg = str(e).lower()
-                    is_timeout = 'timeout' in error_msg or 'timed out' in error_msg
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    if stream_print:
-                        print(f"\rRequest failed (attempt {attempt + 1}/{max_retries + 1}): {type(e).__name__} - retrying... ", end='', flush=True)
-                    time.sleep(wait_time)
-                else:
-                    if stream_print:
-                        print(f"\rAll {max_retries + 1} attempts failed. Raising exception.")
-                    raise
-
-        content_buffer = []
-        reasoning_content_buffer = []
-        model_name = None
-        finish_reason = None
-        prompt_tokens = 0
-        completion_tokens = 0
-        first_content_received = False
-        first_reasoning_received = False
-
-        for chunk in stream:
-            if not model_name and chunk.model:
-                model_name = chunk.model
-
-            delta = chunk.choices[0].delta
-
-            # Accumulate reasoning content if enable_thinking
-            if enable_thinking and hasattr(delta, 'reasoning_content') and delta.reasoning_content:
-                # Clear the loading indicator before printing first reasoning
-                if stream_print and not first_reasoning_received:
-                    print("\r" + " " * 30 + "\r", end='', flush=True)
-                    print("\n--- Reasoning ---", end='', flush=True)
-                    first_reasoning_received = True
-
-                reasoning_content = delta.reasoning_content
-                reasoning_content_buffer.append(reasoning_content)
-                completion_tokens += 1
-
-                # Print reasoning content in real-time if enable_thinking
-                if stream_print:
-                    if not hasattr(delta, 'content') or not delta.content:
-                        # If there's no content in this chunk, newline before reasoning
-                        pass
-                    print(reasoning_content, end='', flush=True)
-
-            # Accumulate content and print immediately when received
-            if hasattr(delta, 'content') and delta.content:
-                # Clear the loading indicator before printing first content
-                if stream_print and not first_content_received:
-                    print("\r" + " " * 30 + "\r", end='', flush=True)
-                    # Print reasoning section heading if reasoning exists
-                    if reasoning_content_buffer:
-                        print("\n--- Reasoning ---\n" + "".join(reasoning_content_buffer) + "\n--- Response ---")
-                    first_content_received = True
-
-                content = delta.content
-                content_buffer.append(content)
-                completion_tokens += 1  # Rough token count estimation
-
-                # Print content in real-time as soon as it's received
-                if stream_print:
-                    print(content, end='', flush=True)
-
-            # Capture finish reason
-            if chunk.choices[0].finish_reason:
-                finish_reason = chunk.choices[0].finish_reason
-
-            # Get usage if available (some models return this in final chunk)
-            if hasattr(chunk, 'usage') and chunk.usage:
-                usage = chunk.usage
-                if isinstance(usage, dict):
-                    if usage.get('prompt_tokens'):
-                        prompt_tokens = usage['prompt_tokens']
-                    if usage.get('completion_tokens'):
-                        completion_tokens = usage['completion_tokens']
-                else:
-                    if hasattr(usage, 'prompt_tokens') and usage.prompt_tokens:
-                        prompt_tokens = usage.prompt_tokens
-                    if hasattr(usage, 'completion_tokens') and usage.completion_tokens:
-                        completion_tokens = usage.completion_tokens
+            self._print_request_messages(messages)
 
-        # Add newline if we were printing
-        if stream_print and content_buffer:
-            print()
+        # Keep prompt + completion inside the model's context window
+        prompt_tokens = count_message_tokens(messages)
+        max_tokens = get_model_token_budget(model).fit_to_context(prompt_tokens, max_tokens)
 
-        full_content = "".join(content_buffer)
-        full_reasoning_content = "".join(reasoning_content_buffer) if reasoning_content_buffer else None
+        request = _CompletionRequest(
+            model, messages, temperature, max_tokens, top_p, stream_print, enable_thinking, stage,
+            kwargs, self._prepare_request_kwargs(kwargs), prompt_tokens, self.router.resolve_model(model)
+        )
+        # Responses are cached per model actually sent; with endpoints overriding the model
+        # differently, the cache is consulted once the endpoint is chosen
+        if request.sent_model is not None:
+            request.cache_key = self._request_cache_key(request, request.sent_model)
+        return request
+
+    def _request_cache_key(self, request: _CompletionRequest, model: str) -> Optional[str]:
+        """Build the response cache key of a request sent with the given model"""
+        return self._response_cache_key(
+            model, request.messages, request.temperature, request.max_tokens,
+            request.top_p, request.enable_thinking, request.kwargs
+        )
 
-        result = {
-            "content": full_content,
-            "model": model_name or model,
-            "usage": {
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": prompt_tokens + completion_tokens
-            },
-            "finish_reason": finish_reason
-        }
+    def _endpoint_cache_key(self, request: _CompletionRequest, endpoint: Endpoint) -> Optional[str]:
+        """
+        Build the cache key once the endpoint is chosen
 
-        # Add reasoning_content if enable_thinking and it exists
-        if enable_thinking and full_reasoning_content:
-            result["reasoning_content"] = full_reasoning_content
+        Returns:
+            Key to look up, or None if the cache was already checked before the first attempt
+        """
+        if request.sent_model is not None:
+            return None
+        request.cache_key = self._request_cache_key(request, endpoint.model or request.model)
+        return request.cache_key
 
-        return result
+    def _cached_completion(
+        self,
+        request: _CompletionRequest,
+        cached: Dict[str, Any],
+        endpoint: Optional[Endpoint] = None
+    ) -> Dict[str, Any]:
+        """Answer a request from the response cache, releasing the endpoint chosen for it"""
+        if endpoint is not None:
+            self.router.release(endpoint)
+        self.metrics.record_cached(request.stage)
+        return self._replay_cached_response(cached, request.stream_print)
 
-    def extract_proper_nouns(
+    def _handle_attempt_error(
         self,
-        model: str,
-        text: str,
-        context: Optional[str] = None,
-        stream_print: bool = False
-    ) -> List[str]:
+        request: _CompletionRequest,
+        endpoint: Endpoint,
+        error: Exception,
+        attempt: int
+    ) -> Tuple[float, float]:
         """
-        Extract proper nouns from text using streaming
+        Report a failed attempt and decide how to back off before the next one
 
         Args:
-            model: Model identifier
-            text: Text to analyze
-            context: Additional context about the document
-            stream_print: If True, stream and print the output in real-time
+            request: Request state (failed endpoints and request_kwargs are updated)
+            endpoint: Endpoint the attempt was sent to
+            error: Exception raised by the request
+            attempt: Zero-based attempt number
 
         Returns:
-            List of extracted proper nouns
+            Tuple of (seconds to sleep, seconds the endpoint's rate limiter must pause its users)
+
+        Raises:
+            The error itself once all attempts failed
+        """
+        if attempt < self._MAX_RETRIES and self._disable_stream_usage(error, request.request_kwargs, request.kwargs):
+            self.router.release(endpoint, error=error)
+            return 0.0, 0.0
+        backoff = self._record_request_error(endpoint, error, attempt, request.failed_endpoints)
+        if attempt >= self._MAX_RETRIES:
+            if request.stream_print:
+                print(f"\rAll {self._MAX_RETRIES + 1} attempts failed. Raising exception.")
+            self.metrics.record_error(request.stage, attempt)
+            raise error
+        if request.stream_print:
+            print(f"\rRequest failed (attempt {attempt + 1}/{self._MAX_RETRIES + 1}): {type(error).__name__} - retrying... ", end='', flush=True)
+        return backoff
+
+    def _finish_completion(
+        self,
+        request: _CompletionRequest,
+        endpoint: Endpoint,
+        accumulator: _StreamAccumulator,
+        request_start: float,
+        attempt: int
+    ) -> Dict[str, Any]:
+        """Release the endpoint of a finished stream, record its metrics and build the response"""
+        request_end = time.perf_counter()
+        self.router.release(endpoint, latency=(accumulator.first_token_at or request_end) - request_start)
+        self._record_stream_metrics(
+            request.stage, accumulator, request_start, request_end, attempt, request.rate_limit_wait
+        )
+        return accumulator.result()
+
+    _CONTINUATION_PROMPT = (
+        "Your previous response was cut off because it reached the output length limit. "
+        "Continue exactly where it stopped. Do not repeat any text that was already written "
+        "and do not add explanations or notes."
+    )
+
+    @classmethod
+    def _build_continuation_messages(
+        cls,
+        messages: List[Dict[str, str]],
+        partial_content: str
+    ) -> List[Dict[str, str]]:
+        """Build a follow-up request that carries the truncated output"""
+        return list(messages) + [
+            {"role": "assistant", "content": partial_content},
+            {"role": "user", "content": cls._CONTINUATION_PROMPT}
+        ]
+
+    @staticmethod
+    def _stitch_continuation(existing: str, continuation: str, max_overlap: int = 500, min_overlap: int = 20) -> str:
+        """
+        Append a continuation, dropping text the model repeated from the end of the previous part
+
+        Args:
+            existing: Output collected so far
+            continuation: Output of the continuation request
+            max_overlap: Longest repeated text to look for
+            min_overlap: Shortest repeated text treated as a repeat (avoids false positives)
+
+        Returns:
+            Stitched output
+        """
+        limit = min(len(existing), len(continuation), max_overlap)
+        for size in range(limit, min_overlap - 1, -1):
+            if existing.endswith(continuation[:size]):
+                return existing + continuation[size:]
+        return existing + continuation
+
+    def _merge_continuation(self, result: Dict[str, Any], part: Dict[str, Any]) -> None:
+        """Stitch a continuation response into the accumulated result"""
+        result["content"] = self._stitch_continuation(result["content"], part["content"])
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            result["usage"][key] += part["usage"][key]
+        result["finish_reason"] = part["finish_reason"]
+
+    def _should_continue(self, result: Dict[str, Any], continuations: int) -> bool:
+        """A truncated response with some content can be continued"""
+        return (
+            result.get("finish_reason") == "length"
+            and bool(result.get("content"))
+            and continuations < self.max_continuations
+        )
+
+    def _record_continuations(self, stage: str, continuations: int, truncated: bool) -> None:
+        """Update per-stage counters of truncated and continued responses"""
+        with self._stats_lock:
+            stats = self.continuation_stats.setdefault(
+                stage, {"requests": 0, "truncated": 0, "continuations": 0, "unresolved": 0}
+            )
+            stats["requests"] += 1
+            if continuations or truncated:
+                stats["truncated"] += 1
+            stats["continuations"] += continuations
+            if truncated:
+                stats["unresolved"] += 1
+
+    @staticmethod
+    def _completion_budget(source_text: str, expansion: float, margin: int = 256) -> int:
+        """
+        Get max_tokens for a response that rewrites or translates source_text
+
+        Args:
+            source_text: Text the response is derived from
+            expansion: Expected output tokens per source token
+            margin: Fixed headroom added to the estimate
+
+        Returns:
+            max_tokens within the configured completion budget
         """
-        system_prompt = """You are a specialized assistant for analyzing TRPG (tabletop role-playing game) documents.
+        return get_model_token_budget().completion_tokens(count_tokens(source_text), expansion, margin)
+
+    @staticmethod
+    def _print_request_messages(messages: List[Dict[str, str]]) -> None:
+        """Print messages and waiting indicator before making the request"""
+        print("\n--- User Messages ---")
+        for msg in messages:
+            role = msg.get('role', 'unknown').upper()
+            content = msg.get('content', '')
+            print(f"[{role}]: {content[:200]}{'...' if len(content) > 200 else ''}")
+        print("---------------------")
+        print("  [Waiting for response...] ", end='', flush=True)
+
+    @staticmethod
+    def _strip_code_fence(content: str) -> str:
+        """Remove a surrounding markdown code fence from a JSON response"""
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:-3].strip()
+        elif content.startswith("```"):
+            content = content[3:-3].strip()
+        return content
+
+    # ------------------------------------------------------------------
+    # Proper noun extraction
+    # ------------------------------------------------------------------
+
+    _PROPER_NOUNS_SYSTEM_PROMPT = """You are a specialized assistant for analyzing TRPG (tabletop role-playing game) documents.
 
 Your task is to extract ALL proper nouns from the provided text. Be thorough and extract EVERY proper noun you find.
 
@@ -302,6 +718,17 @@ Return ONLY a JSON array of strings with no explanation.
 
 Directly output the JSON array - do not add any reasoning or extra text."""
 
+    def _build_proper_nouns_messages(self, text: str, context: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for proper noun extraction
+
+        Args:
+            text: Text to analyze
+            context: Additional context about the document
+
+        Returns:
+            Message list with role and content
+        """
         user_message = f"""Extract proper nouns from the following text:
 
 {text[:3000]}
@@ -310,53 +737,59 @@ Directly output the JSON array - do not add any reasoning or extra text."""
         if context:
             user_message += f"\nContext: {context}\n"
 
-        messages = [
-            {"role": "system", "content": system_prompt},
+        return [
+            {"role": "system", "content": self._PROPER_NOUNS_SYSTEM_PROMPT},
             {"role": "user", "content": user_message}
         ]
 
-        response = self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=2000, stream_print=stream_print)
+    def _parse_proper_nouns_response(self, response: Dict[str, Any]) -> List[str]:
+        """
+        Parse the proper noun list from a chat completion response
+
+        Args:
+            response: Response dictionary from _stream_chat_completion
+
+        Returns:
+            List of extracted proper nouns
+        """
         import json
-        import re
         try:
             # Try to parse JSON directly
-            content = response["content"].strip()
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
-            return json.loads(content)
+            return json.loads(self._strip_code_fence(response["content"]))
         except json.JSONDecodeError:
             # Fallback: extract items manually
             content = response["content"]
             matches = re.findall(r'"([^"]+)"', content)
             return matches
 
-    def generate_glossary(
+    # ------------------------------------------------------------------
+    # Glossary generation
+    # ------------------------------------------------------------------
+
+    def _prepare_glossary_request(
         self,
-        model: str,
         proper_nouns: List[str],
         target_language: str = "中文",
         context: Optional[str] = None,
         stream_print: bool = False,
         existing_glossary: Optional[Dict[str, str]] = None
-    ) -> Dict[str, str]:
+    ) -> Tuple[Optional[Dict[str, str]], List[Dict[str, str]], int]:
         """
-        Generate translation glossary for proper nouns using streaming
+        Build the chat messages for glossary generation
 
         Args:
-            model: Model identifier
             proper_nouns: List of proper nouns to translate
             target_language: Target language
             context: Additional context about the document
-            stream_print: If True, stream and print the output in real-time
+            stream_print: If True, print filtering information
             existing_glossary: Existing glossary entries to use for partial word matching
 
         Returns:
-            Dictionary mapping original terms to translations
+            Tuple of (final_result, messages, max_tokens). final_result is not None when
+            no request is needed because every term is already translated.
         """
         if not proper_nouns:
-            return {}
+            return {}, [], 0
 
         # Filter out terms that already exist in the glossary - do not translate them again
         terms_to_translate = proper_nouns
@@ -365,7 +798,7 @@ Directly output the JSON array - do not add any reasoning or extra text."""
 
             if not terms_to_translate:
                 # All terms already exist in glossary, return existing translations
-                return {term: existing_glossary.get(term, term) for term in proper_nouns}
+                return {term: existing_glossary.get(term, term) for term in proper_nouns}, [], 0
 
             if stream_print:
                 print(f"Filtering: {len(proper_nouns)} total terms, {len(terms_to_translate)} new terms to translate")
@@ -387,6 +820,19 @@ For terms that contain words already in the glossary, maintain consistency:
                     for match_term, match_translation in matches:
                         partial_matching_instructions += f"- If '{term}' contains '{match_term}' (already translated as '{match_translation}'), ensure consistency\n"
 
+            # Spelling variants ("Iomedaean" for "Iomedae") share no whole word with the glossary
+            similar_spellings = self._find_similar_spellings(
+                [term for term in terms_to_translate if term not in partial_matches], existing_glossary
+            )
+            if similar_spellings:
+                partial_matching_instructions += """
+SIMILAR SPELLING GUIDELINES:
+For terms spelled like existing glossary entries, keep the shared part consistent if they are related:
+"""
+                for term, matches in similar_spellings.items():
+                    for match_term, match_translation in matches:
+                        partial_matching_instructions += f"- '{term}' is spelled like '{match_term}' (already translated as '{match_translation}')\n"
+
         system_prompt = f"""You are a specialized TRPG translator. Your task is to translate proper nouns to {target_language}.
 
 For each proper noun, provide the best translation considering:
@@ -418,15 +864,28 @@ Directly output the JSON object - do not add any reasoning or extra text."""
 
         # Adjust max_tokens based on number of terms
         max_tokens = min(8000, len(terms_to_translate) * 20 + 2000)
-        response = self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=max_tokens, stream_print=stream_print)
+        return None, messages, max_tokens
+
+    def _parse_glossary_response(
+        self,
+        response: Dict[str, Any],
+        proper_nouns: List[str],
+        existing_glossary: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Parse the glossary mapping from a chat completion response
+
+        Args:
+            response: Response dictionary from _stream_chat_completion
+            proper_nouns: List of proper nouns that were requested
+            existing_glossary: Existing glossary entries merged into the result
+
+        Returns:
+            Dictionary mapping original terms to translations
+        """
         import json
         try:
-            content = response["content"].strip()
-            if content.startswith("```json"):
-                content = content[7:-3].strip()
-            elif content.startswith("```"):
-                content = content[3:-3].strip()
-            result = json.loads(content)
+            result = json.loads(self._strip_code_fence(response["content"]))
             # Merge new translations with existing glossary
             merged_result = {**existing_glossary} if existing_glossary else {}
             merged_result.update(result)
@@ -452,65 +911,130 @@ Directly output the JSON object - do not add any reasoning or extra text."""
             existing_glossary: Existing glossary with term->translation mapping
 
         Returns:
-            Dictionary mapping each term to list of (matched_term, translation) tuples
+            Dictionary mapping each term to list of (matched_term, translation) tuples,
+            longest matched term first
         """
-        import re
+        # Word boundaries avoid partial matches like "bear" in "bearing"
+        matcher = get_glossary_matcher(existing_glossary)
+        return {
+            term: [(existing_term, existing_glossary[existing_term]) for existing_term in matches]
+            for term, matches in matcher.find_partial_word_matches(terms).items()
+        }
 
-        partial_matches = {}
+    def _find_similar_spellings(
+        self,
+        terms: List[str],
+        existing_glossary: Dict[str, str]
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Find existing glossary entries spelled like new terms
 
-        # Create a list of existing glossary terms sorted by length (longest first)
-        # to prioritize longer matches first
-        existing_terms = sorted(existing_glossary.keys(), key=len, reverse=True)
+        All terms are looked up in one batched query of the glossary's trigram index.
 
-        for term in terms:
-            term_lower = term.lower()
-            matches = []
+        Args:
+            terms: List of new terms to translate
+            existing_glossary: Existing glossary with term->translation mapping
 
-            for existing_term in existing_terms:
-                existing_term_lower = existing_term.lower()
+        Returns:
+            Dictionary mapping each term to up to SIMILAR_SPELLING_HINTS (matched_term, translation)
+            tuples, most similar first
+        """
+        if not NUMPY_AVAILABLE or not terms or not existing_glossary:
+            return {}
+        engine = get_similarity_engine(existing_glossary)
+        neighbors = engine.query(terms, threshold=SIMILAR_SPELLING_THRESHOLD, top_k=SIMILAR_SPELLING_HINTS)
+        return {
+            term: [(engine.terms[idx], existing_glossary[engine.terms[idx]]) for idx, _ in found]
+            for term, found in zip(terms, neighbors) if found
+        }
 
-                # Check if existing term appears as a word in the new term
-                # Use word boundary matching to avoid partial matches like "bear" in "bearing"
-                pattern = r'\b' + re.escape(existing_term_lower) + r'\b'
-                if re.search(pattern, term_lower):
-                    # Found a partial match
-                    matches.append((existing_term, existing_glossary[existing_term]))
+    # ------------------------------------------------------------------
+    # Translation
+    # ------------------------------------------------------------------
 
-            if matches:
-                partial_matches[term] = matches
+    @staticmethod
+    def _resolve_glossary_mode(glossary_mode: Optional[str], related_terms: Optional[bool]) -> Tuple[str, bool]:
+        """
+        Resolve glossary prompt options from arguments or environment
 
-        return partial_matches
+        Args:
+            glossary_mode: "full" or "detected" (reads from TRANSLATION_GLOSSARY_MODE env var if not provided, default: "full")
+            related_terms: Include partial-word matches of detected terms
+                           (reads from TRANSLATION_GLOSSARY_RELATED env var if not provided, default: True)
 
-    def translate_text(
+        Returns:
+            Tuple of (glossary_mode, related_terms)
+        """
+        glossary_mode = (glossary_mode or os.getenv("TRANSLATION_GLOSSARY_MODE", "full")).strip().lower()
+        if glossary_mode not in GLOSSARY_MODES:
+            raise ValueError(f"Unknown glossary mode: {glossary_mode}. Supported: {', '.join(GLOSSARY_MODES)}")
+        if related_terms is None:
+            related_terms = os.getenv("TRANSLATION_GLOSSARY_RELATED", "1").strip().lower() not in ("0", "false", "no", "off")
+        return glossary_mode, related_terms
+
+    def _select_glossary_entries(
         self,
-        model: str,
-        text: str,
-        source_language: str = "English",
-        target_language: str = "中文",
-        glossary: Optional[Dict[str, str]] = None,
-        context: Optional[str] = None,
-        stream_print: bool = False,
+        glossary: Dict[str, str],
+        detected_terms: List[str],
+        related_terms: bool
+    ) -> Dict[str, str]:
+        """
+        Select the glossary entries relevant to one text chunk
+
+        Args:
+            glossary: Full translation glossary
+            detected_terms: Glossary terms detected in the chunk
+            related_terms: Also include glossary terms appearing as words inside detected terms
+                           (e.g., "Bear" for "Golden Bear")
+
+        Returns:
+            Pruned glossary in the original glossary order
+        """
+        selected = {term for term in detected_terms if term in glossary}
+        if related_terms and selected:
+            for matches in self._find_partial_word_matches(list(selected), glossary).values():
+                selected.update(matched_term for matched_term, _ in matches)
+        return {orig: trans for orig, trans in glossary.items() if orig in selected}
+
+    def _build_translation_request(
+        self,
+        text: str,
+        source_language: str = "English",
+        target_language: str = "中文",
+        glossary: Optional[Dict[str, str]] = None,
+        context: Optional[str] = None,
         detected_terms: Optional[List[str]] = None,
-        use_hyperlink_format: bool = False
-    ) -> str:
+        use_hyperlink_format: bool = False,
+        glossary_mode: Optional[str] = None,
+        related_terms: Optional[bool] = None,
+        glossary_report: Optional[Dict[str, Any]] = None,
+        preceding_text: Optional[str] = None,
+        paragraph_tags: bool = False
+    ) -> Tuple[List[Dict[str, str]], int]:
         """
-        Translate text using LLM with streaming
+        Build the chat messages for a translation request
 
         Args:
-            model: Model identifier
             text: Text to translate
             source_language: Source language
             target_language: Target language
             glossary: Translation glossary with term->translation mapping
             context: Additional context about the document
-            stream_print: If True, stream and print the output in real-time
             detected_terms: Glossary terms detected in the current text chunk
             use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            glossary_mode: "full" sends the whole glossary, "detected" only the detected
+                           and related terms (reads from TRANSLATION_GLOSSARY_MODE env var if not provided)
+            related_terms: Include partial-word matches of detected terms in "detected" mode
+            glossary_report: Optional dictionary filled with the glossary entries and
+                             estimated prompt tokens sent versus the full glossary
+            preceding_text: Source text before this chunk, sent as delimited read-only context
+            paragraph_tags: If True, the text is tagged with paragraph ID markers ("⟦12⟧ ...")
+                            that must be echoed at the start of each translated paragraph
 
         Returns:
-            Translated text
+            Tuple of (messages, max_tokens)
         """
-        import re
+        glossary_mode, related_terms = self._resolve_glossary_mode(glossary_mode, related_terms)
 
         # Detect glossary terms in the text if not provided
         if glossary and detected_terms is None:
@@ -518,11 +1042,28 @@ Directly output the JSON object - do not add any reasoning or extra text."""
 
         # Build glossary instruction
         glossary_instruction = ""
+        full_glossary_instruction = ""
+        sent_entries = 0
         if glossary:
             # Include all glossary terms
             glossary_items = [f"- {orig}: {trans}" for orig, trans in glossary.items() if trans and trans != orig]
             if glossary_items:
-                glossary_instruction = f"\n\nGLOSSARY - Use these translations for proper nouns:\n" + "\n".join(glossary_items)
+                full_glossary_instruction = f"\n\nGLOSSARY - Use these translations for proper nouns:\n" + "\n".join(glossary_items)
+
+            if glossary_mode == "full":
+                glossary_instruction = full_glossary_instruction
+                sent_entries = len(glossary_items)
+            else:
+                # Detected terms are listed below; only add their related entries here
+                selected = self._select_glossary_entries(glossary, detected_terms or [], related_terms)
+                detected_set = set(detected_terms or [])
+                related_items = [
+                    f"- {orig}: {trans}" for orig, trans in selected.items()
+                    if trans and trans != orig and orig not in detected_set
+                ]
+                sent_entries = len(related_items) + len(detected_set)
+                if related_items:
+                    glossary_instruction = f"\n\nGLOSSARY - Use these translations for proper nouns:\n" + "\n".join(related_items)
 
         # Add detected terms information
         detected_terms_instruction = ""
@@ -540,13 +1081,30 @@ Directly output the JSON object - do not add any reasoning or extra text."""
             hyperlink_instruction = """
 IMPORTANT OUTPUT FORMAT: For all proper nouns from the glossary, output them in markdown hyperlink format: [Translation](Original).
 Example: If "Gorum" translates to "戈鲁姆", use "[戈鲁姆](Gorum)" instead of just "戈鲁姆".
+"""
+
+        # Overlap with the previous window is context only: it is translated by that window
+        preceding_instruction = ""
+        if preceding_text:
+            preceding_instruction = """
+The text between <preceding_context> tags is the end of the previous section. It is already translated:
+use it only to understand the text, and do not translate or repeat it in your output.
+"""
+
+        # Paragraph markers let the reply be mapped back to its source paragraphs exactly
+        paragraph_tags_instruction = ""
+        if paragraph_tags:
+            paragraph_tags_instruction = """
+PARAGRAPH MARKERS: Every paragraph of the text starts with an ID marker such as ⟦12⟧.
+Start each translated paragraph with the marker of its source paragraph, copied exactly, followed by a space.
+Translate every marked paragraph separately: never merge, split, skip or reorder paragraphs, and never translate or change a marker.
 """
 
         system_prompt = f"""You are a professional TRPG document translator.
 
 Translate the provided text from {source_language} to {target_language}.
 Maintain proper formatting (headings, lists, markdown structure).
-Capture the epic and immersive tone typical of TRPG literature.{glossary_instruction}{detected_terms_instruction}{hyperlink_instruction}
+Capture the epic and immersive tone typical of TRPG literature.{glossary_instruction}{detected_terms_instruction}{hyperlink_instruction}{preceding_instruction}{paragraph_tags_instruction}
 
 Return only the translated text with no explanations or notes.
 
@@ -554,6 +1112,9 @@ Directly translate - do not show any thinking process or reasoning."""
 
         user_message = f"""Translate the following text:\n\n{text}"""
 
+        if preceding_text:
+            user_message = f"""<preceding_context>\n{preceding_text}\n</preceding_context>\n\n{user_message}"""
+
         if context:
             user_message = f"""Context: {context}\n\n{user_message}"""
 
@@ -562,16 +1123,21 @@ Directly translate - do not show any thinking process or reasoning."""
             {"role": "user", "content": user_message}
         ]
 
-        # Stream to handle long translations without timeout
-        response = self._stream_chat_completion(
-            model,
-            messages,
-            temperature=0.4,
-            max_tokens=min(4000, len(text) * 2 + 500),
-            stream_print=stream_print
-        )
-
-        return response["content"]
+        if glossary_report is not None:
+            full_tokens = count_tokens(full_glossary_instruction)
+            sent_tokens = count_tokens(glossary_instruction)
+            glossary_report.update({
+                "glossary_mode": glossary_mode,
+                "glossary_entries": len(glossary or {}),
+                "detected_entries": len(detected_terms or []),
+                "sent_entries": sent_entries,
+                "full_glossary_tokens": full_tokens,
+                "sent_glossary_tokens": sent_tokens,
+                "tokens_saved": full_tokens - sent_tokens
+            })
+
+        # Hyperlinks repeat every proper noun in the source language
+        return messages, self._completion_budget(text, 2.0 if use_hyperlink_format else 1.5)
 
     def _detect_glossary_terms_in_text(
         self,
@@ -588,42 +1154,33 @@ Directly translate - do not show any thinking process or reasoning."""
         Returns:
             List of glossary terms found in the text
         """
-        import re
-        found_terms = []
-        text_lower = text.lower()
-
-        for term in glossary.keys():
-            # Use word boundary matching to avoid partial matches
-            pattern = r'\b' + re.escape(term) + r'\b'
-            if re.search(pattern, text_lower):
-                found_terms.append(term)
+        # Case-insensitive whole-word matching in one pass over the text
+        return get_glossary_matcher(glossary).detect(text)
 
-        return found_terms
+    # ------------------------------------------------------------------
+    # Glossary post-editing
+    # ------------------------------------------------------------------
 
-    def update_translation_with_glossary(
+    def _build_glossary_update_request(
         self,
-        model: str,
         translated_text: str,
         glossary: Dict[str, str],
-        context: Optional[str] = None,
-        stream_print: bool = False
-    ) -> str:
+        context: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict[str, str]], int]]:
         """
-        Update translated text to use glossary terms using streaming
+        Build the chat messages for a glossary post-editing request
 
         Args:
-            model: Model identifier
             translated_text: Previously translated text
             glossary: Translation glossary with term->translation mapping
             context: Additional context about the document
-            stream_print: If True, stream and print the output in real-time
 
         Returns:
-            Updated translated text
+            Tuple of (messages, max_tokens), or None if the glossary has no usable entries
         """
         glossary_items = [f"- {orig}: {trans}" for orig, trans in glossary.items() if trans and trans != orig]
         if not glossary_items:
-            return translated_text
+            return None
 
         glossary_text = "\n".join(glossary_items)
 
@@ -651,17 +1208,19 @@ Directly output - do not show any thinking process or reasoning."""
             {"role": "user", "content": user_message}
         ]
 
-        response = self._stream_chat_completion(
-            model,
-            messages,
-            temperature=0.2,
-            max_tokens=min(4000, len(translated_text) * 2 + 500),
-            stream_print=stream_print
-        )
+        return messages, self._completion_budget(translated_text, 1.5)
+
+    @staticmethod
+    def _fix_link_targets(text: str) -> str:
+        """
+        Post-process: Fix markdown hyperlinks (replace spaces with underscores in URLs)
 
-        updated_text = response["content"]
+        Args:
+            text: Text containing markdown links
 
-        # Post-process: Fix markdown hyperlinks (replace spaces with underscores in URLs)
+        Returns:
+            Text with spaces in link targets replaced by underscores
+        """
         def fix_link(match):
             """Replace spaces with underscores in the link target"""
             link_text = match.group(1)  # The text inside []
@@ -670,120 +1229,13 @@ Directly output - do not show any thinking process or reasoning."""
             return f"[{link_text}]({fixed_target})"
 
         # Match markdown links: [text](target) and fix spaces in the target
-        updated_text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', fix_link, updated_text)
-
-        return updated_text
-
-    def optimize_pdf_text_formatting(
-        self,
-        model: str,
-        extracted_text: str,
-        context: Optional[str] = None,
-        stream_print: bool = False,
-        window_char_limit: int = 8000,
-        overlap_paragraphs: int = 2
-    ) -> str:
-        """
-        Optimize PDF extracted text formatting using LLM with sliding window
-
-        This method analyzes and fixes common PDF text extraction issues:
-        - Merging paragraphs that were incorrectly split
-        - Fixing capitalization issues (proper names, sentence beginnings)
-        - Removing extra whitespace
-        - Fixing broken words (hyphenated line breaks)
-        - Restoring proper paragraph structure
-
-        Uses sliding window approach to handle long texts that exceed model context limits.
-
-        Args:
-            model: Model identifier
-            extracted_text: Text extracted from PDF that may have formatting issues
-            context: Additional context about the document (e.g., document type, content summary)
-            stream_print: If True, stream and print the output in real-time
-            window_char_limit: Maximum characters per window (default: 8000)
-            overlap_paragraphs: Number of paragraphs to overlap between windows (default: 2)
-
-        Returns:
-            Formatting-optimized text
-        """
-        import re
-
-        # Helper function to split into paragraphs
-        def split_into_paragraphs(text: str) -> List[str]:
-            paragraphs = re.split(r'\n\n+|(?=^#{1,6}\s)', text, flags=re.MULTILINE)
-            return [p.strip() for p in paragraphs if p.strip()]
-
-        # Helper function to create sliding windows
-        def create_sliding_windows(text: str, window_char_limit: int, overlap_paragraphs: int):
-            units = split_into_paragraphs(text)
-            if not units:
-                return []
-
-            windows = []
-            i = 0
-            while i < len(units):
-                window_units = []
-                total_chars = 0
-
-                for j in range(i, len(units)):
-                    unit = units[j]
-                    unit_len = len(unit)
-                    separator_len = 2 if window_units else 0
-                    if window_units:
-                        total_chars += separator_len
-
-                    if total_chars + unit_len > window_char_limit and window_units:
-                        break
-
-                    window_units.append(unit)
-                    total_chars += unit_len
-
-                if not window_units:
-                    window_units = [units[i]]
-                    j = i
-
-                window_text = "\n\n".join(window_units)
-                end_idx = j
-                windows.append((window_text, i, end_idx))
-
-                window_len = len(window_units)
-                step_size = window_len - overlap_paragraphs
-                if step_size <= 1:
-                    step_size = 1
-
-                i += step_size
-                if i >= len(units):
-                    break
-
-            return windows
-
-        # Helper function to merge windows
-        def merge_windows(windows, translations, overlap_paragraphs: int) -> str:
-            if len(windows) != len(translations):
-                raise ValueError(f"Number of windows doesn't match translations")
-
-            if not windows:
-                return ""
-
-            units = []
-
-            for idx, (window_text, start, end) in enumerate(windows):
-                window_units = split_into_paragraphs(translations[idx])
-
-                for unit_idx, unit in enumerate(window_units):
-                    absolute_idx = start + unit_idx
-                    is_overlap = unit_idx < overlap_paragraphs and idx > 0
+        return re.sub(r'\[([^\]]+)\]\(([^)]+)\)', fix_link, text)
 
-                    if not is_overlap or idx == len(windows) - 1:
-                        while len(units) <= absolute_idx:
-                            units.append(None)
-                        if units[absolute_idx] is None:
-                            units[absolute_idx] = unit
+    # ------------------------------------------------------------------
+    # PDF text formatting optimization
+    # ------------------------------------------------------------------
 
-            units = [u for u in units if u is not None]
-            return "\n\n".join(units)
-
-        system_prompt = """You are a specialized text formatting optimizer for PDF extracted text.
+    _FORMATTING_SYSTEM_PROMPT = """You are a specialized text formatting optimizer for PDF extracted text.
 
 Your task is to analyze and fix common PDF text extraction issues:
 
@@ -812,159 +1264,158 @@ Return only the formatted text with no explanations.
 
 Directly output the formatted text - do not add any reasoning or extra text."""
 
-        context_prefix = f"Context: {context}\n\n" if context else ""
+    @staticmethod
+    def _split_formatting_paragraphs(text: str) -> List[str]:
+        """Split text into paragraphs for formatting optimization"""
+        paragraphs = re.split(r'\n\n+|(?=^#{1,6}\s)', text, flags=re.MULTILINE)
+        return [p.strip() for p in paragraphs if p.strip()]
+
+    @classmethod
+    def _create_formatting_windows(
+        cls,
+        text: str,
+        window_char_limit: int,
+        overlap_paragraphs: int
+    ) -> List[Tuple[str, int, int]]:
+        """
+        Create sliding windows for formatting optimization
 
-        # Create sliding windows
-        windows = create_sliding_windows(extracted_text, window_char_limit, overlap_paragraphs)
+        Args:
+            text: Text to split into windows
+            window_char_limit: Maximum characters per window
+            overlap_paragraphs: Number of paragraphs to overlap between windows
 
-        if not windows:
-            return extracted_text
+        Returns:
+            List of tuples (window_text, start_idx, end_idx)
+        """
+        units = cls._split_formatting_paragraphs(text)
+        if not units:
+            return []
+
+        windows = []
+        i = 0
+        while i < len(units):
+            window_units = []
+            total_chars = 0
+
+            for j in range(i, len(units)):
+                unit = units[j]
+                unit_len = len(unit)
+                separator_len = 2 if window_units else 0
+                if window_units:
+                    total_chars += separator_len
+
+                if total_chars + unit_len > window_char_limit and window_units:
+                    break
 
-        if stream_print:
-            print(f"  Processing text in {len(windows)} windows (max {window_char_limit} chars each, {overlap_paragraphs} paragraph overlap)...")
+                window_units.append(unit)
+                total_chars += unit_len
 
-        translations = []
-        for idx, (window_text, start, end) in enumerate(windows):
-            # 解析段落信息（无论是否stream_print都需要）
-            paragraphs = split_into_paragraphs(window_text)
+            if not window_units:
+                window_units = [units[i]]
+                j = i
 
-            if stream_print:
-                # 显示详细的段落信息
-                first_para_preview = paragraphs[0][:100] + "..." if len(paragraphs[0]) > 100 else paragraphs[0]
-                last_para_preview = paragraphs[-1][:100] + "..." if len(paragraphs[-1]) > 100 else paragraphs[-1]
+            window_text = "\n\n".join(window_units)
+            end_idx = j
+            windows.append((window_text, i, end_idx))
 
-                print(f"    Window {idx + 1}/{len(windows)} (paragraphs {start + 1}-{end}, {len(paragraphs)} paragraphs, {len(window_text)} chars)...")
-                print(f"      First paragraph: {first_para_preview}")
-                print(f"      Last paragraph: {last_para_preview}")
-                print(f"      Processing...", end='', flush=True)
+            window_len = len(window_units)
+            step_size = window_len - overlap_paragraphs
+            if step_size <= 1:
+                step_size = 1
 
-            user_message = f"""{context_prefix}Optimize the formatting of this PDF extracted text:\n\n{window_text}"""
+            i += step_size
+            if i >= len(units):
+                break
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
+        return windows
 
-            max_tokens = min(8000, len(window_text) * 2 + 500)
+    @classmethod
+    def _merge_formatting_windows(
+        cls,
+        windows: List[Tuple[str, int, int]],
+        translations: List[str],
+        overlap_paragraphs: int
+    ) -> str:
+        """
+        Merge formatted windows back into a single text
 
-            response = self._stream_chat_completion(
-                model,
-                messages,
-                temperature=0.1,
-                max_tokens=max_tokens,
-                stream_print=False  # Disable stream_print for each window to avoid confusion
-            )
+        Args:
+            windows: List of (window_text, start_idx, end_idx) tuples
+            translations: Formatted text for each window
+            overlap_paragraphs: Number of paragraphs overlapping between windows
 
-            translations.append(response["content"])
+        Returns:
+            Merged text
+        """
+        if len(windows) != len(translations):
+            raise ValueError(f"Number of windows doesn't match translations")
 
-            if stream_print:
-                print(" ✓", flush=True)
-                print(f"      ✓ Optimized {len(paragraphs)} paragraphs")
+        if not windows:
+            return ""
 
-        # Merge all windows
-        if stream_print:
-            print(f"  Merging {len(translations)} optimized windows...")
+        units = []
 
-        merged_text = merge_windows(windows, translations, overlap_paragraphs)
+        for idx, (window_text, start, end) in enumerate(windows):
+            window_units = cls._split_formatting_paragraphs(translations[idx])
 
-        if stream_print:
-            print(f"  ✓ Formatting optimization completed")
+            for unit_idx, unit in enumerate(window_units):
+                absolute_idx = start + unit_idx
+                is_overlap = unit_idx < overlap_paragraphs and idx > 0
 
-        return merged_text
+                if not is_overlap or idx == len(windows) - 1:
+                    while len(units) <= absolute_idx:
+                        units.append(None)
+                    if units[absolute_idx] is None:
+                        units[absolute_idx] = unit
 
-    def align_bilingual_text(
+        units = [u for u in units if u is not None]
+        return "\n\n".join(units)
+
+    def _build_formatting_request(
         self,
-        model: str,
-        english_text: str,
-        chinese_text: str,
-        stream_print: bool = False,
-        window_char_limit: int = 4000,
-        overlap_chars: int = 500
-    ) -> str:
+        window_text: str,
+        context: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
         """
-        Align English and Chinese text using LLM with sliding window approach
-
-        This method creates a bilingual output with:
-        - Headings merged as "中文 (English)"
-        - Content paragraphs showing English (blockquote) then Chinese
-        - Tables merged with Chinese heading and row-by-row alignment
-        - Sliding window for long texts (max 4000 chars per window, 500 char overlap)
-
-        Strategy:
-        1. Extract keywords from Chinese text as anchors
-        2. Find corresponding English sections based on anchors
-        3. For each section, ask LLM to create bilingual output
-        4. Merge all sections
+        Build the chat messages for formatting one window
 
         Args:
-            model: Model identifier
-            english_text: Original English text
-            chinese_text: Translated Chinese text
-            stream_print: If True, stream and print LLM output in real-time
-            window_char_limit: Maximum characters per window (default: 4000)
-            overlap_chars: Characters to overlap between windows (default: 500)
+            window_text: Window of PDF extracted text
+            context: Additional context about the document
 
         Returns:
-            Bilingual aligned text
+            Tuple of (messages, max_tokens)
         """
-        import re
+        context_prefix = f"Context: {context}\n\n" if context else ""
+        user_message = f"""{context_prefix}Optimize the formatting of this PDF extracted text:\n\n{window_text}"""
+
+        messages = [
+            {"role": "system", "content": self._FORMATTING_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ]
 
-        # Split texts into paragraphs
-        def split_paragraphs(text):
-            paragraphs = re.split(r'\n\n+', text.strip())
-            return [p.strip() for p in paragraphs if p.strip()]
+        return messages, self._completion_budget(window_text, 1.2)
 
-        en_paragraphs = split_paragraphs(english_text)
-        cn_paragraphs = split_paragraphs(chinese_text)
+    @classmethod
+    def _print_formatting_window(cls, idx: int, num_windows: int, window: Tuple[str, int, int]) -> None:
+        """Print detailed paragraph information for a formatting window"""
+        window_text, start, end = window
+        paragraphs = cls._split_formatting_paragraphs(window_text)
 
-        if not en_paragraphs or not cn_paragraphs:
-            return chinese_text  # Fallback to Chinese only
+        # 显示详细的段落信息
+        first_para_preview = paragraphs[0][:100] + "..." if len(paragraphs[0]) > 100 else paragraphs[0]
+        last_para_preview = paragraphs[-1][:100] + "..." if len(paragraphs[-1]) > 100 else paragraphs[-1]
+
+        print(f"    Window {idx + 1}/{num_windows} (paragraphs {start + 1}-{end}, {len(paragraphs)} paragraphs, {len(window_text)} chars)...")
+        print(f"      First paragraph: {first_para_preview}")
+        print(f"      Last paragraph: {last_para_preview}")
 
-        # Extract keywords from Chinese text for anchoring
-        def extract_keywords(text):
-            # Extract proper nouns, capitalized words, numbers, markdown links
-            keywords = set()
-            # Markdown links [text](url)
-            links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', text)
-            for zh, en in links:
-                keywords.add(en)  # Add the English term from the link
-            # Capitalized sequences (potential proper nouns)
-            capitalized = re.findall(r'\b[A-Z][a-zA-Z]+\b', text)
-            keywords.update(capitalized)
-            # Numbers with dice notation like 2d10+4, etc.
-            dice = re.findall(r'\d+d\d+\+?\d*', text)
-            keywords.update(dice)
-            # Words in quotes (often keywords)
-            quoted = re.findall(r'"([^"]+)"', text)
-            keywords.update(quoted)
-
-            return list(keywords)[:50]  # Limit to top 50 keywords
-
-        # Create sliding windows for long texts
-        def create_windows(text, char_limit, overlap):
-            if len(text) <= char_limit:
-                return [(text, 0, len(text))]
-
-            windows = []
-            start = 0
-            while start < len(text):
-                end = min(start + char_limit, len(text))
-                window_text = text[start:end]
-
-                # Find a good break point (end of a paragraph) near the end
-                if end < len(text):
-                    last_paragraph_end = window_text.rfind('\n\n')
-                    if last_paragraph_end > char_limit - 500:  # Don't go back too far
-                        end = start + last_paragraph_end + 2
-                        window_text = text[start:end]
-
-                windows.append((window_text, start, end))
-
-                start = end - overlap if end < len(text) else len(text)
-
-            return windows
-
-        system_prompt = """You are a specialized TRPG bilingual text aligner.
+    # ------------------------------------------------------------------
+    # Bilingual alignment
+    # ------------------------------------------------------------------
+
+    _ALIGNMENT_SYSTEM_PROMPT = """You are a specialized TRPG bilingual text aligner.
 
 Your task is to create a bilingual (English/Chinese) output from the provided texts.
 
@@ -1001,10 +1452,75 @@ IMPORTANT:
 
 Return only the bilingual aligned markdown with no explanations."""
 
-        # If text is short enough, process in one go
-        if len(chinese_text) <= window_char_limit:
-            # Build combined prompt
-            combined_message = f"""Create a bilingual alignment for these texts:
+    @staticmethod
+    def _split_alignment_paragraphs(text: str) -> List[str]:
+        """Split texts into paragraphs"""
+        paragraphs = re.split(r'\n\n+', text.strip())
+        return [p.strip() for p in paragraphs if p.strip()]
+
+    @staticmethod
+    def _extract_alignment_keywords(text: str) -> List[str]:
+        """Extract keywords from Chinese text for anchoring"""
+        # Extract proper nouns, capitalized words, numbers, markdown links
+        keywords = set()
+        # Markdown links [text](url)
+        links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', text)
+        for zh, en in links:
+            keywords.add(en)  # Add the English term from the link
+        # Capitalized sequences (potential proper nouns)
+        capitalized = re.findall(r'\b[A-Z][a-zA-Z]+\b', text)
+        keywords.update(capitalized)
+        # Numbers with dice notation like 2d10+4, etc.
+        dice = re.findall(r'\d+d\d+\+?\d*', text)
+        keywords.update(dice)
+        # Words in quotes (often keywords)
+        quoted = re.findall(r'"([^"]+)"', text)
+        keywords.update(quoted)
+
+        return list(keywords)[:50]  # Limit to top 50 keywords
+
+    @staticmethod
+    def _create_alignment_windows(text: str, char_limit: int, overlap: int) -> List[Tuple[str, int, int]]:
+        """Create sliding windows for long texts"""
+        if len(text) <= char_limit:
+            return [(text, 0, len(text))]
+
+        windows = []
+        start = 0
+        while start < len(text):
+            end = min(start + char_limit, len(text))
+            window_text = text[start:end]
+
+            # Find a good break point (end of a paragraph) near the end
+            if end < len(text):
+                last_paragraph_end = window_text.rfind('\n\n')
+                if last_paragraph_end > char_limit - 500:  # Don't go back too far
+                    end = start + last_paragraph_end + 2
+                    window_text = text[start:end]
+
+            windows.append((window_text, start, end))
+
+            start = end - overlap if end < len(text) else len(text)
+
+        return windows
+
+    def _build_full_alignment_request(
+        self,
+        english_text: str,
+        chinese_text: str
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Build the chat messages for aligning a short text in one request
+
+        Args:
+            english_text: Original English text
+            chinese_text: Translated Chinese text
+
+        Returns:
+            Tuple of (messages, max_tokens)
+        """
+        # Build combined prompt
+        combined_message = f"""Create a bilingual alignment for these texts:
 
 ENGLISH TEXT:
 {english_text}
@@ -1014,62 +1530,64 @@ CHINESE TEXT:
 
 Generate the bilingual output following the format rules."""
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": combined_message}
-            ]
-
-            max_tokens = min(8000, len(chinese_text) * 3 + 1000)
-            response = self._stream_chat_completion(
-                model,
-                messages,
-                temperature=0.2,
-                max_tokens=max_tokens,
-                stream_print=stream_print
-            )
-
-            return response["content"]
+        messages = [
+            {"role": "system", "content": self._ALIGNMENT_SYSTEM_PROMPT},
+            {"role": "user", "content": combined_message}
+        ]
 
-        # Long text: use sliding window approach
-        if stream_print:
-            print(f"  Aligning bilingual text using sliding windows (max {window_char_limit} chars, {overlap_chars} overlap)...")
+        # Output contains both texts
+        return messages, self._completion_budget(english_text + chinese_text, 1.2, margin=512)
 
-        cn_windows = create_windows(chinese_text, window_char_limit, overlap_chars)
-        aligned_sections = []
+    def _build_window_alignment_request(
+        self,
+        english_text: str,
+        cn_window: str,
+        start: int,
+        end: int,
+        window_char_limit: int
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Build the chat messages for aligning one Chinese window
 
-        for idx, (cn_window, start, end) in enumerate(cn_windows):
-            if stream_print:
-                print(f"    Processing window {idx + 1}/{len(cn_windows)} (chars {start}-{end})...", end='', flush=True)
+        Args:
+            english_text: Original English text
+            cn_window: Window of the translated Chinese text
+            start: Start offset of the window in the Chinese text
+            end: End offset of the window in the Chinese text
+            window_char_limit: Maximum characters per window
 
-            # Find corresponding English text
-            # Use keyword matching to find approximate English section
-            cn_keywords = extract_keywords(cn_window)
+        Returns:
+            Tuple of (messages, max_tokens)
+        """
+        # Find corresponding English text
+        # Use keyword matching to find approximate English section
+        cn_keywords = self._extract_alignment_keywords(cn_window)
 
-            # Find English windows containing these keywords
-            en_start = 0
-            en_end = len(english_text)
+        # Find English windows containing these keywords
+        en_start = 0
+        en_end = len(english_text)
 
-            if cn_keywords:
-                found_positions = []
-                for keyword in cn_keywords:
-                    keyword_lower = keyword.lower()
-                    pos = english_text.lower().find(keyword_lower)
-                    if pos >= 0:
-                        found_positions.append(pos)
+        if cn_keywords:
+            found_positions = []
+            english_lower = english_text.lower()
+            for keyword in cn_keywords:
+                pos = english_lower.find(keyword.lower())
+                if pos >= 0:
+                    found_positions.append(pos)
 
-                if found_positions:
-                    min_pos = min(found_positions)
-                    max_pos = max(found_positions)
+            if found_positions:
+                min_pos = min(found_positions)
+                max_pos = max(found_positions)
 
-                    # Add some padding
-                    pad = min(1000, min_pos)
-                    en_start = max(0, min_pos - pad)
-                    en_end = min(len(english_text), max_pos + window_char_limit)
+                # Add some padding
+                pad = min(1000, min_pos)
+                en_start = max(0, min_pos - pad)
+                en_end = min(len(english_text), max_pos + window_char_limit)
 
-            en_window = english_text[en_start:en_end]
+        en_window = english_text[en_start:en_end]
 
-            # Build prompt for this window
-            window_message = f"""Create a bilingual alignment for this section:
+        # Build prompt for this window
+        window_message = f"""Create a bilingual alignment for this section:
 
 ENGLISH SECTION (partial, context: chars {en_start}-{en_end}):
 {en_window}
@@ -1079,30 +1597,17 @@ CHINESE SECTION (chars {start}-{end}):
 
 Generate the bilingual output following the format rules. Only output the aligned content for this section."""
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": window_message}
-            ]
-
-            max_tokens = min(8000, len(cn_window) * 3 + 1000)
-            response = self._stream_chat_completion(
-                model,
-                messages,
-                temperature=0.2,
-                max_tokens=max_tokens,
-                stream_print=False  # Disable stream_print for individual windows
-            )
-
-            aligned_sections.append(response["content"])
-
-            if stream_print:
-                print(" ✓", flush=True)
+        messages = [
+            {"role": "system", "content": self._ALIGNMENT_SYSTEM_PROMPT},
+            {"role": "user", "content": window_message}
+        ]
 
-        # Join all sections with proper spacing
-        if stream_print:
-            print(f"  Merging {len(aligned_sections)} aligned sections...")
+        # Output contains the Chinese window and its matching English paragraphs
+        return messages, self._completion_budget(cn_window, 2.5, margin=512)
 
-        # Merge sections, handling overlaps
+    @staticmethod
+    def _merge_aligned_sections(aligned_sections: List[str]) -> str:
+        """Merge sections, handling overlaps"""
         merged_result = ""
         for i, section in enumerate(aligned_sections):
             if i > 0:
@@ -1118,6 +1623,533 @@ Generate the bilingual output following the format rules. Only output the aligne
 
             merged_result += "\n\n" + section if merged_result else section
 
+        return merged_result
+
+
+class SiliconFlowClient(_SiliconFlowClientBase):
+    """Client for SiliconFlow API with streaming support"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[Any] = None,
+        cache: Optional[ResponseCache] = None,
+        use_cache: Optional[bool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        router: Optional[EndpointRouter] = None
+    ):
+        """
+        Initialize SiliconFlow client
+
+        Args:
+            api_key: API key (reads from SILICONFLOW_API_KEY env var if not provided)
+            base_url: Base URL (reads from SILICONFLOW_BASE_URL env var if not provided)
+            http_client: Optional httpx.Client to share one connection pool between clients
+            cache: Response cache to use (uses the shared on-disk cache if not provided)
+            use_cache: Set to False to bypass the response cache
+                       (reads from LLM_CACHE_ENABLED env var if not provided)
+            rate_limiter: RPM/TPM limiter shared by all requests (uses the limiter
+                          configured by SILICONFLOW_RPM / SILICONFLOW_TPM if not provided)
+            metrics: Registry for per-stage request metrics (uses the process-wide registry if not provided)
+            router: Endpoints to spread requests over (uses LLM_ENDPOINTS if not provided,
+                    otherwise the single endpoint given by api_key / base_url)
+        """
+        super().__init__(api_key, base_url, cache, use_cache, rate_limiter, metrics, router)
+
+        self._endpoint_clients: Dict[str, OpenAI] = {
+            endpoint.name: OpenAI(
+                api_key=endpoint.api_key,
+                base_url=endpoint.base_url,
+                timeout=60.0,  # Set a longer timeout for streaming
+                http_client=http_client
+            )
+            for endpoint in self.router.endpoints
+        }
+        self.client = self._endpoint_clients[self.router.endpoints[0].name]
+
+    @staticmethod
+    def _execute_stream_request(client: OpenAI, model: str, messages: List[Dict[str, str]],
+                                 temperature: float, max_tokens: Optional[int],
+                                 top_p: float, **kwargs):
+        """
+        Execute a streaming request with timeout - used internally for retry logic
+
+        Args:
+            client: OpenAI client instance with timeout configured
+            model: Model identifier
+            messages: Message list
+            temperature: Temperature setting
+            max_tokens: Max tokens
+            top_p: Top_p setting
+            **kwargs: Additional parameters
+
+        Returns:
+            Stream object
+        """
+        return client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            stream=True,
+            **kwargs
+        )
+
+    def _stream_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 0.7,
+        stream_print: bool = False,
+        enable_thinking: bool = False,
+        stage: str = "chat",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send chat completion request, continuing responses truncated at max_tokens
+
+        A response with finish_reason "length" is continued with a follow-up request that
+        carries the partial output (up to LLM_MAX_CONTINUATIONS times) and the parts are
+        stitched together. Truncations are counted per stage in self.continuation_stats.
+
+        Args:
+            model: Model identifier (e.g., "Pro/moonshotai/Kimi-K2.5")
+            messages: Message list with role and content
+            temperature: Response randomness (0-2)
+            max_tokens: Maximum tokens to generate per request
+            top_p: Nucleus sampling threshold (0-1)
+            stream_print: If True, stream and print the output in real-time
+            enable_thinking: If True, enable reasoning_content extraction
+            stage: Pipeline stage the request belongs to (e.g., "translate")
+            **kwargs: Additional parameters
+
+        Returns:
+            Response dictionary with content, reasoning_content and metadata
+            ("continuations" is set when the response was continued)
+        """
+        result = self._stream_single_completion(
+            model, messages, temperature, max_tokens, top_p, stream_print, enable_thinking, stage, **kwargs
+        )
+
+        continuations = 0
+        while self._should_continue(result, continuations):
+            continuations += 1
+            if stream_print:
+                print(f"\n[Response truncated at max_tokens - continuing ({continuations}/{self.max_continuations})]")
+            part = self._stream_single_completion(
+                model, self._build_continuation_messages(messages, result["content"]),
+                temperature, max_tokens, top_p, stream_print, False, stage, **kwargs
+            )
+            self._merge_continuation(result, part)
+
+        self._record_continuations(stage, continuations, result.get("finish_reason") == "length")
+        if continuations:
+            result["continuations"] = continuations
+        return result
+
+    def _stream_single_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 0.7,
+        stream_print: bool = False,
+        enable_thinking: bool = False,
+        stage: str = "chat",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Send one chat completion request with streaming (60s timeout with 3 retries)
+
+        Identical requests are answered from the response cache when it is enabled.
+        Latency, time-to-first-token, throughput and usage are recorded in self.metrics.
+
+        Args:
+            model: Model identifier (e.g., "Pro/moonshotai/Kimi-K2.5")
+            messages: Message list with role and content
+            temperature: Response randomness (0-2)
+            max_tokens: Maximum tokens to generate
+            top_p: Nucleus sampling threshold (0-1)
+            stream_print: If True, stream and print the output in real-time
+            enable_thinking: If True, enable reasoning_content extraction
+            stage: Pipeline stage the request belongs to (metrics tag)
+            **kwargs: Additional parameters
+
+        Returns:
+            Response dictionary with content, reasoning_content and metadata
+        """
+        request = self._begin_completion(
+            model, messages, temperature, max_tokens, top_p, stream_print, enable_thinking, stage, kwargs
+        )
+        cached = self.cache.get(request.cache_key) if request.cache_key is not None else None
+        if cached is not None:
+            return self._cached_completion(request, cached)
+
+        # Streaming completion with 60s timeout and 3 retries, failing over between endpoints
+        for attempt in range(self._MAX_RETRIES + 1):
+            endpoint = self.router.acquire(exclude=request.failed_endpoints)
+            cache_key = self._endpoint_cache_key(request, endpoint)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                return self._cached_completion(request, cached, endpoint)
+            if endpoint.rate_limiter is not None:
+                request.rate_limit_wait += endpoint.rate_limiter.acquire(request.estimated_tokens)
+            request_start = time.perf_counter()
+            try:
+                stream = self._execute_stream_request(
+                    self._endpoint_clients[endpoint.name], endpoint.model or model, messages,
+                    temperature, request.max_tokens, top_p, **request.request_kwargs
+                )
+                break  # Success exit the retry loop
+            except KeyboardInterrupt:
+                self.router.release(endpoint)
+                raise
+            except Exception as e:
+                wait_time, block_seconds = self._handle_attempt_error(request, endpoint, e, attempt)
+                if block_seconds:
+                    endpoint.rate_limiter.block_for(block_seconds)
+                time.sleep(wait_time)
+
+        accumulator = _StreamAccumulator(model, stream_print, enable_thinking)
+        try:
+            for chunk in stream:
+                accumulator.add_chunk(chunk)
+        except KeyboardInterrupt:
+            self.router.release(endpoint)
+            raise
+        except Exception as e:
+            self.router.release(endpoint, error=e)
+            raise
+
+        result = self._finish_completion(request, endpoint, accumulator, request_start, attempt)
+        self._reconcile_rate_limit(endpoint, request.estimated_tokens, result)
+        if request.cache_key is not None and self._should_cache_response(result):
+            self.cache.put(request.cache_key, result)
+        return result
+
+    def extract_proper_nouns(
+        self,
+        model: str,
+        text: str,
+        context: Optional[str] = None,
+        stream_print: bool = False
+    ) -> List[str]:
+        """
+        Extract proper nouns from text using streaming
+
+        Args:
+            model: Model identifier
+            text: Text to analyze
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+
+        Returns:
+            List of extracted proper nouns
+        """
+        messages = self._build_proper_nouns_messages(text, context)
+        response = self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=2000, stream_print=stream_print, stage="noun_extraction")
+        return self._parse_proper_nouns_response(response)
+
+    def generate_glossary(
+        self,
+        model: str,
+        proper_nouns: List[str],
+        target_language: str = "中文",
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        existing_glossary: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Generate translation glossary for proper nouns using streaming
+
+        Args:
+            model: Model identifier
+            proper_nouns: List of proper nouns to translate
+            target_language: Target language
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+            existing_glossary: Existing glossary entries to use for partial word matching
+
+        Returns:
+            Dictionary mapping original terms to translations
+        """
+        final_result, messages, max_tokens = self._prepare_glossary_request(
+            proper_nouns, target_language, context, stream_print, existing_glossary
+        )
+        if final_result is not None:
+            return final_result
+
+        response = self._stream_chat_completion(model, messages, temperature=0.3, max_tokens=max_tokens, stream_print=stream_print, stage="glossary")
+        return self._parse_glossary_response(response, proper_nouns, existing_glossary)
+
+    def translate_text(
+        self,
+        model: str,
+        text: str,
+        source_language: str = "English",
+        target_language: str = "中文",
+        glossary: Optional[Dict[str, str]] = None,
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        detected_terms: Optional[List[str]] = None,
+        use_hyperlink_format: bool = False,
+        glossary_mode: Optional[str] = None,
+        related_terms: Optional[bool] = None,
+        glossary_report: Optional[Dict[str, Any]] = None,
+        preceding_text: Optional[str] = None,
+        paragraph_tags: bool = False
+    ) -> str:
+        """
+        Translate text using LLM with streaming
+
+        Args:
+            model: Model identifier
+            text: Text to translate
+            source_language: Source language
+            target_language: Target language
+            glossary: Translation glossary with term->translation mapping
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+            detected_terms: Glossary terms detected in the current text chunk
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            glossary_mode: "full" sends the whole glossary, "detected" only the detected
+                           and related terms (reads from TRANSLATION_GLOSSARY_MODE env var if not provided)
+            related_terms: Include partial-word matches of detected terms in "detected" mode
+            glossary_report: Optional dictionary filled with glossary prompt token savings
+            preceding_text: Source text before this chunk, sent as read-only context
+                            (not translated, not part of the output)
+            paragraph_tags: If True, the text is tagged with paragraph ID markers to echo back
+
+        Returns:
+            Translated text
+        """
+        messages, max_tokens = self._build_translation_request(
+            text, source_language, target_language, glossary, context,
+            detected_terms, use_hyperlink_format,
+            glossary_mode, related_terms, glossary_report, preceding_text, paragraph_tags
+        )
+
+        # Stream to handle long translations without timeout
+        response = self._stream_chat_completion(
+            model,
+            messages,
+            temperature=0.4,
+            max_tokens=max_tokens,
+            stream_print=stream_print,
+            stage="translate"
+        )
+
+        return response["content"]
+
+    def update_translation_with_glossary(
+        self,
+        model: str,
+        translated_text: str,
+        glossary: Dict[str, str],
+        context: Optional[str] = None,
+        stream_print: bool = False
+    ) -> str:
+        """
+        Update translated text to use glossary terms using streaming
+
+        Args:
+            model: Model identifier
+            translated_text: Previously translated text
+            glossary: Translation glossary with term->translation mapping
+            context: Additional context about the document
+            stream_print: If True, stream and print the output in real-time
+
+        Returns:
+            Updated translated text
+        """
+        request = self._build_glossary_update_request(translated_text, glossary, context)
+        if request is None:
+            return translated_text
+        messages, max_tokens = request
+
+        response = self._stream_chat_completion(
+            model,
+            messages,
+            temperature=0.2,
+            max_tokens=max_tokens,
+            stream_print=stream_print,
+            stage="post_edit"
+        )
+
+        return self._fix_link_targets(response["content"])
+
+    def optimize_pdf_text_formatting(
+        self,
+        model: str,
+        extracted_text: str,
+        context: Optional[str] = None,
+        stream_print: bool = False,
+        window_char_limit: int = 8000,
+        overlap_paragraphs: int = 2
+    ) -> str:
+        """
+        Optimize PDF extracted text formatting using LLM with sliding window
+
+        This method analyzes and fixes common PDF text extraction issues:
+        - Merging paragraphs that were incorrectly split
+        - Fixing capitalization issues (proper names, sentence beginnings)
+        - Removing extra whitespace
+        - Fixing broken words (hyphenated line breaks)
+        - Restoring proper paragraph structure
+
+        Uses sliding window approach to handle long texts that exceed model context limits.
+
+        Args:
+            model: Model identifier
+            extracted_text: Text extracted from PDF that may have formatting issues
+            context: Additional context about the document (e.g., document type, content summary)
+            stream_print: If True, stream and print the output in real-time
+            window_char_limit: Maximum characters per window (default: 8000)
+            overlap_paragraphs: Number of paragraphs to overlap between windows (default: 2)
+
+        Returns:
+            Formatting-optimized text
+        """
+        # Create sliding windows
+        windows = self._create_formatting_windows(extracted_text, window_char_limit, overlap_paragraphs)
+
+        if not windows:
+            return extracted_text
+
+        if stream_print:
+            print(f"  Processing text in {len(windows)} windows (max {window_char_limit} chars each, {overlap_paragraphs} paragraph overlap)...")
+
+        translations = []
+        for idx, window in enumerate(windows):
+            window_text = window[0]
+
+            if stream_print:
+                self._print_formatting_window(idx, len(windows), window)
+                print(f"      Processing...", end='', flush=True)
+
+            messages, max_tokens = self._build_formatting_request(window_text, context)
+
+            response = self._stream_chat_completion(
+                model,
+                messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                stream_print=False,  # Disable stream_print for each window to avoid confusion
+                stage="formatting"
+            )
+
+            translations.append(response["content"])
+
+            if stream_print:
+                print(" ✓", flush=True)
+                print(f"      ✓ Optimized {len(self._split_formatting_paragraphs(window_text))} paragraphs")
+
+        # Merge all windows
+        if stream_print:
+            print(f"  Merging {len(translations)} optimized windows...")
+
+        merged_text = self._merge_formatting_windows(windows, translations, overlap_paragraphs)
+
+        if stream_print:
+            print(f"  ✓ Formatting optimization completed")
+
+        return merged_text
+
+    def align_bilingual_text(
+        self,
+        model: str,
+        english_text: str,
+        chinese_text: str,
+        stream_print: bool = False,
+        window_char_limit: int = 4000,
+        overlap_chars: int = 500
+    ) -> str:
+        """
+        Align English and Chinese text using LLM with sliding window approach
+
+        This method creates a bilingual output with:
+        - Headings merged as "中文 (English)"
+        - Content paragraphs showing English (blockquote) then Chinese
+        - Tables merged with Chinese heading and row-by-row alignment
+        - Sliding window for long texts (max 4000 chars per window, 500 char overlap)
+
+        Strategy:
+        1. Extract keywords from Chinese text as anchors
+        2. Find corresponding English sections based on anchors
+        3. For each section, ask LLM to create bilingual output
+        4. Merge all sections
+
+        Args:
+            model: Model identifier
+            english_text: Original English text
+            chinese_text: Translated Chinese text
+            stream_print: If True, stream and print LLM output in real-time
+            window_char_limit: Maximum characters per window (default: 4000)
+            overlap_chars: Characters to overlap between windows (default: 500)
+
+        Returns:
+            Bilingual aligned text
+        """
+        en_paragraphs = self._split_alignment_paragraphs(english_text)
+        cn_paragraphs = self._split_alignment_paragraphs(chinese_text)
+
+        if not en_paragraphs or not cn_paragraphs:
+            return chinese_text  # Fallback to Chinese only
+
+        # If text is short enough, process in one go
+        if len(chinese_text) <= window_char_limit:
+            messages, max_tokens = self._build_full_alignment_request(english_text, chinese_text)
+            response = self._stream_chat_completion(
+                model,
+                messages,
+                temperature=0.2,
+                max_tokens=max_tokens,
+                stream_print=stream_print,
+                stage="alignment"
+            )
+
+            return response["content"]
+
+        # Long text: use sliding window approach
+        if stream_print:
+            print(f"  Aligning bilingual text using sliding windows (max {window_char_limit} chars, {overlap_chars} overlap)...")
+
+        cn_windows = self._create_alignment_windows(chinese_text, window_char_limit, overlap_chars)
+        aligned_sections = []
+
+        for idx, (cn_window, start, end) in enumerate(cn_windows):
+            if stream_print:
+                print(f"    Processing window {idx + 1}/{len(cn_windows)} (chars {start}-{end})...", end='', flush=True)
+
+            messages, max_tokens = self._build_window_alignment_request(
+                english_text, cn_window, start, end, window_char_limit
+            )
+            response = self._stream_chat_completion(
+                model,
+                messages,
+                temperature=0.2,
+                max_tokens=max_tokens,
+                stream_print=False,  # Disable stream_print for individual windows
+                stage="alignment"
+            )
+
+            aligned_sections.append(response["content"])
+
+            if stream_print:
+                print(" ✓", flush=True)
+
+        # Join all sections with proper spacing
+        if stream_print:
+            print(f"  Merging {len(aligned_sections)} aligned sections...")
+
+        merged_result = self._merge_aligned_sections(aligned_sections)
+
         if stream_print:
             print(f"  ✓ Bilingual alignment completed")
 
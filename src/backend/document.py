@@ -0,0 +1,248 @@
+"""
+Span-Based Document Model
+
+A Document holds the source text of a book once. Pages, paragraphs and
+translation windows are offset spans into it instead of copies:
+
+- pages are [start, end) character spans located by the parser
+- paragraphs are segmented once and cached with their character spans
+- windows are [start, end] paragraph index ranges; their text is built on demand
+- translations are attached per paragraph, in paragraph order
+
+Every pipeline stage works on the same Document, so the text is neither
+re-split nor re-joined between stages.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .paragraph_segmenter import Paragraph, segment_paragraphs
+except ImportError:
+    from backend.paragraph_segmenter import Paragraph, segment_paragraphs
+
+# Separator between pages and between paragraphs of a window
+PAGE_SEPARATOR = "\n\n"
+PARAGRAPH_SEPARATOR = "\n\n"
+
+
+def plan_window_spans(
+    unit_sizes: Sequence[int],
+    window_limit: int,
+    separator_len: int,
+    overlap_units: int
+) -> List[Tuple[int, int]]:
+    """
+    Plan size-limited windows with overlap over a sequence of units
+
+    A window takes units until the next one would exceed window_limit (at least one
+    unit); the next window starts overlap_units before the end of the previous one.
+
+    Args:
+        unit_sizes: Size of every unit (tokens or characters)
+        window_limit: Maximum window size
+        separator_len: Size added between units
+        overlap_units: Number of units shared by consecutive windows
+
+    Returns:
+        List of (start_idx, end_idx) tuples, end_idx inclusive
+    """
+    spans = []
+    count = len(unit_sizes)
+    i = 0
+    while i < count:
+        total = unit_sizes[i]
+        end = i
+        while end + 1 < count and total + separator_len + unit_sizes[end + 1] <= window_limit:
+            end += 1
+            total += separator_len + unit_sizes[end]
+        spans.append((i, end))
+        if end == count - 1:
+            break
+        i += max(1, (end - i + 1) - overlap_units)
+    return spans
+
+
+class Document:
+    """Source text stored once, with pages and paragraphs as spans and translations per paragraph"""
+
+    def __init__(
+        self,
+        text: str,
+        page_spans: Optional[Sequence[Tuple[int, int]]] = None,
+        paragraphs: Optional[Sequence[Paragraph]] = None
+    ):
+        """
+        Initialize a document
+
+        Args:
+            text: Full source text
+            page_spans: [start, end) offsets of every page in text (default: no page information)
+            paragraphs: Paragraphs already segmented with their offsets in text
+                        (default: segmented from text on first use)
+        """
+        self.text = text
+        self.page_spans: List[Tuple[int, int]] = list(page_spans or [])
+        self._segments: Optional[List[Paragraph]] = list(paragraphs) if paragraphs is not None else None
+        self._paragraphs: Optional[List[str]] = None
+        self._paragraph_sizes: Dict[Any, List[int]] = {}
+        self.translations: Optional[List[Optional[str]]] = None
+
+    @classmethod
+    def from_pages(cls, page_texts: Sequence[str]) -> "Document":
+        """
+        Create a document from page texts joined with blank lines
+
+        Args:
+            page_texts: Text of every page
+
+        Returns:
+            Document with one span per page
+        """
+        spans = []
+        offset = 0
+        for page_text in page_texts:
+            spans.append((offset, offset + len(page_text)))
+            offset += len(page_text) + len(PAGE_SEPARATOR)
+        return cls(PAGE_SEPARATOR.join(page_texts), spans)
+
+    @classmethod
+    def from_paragraphs(cls, paragraphs: Sequence[str]) -> "Document":
+        """
+        Create a document from paragraphs joined with blank lines, without segmenting again
+
+        Args:
+            paragraphs: Paragraph texts
+
+        Returns:
+            Document whose paragraphs are exactly the given ones
+        """
+        segments = []
+        offset = 0
+        for paragraph in paragraphs:
+            segments.append(Paragraph(paragraph, offset, offset + len(paragraph)))
+            offset += len(paragraph) + len(PARAGRAPH_SEPARATOR)
+        return cls(PARAGRAPH_SEPARATOR.join(paragraphs), paragraphs=segments)
+
+    @classmethod
+    def from_parse_result(cls, parse_result: Dict[str, Any]) -> "Document":
+        """
+        Create a document from the parse result dictionary of the pipeline
+
+        Pages are taken over as spans when they index full_text (not after
+        formatting optimization, where they index raw_text).
+
+        Args:
+            parse_result: Dictionary with full_text and pages
+
+        Returns:
+            Document over full_text
+        """
+        page_spans = None
+        if not parse_result.get("formatting_optimized"):
+            page_spans = [
+                (page["start"], page["end"]) for page in parse_result.get("pages", [])
+                if page.get("start") is not None
+            ]
+        return cls(parse_result["full_text"], page_spans)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def num_pages(self) -> int:
+        """Number of located pages"""
+        return len(self.page_spans)
+
+    def page_text(self, index: int) -> str:
+        """Text of a page (0-indexed)"""
+        start, end = self.page_spans[index]
+        return self.text[start:end]
+
+    @property
+    def segments(self) -> List[Paragraph]:
+        """Paragraphs with their offsets, segmented once"""
+        if self._segments is None:
+            self._segments = segment_paragraphs(self.text)
+        return self._segments
+
+    @property
+    def paragraphs(self) -> List[str]:
+        """Paragraph texts in order (shared list, do not modify)"""
+        if self._paragraphs is None:
+            self._paragraphs = [segment.text for segment in self.segments]
+        return self._paragraphs
+
+    @property
+    def num_paragraphs(self) -> int:
+        return len(self.segments)
+
+    def paragraph_sizes(self, counter: Optional[Callable[[str], int]] = None) -> List[int]:
+        """
+        Size of every paragraph, computed once per counter
+
+        Args:
+            counter: Size function such as the token counter (default: characters)
+
+        Returns:
+            Size per paragraph
+        """
+        sizes = self._paragraph_sizes.get(counter)
+        if sizes is None:
+            sizes = [counter(paragraph) if counter else len(paragraph) for paragraph in self.paragraphs]
+            self._paragraph_sizes[counter] = sizes
+        return sizes
+
+    def windows(
+        self,
+        window_limit: int,
+        overlap_paragraphs: int,
+        counter: Optional[Callable[[str], int]] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Plan translation windows over the paragraphs, like create_sliding_windows
+
+        Args:
+            window_limit: Maximum window size, in units of counter
+            overlap_paragraphs: Number of paragraphs shared by consecutive windows
+            counter: Size function such as the token counter (default: characters)
+
+        Returns:
+            List of (start_idx, end_idx) paragraph spans, end_idx inclusive
+        """
+        separator_len = 1 if counter else len(PARAGRAPH_SEPARATOR)
+        return plan_window_spans(self.paragraph_sizes(counter), window_limit, separator_len, overlap_paragraphs)
+
+    def window_text(self, start: int, end: int) -> str:
+        """Source text of paragraphs start..end (inclusive)"""
+        return PARAGRAPH_SEPARATOR.join(self.paragraphs[start:end + 1])
+
+    def attach_translations(self, translations: Sequence[Optional[str]]) -> None:
+        """
+        Attach one translation per paragraph
+
+        Args:
+            translations: Translation of every paragraph (None where unknown)
+
+        Raises:
+            ValueError: If the number of translations differs from the number of paragraphs
+        """
+        if len(translations) != self.num_paragraphs:
+            raise ValueError(f"Number of translations ({len(translations)}) doesn't match "
+                             f"paragraphs ({self.num_paragraphs})")
+        self.translations = list(translations)
+
+    @property
+    def fully_translated(self) -> bool:
+        """Whether every paragraph has a translation"""
+        return self.translations is not None and all(self.translations)
+
+    def translated_text(self) -> str:
+        """Translations of the paragraphs joined with blank lines (paragraphs without one are skipped)"""
+        return PARAGRAPH_SEPARATOR.join(translation for translation in self.translations or [] if translation)
+
+
+__all__ = [
+    "Document",
+    "plan_window_spans",
+    "PAGE_SEPARATOR",
+]
@@ -0,0 +1,390 @@
+"""
+Endpoint Router for OpenAI-compatible LLM APIs
+
+Spreads requests over several endpoints (e.g., SiliconFlow plus a self-hosted
+gateway) by weight, respecting a concurrency cap per endpoint. Endpoints that
+keep failing, return 429, or answer much slower than the others are ejected for
+a while and requests fail over to the remaining ones. Each endpoint can carry
+its own RPM/TPM rate limiter, so throughput grows with the quotas held.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .rate_limiter import RateLimiter, get_default_rate_limiter
+
+# Poll interval while every endpoint is at its concurrency cap
+CAPACITY_POLL_SECONDS = 0.05
+
+
+@dataclass
+class Endpoint:
+    """One OpenAI-compatible endpoint"""
+
+    base_url: str
+    api_key: str
+    name: str = ""
+    weight: float = 1.0
+    max_concurrency: int = 0  # 0 = unlimited
+    model: Optional[str] = None  # Model identifier to send instead of the requested one
+    rate_limiter: Optional[RateLimiter] = None
+
+    def __post_init__(self):
+        self.name = self.name or self.base_url
+        if self.weight <= 0:
+            raise ValueError(f"Endpoint '{self.name}' must have a positive weight")
+
+
+class _EndpointHealth:
+    """Load and health state of one endpoint"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.consecutive_ejections = 0
+        self.ejected_until = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.latency_samples = 0
+        self.last_error: Optional[str] = None
+
+
+class EndpointRouter:
+    """Weighted least-loaded routing with failure and latency based ejection"""
+
+    def __init__(
+        self,
+        endpoints: Iterable[Endpoint],
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0,
+        slow_factor: float = 3.0,
+        min_latency_samples: int = 5,
+        latency_alpha: float = 0.2
+    ):
+        """
+        Initialize router
+
+        Args:
+            endpoints: Endpoints in order of preference (names must be unique)
+            failure_threshold: Consecutive failures that eject an endpoint
+            ejection_seconds: Base ejection time (doubles on repeated ejections, up to 8x)
+            slow_factor: Eject an endpoint whose time-to-first-token average exceeds
+                         this multiple of the fastest other endpoint
+            min_latency_samples: Requests needed before latency is compared
+            latency_alpha: Smoothing factor of the latency moving average
+        """
+        self.endpoints: List[Endpoint] = list(endpoints)
+        if not self.endpoints:
+            raise ValueError("EndpointRouter requires at least one endpoint")
+        names = [endpoint.name for endpoint in self.endpoints]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Endpoint names must be unique: {names}")
+
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self.slow_factor = slow_factor
+        self.min_latency_samples = min_latency_samples
+        self.latency_alpha = latency_alpha
+
+        self._health: Dict[str, _EndpointHealth] = {name: _EndpointHealth() for name in names}
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @property
+    def total_concurrency(self) -> int:
+        """Sum of the concurrency caps (an unlimited endpoint counts as 1)"""
+        return sum(endpoint.max_concurrency or 1 for endpoint in self.endpoints)
+
+    def _has_capacity(self, endpoint: Endpoint) -> bool:
+        return not endpoint.max_concurrency or self._health[endpoint.name].in_flight < endpoint.max_concurrency
+
+    def _is_healthy(self, endpoint: Endpoint, now: float) -> bool:
+        return self._health[endpoint.name].ejected_until <= now
+
+    def _load_score(self, endpoint: Endpoint) -> Tuple[float, float]:
+        health = self._health[endpoint.name]
+        return (health.in_flight + 1) / endpoint.weight, health.latency_ewma or 0.0
+
+    def _select_locked(self, exclude: Iterable[str]) -> Tuple[Optional[Endpoint], float]:
+        """
+        Pick the endpoint for the next request
+
+        Healthy endpoints not in exclude are preferred, then any healthy endpoint, then
+        the ejected endpoint whose ejection ends first (so a request is never refused
+        only because every endpoint is ejected).
+
+        Returns:
+            Tuple of (endpoint or None, seconds to wait before trying again)
+        """
+        now = time.monotonic()
+        exclude = set(exclude)
+        available = [endpoint for endpoint in self.endpoints if self._has_capacity(endpoint)]
+        if not available:
+            return None, CAPACITY_POLL_SECONDS
+
+        healthy = [endpoint for endpoint in available if self._is_healthy(endpoint, now)]
+        preferred = [endpoint for endpoint in healthy if endpoint.name not in exclude] or healthy
+        if preferred:
+            return min(preferred, key=self._load_score), 0.0
+        return min(available, key=lambda endpoint: self._health[endpoint.name].ejected_until), 0.0
+
+    def _take_locked(self, endpoint: Endpoint) -> Endpoint:
+        health = self._health[endpoint.name]
+        health.in_flight += 1
+        health.requests += 1
+        return endpoint
+
+    def try_acquire(self, exclude: Iterable[str] = ()) -> Tuple[Optional[Endpoint], float]:
+        """
+        Reserve a request slot without waiting
+
+        Args:
+            exclude: Names of endpoints to avoid if another one is available
+                     (e.g., endpoints that already failed for this request)
+
+        Returns:
+            Tuple of (reserved endpoint or None, seconds to wait before trying again)
+        """
+        with self._condition:
+            endpoint, wait = self._select_locked(exclude)
+            return (self._take_locked(endpoint), 0.0) if endpoint is not None else (None, wait)
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Endpoint:
+        """
+        Block until a request slot is free and reserve it
+
+        Args:
+            exclude: Names of endpoints to avoid if another one is available
+
+        Returns:
+            Reserved endpoint (must be handed back with release())
+        """
+        with self._condition:
+            while True:
+                endpoint, wait = self._select_locked(exclude)
+                if endpoint is not None:
+                    return self._take_locked(endpoint)
+                self._condition.wait(wait)
+
+    async def acquire_async(self, exclude: Iterable[str] = ()) -> Endpoint:
+        """
+        Wait without blocking the event loop until a request slot is free and reserve it
+
+        Args:
+            exclude: Names of endpoints to avoid if another one is available
+
+        Returns:
+            Reserved endpoint (must be handed back with release())
+        """
+        while True:
+            endpoint, wait = self.try_acquire(exclude)
+            if endpoint is not None:
+                return endpoint
+            await asyncio.sleep(wait)
+
+    def resolve_model(self, model: str) -> Optional[str]:
+        """
+        Get the model sent for a request, if it does not depend on the endpoint
+
+        Args:
+            model: Model identifier requested by the caller
+
+        Returns:
+            Model every endpoint sends, or None if endpoints override it differently
+        """
+        models = {endpoint.model or model for endpoint in self.endpoints}
+        return models.pop() if len(models) == 1 else None
+
+    def has_alternative(self, exclude: Iterable[str]) -> bool:
+        """
+        Check if a healthy endpoint outside exclude exists
+
+        Args:
+            exclude: Names of endpoints to ignore
+
+        Returns:
+            True if a request could fail over right away
+        """
+        now = time.monotonic()
+        exclude = set(exclude)
+        with self._condition:
+            return any(
+                endpoint.name not in exclude and self._is_healthy(endpoint, now)
+                for endpoint in self.endpoints
+            )
+
+    def _eject_locked(self, endpoint: Endpoint, reason: str) -> None:
+        health = self._health[endpoint.name]
+        duration = self.ejection_seconds * min(2 ** health.consecutive_ejections, 8)
+        health.ejected_until = time.monotonic() + duration
+        health.ejections += 1
+        health.consecutive_ejections += 1
+        health.consecutive_failures = 0
+        health.latency_ewma = None
+        health.latency_samples = 0
+        print(f"Endpoint '{endpoint.name}' ejected for {duration:.0f}s ({reason})")
+
+    def _is_slow_locked(self, endpoint: Endpoint) -> bool:
+        """Compare the latency average against the fastest other endpoint"""
+        health = self._health[endpoint.name]
+        if health.latency_samples < self.min_latency_samples:
+            return False
+        now = time.monotonic()
+        others = [
+            self._health[other.name].latency_ewma
+            for other in self.endpoints
+            if other.name != endpoint.name
+            and self._is_healthy(other, now)
+            and self._health[other.name].latency_samples >= self.min_latency_samples
+        ]
+        return bool(others) and health.latency_ewma > self.slow_factor * min(others)
+
+    def release(
+        self,
+        endpoint: Endpoint,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        cooldown: float = 0.0
+    ) -> None:
+        """
+        Hand back a request slot and update the endpoint's health
+
+        Server errors, timeouts and connection errors count as failures; other 4xx
+        responses are the request's fault and do not affect health. Without latency
+        and error (e.g., a cancelled request) only the slot is handed back.
+
+        Args:
+            endpoint: Endpoint returned by acquire()
+            latency: Time to first token of a successful request
+            error: Exception of a failed request
+            cooldown: Seconds to keep the endpoint out of rotation (e.g., 429 Retry-After)
+        """
+        with self._condition:
+            health = self._health[endpoint.name]
+            health.in_flight = max(0, health.in_flight - 1)
+
+            if cooldown > 0:
+                health.ejected_until = max(health.ejected_until, time.monotonic() + cooldown)
+
+            if error is None and latency is not None:
+                health.consecutive_failures = 0
+                health.consecutive_ejections = 0
+                if health.latency_ewma is None:
+                    health.latency_ewma = latency
+                else:
+                    health.latency_ewma += self.latency_alpha * (latency - health.latency_ewma)
+                health.latency_samples += 1
+                if self._is_slow_locked(endpoint):
+                    self._eject_locked(endpoint, f"time to first token {health.latency_ewma:.2f}s")
+            elif error is not None:
+                status_code = getattr(error, "status_code", None)
+                if status_code is None or status_code >= 500:
+                    health.failures += 1
+                    health.consecutive_failures += 1
+                    health.last_error = f"{type(error).__name__}: {error}"[:200]
+                    if health.consecutive_failures >= self.failure_threshold and len(self.endpoints) > 1:
+                        self._eject_locked(endpoint, f"{health.consecutive_failures} consecutive failures")
+
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get load and health of every endpoint
+
+        Returns:
+            Dictionary mapping endpoint name to its counters
+        """
+        now = time.monotonic()
+        with self._condition:
+            return {
+                endpoint.name: {
+                    "base_url": endpoint.base_url,
+                    "weight": endpoint.weight,
+                    "max_concurrency": endpoint.max_concurrency,
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "ejections": health.ejections,
+                    "in_flight": health.in_flight,
+                    "healthy": health.ejected_until <= now,
+                    "ttft_ewma_seconds": round(health.latency_ewma, 3) if health.latency_ewma is not None else None,
+                    "last_error": health.last_error
+                }
+                for endpoint in self.endpoints
+                for health in (self._health[endpoint.name],)
+            }
+
+
+def load_endpoints(config: Any) -> List[Endpoint]:
+    """
+    Build endpoints from a JSON-style configuration
+
+    Each entry accepts base_url, api_key (or api_key_env naming an environment
+    variable), name, weight, max_concurrency, model, and rpm / tpm for a rate
+    limiter shared by all processes using that key.
+
+    Args:
+        config: List of endpoint dictionaries
+
+    Returns:
+        List of Endpoint instances
+    """
+    endpoints = []
+    for idx, entry in enumerate(config):
+        api_key = entry.get("api_key") or os.getenv(entry.get("api_key_env", ""), "")
+        if not entry.get("base_url") or not api_key:
+            raise ValueError(f"Endpoint #{idx + 1} needs base_url and api_key (or api_key_env)")
+        rpm, tpm = int(entry.get("rpm", 0)), int(entry.get("tpm", 0))
+        endpoints.append(Endpoint(
+            base_url=entry["base_url"],
+            api_key=api_key,
+            name=entry.get("name", ""),
+            weight=float(entry.get("weight", 1.0)),
+            max_concurrency=int(entry.get("max_concurrency", 0)),
+            model=entry.get("model"),
+            rate_limiter=get_default_rate_limiter(api_key, rpm, tpm)
+        ))
+    return endpoints
+
+
+def get_default_endpoint_router() -> Optional[EndpointRouter]:
+    """
+    Create a router from the LLM_ENDPOINTS env var
+
+    LLM_ENDPOINTS holds a JSON list of endpoints (see load_endpoints) or the path to
+    a JSON file containing it. Ejection is tuned by LLM_ENDPOINT_FAILURE_THRESHOLD
+    (default: 3), LLM_ENDPOINT_EJECTION_SECONDS (default: 30) and
+    LLM_ENDPOINT_SLOW_FACTOR (default: 3).
+
+    Returns:
+        EndpointRouter instance, or None if LLM_ENDPOINTS is not set
+    """
+    value = os.getenv("LLM_ENDPOINTS", "").strip()
+    if not value:
+        return None
+    if not value.startswith("["):
+        with open(Path(value).expanduser(), "r", encoding="utf-8") as f:
+            value = f.read()
+    return EndpointRouter(
+        load_endpoints(json.loads(value)),
+        failure_threshold=int(os.getenv("LLM_ENDPOINT_FAILURE_THRESHOLD", "3")),
+        ejection_seconds=float(os.getenv("LLM_ENDPOINT_EJECTION_SECONDS", "30")),
+        slow_factor=float(os.getenv("LLM_ENDPOINT_SLOW_FACTOR", "3"))
+    )
+
+
+__all__ = [
+    "Endpoint",
+    "EndpointRouter",
+    "load_endpoints",
+    "get_default_endpoint_router",
+]
@@ -0,0 +1,311 @@
+"""
+Glossary Enforcement for Translated Documents
+
+Checks every source/target segment pair against the glossary without an LLM. For
+each glossary term found in the source segment, the target segment must contain
+the term's translation. Missing translations are fixed deterministically when the
+target holds a recognizable rendering of the term:
+
+- the source term left untranslated ("Iomedae" in the Chinese text)
+- a variant already corrected in an earlier segment
+- a variant transliteration of a translation of at least four characters: a
+  same-length string differing in one character out of four ("艾欧梅黛" for
+  "艾奥梅黛"), or a string one character longer or shorter with the same first
+  and last characters ("艾梅黛")
+
+Short translations are only matched exactly, since one changed character turns
+them into ordinary words ("圣武器" is not a variant of "圣武士"). When the
+segment holds more variant candidates than missing translations, none of them
+is replaced. Only segments with terms that cannot be resolved this way are
+returned as unresolved, so callers can send just those paragraphs back to the LLM.
+"""
+
+import re
+import threading
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Handle both package and direct imports
+try:
+    from .glossary_matcher import get_glossary_matcher
+except ImportError:
+    from backend.glossary_matcher import get_glossary_matcher
+
+# "local" enforces the glossary per segment and post-edits only unresolved paragraphs,
+# "llm" post-edits the whole translation in one request
+ENFORCEMENT_MODES = ("local", "llm")
+
+# Minimum similarity between a variant and the glossary translation
+VARIANT_MIN_SIMILARITY = 0.75
+
+# Translations shorter than this are only matched exactly (too short to tell variants apart)
+VARIANT_MIN_LENGTH = 4
+
+# Characters that continue a Latin-script word
+LATIN_WORD_CHAR = r"[0-9A-Za-z_\u00C0-\u024F]"
+
+
+def _occurrences(text: str, needle: str) -> List[Tuple[int, int]]:
+    """Non-overlapping (start, end) spans of a substring"""
+    spans = []
+    start = text.find(needle)
+    while start >= 0:
+        spans.append((start, start + len(needle)))
+        start = text.find(needle, start + len(needle))
+    return spans
+
+
+def _overlaps(start: int, end: int, spans: Sequence[Tuple[int, int]]) -> bool:
+    """Check whether a span overlaps any of the given spans"""
+    return any(start < span_end and span_start < end for span_start, span_end in spans)
+
+
+def find_variant_spans(
+    text: str,
+    translation: str,
+    protected: Sequence[Tuple[int, int]] = (),
+    min_similarity: float = VARIANT_MIN_SIMILARITY
+) -> List[Tuple[int, int]]:
+    """
+    Find variant renderings of a translation in a text
+
+    Args:
+        text: Target text to scan
+        translation: Glossary translation
+        protected: Spans that must not be touched (e.g., other glossary translations)
+        min_similarity: Minimum similarity of a variant (default: VARIANT_MIN_SIMILARITY)
+
+    Returns:
+        Non-overlapping (start, end) spans, best match first
+    """
+    length = len(translation)
+    if length < VARIANT_MIN_LENGTH:
+        return []
+    # Variants consist of word characters and the separators of the translation itself ("·")
+    allowed = {char for char in translation if not char.isalnum()}
+    matcher = SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2(translation)
+
+    scored = []
+    for start in range(len(text) - length + 2):
+        for size in (length, length - 1, length + 1):
+            candidate = text[start:start + size]
+            if len(candidate) != size or candidate == translation:
+                continue
+            if translation in candidate or candidate in translation:
+                continue
+            if not all(char.isalnum() or char in allowed for char in candidate):
+                continue
+            if size == length:
+                # Substitutions: agreement by position
+                score = sum(a == b for a, b in zip(candidate, translation)) / length
+            elif candidate[0] != translation[0] or candidate[-1] != translation[-1]:
+                continue
+            else:
+                # One insertion or deletion inside the name
+                matcher.set_seq1(candidate)
+                score = matcher.ratio()
+            if score >= min_similarity and not _overlaps(start, start + size, protected):
+                scored.append((-score, abs(size - length), start, start + size))
+
+    spans: List[Tuple[int, int]] = []
+    for _, _, start, end in sorted(scored):
+        if not _overlaps(start, end, spans):
+            spans.append((start, end))
+    return spans
+
+
+def align_paragraph_segments(
+    num_sources: int,
+    units: List[str],
+    mapped: Optional[List[Optional[str]]] = None
+) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Pair runs of source paragraphs with runs of translated paragraphs
+
+    Paragraphs pair one to one when the counts match. Otherwise the translation
+    attributed to each source paragraph (from the translation windows) anchors the
+    pairing, and the paragraphs between two anchors form one segment.
+
+    Args:
+        num_sources: Number of source paragraphs
+        units: Translated paragraphs of the merged translation
+        mapped: Translation attributed to each source paragraph (None where unknown)
+
+    Returns:
+        List of ((source_start, source_end), (unit_start, unit_end)) half-open ranges
+    """
+    if len(units) == num_sources:
+        return [((idx, idx + 1), (idx, idx + 1)) for idx in range(num_sources)]
+    whole = [((0, num_sources), (0, len(units)))]
+    if mapped is None or len(mapped) != num_sources:
+        return whole
+
+    segments = []
+    source_start, unit_start = 0, 0
+    for idx, unit in enumerate(mapped):
+        if unit is None:
+            continue
+        try:
+            position = units.index(unit, unit_start)
+        except ValueError:
+            return whole
+        if idx > source_start or position > unit_start:
+            segments.append(((source_start, idx), (unit_start, position)))
+        segments.append(((idx, idx + 1), (position, position + 1)))
+        source_start, unit_start = idx + 1, position + 1
+    if source_start < num_sources or unit_start < len(units):
+        segments.append(((source_start, num_sources), (unit_start, len(units))))
+    return segments
+
+
+class GlossaryEnforcer:
+    """Deterministic glossary checks and fixes for source/target segment pairs"""
+
+    def __init__(self, glossary: Dict[str, str], min_similarity: float = VARIANT_MIN_SIMILARITY):
+        """
+        Initialize enforcer
+
+        Args:
+            glossary: Translation glossary with term->translation mapping
+            min_similarity: Minimum similarity of a variant rendering (default: VARIANT_MIN_SIMILARITY)
+        """
+        self.glossary = {term: translation for term, translation in glossary.items() if translation and translation != term}
+        self.min_similarity = min_similarity
+        self._matcher = get_glossary_matcher(self.glossary) if self.glossary else None
+        # Term -> variant -> number of occurrences replaced
+        self.variants: Dict[str, Counter] = defaultdict(Counter)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, **counts: int) -> None:
+        """
+        Add to the enforcement statistics (thread-safe)
+
+        Args:
+            **counts: Statistic name to increment
+        """
+        with self._lock:
+            self.stats.update(counts)
+
+    def enforce(self, source: str, target: str) -> Tuple[str, List[str]]:
+        """
+        Enforce the glossary on one translated segment
+
+        Args:
+            source: Source segment
+            target: Translation of the segment
+
+        Returns:
+            Tuple of (fixed translation, terms whose translation is still missing)
+        """
+        if self._matcher is None or not source or not target:
+            return target, []
+        expected = Counter(term for _, _, term in self._matcher.find_longest(source))
+        if not expected:
+            return target, []
+
+        counts: Counter = Counter(segments=1, terms_checked=len(expected))
+        unresolved = []
+        # Longer translations first, so a shorter one inside them is protected afterwards
+        for term in sorted(expected, key=lambda term: (-len(self.glossary[term]), term)):
+            translation = self.glossary[term]
+            protected = [
+                span for other in expected if other != term
+                for span in _occurrences(target, self.glossary[other])
+            ]
+            missing = expected[term] - len(_occurrences(target, translation))
+            if missing > 0:
+                target = self._fix_term(term, translation, target, missing, protected, counts)
+            if translation not in target:
+                unresolved.append(term)
+
+        counts["terms_unresolved"] = len(unresolved)
+        if unresolved:
+            counts["segments_unresolved"] = 1
+        self.record(**counts)
+        return target, unresolved
+
+    def _fix_term(
+        self,
+        term: str,
+        translation: str,
+        target: str,
+        missing: int,
+        protected: List[Tuple[int, int]],
+        counts: Counter
+    ) -> str:
+        """Replace up to `missing` renderings of a term with its translation"""
+        # The source term left untranslated (CJK characters next to it are not part of the word)
+        pattern = rf"(?<!{LATIN_WORD_CHAR}){re.escape(term)}(?!{LATIN_WORD_CHAR})"
+        spans = [
+            match.span() for match in re.finditer(pattern, target, re.IGNORECASE)
+            if not _overlaps(*match.span(), protected)
+        ][:missing]
+        target = self._replace_spans(target, spans, translation)
+        counts["untranslated_fixed"] += len(spans)
+        fixed = len(spans)
+
+        # Variants corrected in earlier segments, most frequent first
+        with self._lock:
+            known = [variant for variant, _ in self.variants[term].most_common()]
+        for variant in known:
+            if fixed >= missing:
+                break
+            spans = [span for span in _occurrences(target, variant) if not _overlaps(*span, protected)]
+            spans = spans[:missing - fixed]
+            target = self._replace_spans(target, spans, translation)
+            self._learn(term, variant, len(spans))
+            counts["variants_fixed"] += len(spans)
+            fixed += len(spans)
+
+        # New variant renderings, only when every candidate is needed (otherwise the match is ambiguous)
+        if fixed < missing:
+            protected = protected + _occurrences(target, translation)
+            spans = find_variant_spans(target, translation, protected, self.min_similarity)
+            if len(spans) > missing - fixed:
+                counts["variants_ambiguous"] += 1
+                return target
+            spans = sorted(spans)
+            for start, end in spans:
+                self._learn(term, target[start:end], 1)
+            target = self._replace_spans(target, spans, translation)
+            counts["variants_fixed"] += len(spans)
+        return target
+
+    def _learn(self, term: str, variant: str, count: int) -> None:
+        """Remember a variant rendering of a term"""
+        if count:
+            with self._lock:
+                self.variants[term][variant] += count
+
+    @staticmethod
+    def _replace_spans(text: str, spans: List[Tuple[int, int]], replacement: str) -> str:
+        """Replace non-overlapping spans of a text"""
+        for start, end in sorted(spans, reverse=True):
+            text = text[:start] + replacement + text[end:]
+        return text
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the enforcement
+
+        Returns:
+            Dictionary with statistics and the variants replaced per term
+        """
+        with self._lock:
+            summary: Dict[str, Any] = dict(self.stats)
+            summary["variants"] = {
+                term: dict(variants.most_common()) for term, variants in sorted(self.variants.items()) if variants
+            }
+        return summary
+
+
+__all__ = [
+    "GlossaryEnforcer",
+    "align_paragraph_segments",
+    "find_variant_spans",
+    "ENFORCEMENT_MODES",
+    "VARIANT_MIN_SIMILARITY",
+]
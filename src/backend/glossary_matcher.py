@@ -0,0 +1,294 @@
+"""
+Glossary Matcher for TRPG Documents
+
+Aho-Corasick automaton over case-folded glossary terms. One linear pass over a
+text finds every term occurrence with the same word-boundary semantics as the
+regex ``\\b<term>\\b`` under re.IGNORECASE, so term detection, partial-word
+matching and longest-match-first replacement no longer loop over the glossary.
+Matchers are cached per glossary version.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# Number of compiled glossaries kept in memory
+MATCHER_CACHE_SIZE = 8
+
+_MATCHER_CACHE: "OrderedDict[Tuple, GlossaryMatcher]" = OrderedDict()
+_MATCHER_CACHE_LOCK = threading.Lock()
+
+
+def _is_word_char(char: str) -> bool:
+    """Same definition as the regex \\w class for str patterns"""
+    return char.isalnum() or char == "_"
+
+
+def _fold(text: str) -> str:
+    """
+    Lowercase text while keeping a 1:1 character mapping to the original
+
+    Characters whose lowercase form has a different length (e.g., "İ") are kept
+    as-is so match offsets can be used on the original text.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(lower if len(lower) == 1 else char for char, lower in ((c, c.lower()) for c in text))
+
+
+class GlossaryMatcher:
+    """Compiled multi-term matcher with word boundaries and case folding"""
+
+    def __init__(self, terms: Iterable[str], word_boundaries: bool = True):
+        """
+        Build the automaton
+
+        Args:
+            terms: Glossary terms in glossary order (non-string and empty terms are ignored)
+            word_boundaries: Only match terms on word boundaries (default: True); disable
+                             for scripts without spaces between words (e.g., Chinese translations)
+        """
+        self.word_boundaries = word_boundaries
+        self.terms: List[str] = []
+        self._term_index: Dict[str, int] = {}
+
+        # Trie: goto transitions, failure links, terms ending at each node,
+        # and the nearest failure ancestor that ends a term
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._output_link: List[int] = [-1]
+        self._depth: List[int] = [0]
+
+        for term in terms:
+            if not isinstance(term, str) or not term or term in self._term_index:
+                continue
+            self._term_index[term] = len(self.terms)
+            self.terms.append(term)
+            self._insert(_fold(term), self._term_index[term])
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _insert(self, pattern: str, term_id: int) -> None:
+        """Add a folded pattern to the trie"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._output_link.append(-1)
+                self._depth.append(self._depth[node] + 1)
+            node = next_node
+        self._outputs[node].append(term_id)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first computation of failure and output links"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(char, 0)
+                self._fail[child] = fail_target if fail_target != child else 0
+                target = self._fail[child]
+                self._output_link[child] = target if self._outputs[target] else self._output_link[target]
+
+    def _iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """
+        Yield every term occurrence that sits on word boundaries
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            Tuples of (start, end, term_id) in order of end position
+        """
+        if not self.terms or not text:
+            return
+
+        folded = _fold(text)
+        text_length = len(text)
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        output_link = self._output_link
+        depth = self._depth
+        word_boundaries = self.word_boundaries
+
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not node:
+                continue
+
+            end = position + 1
+            match_node = node if outputs[node] else output_link[node]
+            while match_node > 0:
+                start = end - depth[match_node]
+                # Regex \b semantics: word-ness differs on both sides of each edge
+                left_ok = not word_boundaries or (
+                    (start > 0 and _is_word_char(text[start - 1])) != _is_word_char(text[start])
+                )
+                right_ok = not word_boundaries or (
+                    _is_word_char(text[end - 1]) != (end < text_length and _is_word_char(text[end]))
+                )
+                if left_ok and right_ok:
+                    for term_id in outputs[match_node]:
+                        yield start, end, term_id
+                match_node = output_link[match_node]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find all (possibly overlapping) term occurrences
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of (start, end, term) tuples
+        """
+        return [(start, end, self.terms[term_id]) for start, end, term_id in self._iter_matches(text)]
+
+    def detect(self, text: str) -> List[str]:
+        """
+        Find which terms occur in the text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Terms found, in glossary order
+        """
+        found = {term_id for _, _, term_id in self._iter_matches(text)}
+        return [self.terms[term_id] for term_id in sorted(found)]
+
+    def find_longest(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find non-overlapping occurrences, preferring the leftmost and then the longest term
+
+        When several terms fold to the same string, the first one in glossary order wins.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of (start, end, term) tuples ordered by position
+        """
+        best: Dict[int, Tuple[int, int]] = {}
+        for start, end, term_id in self._iter_matches(text):
+            current = best.get(start)
+            if current is None or end > current[0] or (end == current[0] and term_id < current[1]):
+                best[start] = (end, term_id)
+
+        matches = []
+        covered_until = 0
+        for start in sorted(best):
+            if start < covered_until:
+                continue
+            end, term_id = best[start]
+            matches.append((start, end, self.terms[term_id]))
+            covered_until = end
+        return matches
+
+    def replace(
+        self,
+        text: str,
+        replacement: Union[Mapping[str, str], Callable[[str, str], str]]
+    ) -> str:
+        """
+        Replace term occurrences in one pass, longest match first
+
+        Args:
+            text: Text to process
+            replacement: Mapping of term to replacement text, or a callable
+                         (term, matched_text) -> replacement text
+
+        Returns:
+            Text with all matched terms replaced
+        """
+        parts = []
+        last = 0
+        for start, end, term in self.find_longest(text):
+            if callable(replacement):
+                new_text = replacement(term, text[start:end])
+            else:
+                new_text = replacement.get(term)
+            if new_text is None:
+                continue
+            parts.append(text[last:start])
+            parts.append(new_text)
+            last = end
+        if not parts:
+            return text
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def find_partial_word_matches(self, phrases: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Find terms appearing as whole words inside each phrase
+
+        Args:
+            phrases: Phrases to scan (e.g., new glossary terms)
+
+        Returns:
+            Dictionary mapping each phrase with matches to its matched terms,
+            longest term first (glossary order among equal lengths)
+        """
+        partial_matches = {}
+        for phrase in phrases:
+            found = {term_id for _, _, term_id in self._iter_matches(phrase)}
+            if found:
+                ordered = sorted(found, key=lambda term_id: (-len(self.terms[term_id]), term_id))
+                partial_matches[phrase] = [self.terms[term_id] for term_id in ordered]
+        return partial_matches
+
+
+def get_glossary_matcher(
+    glossary: Union[Mapping[str, str], Iterable[str]],
+    word_boundaries: bool = True
+) -> GlossaryMatcher:
+    """
+    Get the compiled matcher for a glossary, building it on first use
+
+    Matchers are cached by glossary content, so an edited glossary gets a new matcher.
+
+    Args:
+        glossary: Glossary mapping (its keys are matched) or iterable of terms
+        word_boundaries: Only match terms on word boundaries (default: True)
+
+    Returns:
+        GlossaryMatcher for the glossary terms
+    """
+    terms = tuple(glossary.keys() if isinstance(glossary, Mapping) else glossary)
+    key = (terms, word_boundaries)
+    with _MATCHER_CACHE_LOCK:
+        matcher = _MATCHER_CACHE.get(key)
+        if matcher is not None:
+            _MATCHER_CACHE.move_to_end(key)
+            return matcher
+
+    matcher = GlossaryMatcher(terms, word_boundaries)
+    with _MATCHER_CACHE_LOCK:
+        _MATCHER_CACHE[key] = matcher
+        while len(_MATCHER_CACHE) > MATCHER_CACHE_SIZE:
+            _MATCHER_CACHE.popitem(last=False)
+    return matcher
+
+
+__all__ = [
+    "GlossaryMatcher",
+    "get_glossary_matcher",
+]
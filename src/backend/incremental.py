@@ -0,0 +1,221 @@
+"""
+Incremental Retranslation for revised PDFs
+
+Every run with an output directory stores a paragraph map: the hash of each
+source paragraph with its translation. When an errata PDF is translated against
+a previous run, paragraphs whose hash is already known reuse their translation
+and only new or edited paragraphs are sent to the LLM.
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+PARAGRAPH_MAP_SUFFIX = "_paragraphs.json"
+PARAGRAPH_MAP_VERSION = 1
+
+# Settings that must match for a stored translation to be reused
+MAP_SETTINGS = ("model", "source_language", "target_language", "use_hyperlink_format")
+
+# Unchanged paragraphs shown around an edited run as context
+CONTEXT_PARAGRAPHS = 2
+
+
+def paragraph_hash(paragraph: str) -> str:
+    """
+    Hash a source paragraph, ignoring whitespace differences between parses
+
+    Args:
+        paragraph: Paragraph text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = re.sub(r'\s+', ' ', paragraph).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ParagraphMap:
+    """Source paragraph hashes with their translations"""
+
+    def __init__(self, translations: Dict[str, str], settings: Dict[str, Any]):
+        """
+        Initialize paragraph map
+
+        Args:
+            translations: Mapping of paragraph hash to translated paragraph
+            settings: Translation settings of the run (see MAP_SETTINGS)
+        """
+        self.translations = translations
+        self.settings = settings
+
+    def __len__(self) -> int:
+        return len(self.translations)
+
+    @classmethod
+    def from_paragraphs(
+        cls,
+        paragraphs: List[str],
+        translations: List[Optional[str]],
+        **settings: Any
+    ) -> "ParagraphMap":
+        """
+        Build a map from aligned source and translated paragraphs
+
+        Args:
+            paragraphs: Source paragraphs
+            translations: Translation of each paragraph (None if it could not be attributed)
+            **settings: Translation settings of the run
+
+        Returns:
+            ParagraphMap with every attributed paragraph
+        """
+        mapping = {
+            paragraph_hash(paragraph): translation
+            for paragraph, translation in zip(paragraphs, translations)
+            if translation
+        }
+        return cls(mapping, {key: settings.get(key) for key in MAP_SETTINGS})
+
+    def lookup(self, paragraphs: List[str]) -> List[Optional[str]]:
+        """
+        Find stored translations for paragraphs
+
+        Args:
+            paragraphs: Source paragraphs of the revised document
+
+        Returns:
+            Stored translation per paragraph, None for new or edited paragraphs
+        """
+        return [self.translations.get(paragraph_hash(paragraph)) for paragraph in paragraphs]
+
+    def mismatched_settings(self, **settings: Any) -> List[str]:
+        """
+        Compare the stored run settings
+
+        Args:
+            **settings: Settings of the current run
+
+        Returns:
+            Names of the settings that differ
+        """
+        return [key for key in MAP_SETTINGS if key in settings and self.settings.get(key) != settings[key]]
+
+    def save(self, file_path: Union[str, Path]) -> str:
+        """
+        Write the map as JSON
+
+        Args:
+            file_path: Output file path
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(file_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": PARAGRAPH_MAP_VERSION,
+                "created": time.time(),
+                "settings": self.settings,
+                "paragraphs": self.translations
+            }, f, ensure_ascii=False, indent=1)
+        return str(path)
+
+    @classmethod
+    def load(cls, previous_run: Union[str, Path]) -> "ParagraphMap":
+        """
+        Load the map of a previous run
+
+        Args:
+            previous_run: Paragraph map file, or the previous output directory
+                          if it holds exactly one map
+
+        Returns:
+            ParagraphMap instance
+        """
+        path = Path(previous_run)
+        if path.is_dir():
+            candidates = sorted(path.glob(f"*{PARAGRAPH_MAP_SUFFIX}"))
+            if len(candidates) != 1:
+                raise ValueError(
+                    f"Expected one *{PARAGRAPH_MAP_SUFFIX} in {path}, found {len(candidates)}; "
+                    f"pass the paragraph map file instead"
+                )
+            path = candidates[0]
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("paragraphs", {}), data.get("settings", {}))
+
+
+def find_changed_runs(reused: List[Optional[str]]) -> List[Tuple[int, int]]:
+    """
+    Group consecutive paragraphs without a stored translation
+
+    Args:
+        reused: Stored translation per paragraph (None = needs translation)
+
+    Returns:
+        List of (start, end) inclusive paragraph index ranges
+    """
+    runs = []
+    start = None
+    for idx, translation in enumerate(reused):
+        if translation is None and start is None:
+            start = idx
+        elif translation is not None and start is not None:
+            runs.append((start, idx - 1))
+            start = None
+    if start is not None:
+        runs.append((start, len(reused) - 1))
+    return runs
+
+
+def build_revision_context(
+    paragraphs: List[str],
+    reused: List[Optional[str]],
+    start: int,
+    end: int,
+    context: Optional[str] = None,
+    context_paragraphs: int = CONTEXT_PARAGRAPHS
+) -> Optional[str]:
+    """
+    Describe the paragraphs around an edited run for the translation prompt
+
+    Args:
+        paragraphs: Source paragraphs of the revised document
+        reused: Stored translation per paragraph
+        start: First paragraph of the run
+        end: Last paragraph of the run (inclusive)
+        context: Document context
+        context_paragraphs: Paragraphs shown before and after the run
+
+    Returns:
+        Context string, or None if there is nothing to add
+    """
+    parts = [context] if context else []
+    before = range(max(0, start - context_paragraphs), start)
+    after = range(end + 1, min(len(paragraphs), end + 1 + context_paragraphs))
+
+    if before:
+        parts.append("Preceding text (already translated, do not translate it again):\n"
+                     + "\n\n".join(paragraphs[idx] for idx in before))
+        previous_translations = [reused[idx] for idx in before if reused[idx]]
+        if previous_translations:
+            parts.append("Its existing translation (keep terminology and style consistent):\n"
+                         + "\n\n".join(previous_translations))
+    if after:
+        parts.append("Following text (for reference only, do not translate it):\n"
+                     + "\n\n".join(paragraphs[idx] for idx in after))
+    return "\n\n".join(parts) or None
+
+
+__all__ = [
+    "ParagraphMap",
+    "paragraph_hash",
+    "find_changed_runs",
+    "build_revision_context",
+    "PARAGRAPH_MAP_SUFFIX",
+]
@@ -0,0 +1,334 @@
+"""
+Metrics Registry for LLM requests
+
+Collects streaming latency metrics per pipeline stage (noun extraction, glossary,
+translate, post-edit, formatting, alignment): time-to-first-token, total latency,
+output tokens/sec, retries and the token counts reported by the API, plus
+wall-clock time of the pipeline steps. The registry is thread-safe and can be
+dumped as JSON.
+
+A run (one translated document) activates its own registry: while it is active in
+the current context, every request recorded by the client's registry is also
+recorded there, so concurrent runs sharing a client do not mix their metrics.
+"""
+
+import contextvars
+import functools
+import json
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Union
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+THROUGHPUT_BUCKETS = (5, 10, 20, 40, 60, 80, 100, 150, 200, 400)
+
+
+class Histogram:
+    """Fixed-bucket histogram that also keeps raw observations for percentiles"""
+
+    def __init__(self, buckets: tuple):
+        """
+        Initialize histogram
+
+        Args:
+            buckets: Ascending bucket upper bounds (an overflow bucket is added)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.values: List[float] = []
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        self.values.append(value)
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                return
+        self.counts[-1] += 1
+
+    def _percentile(self, sorted_values: List[float], fraction: float) -> float:
+        """Nearest-rank percentile"""
+        rank = max(1, math.ceil(fraction * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the histogram
+
+        Returns:
+            Dictionary with count, sum, mean, min/max, p50/p90/p99 and bucket counts
+        """
+        if not self.values:
+            return {"count": 0}
+        sorted_values = sorted(self.values)
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": len(sorted_values),
+            "sum": round(sum(sorted_values), 4),
+            "mean": round(sum(sorted_values) / len(sorted_values), 4),
+            "min": round(sorted_values[0], 4),
+            "max": round(sorted_values[-1], 4),
+            "p50": round(self._percentile(sorted_values, 0.5), 4),
+            "p90": round(self._percentile(sorted_values, 0.9), 4),
+            "p99": round(self._percentile(sorted_values, 0.99), 4),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class _StageMetrics:
+    """Counters and histograms of one stage"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cached = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.usage_reported = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.ttft = Histogram(LATENCY_BUCKETS)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.tokens_per_second = Histogram(THROUGHPUT_BUCKETS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "cached": self.cached,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "usage_reported": self.usage_reported,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 3),
+            "ttft_seconds": self.ttft.to_dict(),
+            "latency_seconds": self.latency.to_dict(),
+            "output_tokens_per_second": self.tokens_per_second.to_dict()
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of per-stage request metrics and pipeline step timings"""
+
+    def __init__(self, document: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            document: Document the metrics belong to (for the registry of one run)
+        """
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageMetrics] = {}
+        self._steps: Dict[str, float] = {}
+        self.document = document
+        self.created_at = time.time()
+
+    def activate(self) -> None:
+        """
+        Make this the run registry of the current context
+
+        Requests recorded by any other registry in this context (and in the thread pool
+        tasks it submits through ContextThreadPoolExecutor) are recorded here as well.
+        Activate inside run_in_own_context so the registry ends with the run.
+        """
+        _RUN_REGISTRY.set(self)
+
+    def _run_registry(self) -> Optional["MetricsRegistry"]:
+        run = _RUN_REGISTRY.get()
+        return run if run is not self else None
+
+    def _stage(self, stage: str) -> _StageMetrics:
+        metrics = self._stages.get(stage)
+        if metrics is None:
+            metrics = self._stages[stage] = _StageMetrics()
+        return metrics
+
+    def record_request(
+        self,
+        stage: str,
+        latency: float,
+        ttft: Optional[float] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        generation_seconds: Optional[float] = None,
+        retries: int = 0,
+        usage_reported: bool = False,
+        rate_limit_wait: float = 0.0
+    ) -> None:
+        """
+        Record a completed streaming request
+
+        Args:
+            stage: Pipeline stage (e.g., "translate")
+            latency: Seconds from sending the request to the end of the stream
+            ttft: Seconds from sending the request to the first content token
+            prompt_tokens: Prompt tokens (as reported by the API when available)
+            completion_tokens: Completion tokens (as reported by the API when available)
+            generation_seconds: Seconds from first to last token, used for tokens/sec
+            retries: Failed attempts before the request succeeded
+            usage_reported: True if the token counts come from the API usage
+            rate_limit_wait: Seconds spent waiting for the rate limiter
+        """
+        with self._lock:
+            metrics = self._stage(stage)
+            metrics.requests += 1
+            metrics.retries += retries
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.usage_reported += int(usage_reported)
+            metrics.rate_limit_wait_seconds += rate_limit_wait
+            metrics.latency.observe(latency)
+            if ttft is not None:
+                metrics.ttft.observe(ttft)
+            if generation_seconds and generation_seconds > 0 and completion_tokens:
+                metrics.tokens_per_second.observe(completion_tokens / generation_seconds)
+        run = self._run_registry()
+        if run is not None:
+            run.record_request(
+                stage, latency, ttft, prompt_tokens, completion_tokens,
+                generation_seconds, retries, usage_reported, rate_limit_wait
+            )
+
+    def record_cached(self, stage: str) -> None:
+        """Record a request answered from the response cache"""
+        with self._lock:
+            metrics = self._stage(stage)
+            metrics.requests += 1
+            metrics.cached += 1
+        run = self._run_registry()
+        if run is not None:
+            run.record_cached(stage)
+
+    def record_error(self, stage: str, retries: int = 0) -> None:
+        """Record a request that failed after all retries"""
+        with self._lock:
+            metrics = self._stage(stage)
+            metrics.errors += 1
+            metrics.retries += retries
+        run = self._run_registry()
+        if run is not None:
+            run.record_error(stage, retries)
+
+    def record_step(self, step: str, seconds: float) -> None:
+        """
+        Add wall-clock time to a pipeline step
+
+        Args:
+            step: Step name (e.g., "parse", "translate")
+            seconds: Elapsed seconds
+        """
+        with self._lock:
+            self._steps[step] = self._steps.get(step, 0.0) + seconds
+
+    def step_clock(self) -> "StepClock":
+        """Create a StepClock recording into this registry"""
+        return StepClock(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export all metrics
+
+        Returns:
+            Dictionary with per-stage request metrics and step timings
+            (and the document of a run registry)
+        """
+        with self._lock:
+            return {
+                **({"document": self.document} if self.document is not None else {}),
+                "created_at": self.created_at,
+                "steps_seconds": {step: round(seconds, 3) for step, seconds in self._steps.items()},
+                "stages": {stage: metrics.to_dict() for stage, metrics in self._stages.items()}
+            }
+
+    def dump_json(self, file_path: Union[str, Path]) -> str:
+        """
+        Write metrics to a JSON file
+
+        Args:
+            file_path: Output file path
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return str(path)
+
+    def reset(self) -> None:
+        """Clear all metrics"""
+        with self._lock:
+            self._stages.clear()
+            self._steps.clear()
+            self.created_at = time.time()
+
+
+class StepClock:
+    """Measures consecutive pipeline steps: each step() call ends the previous step"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._current: Optional[str] = None
+        self._started = 0.0
+
+    def step(self, name: str) -> None:
+        """End the running step (if any) and start a new one"""
+        self.stop()
+        self._current = name
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        """End the running step"""
+        if self._current is not None:
+            self.registry.record_step(self._current, time.perf_counter() - self._started)
+            self._current = None
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in a copy of the submitting context, so they record into its run registry"""
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def run_in_own_context(func: Callable) -> Callable:
+    """
+    Decorator running every call in a copy of the caller's context
+
+    A run registry the call activates is discarded when it returns, also on errors.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return contextvars.copy_context().run(func, *args, **kwargs)
+    return wrapper
+
+
+_RUN_REGISTRY: "contextvars.ContextVar[Optional[MetricsRegistry]]" = contextvars.ContextVar(
+    "run_metrics_registry", default=None
+)
+_DEFAULT_REGISTRY = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry
+
+    Returns:
+        Shared MetricsRegistry instance
+    """
+    return _DEFAULT_REGISTRY
+
+
+__all__ = [
+    "ContextThreadPoolExecutor",
+    "Histogram",
+    "MetricsRegistry",
+    "StepClock",
+    "get_metrics_registry",
+    "run_in_own_context",
+]
@@ -0,0 +1,151 @@
+"""
+Single-Pass Paragraph Segmenter
+
+Splits text into paragraphs in one pass over its lines with precompiled
+patterns, and reports where each paragraph lies in the original buffer. The
+output is identical to the original regex-based split_into_paragraphs:
+
+- paragraphs are separated by blank lines ("\\n\\n")
+- lines are stripped; a line that PDF extraction split from its content
+  ("Description:", "Hazard: ...", "AC 18; ...", "Strike (melee)") is joined
+  to the next line with a space
+- markdown headings start a new paragraph
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple
+
+# Lines joined to the next line: "Description:", "Strike (melee)", "Hazard: ...", "AC 18; ..."
+_MERGE_PATTERN = re.compile(r"[A-Za-z]+\s*:$|[A-Za-z]+\s+\(.*?\)\s*$|[Hh]azard:|AC\s+\d+;")
+
+# Markdown heading at the start of a line
+_HEADING_PATTERN = re.compile(r"#{1,6}\s")
+_HEADING_MARKS = re.compile(r"#{1,6}")
+
+# Texts whose paragraphs are kept for repeated calls on the same text
+SEGMENT_CACHE_SIZE = 4
+
+# Texts are keyed by a digest, so the cache does not keep the texts themselves alive
+_SEGMENT_CACHE: "OrderedDict[Tuple[int, bytes], Tuple[str, ...]]" = OrderedDict()
+_SEGMENT_CACHE_LOCK = threading.Lock()
+
+
+class Paragraph(NamedTuple):
+    """A paragraph and its [start, end) character offsets in the original text"""
+    text: str
+    start: int
+    end: int
+
+
+def _continues(raw_lines: List[str], i: int) -> bool:
+    """Check whether a non-blank line follows line i - 1 before the next paragraph break"""
+    while i < len(raw_lines) and raw_lines[i]:
+        if raw_lines[i].strip():
+            return True
+        i += 1
+    return False
+
+
+def segment_paragraphs(text: str) -> List[Paragraph]:
+    """
+    Split text into paragraphs with their offsets
+
+    The offsets span the paragraph in the original text from its first to its last
+    non-whitespace character; the paragraph text has its lines stripped and split
+    lines joined, so it can differ from text[start:end].
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of paragraphs in order
+    """
+    paragraphs: List[Paragraph] = []
+    # Current paragraph: stripped lines and the offsets of its first and last non-empty line
+    lines: List[str] = []
+    start = end = -1
+
+    def flush() -> None:
+        nonlocal lines, start
+        if start >= 0:
+            # Trailing blank (whitespace-only) lines are not part of the paragraph
+            last = len(lines)
+            while not lines[last - 1]:
+                last -= 1
+            paragraphs.append(Paragraph("\n".join(lines[:last]), start, end))
+        lines = []
+        start = -1
+
+    raw_lines = text.split("\n")
+    count = len(raw_lines)
+    offset = 0
+    i = 0
+    while i < count:
+        raw = raw_lines[i]
+        line_start = offset
+        offset += len(raw) + 1
+        i += 1
+        if not raw:
+            # An empty line is a paragraph break
+            flush()
+            continue
+        line = raw.strip()
+        line_end = line_start + len(raw.rstrip())
+        # Join a split label to the next line of the same paragraph, if that line is not blank
+        if line and i < count and _MERGE_PATTERN.match(line):
+            next_line = raw_lines[i].strip()
+            if next_line:
+                next_raw = raw_lines[i]
+                line = line + " " + next_line
+                line_end = offset + len(next_raw.rstrip())
+                offset += len(next_raw) + 1
+                i += 1
+        # Headings start a new paragraph; a line of only "#" marks does when more text follows in the paragraph
+        if line and line[0] == "#" and (
+            _HEADING_PATTERN.match(line) or (_HEADING_MARKS.fullmatch(line) and _continues(raw_lines, i))
+        ):
+            flush()
+        if line:
+            if start < 0:
+                start = line_start + len(raw) - len(raw.lstrip())
+            end = line_end
+            lines.append(line)
+        elif start >= 0:
+            lines.append(line)
+    flush()
+    return paragraphs
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Split text into paragraphs, reusing the result for texts split recently
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of paragraphs
+    """
+    key = (len(text), hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    with _SEGMENT_CACHE_LOCK:
+        paragraphs = _SEGMENT_CACHE.get(key)
+        if paragraphs is not None:
+            _SEGMENT_CACHE.move_to_end(key)
+            return list(paragraphs)
+
+    paragraphs = tuple(paragraph.text for paragraph in segment_paragraphs(text))
+    with _SEGMENT_CACHE_LOCK:
+        _SEGMENT_CACHE[key] = paragraphs
+        while len(_SEGMENT_CACHE) > SEGMENT_CACHE_SIZE:
+            _SEGMENT_CACHE.popitem(last=False)
+    return list(paragraphs)
+
+
+__all__ = [
+    "Paragraph",
+    "segment_paragraphs",
+    "split_paragraphs",
+]
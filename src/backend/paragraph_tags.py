@@ -0,0 +1,135 @@
+"""
+Paragraph-ID Tagged Translation Protocol
+
+Every source paragraph sent for translation starts with a compact marker holding
+its index in the document ("⟦12⟧ The temple of Iomedae..."), and the model is
+asked to start each translated paragraph with the same marker. The reply is
+parsed back into one translation per paragraph ID:
+
+- paragraphs the model merged keep both markers, so they are split again
+- paragraphs whose marker is missing are reported, so only they (and the paragraph
+  that may have absorbed them) are re-requested
+- window translations are merged, and paired with their source paragraphs,
+  by ID in one pass instead of by position
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# "tagged" marks paragraphs with IDs the model echoes back, "plain" merges translations by position
+TRANSLATION_PROTOCOLS = ("tagged", "plain")
+
+# Re-requests of paragraphs missing from a tagged reply before the source text is kept
+TAG_RETRIES = 2
+
+TAG_FORMAT = "⟦{}⟧"
+
+_TAG_PATTERN = re.compile(r"[ \t]*⟦(\d+)⟧[ \t]*")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def tag_paragraphs(paragraphs: Sequence[str], start: int = 0, ids: Optional[Sequence[int]] = None) -> str:
+    """
+    Prefix paragraphs with their ID markers
+
+    Args:
+        paragraphs: Paragraphs to tag
+        start: ID of the first paragraph, the others are numbered consecutively (default: 0)
+        ids: Explicit ID of every paragraph (overrides start)
+
+    Returns:
+        Tagged text with paragraphs separated by blank lines
+    """
+    if ids is None:
+        ids = range(start, start + len(paragraphs))
+    return "\n\n".join(f"{TAG_FORMAT.format(idx)} {paragraph}" for idx, paragraph in zip(ids, paragraphs))
+
+
+@dataclass
+class TaggedTranslation:
+    """Translation parsed by paragraph ID"""
+    units: Dict[int, str] = field(default_factory=dict)
+    missing: List[int] = field(default_factory=list)
+    unexpected: List[int] = field(default_factory=list)
+    duplicates: List[int] = field(default_factory=list)
+    tagged: bool = True
+
+
+def parse_tagged_translation(text: str, expected: Sequence[int]) -> TaggedTranslation:
+    """
+    Parse a tagged translation into one translated paragraph per ID
+
+    A reply without any marker is mapped by position when it has exactly as many
+    paragraphs as expected (or is the translation of a single paragraph).
+
+    Args:
+        text: Translation returned by the model
+        expected: Paragraph IDs that were sent
+
+    Returns:
+        Parsed translation; units hold the first non-empty translation of each expected ID
+    """
+    expected_set = set(expected)
+    parsed = TaggedTranslation()
+    pieces = _TAG_PATTERN.split(text or "")
+    if len(pieces) == 1:
+        parsed.tagged = False
+        units = [unit.strip() for unit in _BLANK_LINES.split(text or "") if unit.strip()]
+        if len(expected) == 1 and units:
+            units = ["\n".join(units)]
+        if len(units) == len(expected):
+            parsed.units = dict(zip(expected, units))
+        parsed.missing = [idx for idx in expected if idx not in parsed.units]
+        return parsed
+
+    # pieces: [text before the first marker, id, text, id, text, ...]
+    for position in range(1, len(pieces), 2):
+        idx = int(pieces[position])
+        # A paragraph split by the model is joined back into one
+        unit = _BLANK_LINES.sub("\n", pieces[position + 1].strip())
+        if idx not in expected_set:
+            parsed.unexpected.append(idx)
+        elif idx in parsed.units:
+            parsed.duplicates.append(idx)
+        elif unit:
+            parsed.units[idx] = unit
+    parsed.missing = [idx for idx in expected if idx not in parsed.units]
+    return parsed
+
+
+def merge_tagged_translations(
+    windows: Sequence[Tuple[str, int, int]],
+    translations: Sequence[Optional[str]],
+    num_paragraphs: int
+) -> List[Optional[str]]:
+    """
+    Map tagged window translations to their source paragraphs
+
+    Like merge_translations, the first window covering a paragraph wins.
+
+    Args:
+        windows: List of (window_text, start_idx, end_idx) tuples
+        translations: Tagged translation of every window
+        num_paragraphs: Number of source paragraphs
+
+    Returns:
+        Translation per source paragraph (None where no window returned it)
+    """
+    units: List[Optional[str]] = [None] * num_paragraphs
+    for (_, start, end), translation in zip(windows, translations):
+        parsed = parse_tagged_translation(translation or "", range(start, min(end + 1, num_paragraphs)))
+        for idx, unit in parsed.units.items():
+            if units[idx] is None:
+                units[idx] = unit
+    return units
+
+
+__all__ = [
+    "TaggedTranslation",
+    "tag_paragraphs",
+    "parse_tagged_translation",
+    "merge_tagged_translations",
+    "TRANSLATION_PROTOCOLS",
+    "TAG_RETRIES",
+]
@@ -8,7 +8,7 @@ of specific parser implementations.
 
 import os
 import re
-from typing import Dict, Any, Optional, Union, Type, List
+from typing import Dict, Any, Iterator, Optional, Union, Type, List
 from pathlib import Path
 
 # Import base parser classes first
@@ -352,6 +352,49 @@ def parse_pdf_with_window(
     return _postprocess_result(result, remove_images=remove_images)
 
 
+def iter_pdf_windows(
+    source: Union[str, Path],
+    parser_type: Optional[str] = None,
+    window_size: int = 5,
+    overlap_pages: int = 1,
+    remove_images: bool = True,
+    **kwargs
+) -> Iterator[ParseResult]:
+    """
+    Parse a PDF file or URL window by window.
+
+    Unlike parse_pdf_with_window, every window is yielded as soon as it has been
+    parsed, holding only the pages not yielded before, so later stages can start
+    on the first pages while the rest of the document is still being parsed.
+
+    Args:
+        source: Path to local file or URL
+        parser_type: Type of parser to use (uses default if not specified)
+        window_size: Number of pages per window (default: 5)
+        overlap_pages: Number of overlapping pages (default: 1)
+        remove_images: Whether to remove markdown image links (default: True)
+        **kwargs: Additional parsing options
+
+    Yields:
+        ParseResult with the new pages of each window
+
+    Example:
+        for window in iter_pdf_windows("/path/to/document.pdf", window_size=10):
+            print(window.metadata.get("page_range"), len(window.full_text))
+    """
+    parser = create_parser(parser_type=parser_type, **kwargs)
+    is_url = str(source).startswith(("http://", "https://"))
+
+    for result in parser.iter_sliding_window(
+        str(source) if is_url else Path(source),
+        window_size=window_size,
+        overlap_pages=overlap_pages,
+        is_url=is_url,
+        **kwargs
+    ):
+        yield _postprocess_result(result, remove_images=remove_images)
+
+
 # Re-export key classes and functions
 __all__ = [
     "ParserFactory",
@@ -360,6 +403,7 @@ __all__ = [
     "parse_pdf_file",
     "parse_pdf_url",
     "parse_pdf_with_window",
+    "iter_pdf_windows",
     "get_default_parser_config",
     "PDFParserBase",
     "ParseResult",
@@ -6,7 +6,7 @@ Provides abstract interface and data structures for PDF text extraction.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Union
+from typing import Iterator, List, Dict, Optional, Any, Tuple, Union
 from pathlib import Path
 import json
 
@@ -61,6 +61,26 @@ class ParseResult:
         status = "SUCCESS" if self.success else "FAILED"
         return f"ParseResult(status={status}, pages={self.total_pages}, errors={len(self.errors)})"
 
+    def page_spans(self) -> List[Optional[Tuple[int, int]]]:
+        """
+        Locate every page in full_text without copying it.
+
+        Returns:
+            [start, end) offsets of each page's stripped text in full_text, in page
+            order (None for empty pages and pages not found after the previous page)
+        """
+        spans: List[Optional[Tuple[int, int]]] = []
+        cursor = 0
+        for page in self.pages:
+            content = page.text.strip()
+            start = self.full_text.find(content, cursor) if content else -1
+            if start < 0:
+                spans.append(None)
+                continue
+            cursor = start + len(content)
+            spans.append((start, cursor))
+        return spans
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert result to dictionary."""
         return {
@@ -218,6 +238,36 @@ class PDFParserBase(ABC):
             f"Use parse_file_with_window or parse_url_with_window for specific parsers."
         )
 
+    def iter_sliding_window(
+        self,
+        source: Union[str, Path],
+        window_size: int = 5,
+        overlap_pages: int = 1,
+        is_url: bool = False,
+        **kwargs
+    ) -> Iterator[ParseResult]:
+        """
+        Parse a PDF window by window, yielding each window as soon as it is parsed.
+
+        This base implementation parses the whole document and yields it as a
+        single window. Subclasses that can parse page ranges should override it
+        so consumers can start working on the first pages early.
+
+        Args:
+            source: Path to local file or URL
+            window_size: Number of pages per window
+            overlap_pages: Number of overlapping pages between windows
+            is_url: Whether source is a URL
+            **kwargs: Additional parsing options
+
+        Yields:
+            ParseResult with the pages of each window that were not yielded before
+        """
+        if is_url:
+            yield self.parse_url(str(source), **kwargs)
+        else:
+            yield self.parse_file(source, **kwargs)
+
     def parse_file_with_window(
         self,
         file_path: Union[str, Path],
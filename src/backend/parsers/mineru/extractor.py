@@ -9,7 +9,7 @@ import json
 import re
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union, Tuple
+from typing import Dict, Any, Iterator, Optional, List, Union, Tuple
 import tempfile
 
 from .client import MinerUClient
@@ -772,6 +772,129 @@ class MinerUExtractor(PDFParserBase):
             errors=all_errors
         )
 
+    def _resolve_total_pages(
+        self,
+        source: Union[str, Path],
+        is_url: bool = False,
+        force_total_pages: Optional[int] = None,
+        **kwargs
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Determine the number of pages to plan windows for.
+
+        Args:
+            source: File path or URL
+            is_url: Whether source is a URL
+            force_total_pages: Force total page count (useful for URL parsing)
+            **kwargs: Additional parsing options
+
+        Returns:
+            Tuple of (total_pages, error message or None)
+        """
+        # For URLs or when forced, use the provided total_pages
+        if force_total_pages:
+            return force_total_pages, None
+
+        # Parse the first page to get total page count
+        if kwargs.get("verbose", False):
+            logger.info("Determining total page count...")
+        first_result = self._parse_window(source, 1, 1, is_url=is_url, **kwargs)
+        if not first_result.success:
+            return 0, "Failed to parse first page to determine page count"
+        # MinerU may not provide total page count in result
+        # Use the result's total_pages or the number of pages found
+        total_pages = first_result.total_pages or len(first_result.pages)
+        if total_pages == 0:
+            return 0, "Could not determine total page count"
+        return total_pages, None
+
+    def iter_sliding_window(
+        self,
+        source: Union[str, Path],
+        window_size: int = 5,
+        overlap_pages: int = 1,
+        is_url: bool = False,
+        force_total_pages: Optional[int] = None,
+        **kwargs
+    ) -> Iterator[ParseResult]:
+        """
+        Parse a PDF window by window, yielding each window as soon as it is parsed.
+
+        Every yielded result holds only the pages not yielded by an earlier window,
+        selected with the same rule as _merge_window_results, so the texts of all
+        yielded results joined with blank lines match the merged full_text.
+        A failed window is yielded with success=False and its errors.
+
+        Args:
+            source: File path or URL
+            window_size: Number of pages per window (default: 5)
+            overlap_pages: Number of overlapping pages between windows (default: 1)
+            is_url: Whether source is a URL
+            force_total_pages: Force total page count (useful for URL parsing)
+            **kwargs: Additional parsing options passed to parse_file/parse_url
+
+        Yields:
+            ParseResult with the new pages of each window; metadata holds the window
+            number, its page range and the planned number of windows
+        """
+        total_pages, error = self._resolve_total_pages(source, is_url, force_total_pages, **kwargs)
+        if error:
+            yield ParseResult(
+                success=False,
+                file_path=source,
+                total_pages=0,
+                pages=[],
+                full_text="",
+                errors=[error]
+            )
+            return
+
+        windows = self._create_page_windows(total_pages, window_size, overlap_pages)
+        added_pages = set()
+        last_added_page = 0
+
+        for idx, (start, end) in enumerate(windows):
+            window_result = self._parse_window(source, start, end, is_url=is_url, **kwargs)
+            metadata = {
+                "extractor": "mineru",
+                "model_version": self.model_version,
+                "window": idx + 1,
+                "num_windows": len(windows),
+                "page_range": (start, end),
+                "original_total_pages": total_pages
+            }
+            if not window_result.success:
+                logger.warning(f"Window {idx + 1} failed: {window_result.errors}")
+                yield ParseResult(
+                    success=False,
+                    file_path=source,
+                    total_pages=0,
+                    pages=[],
+                    full_text="",
+                    metadata=metadata,
+                    errors=window_result.errors
+                )
+                continue
+
+            new_pages = []
+            for page in window_result.pages:
+                if idx == 0 or page.page_number > last_added_page or (
+                    page.page_number == last_added_page and page.page_number not in added_pages
+                ):
+                    new_pages.append(page)
+                    added_pages.add(page.page_number)
+                    last_added_page = max(last_added_page, page.page_number)
+
+            yield ParseResult(
+                success=True,
+                file_path=window_result.file_path,
+                total_pages=len(new_pages),
+                pages=new_pages,
+                full_text="\n\n".join(page.text for page in new_pages),
+                metadata=metadata,
+                errors=[]
+            )
+
     def parse_with_sliding_window(
         self,
         source: Union[str, Path],
@@ -826,35 +949,16 @@ class MinerUExtractor(PDFParserBase):
                    f"overlap_pages={overlap_pages}")
 
         # Step 1: Determine total number of pages
-        # For URLs or when forced, use the provided total_pages
-        if force_total_pages:
-            total_pages = force_total_pages
-        else:
-            # Parse the first page to get total page count
-            if verbose:
-                logger.info("Determining total page count...")
-            first_result = self._parse_window(source, 1, 1, is_url=is_url, **kwargs)
-            if not first_result.success:
-                return ParseResult(
-                    success=False,
-                    file_path=source,
-                    total_pages=0,
-                    pages=[],
-                    full_text="",
-                    errors=["Failed to parse first page to determine page count"]
-                )
-            # MinerU may not provide total page count in result
-            # Use the result's total_pages or the number of pages found
-            total_pages = first_result.total_pages or len(first_result.pages)
-            if total_pages == 0:
-                return ParseResult(
-                    success=False,
-                    file_path=source,
-                    total_pages=0,
-                    pages=[],
-                    full_text="",
-                    errors=["Could not determine total page count"]
-                )
+        total_pages, error = self._resolve_total_pages(source, is_url, force_total_pages, **kwargs)
+        if error:
+            return ParseResult(
+                success=False,
+                file_path=source,
+                total_pages=0,
+                pages=[],
+                full_text="",
+                errors=[error]
+            )
 
         if verbose:
             logger.info(f"Total pages: {total_pages}")
@@ -5,31 +5,94 @@ glossary generation, translation, and post-translation updates.
 """
 
 import json
+import queue
 import re
 import sys
 import datetime
-from typing import List, Dict, Optional, Any, Tuple
+import threading
+from concurrent.futures import as_completed
+from contextlib import nullcontext
+from typing import Callable, Iterator, List, Dict, Optional, Any, Tuple, Union
 from pathlib import Path
 from difflib import SequenceMatcher
 
 # Handle both package and direct imports
 try:
     from .client import SiliconFlowClient
+    from .glossary_matcher import get_glossary_matcher
+    from .tokenizer import count_tokens, get_model_token_budget
+    from .metrics import ContextThreadPoolExecutor, MetricsRegistry, run_in_own_context
+    from .run_journal import RunJournal, fingerprint_file
+    from .term_clustering import GlossaryBatchPlan, plan_glossary_batches
+    from .glossary_enforcer import GlossaryEnforcer, ENFORCEMENT_MODES, align_paragraph_segments
+    from .bilingual_aligner import (
+        BilingualAligner, ALIGNMENT_MODES, find_low_confidence_spans, render_aligned_pair,
+        is_bilingual_llm_fallback_enabled
+    )
+    from .paragraph_segmenter import Paragraph, segment_paragraphs, split_paragraphs
+    from .document import Document, plan_window_spans
+    from .translation_result import (
+        INITIAL_TRANSLATION_HEADER, TranslationResult, iter_json, iter_ndjson
+    )
+    from .batch import (
+        BATCH_GLOSSARY_FILE, BATCH_SUMMARY_FILE, collect_batch_inputs, summarize_throughput, unique_paragraphs
+    )
+    from .paragraph_tags import (
+        TRANSLATION_PROTOCOLS, TAG_RETRIES, tag_paragraphs, parse_tagged_translation, merge_tagged_translations
+    )
+    from .incremental import (
+        ParagraphMap, PARAGRAPH_MAP_SUFFIX, find_changed_runs, build_revision_context, paragraph_hash
+    )
+    from .translation_memory import (
+        TranslationMemory, TMMatch, format_tm_references,
+        is_translation_memory_enabled, get_default_translation_memory
+    )
 except ImportError:
     from backend.client import SiliconFlowClient
+    from backend.glossary_matcher import get_glossary_matcher
+    from backend.tokenizer import count_tokens, get_model_token_budget
+    from backend.metrics import ContextThreadPoolExecutor, MetricsRegistry, run_in_own_context
+    from backend.run_journal import RunJournal, fingerprint_file
+    from backend.term_clustering import GlossaryBatchPlan, plan_glossary_batches
+    from backend.glossary_enforcer import GlossaryEnforcer, ENFORCEMENT_MODES, align_paragraph_segments
+    from backend.bilingual_aligner import (
+        BilingualAligner, ALIGNMENT_MODES, find_low_confidence_spans, render_aligned_pair,
+        is_bilingual_llm_fallback_enabled
+    )
+    from backend.paragraph_segmenter import Paragraph, segment_paragraphs, split_paragraphs
+    from backend.document import Document, plan_window_spans
+    from backend.translation_result import (
+        INITIAL_TRANSLATION_HEADER, TranslationResult, iter_json, iter_ndjson
+    )
+    from backend.batch import (
+        BATCH_GLOSSARY_FILE, BATCH_SUMMARY_FILE, collect_batch_inputs, summarize_throughput, unique_paragraphs
+    )
+    from backend.paragraph_tags import (
+        TRANSLATION_PROTOCOLS, TAG_RETRIES, tag_paragraphs, parse_tagged_translation, merge_tagged_translations
+    )
+    from backend.incremental import (
+        ParagraphMap, PARAGRAPH_MAP_SUFFIX, find_changed_runs, build_revision_context, paragraph_hash
+    )
+    from backend.translation_memory import (
+        TranslationMemory, TMMatch, format_tm_references,
+        is_translation_memory_enabled, get_default_translation_memory
+    )
 
 # Import parser interface
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 try:
-    from parser_interface import parse_pdf
+    from parser_interface import parse_pdf, iter_pdf_windows
 except ImportError:
     try:
-        from backend.parser_interface import parse_pdf
+        from backend.parser_interface import parse_pdf, iter_pdf_windows
     except ImportError:
         # Try to import from parent directory
         sys.path.insert(0, str(backend_dir.parent))
-        from backend.parser_interface import parse_pdf
+        from backend.parser_interface import parse_pdf, iter_pdf_windows
+
+# Paragraphs shared by consecutive translation windows
+TRANSLATION_OVERLAP_PARAGRAPHS = 5
 
 # Try to import pandas/pyarrow for parquet support
 try:
@@ -147,61 +210,18 @@ def split_into_paragraphs(text: str) -> List[str]:
     """
     Split text into paragraphs
 
+    Lines split from their content by PDF extraction ("Description:", "Hazard: ...",
+    "AC 18; ...") are joined and markdown headings start a new paragraph. The same text
+    is split several times per run (windows, merging, alignment), so results for
+    recently split texts are reused.
+
     Args:
         text: Text to split
 
     Returns:
         List of paragraphs
     """
-    # Special handling for TRPG/PF2e formatting:
-    # Merge lines that were artificially split (like "Description:" alone on a line)
-
-    # Split by double newlines first to get potential paragraph groups
-    para_groups = re.split(r'\n\n+', text)
-
-    paragraphs = []
-    for group in para_groups:
-        lines = group.strip().split('\n')
-        if not lines:
-            continue
-
-        merged_lines = []
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-
-            # Patterns that should be merged with next line
-            should_merge = False
-
-            # Pattern: Single word followed by colon (e.g., "Description:", "Disable:")
-            if re.match(r'^[A-Za-z]+\s*:$', line) or re.match(r'^[A-Za-z]+\s+\(.*?\)\s*$', line):
-                should_merge = True
-            # Pattern: Hazard description line
-            elif re.match(r'^[Hh]azard:', line):
-                should_merge = True
-            # Pattern: AC stats line sometimes split
-            elif re.match(r'^AC\s+\d+;', line):
-                should_merge = True
-
-            if should_merge and next_line:
-                merged_lines.append(line + " " + next_line)
-                i += 2
-            else:
-                merged_lines.append(line)
-                i += 1
-
-        # Join merged lines with single newlines
-        para = "\n".join(merged_lines)
-
-        # Split markdown headers from their content if needed
-        para_parts = re.split(r'(?=^#{1,6}\s)', para, flags=re.MULTILINE)
-        for part in para_parts:
-            part = part.strip()
-            if part:
-                paragraphs.append(part)
-
-    return paragraphs
+    return split_paragraphs(text)
 
 
 def create_sliding_windows(
@@ -210,7 +230,8 @@ def create_sliding_windows(
     window_size: Optional[int] = None,
     overlap_ratio: Optional[float] = None,
     window_char_limit: int = 8000,
-    overlap_paragraphs: int = 5
+    overlap_paragraphs: int = 5,
+    window_token_limit: Optional[int] = None
 ) -> List[Tuple[str, int, int]]:
     """
     Create sliding windows from text based on strategy
@@ -222,9 +243,11 @@ def create_sliding_windows(
         overlap_ratio: Overlap ratio (0-1) (DEPRECATED, use overlap_paragraphs)
         window_char_limit: Maximum character limit per window (default: 8000)
         overlap_paragraphs: Number of paragraphs to overlap between windows (default: 5)
+        window_token_limit: Maximum tokens per window; when given, windows are sized with the
+                            configured token counter instead of window_char_limit
 
     Returns:
-        List of tuples (window_text, start_idx, end_idx)
+        List of tuples (window_text, start_idx, end_idx), end_idx inclusive
     """
     if strategy == "paragraph":
         units = split_into_paragraphs(text)
@@ -236,64 +259,57 @@ def create_sliding_windows(
     if not units:
         return []
 
-    windows = []
-
-    # New logic: Character-limit based windowing with paragraph overlap
-    i = 0
-    while i < len(units):
-        # Collect units until we reach character limit
-        window_units = []
-        total_chars = 0
-
-        for j in range(i, len(units)):
-            unit = units[j]
-            unit_len = len(unit)
-
-            # Estimate separator length
-            separator_len = 2 if strategy == "paragraph" else 1
-            if window_units:
-                total_chars += separator_len
-
-            if total_chars + unit_len > window_char_limit and window_units:
-                # Don't add this unit if it would exceed limit (and we already have at least one)
-                break
-
-            window_units.append(unit)
-            total_chars += unit_len
-
-        if not window_units:
-            # At least include the current unit even if it exceeds limit
-            window_units = [units[i]]
-            j = i
-
-        # Join window units
-        if strategy == "paragraph":
-            window_text = "\n\n".join(window_units)
-        else:
-            window_text = " ".join(window_units)
-
-        end_idx = j
-        windows.append((window_text, i, end_idx))
-
-        # Check if we've reached the end of the document
-        if end_idx == len(units) - 1:
-            # This window contains the last unit, no need to create more windows
-            break
-
-        # Move to next window with overlap
-        # Step forward by (window_size - overlap_paragraphs) paragraphs
-        window_len = len(window_units)
-        step_size = window_len - overlap_paragraphs
-        if step_size <= 1:
-            step_size = 1  # Always move forward at least 1 unit
+    # Size every unit once, in tokens or characters
+    if window_token_limit is not None:
+        unit_sizes = [count_tokens(unit) for unit in units]
+        separator_len = 1
+        window_limit = window_token_limit
+    else:
+        unit_sizes = [len(unit) for unit in units]
+        separator_len = 2 if strategy == "paragraph" else 1
+        window_limit = window_char_limit
+
+    # Size-limit based windowing with paragraph overlap
+    separator = "\n\n" if strategy == "paragraph" else " "
+    return [
+        (separator.join(units[start:end + 1]), start, end)
+        for start, end in plan_window_spans(unit_sizes, window_limit, separator_len, overlap_paragraphs)
+    ]
+
+
+def plan_next_window(
+    unit_sizes: List[int],
+    start: int,
+    window_limit: int,
+    complete: bool,
+    separator_len: int = 1
+) -> Optional[int]:
+    """
+    Find the end of the window starting at start the way create_sliding_windows does
 
-        i += step_size
+    For units that arrive incrementally: a window is only final once the unit that
+    would overflow it is known, or once all units have arrived.
 
-        # Stop if we've covered all units
-        if i >= len(units):
-            break
+    Args:
+        unit_sizes: Size of every unit known so far (tokens or characters)
+        start: First unit of the window
+        window_limit: Maximum window size
+        complete: Whether all units have arrived
+        separator_len: Size added between units
 
-    return windows
+    Returns:
+        Index of the window's last unit (inclusive), or None if more units are needed
+    """
+    total = 0
+    for j in range(start, len(unit_sizes)):
+        if j > start:
+            total += separator_len
+        if total + unit_sizes[j] > window_limit and j > start:
+            return j - 1
+        total += unit_sizes[j]
+    if complete and start < len(unit_sizes):
+        return len(unit_sizes) - 1
+    return None
 
 
 def split_text_by_strategy(
@@ -323,17 +339,7 @@ def split_text_by_strategy(
     Returns:
         List of text chunks
     """
-    if strategy == "paragraph":
-        units = split_into_paragraphs(text)
-    elif strategy == "sentence":
-        units = split_into_sentences(text)
-    else:
-        raise ValueError(f"Unknown strategy: {strategy}")
-
-    if not units:
-        return []
-
-    # Use new sliding window logic by default
+    # create_sliding_windows splits the text and validates the strategy
     windows = create_sliding_windows(
         text,
         strategy,
@@ -343,6 +349,117 @@ def split_text_by_strategy(
     return [window_text for window_text, _, _ in windows]
 
 
+def get_noun_extraction_workers(client: SiliconFlowClient, default: Optional[int] = None) -> int:
+    """
+    Get the number of chunks sent for proper noun extraction in parallel
+
+    Args:
+        client: Client whose endpoints bound the default
+        default: Worker count used when NOUN_EXTRACTION_CONCURRENCY is not set
+                 (default: the summed concurrency caps of the client's endpoints)
+
+    Returns:
+        Worker count (at least 1)
+    """
+    import os
+    return max(1, int(os.getenv("NOUN_EXTRACTION_CONCURRENCY", "0")) or default or client.router.total_concurrency)
+
+
+def extract_proper_nouns_concurrently(
+    client: SiliconFlowClient,
+    model: str,
+    chunks: List[str],
+    context: Optional[str] = None,
+    max_workers: int = 1,
+    stream_print: bool = False,
+    processed: Optional[Dict[str, List[str]]] = None,
+    min_chunk_chars: int = 100
+) -> List[str]:
+    """
+    Extract proper nouns from text chunks on a thread pool
+
+    Chunks are identified by the hash of their whitespace-normalized text. A chunk is
+    skipped when its hash was already processed in this run (processed) or in an earlier
+    run (the client's response cache); the nouns found there are reused. Results are
+    merged as the requests complete.
+
+    Args:
+        client: Client used for the extraction requests
+        model: Model identifier
+        chunks: Text chunks from split_text_by_strategy
+        context: Additional context about the document
+        max_workers: Maximum number of chunks extracted in parallel (default: 1)
+        stream_print: If True, stream and print LLM output (only with a single worker)
+        processed: Chunk hash to nouns of chunks already extracted, updated in place
+        min_chunk_chars: Chunks shorter than this are skipped (default: 100)
+
+    Returns:
+        Sorted list of unique proper nouns
+    """
+    processed = {} if processed is None else processed
+    cache = client.cache
+    all_nouns = set()
+    pending: Dict[str, Tuple[int, str, Optional[str]]] = {}
+    skipped = 0
+
+    for i, chunk in enumerate(chunks):
+        if len(chunk) < min_chunk_chars:
+            continue
+        chunk_hash = paragraph_hash(chunk)
+        if chunk_hash in pending:
+            skipped += 1
+            continue
+        nouns = processed.get(chunk_hash)
+        cache_key = None
+        if nouns is None and cache is not None:
+            cache_key = cache.make_key(stage="proper_nouns", model=model, chunk=chunk_hash, context=context)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                nouns = processed[chunk_hash] = cached["proper_nouns"]
+        if nouns is not None:
+            all_nouns.update(nouns)
+            skipped += 1
+            continue
+        pending[chunk_hash] = (i, chunk, cache_key)
+
+    def extract(chunk_hash: str, chunk_stream_print: bool) -> List[str]:
+        i, chunk, _ = pending[chunk_hash]
+        return client.extract_proper_nouns(
+            model,
+            chunk,
+            context or f"Chunk {i + 1} of {len(chunks)}",
+            chunk_stream_print
+        )
+
+    def record(chunk_hash: str, nouns: List[str]) -> None:
+        processed[chunk_hash] = nouns
+        all_nouns.update(nouns)
+        cache_key = pending[chunk_hash][2]
+        if cache_key is not None:
+            cache.put(cache_key, {"proper_nouns": nouns})
+
+    max_workers = max(1, min(max_workers, len(pending) or 1))
+    if max_workers == 1:
+        for chunk_hash in pending:
+            record(chunk_hash, extract(chunk_hash, stream_print))
+    else:
+        executor = ContextThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {executor.submit(extract, chunk_hash, False): chunk_hash for chunk_hash in pending}
+            for completed, future in enumerate(as_completed(futures), 1):
+                record(futures[future], future.result())
+                if stream_print:
+                    print(f"  ✓ Chunk {completed}/{len(pending)} extracted ({len(all_nouns)} proper nouns so far)")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if stream_print and skipped:
+        print(f"  ↺ Skipped {skipped} already processed chunks")
+
+    # Remove empty strings and duplicates
+    return list(filter(None, sorted(all_nouns)))
+
+
 def merge_translations(
     windows: List[Tuple[str, int, int]],
     translations: List[str],
@@ -371,30 +488,33 @@ def merge_translations(
     if not windows:
         return ""
 
+    # Windows without overlap (overlap sent as context only) are simply concatenated
+    if overlap_paragraphs == 0:
+        separator = "\n\n" if strategy == "paragraph" else " "
+        return separator.join(translation.strip() for translation in translations if translation and translation.strip())
+
     units = []
 
     # Parse each translation to get its units
+    previous_end = -1
     for idx, (window_text, start, end) in enumerate(windows):
         if strategy == "paragraph":
             window_units = split_into_paragraphs(translations[idx])
         else:
             window_units = split_into_sentences(translations[idx])
 
+        # Units shared with the previous window are skipped. Windows overlap by at most
+        # overlap_paragraphs, and by less when a large paragraph fills a window on its own;
+        # the last unit of a window is always new
+        window_overlap = 0
+        if idx > 0:
+            window_overlap = max(0, min(overlap_paragraphs, previous_end - start + 1, len(window_units) - 1))
+        previous_end = end
+
         # For each unit in this window, decide whether to include it
         for unit_idx, unit in enumerate(window_units):
             absolute_idx = start + unit_idx
-
-            # Skip units in overlap region (except for last window)
-            is_overlap = unit_idx < overlap_paragraphs and idx > 0
-
-            # For last window, only include non-overlapping units if there are enough units
-            # to avoid duplication at the end
-            is_last_window = idx == len(windows) - 1
-
-            # Calculate actual overlap for this window
-            actual_overlap = min(overlap_paragraphs, len(window_units))
-
-            if not is_overlap or (is_last_window and unit_idx >= actual_overlap):
+            if unit_idx >= window_overlap:
                 while len(units) <= absolute_idx:
                     units.append(None)
                 if units[absolute_idx] is None:
@@ -410,6 +530,39 @@ def merge_translations(
         return " ".join(units)
 
 
+def map_translated_paragraphs(
+    windows: List[Tuple[str, int, int]],
+    translations: List[str],
+    num_paragraphs: int,
+    overlap_paragraphs: int = 5
+) -> List[Optional[str]]:
+    """
+    Attribute translated paragraphs to their source paragraphs
+
+    Only windows whose translation has exactly as many paragraphs as the source
+    window are used; like merge_translations, the first window covering a
+    paragraph wins.
+
+    Args:
+        windows: List of (window_text, start_idx, end_idx) tuples
+        translations: List of translated texts
+        num_paragraphs: Number of source paragraphs
+        overlap_paragraphs: Number of paragraphs overlapping between windows
+
+    Returns:
+        Translation per source paragraph (None where it cannot be attributed)
+    """
+    mapped: List[Optional[str]] = [None] * num_paragraphs
+    for (_, start, end), translation in zip(windows, translations):
+        units = split_into_paragraphs(translation or "")
+        if len(units) != end - start + 1:
+            continue
+        for offset, unit in enumerate(units):
+            if start + offset < num_paragraphs and mapped[start + offset] is None:
+                mapped[start + offset] = unit
+    return mapped
+
+
 class TranslationPipeline:
     """Pipeline for translating TRPG documents"""
 
@@ -418,7 +571,8 @@ class TranslationPipeline:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         model: Optional[str] = None,
-        glossary_file: Optional[str] = None
+        glossary_file: Optional[str] = None,
+        client: Optional[SiliconFlowClient] = None
     ):
         """
         Initialize translation pipeline
@@ -428,11 +582,16 @@ class TranslationPipeline:
             base_url: Base URL (reads from SILICONFLOW_BASE_URL env var if not provided)
             model: Model identifier (reads from SILICONFLOW_MODEL env var if not provided)
             glossary_file: Path to glossary parquet file (default: doc/glossary/default.parquet)
+            client: Existing SiliconFlowClient to share its connection pool (creates a new one if not provided)
         """
         import os
         self.model = model or os.getenv("SILICONFLOW_MODEL", "Pro/moonshotai/Kimi-K2.5")
-        self.client = SiliconFlowClient(api_key, base_url)
+        self.client = client or SiliconFlowClient(api_key, base_url)
         self.glossary_file = glossary_file or "doc/glossary/default.parquet"
+        # Chunk hash to proper nouns of chunks already extracted by this pipeline
+        self._processed_noun_chunks: Dict[str, List[str]] = {}
+        # Batch plan of the last generate_glossary_from_nouns call
+        self.last_glossary_plan: Optional[GlossaryBatchPlan] = None
 
     def load_glossary(self, file_path: Optional[str] = None) -> Dict[str, str]:
         """
@@ -513,7 +672,8 @@ class TranslationPipeline:
         overlap_ratio: Optional[float] = None,
         window_char_limit: int = 8000,
         overlap_paragraphs: int = 2,
-        stream_print: bool = False
+        stream_print: bool = False,
+        max_workers: Optional[int] = None
     ) -> List[str]:
         """
         Extract proper nouns from document text using paragraph/sentence-based splitting
@@ -527,6 +687,8 @@ class TranslationPipeline:
             window_char_limit: Maximum character limit per chunk (default: 8000)
             overlap_paragraphs: Number of paragraphs to overlap between chunks (default: 2)
             stream_print: If True, stream and print LLM output in real-time
+            max_workers: Maximum number of chunks extracted in parallel
+                        (reads from NOUN_EXTRACTION_CONCURRENCY env var if not provided)
 
         Returns:
             List of extracted proper nouns
@@ -534,22 +696,15 @@ class TranslationPipeline:
         # Use unified splitting function with new parameters
         chunks = split_text_by_strategy(text, strategy, window_char_limit=window_char_limit, overlap_paragraphs=overlap_paragraphs)
 
-        all_nouns = set()
-
-        for i, chunk in enumerate(chunks):
-            if len(chunk) < 100:  # Skip very small chunks
-                continue
-
-            nouns = self.client.extract_proper_nouns(
-                self.model,
-                chunk,
-                context or f"Chunk {i + 1} of {len(chunks)}",
-                stream_print
-            )
-            all_nouns.update(nouns)
-
-        # Remove empty strings and duplicates
-        return list(filter(None, sorted(set(all_nouns))))
+        return extract_proper_nouns_concurrently(
+            self.client,
+            self.model,
+            chunks,
+            context,
+            max_workers or get_noun_extraction_workers(self.client),
+            stream_print,
+            self._processed_noun_chunks
+        )
 
     def generate_glossary_from_nouns(
         self,
@@ -569,6 +724,8 @@ class TranslationPipeline:
         4. When 100+ terms are queued, translate them in a batch
         5. Repeat until all terms are translated
 
+        The batch plan (see plan_glossary_batches) is kept in self.last_glossary_plan.
+
         Args:
             proper_nouns: List of proper nouns
             target_language: Target language for translations
@@ -597,61 +754,24 @@ class TranslationPipeline:
 
         full_glossary = {**existing_glossary}
         batch_size = 100
-        queue = []
-        already_queued = set()
+
+        # Group similar terms into batches (indexed, no pairwise comparison of all terms)
+        plan = plan_glossary_batches(new_nouns, batch_size=batch_size)
+        self.last_glossary_plan = plan
 
         if stream_print:
             print(f"Starting batch translation with {len(new_nouns)} terms (batch size: {batch_size})")
+            print(f"Planned {len(plan.batches)} batches, "
+                  f"{sum(1 for group in plan.groups if len(group) > 1)} groups of similar terms ({plan.metric})")
 
-        while new_nouns:
-            # Take the first term from alphabetically sorted list
-            term = new_nouns.pop(0)
-
-            if term in already_queued:
-                continue
-
-            # Add current term to queue
-            queue.append(term)
-            already_queued.add(term)
-
-            # Find and add similar terms for consistency
-            similar_terms = find_similar_terms(term, new_nouns, already_queued)
-            for similar_term in similar_terms:
-                queue.append(similar_term)
-                already_queued.add(similar_term)
-                # Also remove from new_nouns to avoid re-adding
-                if similar_term in new_nouns:
-                    new_nouns.remove(similar_term)
-
-            # If queue reaches batch size, translate
-            if len(queue) >= batch_size:
-                if stream_print:
-                    print(f"\nTranslating batch of {len(queue)} terms...")
-
-                batch_glossary = self.client.generate_glossary(
-                    self.model,
-                    queue,
-                    target_language,
-                    context,
-                    stream_print,
-                    existing_glossary=full_glossary  # Pass existing glossary for partial word matching
-                )
-
-                full_glossary.update(batch_glossary)
-
-                if stream_print and batch_glossary:
-                    print(f"  ✓ Translated {len(batch_glossary)} terms")
-
-                queue.clear()
-
-        # Translate remaining terms in queue
-        if queue:
+        for batch_idx, batch in enumerate(plan.batches):
             if stream_print:
-                print(f"\nTranslating final batch of {len(queue)} terms...")
+                label = "final batch" if batch_idx == len(plan.batches) - 1 else "batch"
+                print(f"\nTranslating {label} of {len(batch)} terms...")
 
             batch_glossary = self.client.generate_glossary(
                 self.model,
-                queue,
+                batch,
                 target_language,
                 context,
                 stream_print,
@@ -811,13 +931,16 @@ class TranslationPipeline:
         Returns:
             Translated text
         """
-        windows = create_sliding_windows(text, window_strategy, window_char_limit=8000, overlap_paragraphs=5)
+        windows = create_sliding_windows(
+            text, window_strategy, overlap_paragraphs=5,
+            window_token_limit=get_model_token_budget(self.model).window_tokens
+        )
         result["num_windows"] = len(windows)
 
         translations = []
 
         for idx, (window_text, start, end) in enumerate(windows):
-            print(f"  Translating window {idx + 1}/{len(windows)} (units {start + 1}-{end})...")
+            print(f"  Translating window {idx + 1}/{len(windows)} (units {start + 1}-{end + 1})...")
             translation = self.client.translate_text(
                 self.model,
                 window_text,
@@ -852,6 +975,8 @@ class TranslationPipeline:
             File path if saved, or content as string
         """
         if output_type == "json":
+            if isinstance(result, TranslationResult):
+                result = result.to_dict()
             content = json.dumps(result, ensure_ascii=False, indent=2)
         elif output_type == "markdown":
             content = self._format_as_markdown(result)
@@ -1082,19 +1207,8 @@ class TranslationPipeline:
         Returns:
             处理后的文本
         """
-        import re
-
-        # 按长度降序排序，确保长词优先匹配
-        sorted_terms = sorted(glossary.keys(), key=len, reverse=True)
-
-        result_text = text
-        for term in sorted_terms:
-            translation = glossary[term]
-            # 使用单词边界匹配，避免部分匹配
-            pattern = r'\b' + re.escape(term) + r'\b'
-            result_text = re.sub(pattern, translation, result_text, flags=re.IGNORECASE)
-
-        return result_text
+        # 单次扫描，长词优先匹配，使用单词边界避免部分匹配（不区分大小写）
+        return get_glossary_matcher(glossary).replace(text, glossary)
 
     def _create_simple_bilingual(self, original_text: str, translated_text: str) -> str:
         """
@@ -1125,7 +1239,16 @@ class UnifiedTranslationPipeline:
         base_url: Optional[str] = None,
         model: Optional[str] = None,
         glossary_file: Optional[str] = None,
-        parser_type: Optional[str] = "mineru"
+        parser_type: Optional[str] = "mineru",
+        max_concurrency: Optional[int] = None,
+        client: Optional[SiliconFlowClient] = None,
+        glossary_mode: Optional[str] = None,
+        translation_memory: Optional[TranslationMemory] = None,
+        use_translation_memory: Optional[bool] = None,
+        overlap_mode: Optional[str] = None,
+        glossary_enforcement: Optional[str] = None,
+        bilingual_alignment: Optional[str] = None,
+        translation_protocol: Optional[str] = None
     ):
         """
         Initialize unified translation pipeline
@@ -1136,12 +1259,87 @@ class UnifiedTranslationPipeline:
             model: Model identifier (reads from SILICONFLOW_MODEL env var if not provided)
             glossary_file: Path to glossary parquet file (default: doc/glossary/default.parquet)
             parser_type: PDF parser type (default: "mineru")
+            max_concurrency: Maximum number of windows translated in parallel
+                            (reads from TRANSLATION_MAX_CONCURRENCY env var if not provided,
+                            default: the summed concurrency caps of the client's endpoints)
+            client: Existing SiliconFlowClient to share its connection pool (creates a new one if not provided)
+            glossary_mode: "full" sends the whole glossary with every window, "detected" only the terms
+                           found in the window (reads from TRANSLATION_GLOSSARY_MODE env var if not provided, default: "full")
+            translation_memory: Translation memory to use (uses the shared on-disk memory if not provided)
+            use_translation_memory: Set to False to neither reuse nor store paragraphs
+                                    (reads from TM_ENABLED env var if not provided)
+            overlap_mode: "context" sends the paragraphs overlapping the previous window as read-only
+                          context, "translate" translates them again and discards the duplicates when
+                          merging (reads from TRANSLATION_OVERLAP_MODE env var if not provided, default: "translate")
+            glossary_enforcement: "local" fixes glossary terms in the translation deterministically and
+                                  post-edits only unresolved paragraphs with the LLM, "llm" post-edits the
+                                  whole translation (reads from GLOSSARY_ENFORCEMENT env var if not provided,
+                                  default: "local")
+            bilingual_alignment: "local" aligns bilingual output by paragraph lengths and anchors and
+                                 asks the LLM only for low-confidence spans, "llm" aligns every window
+                                 with the LLM (reads from BILINGUAL_ALIGNMENT env var if not provided,
+                                 default: "local")
+            translation_protocol: "tagged" prefixes every source paragraph with an ID marker the model
+                                  echoes back, so translations are merged and paired by ID and only
+                                  missing paragraphs are re-requested; "plain" merges by position
+                                  (reads from TRANSLATION_PROTOCOL env var if not provided, default: "plain")
         """
         import os
         self.model = model or os.getenv("SILICONFLOW_MODEL", "Pro/moonshotai/Kimi-K2.5")
-        self.client = SiliconFlowClient(api_key, base_url)
+        self.client = client or SiliconFlowClient(api_key, base_url)
         self.glossary_file = glossary_file or "doc/glossary/default.parquet"
         self.parser_type = parser_type or os.getenv("PDF_PARSER_TYPE", "mineru")
+        self.max_concurrency = max(1, max_concurrency or int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "0"))
+                                   or self.client.router.total_concurrency)
+        self.glossary_mode = glossary_mode or os.getenv("TRANSLATION_GLOSSARY_MODE", "full")
+        if use_translation_memory is None:
+            use_translation_memory = is_translation_memory_enabled()
+        self.translation_memory: Optional[TranslationMemory] = (
+            (translation_memory if translation_memory is not None else get_default_translation_memory())
+            if use_translation_memory else None
+        )
+        self.overlap_mode = (overlap_mode or os.getenv("TRANSLATION_OVERLAP_MODE", "translate")).strip().lower()
+        if self.overlap_mode not in ("context", "translate"):
+            raise ValueError(f"Unknown overlap mode: {self.overlap_mode} (expected 'context' or 'translate')")
+        self.glossary_enforcement = (glossary_enforcement or os.getenv("GLOSSARY_ENFORCEMENT", "local")).strip().lower()
+        if self.glossary_enforcement not in ENFORCEMENT_MODES:
+            raise ValueError(f"Unknown glossary enforcement: {self.glossary_enforcement} "
+                             f"(expected {' or '.join(repr(mode) for mode in ENFORCEMENT_MODES)})")
+        self.bilingual_alignment = (bilingual_alignment or os.getenv("BILINGUAL_ALIGNMENT", "local")).strip().lower()
+        if self.bilingual_alignment not in ALIGNMENT_MODES:
+            raise ValueError(f"Unknown bilingual alignment: {self.bilingual_alignment} "
+                             f"(expected {' or '.join(repr(mode) for mode in ALIGNMENT_MODES)})")
+        self.translation_protocol = (translation_protocol or os.getenv("TRANSLATION_PROTOCOL", "plain")).strip().lower()
+        if self.translation_protocol not in TRANSLATION_PROTOCOLS:
+            raise ValueError(f"Unknown translation protocol: {self.translation_protocol} "
+                             f"(expected {' or '.join(repr(mode) for mode in TRANSLATION_PROTOCOLS)})")
+        # Chunk hash to proper nouns of chunks already extracted by this pipeline
+        self._processed_noun_chunks: Dict[str, List[str]] = {}
+        # Batch plan of the last generate_glossary_from_nouns call
+        self.last_glossary_plan: Optional[GlossaryBatchPlan] = None
+        # Limit on LLM requests in flight across all documents (set by translate_batch)
+        self.request_limiter: Optional[threading.Semaphore] = None
+
+    def _request_slot(self):
+        """Context manager held around every per-document LLM request (a shared limit in batch mode)"""
+        return self.request_limiter or nullcontext()
+
+    def _post_edit_translation(
+        self,
+        translation: str,
+        glossary: Dict[str, str],
+        context: Optional[str],
+        stream_print: bool
+    ) -> str:
+        """Ask the LLM to update a translation for glossary consistency, within the request limit"""
+        with self._request_slot():
+            return self.client.update_translation_with_glossary(
+                self.model,
+                translation,
+                glossary,
+                context,
+                stream_print
+            )
 
     def parse_pdf(
         self,
@@ -1160,7 +1358,9 @@ class UnifiedTranslationPipeline:
             **parse_kwargs: Additional parsing options
 
         Returns:
-            Dictionary with parse results including full_text and pages
+            Dictionary with parse results including full_text and pages; pages are
+            [start, end) spans into the parsed text (raw_text, present only when
+            formatting was optimized, otherwise full_text)
         """
         try:
             parse_result = parse_pdf(
@@ -1177,18 +1377,11 @@ class UnifiedTranslationPipeline:
                 "success": parse_result.success,
                 "file_path": str(parse_result.file_path),
                 "total_pages": parse_result.total_pages,
-                "pages": [
-                    {
-                        "page_number": p.page_number,
-                        "text": p.text
-                    }
-                    for p in parse_result.pages
-                ],
+                "pages": self._page_spans(parse_result),
                 "metadata": parse_result.metadata
             }
 
             raw_text = parse_result.full_text
-            result["raw_text"] = raw_text
 
             # Optimize formatting if requested
             if optimize_formatting:
@@ -1199,6 +1392,7 @@ class UnifiedTranslationPipeline:
                     context=f"PDF document: {Path(pdf_path).name}",
                     stream_print=True
                 )
+                result["raw_text"] = raw_text
                 result["full_text"] = optimized_text
                 result["formatting_optimized"] = True
             else:
@@ -1209,6 +1403,55 @@ class UnifiedTranslationPipeline:
         except Exception as e:
             raise Exception(f"Failed to parse PDF: {e}")
 
+    @staticmethod
+    def _page_spans(parse_result: Any, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Describe the pages of a parse result as spans into its full text
+
+        Args:
+            parse_result: ParseResult from the parser
+            offset: Position of the parse result's full text in the document text
+
+        Returns:
+            One dictionary per page with page_number, start and end (the page text
+            itself for pages not found in the full text)
+        """
+        pages = []
+        for page, span in zip(parse_result.pages, parse_result.page_spans()):
+            if span is None:
+                pages.append({"page_number": page.page_number, "text": page.text})
+            else:
+                pages.append({"page_number": page.page_number, "start": span[0] + offset, "end": span[1] + offset})
+        return pages
+
+    def iter_pdf_windows(
+        self,
+        pdf_path: str,
+        window_pages: int = 10,
+        remove_images: bool = True,
+        **parse_kwargs
+    ) -> Iterator[Any]:
+        """
+        Parse PDF file window by window
+
+        Args:
+            pdf_path: Path to PDF file
+            window_pages: Number of pages per parser window
+            remove_images: Whether to remove markdown image links
+            **parse_kwargs: Additional parsing options
+
+        Returns:
+            Iterator of ParseResult objects holding the new pages of each window
+        """
+        return iter_pdf_windows(
+            pdf_path,
+            parser_type=self.parser_type,
+            window_size=window_pages,
+            overlap_pages=1,
+            remove_images=remove_images,
+            **parse_kwargs
+        )
+
     def _detect_glossary_terms_in_text(
         self,
         text: str,
@@ -1224,17 +1467,168 @@ class UnifiedTranslationPipeline:
         Returns:
             List of glossary terms found in the text
         """
-        found_terms = []
-        text_lower = text.lower()
+        # Case-insensitive whole-word matching in one pass over the text
+        return get_glossary_matcher(glossary).detect(text)
+
+    @staticmethod
+    def _export_original_text(text: str, path: Path, output_files: Dict[str, str]) -> None:
+        """Write the parsed source text"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        output_files["original_text"] = str(path)
+        print(f"  → Saved original text: {path.name}")
+
+    @staticmethod
+    def _export_proper_nouns(proper_nouns: List[str], path: Path, output_files: Dict[str, str]) -> None:
+        """Write the extracted proper nouns as a numbered list"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Extracted Proper Nouns\n")
+            f.write("=" * 50 + "\n\n")
+            for i, noun in enumerate(proper_nouns, 1):
+                f.write(f"{i:4d}. {noun}\n")
+        output_files["proper_nouns"] = str(path)
+        print(f"  → Saved proper nouns: {path.name}")
+
+    @staticmethod
+    def _export_glossary(glossary: Dict[str, str], path: Path, output_files: Dict[str, str]) -> None:
+        """Write the glossary as an aligned text listing"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("译名表 (Glossary)\n")
+            f.write("=" * 50 + "\n\n")
+            for orig, trans in sorted(glossary.items()):
+                f.write(f"{orig:40s} → {trans}\n")
+        output_files["glossary"] = str(path)
+        print(f"  → Saved glossary: {path.name}")
+
+    def _record_glossary_plan(self, result: Dict[str, Any]) -> None:
+        """
+        Add the batch plan of the last glossary generation to the result
+
+        Args:
+            result: Result dictionary, extended in place under "glossary_batch_plan"
+        """
+        if self.last_glossary_plan is None:
+            return
+        plan = self.last_glossary_plan.to_dict()
+        recorded = result.get("glossary_batch_plan")
+        if recorded is None:
+            result["glossary_batch_plan"] = plan
+            return
+        # Pipelined runs generate the glossary per parsed window: append the batches
+        for key in ("batches", "similar_groups"):
+            recorded[key].extend(plan[key])
+        for key in ("num_terms", "num_batches", "comparisons"):
+            recorded[key] += plan[key]
+
+    @staticmethod
+    def _run_journaled(
+        journal: Optional[RunJournal],
+        record_type: str,
+        key_parts: Callable[[], Tuple],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Run a pipeline stage unless the journal already holds its result
+
+        Args:
+            journal: Run journal (None runs the stage without journaling)
+            record_type: Stage name in the journal
+            key_parts: Returns the stage inputs the journal key is derived from
+            compute: Runs the stage
+
+        Returns:
+            Restored or freshly computed stage result
+        """
+        if journal is None:
+            return compute()
+        key = RunJournal.make_key(*key_parts())
+        value = journal.get(record_type, key)
+        if value is not None:
+            print(f"  ↺ Restored {record_type} from journal")
+            return value
+        value = compute()
+        journal.put(record_type, key, value)
+        return value
+
+    def _lookup_translation_memory(
+        self,
+        paragraphs: List[str],
+        reused: Optional[List[Optional[str]]],
+        variant: str,
+        result: Dict[str, Any],
+        glossary: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[List[Optional[str]]], Dict[int, List[TMMatch]]]:
+        """
+        Look up the paragraphs still to translate in the translation memory
+
+        Args:
+            paragraphs: Source paragraphs
+            reused: Translations already known from a previous run (None if none)
+            variant: Translation memory variant of this run
+            result: Result dictionary; hit counts are stored in result["translation_memory"]
+            glossary: Glossary known before translating; exact hits must agree with it
+
+        Returns:
+            Tuple of (known translation per paragraph, None where unknown,
+            near-duplicate matches per paragraph index)
+        """
+        pending = [idx for idx in range(len(paragraphs)) if reused is None or reused[idx] is None]
+        exact = self.translation_memory.lookup_exact([paragraphs[idx] for idx in pending], variant, glossary)
+
+        merged = list(reused) if reused is not None else [None] * len(paragraphs)
+        references: Dict[int, List[TMMatch]] = {}
+        for idx, translation in zip(pending, exact):
+            if translation is not None:
+                merged[idx] = translation
+            else:
+                matches = self.translation_memory.lookup_fuzzy(paragraphs[idx], variant)
+                if matches:
+                    references[idx] = matches
+
+        exact_hits = sum(translation is not None for translation in exact)
+        result["translation_memory"] = {
+            "paragraphs": len(pending),
+            "exact_hits": exact_hits,
+            "fuzzy_hits": len(references),
+            "exact_hit_rate": exact_hits / len(pending) if pending else 0.0,
+            "hit_rate": (exact_hits + len(references)) / len(pending) if pending else 0.0,
+            "stored": 0
+        }
+        print(f"✓ Translation memory: {exact_hits} exact and {len(references)} fuzzy hits "
+              f"in {len(pending)} paragraphs")
+        return merged, references
 
-        for term in glossary.keys():
-            # Use word boundary matching to avoid partial matches
-            pattern = r'\b' + re.escape(term) + r'\b'
-            if re.search(pattern, text_lower):
-                found_terms.append(term)
+    @staticmethod
+    def _context_with_references(
+        context: Optional[str],
+        references: Optional[Dict[int, List[TMMatch]]],
+        start: int,
+        end: int,
+        max_references: int = 8
+    ) -> Optional[str]:
+        """
+        Append translation memory references for paragraphs start..end (inclusive) to the context
 
-        return found_terms
+        Args:
+            context: Translation context
+            references: Near-duplicate matches per paragraph index
+            start: First paragraph
+            end: Last paragraph (inclusive)
+            max_references: Maximum number of references added
 
+        Returns:
+            Context with a reference block, or the unchanged context if there are no references
+        """
+        matches = [
+            match
+            for idx in range(start, end + 1)
+            for match in (references or {}).get(idx, [])[:1]
+        ][:max_references]
+        if not matches:
+            return context
+        return "\n\n".join(part for part in (context, format_tm_references(matches)) if part)
+
+    @run_in_own_context
     def translate_document_with_pdf(
         self,
         pdf_path: str,
@@ -1249,11 +1643,23 @@ class UnifiedTranslationPipeline:
         use_hyperlink_format: bool = True,
         output_dir: Optional[str] = None,
         optimize_formatting: bool = False,
-        export_bilingual: bool = False
-    ) -> Dict[str, Any]:
+        export_bilingual: bool = False,
+        max_concurrency: Optional[int] = None,
+        resume: bool = False,
+        previous_run: Optional[str] = None,
+        pipelined: Optional[bool] = None,
+        parse_result: Optional[Dict[str, Any]] = None
+    ) -> TranslationResult:
         """
         Parse PDF and translate its content with unified pipeline
 
+        With output_dir, every completed stage and window is appended to
+        {pdf_filename}_journal.jsonl; resume=True reuses them instead of starting over.
+        The paragraph map {pdf_filename}_paragraphs.json lets a later run on a revised
+        PDF (previous_run) translate only new or edited paragraphs. Paragraphs found in the
+        translation memory are reused as well, near-duplicates are shown to the model as
+        references, and every attributed paragraph is stored for later books.
+
         Args:
             pdf_path: Path to PDF file
             source_language: Source language
@@ -1268,9 +1674,19 @@ class UnifiedTranslationPipeline:
             output_dir: If provided, will export all translation results to this directory
             optimize_formatting: Whether to use LLM to optimize PDF text formatting (default: False)
             export_bilingual: Whether to export bilingual output (default: False)
+            max_concurrency: Maximum number of windows translated in parallel (default: self.max_concurrency)
+            resume: If True, continue from the journal in output_dir, skipping completed
+                    stages and windows (default: False)
+            previous_run: Paragraph map (or output directory) of a run on an earlier
+                          revision of the PDF; unchanged paragraphs reuse its translations
+            pipelined: If True, run parsing, noun extraction, glossary generation and translation
+                       as overlapping stages, starting on the first pages while the rest is parsed
+                       (reads from TRANSLATION_PIPELINED env var if not provided, default: False)
+            parse_result: Result of parse_pdf for this PDF; Step 1 is skipped and the stages
+                          run sequentially (used by translate_batch)
 
         Returns:
-            Dictionary with translation results and metadata including:
+            TranslationResult, readable like a dictionary with translation results and metadata including:
             - parse_result: PDF parsing results
             - proper_nouns: Extracted proper nouns
             - glossary: Translation glossary
@@ -1303,114 +1719,246 @@ class UnifiedTranslationPipeline:
             "translation_errors": []
         }
 
-        # Step 1: Parse PDF
-        print(f"Step 1: Parsing PDF: {pdf_path}")
-        parse_result = self.parse_pdf(pdf_path, optimize_formatting=optimize_formatting)
-        result["parse_result"] = parse_result
-        result["total_pages"] = parse_result["total_pages"]
-        text = parse_result["full_text"]
-
-        if optimize_formatting and parse_result.get("formatting_optimized"):
-            print(f"✓ Parsed and formatted {len(text)} characters from {parse_result['total_pages']} pages")
-        else:
-            print(f"✓ Parsed {len(text)} characters from {parse_result['total_pages']} pages")
+        # Wall-clock time per step and the requests of this run only; the client's
+        # registry forwards every request it records in this context
+        metrics = MetricsRegistry(document=Path(pdf_path).name)
+        metrics.activate()
+        step_clock = metrics.step_clock()
 
-        # Export: Original text from PDF
+        # Journal of completed stages and windows (needs output_dir)
+        journal = None
         if output_dir and output_path:
-            orig_text_path = output_path / f"{pdf_filename}_original.txt"
-            with open(orig_text_path, "w", encoding="utf-8") as f:
-                f.write(text)
-            output_files["original_text"] = str(orig_text_path)
-            print(f"  → Saved original text: {orig_text_path.name}")
+            journal = RunJournal(output_path / f"{pdf_filename}_journal.jsonl", resume=resume)
+            output_files["journal"] = str(journal.path)
+            if resume:
+                print(f"Resuming from journal: {len(journal)} completed records")
+        elif resume:
+            print("Warning: resume requires output_dir, starting a new run")
 
-        glossary = existing_glossary or {}
+        import os
+        max_concurrency = max(1, max_concurrency or self.max_concurrency)
+        if parse_result is not None:
+            pipelined = False
+        if pipelined is None:
+            pipelined = os.getenv("TRANSLATION_PIPELINED", "0").strip().lower() in ("1", "true", "yes", "on")
+        if pipelined and (previous_run or optimize_formatting):
+            print("Warning: previous_run and optimize_formatting need the whole document, running stages sequentially")
+            pipelined = False
+
+        if pipelined:
+            # Steps 1-4 as overlapping stages: parse -> proper nouns/glossary -> translate;
+            # Steps 5-6 below run on the merged translation as in the sequential path
+            step_clock.step("pipeline")
+            print(f"Steps 1-4: Parsing, extracting proper nouns, generating glossary and translating "
+                  f"as overlapping stages (max {max_concurrency} concurrent requests)...")
+            tm_variant = TranslationMemory.make_variant(
+                source_language, target_language, use_hyperlink_format, self.model
+            )
+            document, proper_nouns, glossary, translated = self._translate_pipelined(
+                pdf_path,
+                source_language,
+                target_language,
+                context,
+                auto_extract_nouns,
+                existing_glossary,
+                use_hyperlink_format,
+                result,
+                max_concurrency=max_concurrency,
+                journal=journal,
+                tm_variant=tm_variant if self.translation_memory is not None else None
+            )
+            text, paragraphs = document.text, document.paragraphs
+            reused = None
+            post_edit = bool(glossary) and not use_hyperlink_format
+            parse_result = result["parse_result"]
+            result["total_pages"] = parse_result["total_pages"]
+            if auto_extract_nouns:
+                result["proper_nouns"] = proper_nouns
+            if glossary:
+                result["glossary"] = glossary
+            print(f"✓ Parsed {len(text)} characters from {parse_result['total_pages']} pages, "
+                  f"found {len(proper_nouns)} proper nouns, {len(glossary)} glossary entries")
 
-        # Step 2: Extract proper nouns if enabled
-        if auto_extract_nouns:
-            print(f"\nStep 2: Extracting proper nouns...")
-            proper_nouns = self.extract_proper_nouns_from_file(
-                text,
-                context=context,
-                strategy="paragraph",
-                window_char_limit=8000,
-                overlap_paragraphs=2,
-                stream_print=stream_print
+            if output_dir and output_path:
+                self._export_original_text(text, output_path / f"{pdf_filename}_original.txt", output_files)
+                if proper_nouns:
+                    self._export_proper_nouns(proper_nouns, output_path / f"{pdf_filename}_proper_nouns.txt", output_files)
+                if glossary:
+                    self._export_glossary(glossary, output_path / f"{pdf_filename}_glossary.txt", output_files)
+        else:
+            # Step 1: Parse PDF
+            step_clock.step("parse")
+            if parse_result is None:
+                print(f"Step 1: Parsing PDF: {pdf_path}")
+                parse_result = self._run_journaled(
+                    journal, "parse",
+                    lambda: (fingerprint_file(pdf_path), self.parser_type, optimize_formatting),
+                    lambda: self.parse_pdf(pdf_path, optimize_formatting=optimize_formatting)
+                )
+            else:
+                print(f"Step 1: Using parsed PDF: {pdf_path}")
+            result["parse_result"] = parse_result
+            result["total_pages"] = parse_result["total_pages"]
+            # Every later stage works on this document: its paragraphs are segmented once
+            document = Document.from_parse_result(parse_result)
+            text = document.text
+
+            if optimize_formatting and parse_result.get("formatting_optimized"):
+                print(f"✓ Parsed and formatted {len(text)} characters from {parse_result['total_pages']} pages")
+            else:
+                print(f"✓ Parsed {len(text)} characters from {parse_result['total_pages']} pages")
+
+            # Export: Original text from PDF
+            if output_dir and output_path:
+                self._export_original_text(text, output_path / f"{pdf_filename}_original.txt", output_files)
+
+            glossary = existing_glossary or {}
+
+            # Incremental mode: find paragraphs already translated in the previous run
+            paragraphs = document.paragraphs
+            reused = None
+            if previous_run:
+                paragraph_map = ParagraphMap.load(previous_run)
+                mismatched = paragraph_map.mismatched_settings(
+                    model=self.model, source_language=source_language,
+                    target_language=target_language, use_hyperlink_format=use_hyperlink_format
+                )
+                if mismatched:
+                    print(f"Warning: previous run used different {', '.join(mismatched)}, translating everything")
+                else:
+                    reused = paragraph_map.lookup(paragraphs)
+                    changed = sum(translation is None for translation in reused)
+                    result["reused_paragraphs"] = len(paragraphs) - changed
+                    print(f"✓ {len(paragraphs) - changed}/{len(paragraphs)} paragraphs unchanged since the "
+                          f"previous run, {changed} new or edited")
+
+            # Translation memory: exact hits skip the LLM, near-duplicates become prompt references
+            tm_references: Dict[int, List[TMMatch]] = {}
+            tm_exact: Optional[List[Optional[str]]] = None
+            tm_variant = TranslationMemory.make_variant(
+                source_language, target_language, use_hyperlink_format, self.model
             )
-            result["proper_nouns"] = proper_nouns
-            print(f"✓ Found {len(proper_nouns)} proper nouns")
+            if self.translation_memory is not None:
+                known, tm_references = self._lookup_translation_memory(
+                    paragraphs, reused, tm_variant, result, existing_glossary
+                )
+                if reused is not None:
+                    # Incremental mode only translates the paragraphs still unknown
+                    reused = known
+                elif any(translation is not None for translation in known):
+                    # Exact hits are filled into the sliding-window translation of the other paragraphs
+                    tm_exact = known
+
+            # Only paragraphs that still need translation are searched for new proper nouns
+            noun_text = text
+            known = reused if reused is not None else tm_exact
+            if known is not None:
+                noun_text = "\n\n".join(
+                    paragraph for paragraph, translation in zip(paragraphs, known) if translation is None
+                )
 
-            # Export: Extracted proper nouns
-            if output_dir and output_path and proper_nouns:
-                nouns_path = output_path / f"{pdf_filename}_proper_nouns.txt"
-                with open(nouns_path, "w", encoding="utf-8") as f:
-                    f.write("Extracted Proper Nouns\n")
-                    f.write("=" * 50 + "\n\n")
-                    for i, noun in enumerate(proper_nouns, 1):
-                        f.write(f"{i:4d}. {noun}\n")
-                output_files["proper_nouns"] = str(nouns_path)
-                print(f"  → Saved proper nouns: {nouns_path.name}")
-
-            # Step 3: Generate glossary (only for new terms not in existing glossary)
-            if proper_nouns:
-                print(f"\nStep 3: Generating glossary...")
-                glossary = self.generate_glossary_from_nouns(
-                    proper_nouns,
+            # Step 2: Extract proper nouns if enabled
+            if auto_extract_nouns:
+                step_clock.step("noun_extraction")
+                print(f"\nStep 2: Extracting proper nouns...")
+                proper_nouns = self._run_journaled(
+                    journal, "proper_nouns",
+                    lambda: (noun_text, context, self.model),
+                    lambda: self.extract_proper_nouns_from_file(
+                        noun_text,
+                        context=context,
+                        strategy="paragraph",
+                        window_char_limit=8000,
+                        overlap_paragraphs=2,
+                        stream_print=stream_print
+                    )
+                )
+                result["proper_nouns"] = proper_nouns
+                print(f"✓ Found {len(proper_nouns)} proper nouns")
+
+                # Export: Extracted proper nouns
+                if output_dir and output_path and proper_nouns:
+                    self._export_proper_nouns(proper_nouns, output_path / f"{pdf_filename}_proper_nouns.txt", output_files)
+
+                # Step 3: Generate glossary (only for new terms not in existing glossary)
+                if proper_nouns:
+                    step_clock.step("glossary")
+                    print(f"\nStep 3: Generating glossary...")
+                    self.last_glossary_plan = None
+                    glossary = self._run_journaled(
+                        journal, "glossary",
+                        lambda: (proper_nouns, existing_glossary, target_language, context, self.model),
+                        lambda: self.generate_glossary_from_nouns(
+                            proper_nouns,
+                            target_language,
+                            context,
+                            stream_print,
+                            save_glossary=False  # Don't save automatically when using existing glossary
+                        )
+                    )
+                    self._record_glossary_plan(result)
+
+                    # Merge with existing glossary if provided
+                    if existing_glossary:
+                        # Only add new terms to existing glossary
+                        for term, translation in glossary.items():
+                            if term not in existing_glossary:
+                                existing_glossary[term] = translation
+                        glossary = existing_glossary
+                        print(f"✓ Merged with existing glossary: {len(glossary)} total entries ({len(proper_nouns)} new terms extracted)")
+                    else:
+                        print(f"✓ Generated {len(glossary)} glossary entries")
+
+                    result["glossary"] = glossary
+
+                    # Export: Glossary
+                    if output_dir and output_path and glossary:
+                        self._export_glossary(glossary, output_path / f"{pdf_filename}_glossary.txt", output_files)
+            elif existing_glossary:
+                result["glossary"] = existing_glossary
+                print(f"\nUsing existing glossary with {len(existing_glossary)} entries")
+
+                # Export: Existing glossary
+                if output_dir and output_path:
+                    self._export_glossary(existing_glossary, output_path / f"{pdf_filename}_glossary.txt", output_files)
+
+            # Step 4: Translate text with sliding window and glossary detection
+            post_edit = bool(glossary) and not use_hyperlink_format
+            step_clock.step("translate")
+            if reused is not None:
+                print(f"\nStep 4: Translating paragraphs without a stored translation "
+                      f"(max {max_concurrency} concurrent requests)...")
+                translated = self._translate_changed_paragraphs(
+                    paragraphs,
+                    reused,
+                    source_language,
+                    target_language,
+                    glossary,
+                    context,
+                    use_hyperlink_format,
+                    result,
+                    max_concurrency=max_concurrency,
+                    post_edit=post_edit,
+                    references=tm_references
+                )
+            else:
+                print(f"\nStep 4: Translating with {get_model_token_budget(self.model).window_tokens}-token sliding windows, "
+                      f"{TRANSLATION_OVERLAP_PARAGRAPHS}-paragraph overlap ({self.overlap_mode} mode) "
+                      f"(max {max_concurrency} concurrent requests)...")
+                translated = self._translate_with_sliding_window_and_glossary(
+                    document,
+                    source_language,
                     target_language,
+                    glossary,
                     context,
                     stream_print,
-                    save_glossary=False  # Don't save automatically when using existing glossary
+                    use_hyperlink_format,
+                    result,
+                    max_concurrency=max_concurrency,
+                    journal=journal,
+                    references=tm_references,
+                    memory_hits=tm_exact
                 )
-
-                # Merge with existing glossary if provided
-                if existing_glossary:
-                    # Only add new terms to existing glossary
-                    for term, translation in glossary.items():
-                        if term not in existing_glossary:
-                            existing_glossary[term] = translation
-                    glossary = existing_glossary
-                    print(f"✓ Merged with existing glossary: {len(glossary)} total entries ({len(proper_nouns)} new terms extracted)")
-                else:
-                    print(f"✓ Generated {len(glossary)} glossary entries")
-
-                result["glossary"] = glossary
-
-                # Export: Glossary
-                if output_dir and output_path and glossary:
-                    glossary_path = output_path / f"{pdf_filename}_glossary.txt"
-                    with open(glossary_path, "w", encoding="utf-8") as f:
-                        f.write("译名表 (Glossary)\n")
-                        f.write("=" * 50 + "\n\n")
-                        for orig, trans in sorted(glossary.items()):
-                            f.write(f"{orig:40s} → {trans}\n")
-                    output_files["glossary"] = str(glossary_path)
-                    print(f"  → Saved glossary: {glossary_path.name}")
-        elif existing_glossary:
-            result["glossary"] = existing_glossary
-            print(f"\nUsing existing glossary with {len(existing_glossary)} entries")
-
-            # Export: Existing glossary
-            if output_dir and output_path:
-                glossary_path = output_path / f"{pdf_filename}_glossary.txt"
-                with open(glossary_path, "w", encoding="utf-8") as f:
-                    f.write("译名表 (Glossary)\n")
-                    f.write("=" * 50 + "\n\n")
-                    for orig, trans in sorted(existing_glossary.items()):
-                        f.write(f"{orig:40s} → {trans}\n")
-                output_files["glossary"] = str(glossary_path)
-                print(f"  → Saved glossary: {glossary_path.name}")
-
-        # Step 4: Translate text with sliding window and glossary detection
-        print(f"\nStep 4: Translating with 8000-character sliding windows, 5-paragraph overlap...")
-        translated = self._translate_with_sliding_window_and_glossary(
-            text,
-            source_language,
-            target_language,
-            glossary,
-            context,
-            stream_print,
-            use_hyperlink_format,
-            result
-        )
         result["translated_text"] = translated
         print(f"✓ Translation completed")
 
@@ -1418,7 +1966,7 @@ class UnifiedTranslationPipeline:
         if output_dir and output_path:
             initial_trans_path = output_path / f"{pdf_filename}_translation_initial.md"
             with open(initial_trans_path, "w", encoding="utf-8") as f:
-                f.write("# Initial Translation (Before Post-Processing)\n\n")
+                f.write(INITIAL_TRANSLATION_HEADER)
                 f.write(translated)
             output_files["initial_translation"] = str(initial_trans_path)
             print(f"  → Saved initial translation: {initial_trans_path.name}")
@@ -1437,23 +1985,82 @@ class UnifiedTranslationPipeline:
             print(f"  → Saved detected terms: {detected_path.name}")
 
         # Step 5: Update translation with glossary for consistency
-        if glossary and not use_hyperlink_format:
+        # (in incremental mode the new paragraphs were already updated in Step 4)
+        if post_edit and reused is None and self.glossary_enforcement == "local":
+            step_clock.step("post_edit")
+            print(f"\nStep 5: Enforcing glossary terms in the translation...")
+            enforcer = GlossaryEnforcer(glossary)
+            result["updated_translation"] = self._run_journaled(
+                journal, "post_edit",
+                lambda: (translated, glossary, context, self.model, "local"),
+                lambda: self._enforce_glossary(
+                    paragraphs,
+                    translated,
+                    enforcer,
+                    context,
+                    max_concurrency=max_concurrency,
+                    paragraph_translations=result.get("paragraph_translations")
+                )
+            )
+            result["glossary_enforcement"] = enforcer.to_dict()
+            print(f"✓ Translation updated ({enforcer.stats['untranslated_fixed'] + enforcer.stats['variants_fixed']} "
+                  f"terms fixed locally, {enforcer.stats['llm_paragraphs']} paragraphs post-edited)")
+        elif post_edit and reused is None:
+            step_clock.step("post_edit")
             print(f"\nStep 5: Updating translation for glossary consistency...")
-            result["updated_translation"] = self.client.update_translation_with_glossary(
-                self.model,
-                translated,
-                glossary,
-                context,
-                stream_print
+            result["updated_translation"] = self._run_journaled(
+                journal, "post_edit",
+                lambda: (translated, glossary, context, self.model),
+                lambda: self._post_edit_translation(translated, glossary, context, stream_print)
             )
             print(f"✓ Translation updated")
         else:
             result["updated_translation"] = translated
 
         # Step 6: Post-process translation - fix markdown hyperlinks
+        step_clock.step("postprocess")
         print(f"\nStep 6: Post-processing translation - fixing markdown hyperlinks...")
         result["updated_translation"] = self.fix_markdown_hyperlink_spaces(result["updated_translation"])
         print(f"✓ Markdown hyperlinks fixed")
+        step_clock.stop()
+
+        # Final translation per source paragraph, for incremental runs on later revisions
+        paragraph_translations = result.pop("paragraph_translations", None)
+        final_units = split_into_paragraphs(result["updated_translation"])
+        if len(final_units) == len(paragraphs):
+            document.attach_translations(final_units)
+        elif paragraph_translations is not None:
+            # Paragraph count changed in post-editing: store the paragraphs attributed in Step 4
+            document.attach_translations([
+                self.fix_markdown_hyperlink_spaces(unit) if unit else None
+                for unit in paragraph_translations
+            ])
+        paragraph_translations = document.translations
+        if self.translation_protocol == "tagged" and len(final_units) == len(paragraphs):
+            # Exact translation per source paragraph: the bilingual export pairs them by ID
+            result["paragraph_translations"] = paragraph_translations
+        if self.translation_memory is not None and paragraph_translations is not None:
+            result["translation_memory"]["stored"] = self.translation_memory.add(
+                paragraphs, paragraph_translations, tm_variant, model=self.model, glossary=glossary
+            )
+        result["metrics"] = metrics.to_dict()
+
+        response_cache = getattr(self.client, "cache", None)
+        if response_cache is not None:
+            result["llm_cache"] = response_cache.stats()
+        continuation_stats = getattr(self.client, "continuation_stats", None)
+        if continuation_stats:
+            result["continuations"] = {stage: dict(stats) for stage, stats in continuation_stats.items()}
+        router = getattr(self.client, "router", None)
+        if router is not None and len(router) > 1:
+            result["endpoints"] = router.stats()
+        if journal is not None:
+            result["journal_restored"] = journal.restored
+
+        # Keep every text once: source and paragraph translations in the document,
+        # the initial translation on disk if it was exported
+        result = TranslationResult.from_run(result, document, output_files)
+        translated = None
 
         # Export: Final translation results
         if output_dir and output_path:
@@ -1474,8 +2081,24 @@ class UnifiedTranslationPipeline:
                 output_files["bilingual"] = str(bilingual_path)
                 print(f"  → Saved bilingual: {bilingual_path.name}")
 
+            # Export request metrics
+            metrics_path = output_path / f"{pdf_filename}_metrics.json"
+            metrics.dump_json(metrics_path)
+            output_files["metrics"] = str(metrics_path)
+
+            # Export paragraph map for incremental retranslation
+            if paragraph_translations is not None:
+                paragraph_map_path = output_path / f"{pdf_filename}{PARAGRAPH_MAP_SUFFIX}"
+                ParagraphMap.from_paragraphs(
+                    paragraphs, paragraph_translations,
+                    model=self.model, source_language=source_language,
+                    target_language=target_language, use_hyperlink_format=use_hyperlink_format
+                ).save(paragraph_map_path)
+                output_files["paragraph_map"] = str(paragraph_map_path)
+
             print(f"  → Saved final markdown: {md_path.name}")
             print(f"  → Saved JSON: {json_path.name}")
+            print(f"  → Saved metrics: {metrics_path.name}")
 
             # Display results summary
             print()
@@ -1489,6 +2112,31 @@ class UnifiedTranslationPipeline:
             print(f"Glossary Entries: {len(glossary)}")
             print(f"Translation Windows: {result.get('num_windows', 'N/A')}")
             print(f"Detected Terms in Text: {len(detected_terms)}")
+            if "llm_cache" in result:
+                cache_stats = result["llm_cache"]
+                print(f"LLM Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+            for stage, stats in result.get("continuations", {}).items():
+                if stats["truncated"]:
+                    print(f"Truncated Responses ({stage}): {stats['truncated']} continued, "
+                          f"{stats['unresolved']} still truncated")
+            if resume and journal is not None:
+                print(f"Restored from Journal: {journal.restored} stages/windows")
+            if "reused_paragraphs" in result:
+                print(f"Reused Paragraphs: {result['reused_paragraphs']}/{len(paragraphs)}")
+            if "translation_memory" in result:
+                tm_stats = result["translation_memory"]
+                print(f"Translation Memory: {tm_stats['exact_hits']} exact / {tm_stats['fuzzy_hits']} fuzzy hits "
+                      f"in {tm_stats['paragraphs']} paragraphs ({tm_stats['hit_rate']:.1%} hit rate)")
+            for name, stats in result.get("endpoints", {}).items():
+                status = "healthy" if stats["healthy"] else "ejected"
+                print(f"Endpoint {name}: {stats['requests']} requests, {stats['failures']} failures ({status})")
+            for stage, stats in result["metrics"]["stages"].items():
+                latency = stats["latency_seconds"]
+                if latency["count"]:
+                    ttft = stats["ttft_seconds"]
+                    ttft_text = f", TTFT p50 {ttft['p50']:.2f}s" if ttft["count"] else ""
+                    print(f"Requests ({stage}): {stats['requests']} ({stats['cached']} cached), "
+                          f"latency p50 {latency['p50']:.2f}s / p90 {latency['p90']:.2f}s{ttft_text}")
             print()
 
             # Display summary of generated files
@@ -1535,7 +2183,11 @@ class UnifiedTranslationPipeline:
         stream_print: bool = False,
         use_hyperlink_format: bool = True,
         optimize_formatting: bool = False,
-        export_bilingual: bool = False
+        export_bilingual: bool = False,
+        max_concurrency: Optional[int] = None,
+        resume: bool = False,
+        previous_run: Optional[str] = None,
+        pipelined: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Complete pipeline: Parse PDF, extract terms, translate, and export all output files.
@@ -1557,6 +2209,11 @@ class UnifiedTranslationPipeline:
             use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
             optimize_formatting: Whether to use LLM to optimize PDF text formatting (default: False)
             export_bilingual: Whether to export bilingual output (default: False)
+            max_concurrency: Maximum number of windows translated in parallel (default: self.max_concurrency)
+            resume: If True, continue an interrupted run from the journal in output_dir
+            previous_run: Paragraph map (or output directory) of a run on an earlier revision
+                          of the PDF; only new or edited paragraphs are translated
+            pipelined: If True, overlap parsing, noun extraction, glossary generation and translation
 
         Returns:
             Dictionary containing translation results and output file paths:
@@ -1578,75 +2235,1206 @@ class UnifiedTranslationPipeline:
             use_hyperlink_format=use_hyperlink_format,
             optimize_formatting=optimize_formatting,
             export_bilingual=export_bilingual,
-            output_dir=output_dir
+            output_dir=output_dir,
+            max_concurrency=max_concurrency,
+            resume=resume,
+            previous_run=previous_run,
+            pipelined=pipelined
         )
 
         return result
 
+    def translate_batch(
+        self,
+        source: str,
+        output_dir: str,
+        source_language: str = "English",
+        target_language: str = "中文",
+        context: Optional[str] = None,
+        auto_extract_nouns: bool = True,
+        existing_glossary: Optional[Dict[str, str]] = None,
+        use_hyperlink_format: bool = True,
+        export_bilingual: bool = False,
+        max_concurrency: Optional[int] = None,
+        parse_workers: Optional[int] = None,
+        active_books: Optional[int] = None,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Translate every PDF of a directory or manifest with one shared glossary
+
+        1. All PDFs are parsed concurrently.
+        2. Proper nouns are extracted once from the paragraphs of all books, with repeated
+           paragraphs removed, and one glossary is generated for the whole batch.
+        3. Up to active_books books are translated at the same time; the translation,
+           post-edit and alignment requests of all of them share a single limit of
+           max_concurrency requests in flight.
+
+        Every book is exported to its own subdirectory of output_dir; the shared glossary
+        and the per-book and aggregate throughput are written to output_dir.
+
+        Args:
+            source: Directory with PDF files or manifest file (see backend.batch)
+            output_dir: Directory for the batch output
+            source_language: Source language
+            target_language: Target language
+            context: Context shared by all books (a manifest entry's context overrides it for translation)
+            auto_extract_nouns: Whether to extract proper nouns and generate the shared glossary
+            existing_glossary: Existing glossary; its entries take precedence over generated ones
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            export_bilingual: Whether to export bilingual output for every book
+            max_concurrency: Maximum number of LLM requests in flight across all books
+                             (default: self.max_concurrency)
+            parse_workers: Number of PDFs parsed concurrently
+                           (reads from BATCH_PARSE_WORKERS env var if not provided, default: 4)
+            active_books: Number of books translated at the same time
+                          (reads from BATCH_ACTIVE_BOOKS env var if not provided, default: max_concurrency)
+            resume: If True, reuse parse results, proper nouns and glossary from the batch journal and
+                    continue every book from its own journal
+
+        Returns:
+            Dictionary with the shared glossary, deduplication statistics, throughput
+            (per book and aggregate) and output file paths
+        """
+        import os
+        import time
+        items = collect_batch_inputs(source)
+        max_concurrency = max(1, max_concurrency or self.max_concurrency)
+        parse_workers = max(1, parse_workers or int(os.getenv("BATCH_PARSE_WORKERS", "4")))
+        active_books = max(1, active_books or int(os.getenv("BATCH_ACTIVE_BOOKS", "0")) or max_concurrency)
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        output_files: Dict[str, str] = {}
+        journal = RunJournal(output_path / "batch_journal.jsonl", resume=resume)
+        output_files["journal"] = str(journal.path)
+
+        print("=" * 80)
+        print("TRPG PDF Batch Translation")
+        print("=" * 80)
+        print(f"Books: {len(items)} from {source}")
+        print(f"Output Directory: {output_dir}")
+        print()
+
+        batch_start = time.perf_counter()
+        stage_seconds: Dict[str, float] = {}
+        summary: Dict[str, Any] = {
+            "source": str(source),
+            "source_language": source_language,
+            "target_language": target_language,
+            "model": self.model
+        }
+        books: List[Dict[str, Any]] = [
+            {"name": item.name, "pdf_path": item.pdf_path, "status": "pending", "pages": 0, "paragraphs": 0,
+             "characters": 0, "windows": 0, "parse_seconds": 0.0, "translate_seconds": 0.0}
+            for item in items
+        ]
+
+        # Step 1: Parse all PDFs concurrently
+        print(f"Step 1: Parsing {len(items)} PDFs ({min(parse_workers, len(items))} concurrently)...")
+        stage_start = time.perf_counter()
+        parse_results: Dict[int, Dict[str, Any]] = {}
+        documents: Dict[int, Document] = {}
+
+        def parse(idx: int) -> Tuple[Dict[str, Any], float]:
+            pdf_path = items[idx].pdf_path
+            start = time.perf_counter()
+            parse_result = self._run_journaled(
+                journal, "parse",
+                lambda: (fingerprint_file(pdf_path), self.parser_type, False),
+                lambda: self.parse_pdf(pdf_path)
+            )
+            return parse_result, time.perf_counter() - start
+
+        with ContextThreadPoolExecutor(max_workers=min(parse_workers, len(items))) as executor:
+            futures = {executor.submit(parse, idx): idx for idx in range(len(items))}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    parse_result, seconds = future.result()
+                except Exception as e:
+                    books[idx].update(status="failed", error=str(e))
+                    print(f"Warning: skipping {items[idx].name}: {e}")
+                    continue
+                parse_results[idx] = parse_result
+                documents[idx] = Document.from_parse_result(parse_result)
+                books[idx].update(
+                    pages=parse_result["total_pages"], paragraphs=documents[idx].num_paragraphs,
+                    characters=len(documents[idx]), parse_seconds=round(seconds, 3)
+                )
+                print(f"  ✓ Parsed {items[idx].name}: {parse_result['total_pages']} pages, "
+                      f"{documents[idx].num_paragraphs} paragraphs ({seconds:.1f}s)")
+        stage_seconds["parse"] = time.perf_counter() - stage_start
+
+        # Steps 2-3: Proper nouns of all books without repeated paragraphs, one shared glossary
+        stage_start = time.perf_counter()
+        glossary: Dict[str, str] = dict(existing_glossary or {})
+        proper_nouns: List[str] = []
+        unique, total = unique_paragraphs([documents[idx].paragraphs for idx in sorted(documents)])
+        summary["paragraphs"] = {"total": total, "unique": len(unique)}
+        if auto_extract_nouns and unique:
+            print(f"\nStep 2: Extracting proper nouns from {len(unique)}/{total} unique paragraphs "
+                  f"of {len(documents)} books...")
+            noun_text = "\n\n".join(unique)
+            proper_nouns = self._run_journaled(
+                journal, "proper_nouns",
+                lambda: (noun_text, context, self.model),
+                lambda: self.extract_proper_nouns_from_file(
+                    noun_text,
+                    context=context,
+                    strategy="paragraph",
+                    window_char_limit=8000,
+                    overlap_paragraphs=2
+                )
+            )
+            del noun_text
+            print(f"✓ Found {len(proper_nouns)} proper nouns")
+
+            missing = [noun for noun in proper_nouns if noun not in glossary]
+            if missing:
+                print(f"\nStep 3: Generating the shared glossary for {len(missing)} new terms...")
+                self.last_glossary_plan = None
+                entries = self._run_journaled(
+                    journal, "glossary",
+                    lambda: (missing, existing_glossary, target_language, context, self.model),
+                    lambda: self.generate_glossary_from_nouns(
+                        missing, target_language, context, False, save_glossary=False
+                    )
+                )
+                self._record_glossary_plan(summary)
+                for term, translation in entries.items():
+                    glossary.setdefault(term, translation)
+                print(f"✓ Shared glossary: {len(glossary)} entries")
+        del unique
+        summary["proper_nouns"] = proper_nouns
+        summary["glossary"] = glossary
+        if glossary:
+            self._export_glossary(glossary, output_path / BATCH_GLOSSARY_FILE, output_files)
+        stage_seconds["glossary"] = time.perf_counter() - stage_start
+
+        # Step 4: Translate the books; their windows share one limit on requests in flight
+        print(f"\nStep 4: Translating {len(parse_results)} books ({min(active_books, len(parse_results) or 1)} at a time, "
+              f"max {max_concurrency} concurrent requests across all books)...")
+        stage_start = time.perf_counter()
+
+        def translate_book(idx: int) -> Tuple[Dict[str, Any], float]:
+            item = items[idx]
+            start = time.perf_counter()
+            result = self.translate_document_with_pdf(
+                item.pdf_path,
+                source_language,
+                target_language,
+                context=item.context or context,
+                auto_extract_nouns=False,
+                existing_glossary=dict(glossary),
+                use_hyperlink_format=use_hyperlink_format,
+                output_dir=str(output_path / item.name),
+                export_bilingual=export_bilingual,
+                max_concurrency=max_concurrency,
+                resume=resume,
+                parse_result=parse_results[idx]
+            )
+            return result, time.perf_counter() - start
+
+        self.request_limiter = threading.BoundedSemaphore(max_concurrency)
+        try:
+            if parse_results:
+                with ContextThreadPoolExecutor(max_workers=min(active_books, len(parse_results))) as executor:
+                    futures = {executor.submit(translate_book, idx): idx for idx in sorted(parse_results)}
+                    for future in as_completed(futures):
+                        idx = futures[future]
+                        # The book's text is no longer needed once it is translated
+                        parse_results.pop(idx, None)
+                        documents.pop(idx, None)
+                        try:
+                            result, seconds = future.result()
+                        except Exception as e:
+                            books[idx].update(status="failed", error=str(e))
+                            print(f"Warning: translation of {items[idx].name} failed: {e}")
+                            continue
+                        books[idx].update(
+                            status="translated", windows=result.get("num_windows", 0),
+                            translate_seconds=round(seconds, 3),
+                            output_dir=str(output_path / items[idx].name)
+                        )
+                        if result.get("translation_errors"):
+                            books[idx]["translation_errors"] = len(result["translation_errors"])
+                        print(f"  ✓ Book {items[idx].name} translated ({seconds:.1f}s)")
+        finally:
+            self.request_limiter = None
+        stage_seconds["translate"] = time.perf_counter() - stage_start
+
+        summary["throughput"] = summarize_throughput(books, time.perf_counter() - batch_start, stage_seconds)
+        summary_path = output_path / BATCH_SUMMARY_FILE
+        output_files["summary"] = str(summary_path)
+        summary["output_files"] = output_files
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        print()
+        print("-" * 80)
+        print("Batch Throughput")
+        print("-" * 80)
+        for book in summary["throughput"]["books"]:
+            print(f"  {book['name'][:32]:32s} {book['status']:10s} {book['pages']:5d} pages "
+                  f"{book['characters']:9d} chars {book['translate_seconds']:8.1f}s "
+                  f"{book['characters_per_second']:8.1f} chars/s")
+        aggregate = summary["throughput"]["aggregate"]
+        print(f"  Total: {aggregate['translated']}/{aggregate['books']} books, {aggregate['characters']} chars "
+              f"in {aggregate['wall_seconds']:.1f}s ({aggregate['characters_per_second']:.1f} chars/s, "
+              f"{aggregate['books_in_parallel']:.1f} books in parallel)")
+        print(f"  → Saved batch summary: {summary_path.name}")
+        print("=" * 80)
+        return summary
+
     def _translate_with_sliding_window_and_glossary(
         self,
-        text: str,
+        text: Union[str, Document],
         source_language: str,
         target_language: str,
         glossary: Optional[Dict[str, str]],
         context: Optional[str],
         stream_print: bool,
         use_hyperlink_format: bool,
-        result: Dict[str, Any]
+        result: Dict[str, Any],
+        max_concurrency: int = 1,
+        glossary_mode: Optional[str] = None,
+        journal: Optional[RunJournal] = None,
+        references: Optional[Dict[int, List[TMMatch]]] = None,
+        memory_hits: Optional[List[Optional[str]]] = None
     ) -> str:
         """
         Translate text using sliding window approach with glossary term detection
 
+        With max_concurrency > 1 the windows are translated on a thread pool with at most
+        max_concurrency requests in flight. Every translation is stored in the slot of its
+        window, so merge_translations sees the same order as in sequential mode.
+
         Args:
-            text: Text to translate
+            text: Text to translate, or the Document whose paragraphs are translated
             source_language: Source language
             target_language: Target language
             glossary: Translation glossary
             context: Document context
             stream_print: If True, stream and print LLM output in real-time
+                          (only honoured in sequential mode to avoid interleaved output)
             use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
             result: Result dictionary to store metadata
+            max_concurrency: Maximum number of windows translated in parallel (default: 1)
+            glossary_mode: "full" or "detected" glossary prompts (default: self.glossary_mode);
+                           per-window prompt token savings are stored in result["glossary_pruning"]
+            journal: Run journal; windows translated in an earlier run with the same content,
+                     settings and glossary are restored from it, new ones are recorded
+            references: Translation memory near-duplicates per paragraph index, added to the
+                        context of the windows containing the paragraph
+            memory_hits: Translation memory exact hit per paragraph (None where unknown); only the
+                         runs of other paragraphs are windowed and translated, the hits are filled in
 
         Returns:
             Translated text
         """
-        windows = create_sliding_windows(text, "paragraph", window_char_limit=8000, overlap_paragraphs=5)
+        glossary_mode = glossary_mode or self.glossary_mode
+        document = text if isinstance(text, Document) else Document(text)
+        paragraphs = document.paragraphs
+        # In context mode windows do not overlap; the previous paragraphs are sent as context only
+        overlap_paragraphs = 0 if self.overlap_mode == "context" else TRANSLATION_OVERLAP_PARAGRAPHS
+        window_tokens = get_model_token_budget(self.model).window_tokens
+        if memory_hits is None:
+            spans = document.windows(window_tokens, overlap_paragraphs, count_tokens)
+        else:
+            spans = self._plan_windows_around_memory_hits(document, memory_hits, window_tokens, overlap_paragraphs)
+        windows = [(document.window_text(start, end), start, end) for start, end in spans]
         result["num_windows"] = len(windows)
 
-        translations = []
+        translations: List[Optional[str]] = [None] * len(windows)
         detected_terms_list = []
 
+        # Detect glossary terms for every window up front
+        window_terms: List[Optional[List[str]]] = []
         for idx, (window_text, start, end) in enumerate(windows):
-            print(f"\n  Translating window {idx + 1}/{len(windows)} (paragraphs {start + 1}-{end})...")
-
-            # Detect glossary terms in this window
+            detected_terms = None
             if glossary:
                 detected_terms = self._detect_glossary_terms_in_text(window_text, glossary)
                 detected_terms_list.extend(detected_terms)
-                if detected_terms and stream_print:
-                    print(f"    → Found {len(detected_terms)} glossary terms in this window")
-
-            translation = self.client.translate_text(
-                self.model,
+            window_terms.append(detected_terms)
+
+        glossary_reports: List[Dict[str, Any]] = [{} for _ in windows]
+        glossary_digest = RunJournal.make_key(glossary) if journal is not None else None
+
+        def translate_window(idx: int, window_stream_print: bool, use_journal: bool = True) -> str:
+            window_text, start, end = windows[idx]
+            window_context = context
+            preceding_text = self._preceding_context(paragraphs, start)
+            if memory_hits is not None and self._borders_memory_hit(memory_hits, start, end):
+                # The neighbouring paragraphs are shown with their memory translations instead
+                window_context = build_revision_context(paragraphs, memory_hits, start, end, context)
+                preceding_text = None
+            translation, restored = self._translate_window(
                 window_text,
                 source_language,
                 target_language,
                 glossary,
-                context,
-                stream_print,
-                detected_terms if glossary else None,
-                use_hyperlink_format
+                self._context_with_references(window_context, references, start, end),
+                window_stream_print,
+                window_terms[idx],
+                use_hyperlink_format,
+                glossary_mode,
+                glossary_reports[idx],
+                journal=journal if use_journal else None,
+                glossary_digest=glossary_digest,
+                preceding_text=preceding_text,
+                paragraphs=paragraphs[start:end + 1],
+                paragraph_start=start
             )
-            translations.append(translation)
-            print(f"  ✓ Window {idx + 1} translated")
+            if restored:
+                print(f"  ↺ Window {idx + 1}/{len(windows)} restored from journal")
+            return translation
+
+        max_concurrency = max(1, min(max_concurrency, len(windows)))
+
+        if max_concurrency == 1:
+            for idx, (window_text, start, end) in enumerate(windows):
+                print(f"\n  Translating window {idx + 1}/{len(windows)} (paragraphs {start + 1}-{end + 1})...")
+                if window_terms[idx] and stream_print:
+                    print(f"    → Found {len(window_terms[idx])} glossary terms in this window")
+
+                translations[idx] = translate_window(idx, stream_print)
+                print(f"  ✓ Window {idx + 1} translated")
+                if glossary_reports[idx].get("tokens_saved"):
+                    print(f"    → Glossary prompt: {glossary_reports[idx]['sent_entries']} entries, "
+                          f"~{glossary_reports[idx]['tokens_saved']} prompt tokens saved")
+        else:
+            print(f"\n  Translating {len(windows)} windows with up to {max_concurrency} concurrent requests...")
+            completed = 0
+            executor = ContextThreadPoolExecutor(max_workers=max_concurrency)
+            try:
+                futures = {
+                    executor.submit(translate_window, idx, False): idx
+                    for idx in range(len(windows))
+                }
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    translations[idx] = future.result()
+                    completed += 1
+                    _, start, end = windows[idx]
+                    print(f"  ✓ Window {idx + 1}/{len(windows)} translated "
+                          f"(paragraphs {start + 1}-{end + 1}, {completed}/{len(windows)} completed)")
+            finally:
+                # Drop queued windows if one of them failed
+                executor.shutdown(wait=True, cancel_futures=True)
 
         result["all_detected_terms"] = list(set(detected_terms_list))
         print(f"\n  Total unique glossary terms detected across text: {len(result['all_detected_terms'])}")
 
+        if memory_hits is not None and self.translation_protocol != "tagged":
+            # A window that cannot be split back into its paragraphs is translated once more on its own
+            for idx, (_, start, end) in enumerate(windows):
+                if len(split_into_paragraphs(translations[idx] or "")) != end - start + 1:
+                    print(f"  Warning: window {idx + 1} (paragraphs {start + 1}-{end + 1}) could not be paired "
+                          f"with its source paragraphs, translating it again")
+                    translations[idx] = translate_window(idx, False, use_journal=False)
+
+        if glossary:
+            self._summarize_glossary_pruning(windows, glossary_reports, glossary_mode, result)
+
         # Merge translations
-        merged = merge_translations(windows, translations, "paragraph", overlap_paragraphs=5)
+        if memory_hits is not None:
+            return self._merge_around_memory_hits(windows, translations, memory_hits, overlap_paragraphs, result)
+        if self.translation_protocol == "tagged":
+            return self._merge_tagged_windows(windows, translations, len(paragraphs), result)
+        merged = merge_translations(windows, translations, "paragraph", overlap_paragraphs=overlap_paragraphs)
+        result["paragraph_translations"] = map_translated_paragraphs(
+            windows, translations, len(paragraphs), overlap_paragraphs=overlap_paragraphs
+        )
         return merged
 
+    @staticmethod
+    def _plan_windows_around_memory_hits(
+        document: Document,
+        memory_hits: List[Optional[str]],
+        window_tokens: int,
+        overlap_paragraphs: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Plan translation windows over the runs of paragraphs without a translation memory hit
+
+        Every run is windowed like a document of its own, so a window never spans a hit
+        and its paragraphs keep their document indices.
+
+        Args:
+            document: Document to translate
+            memory_hits: Exact hit per paragraph (None where unknown)
+            window_tokens: Maximum window size in tokens
+            overlap_paragraphs: Number of paragraphs shared by consecutive windows of a run
+
+        Returns:
+            List of (start_idx, end_idx) paragraph spans, end_idx inclusive
+        """
+        sizes = document.paragraph_sizes(count_tokens)
+        runs = find_changed_runs(memory_hits)
+        missing = sum(end - start + 1 for start, end in runs)
+        print(f"  ↺ {len(memory_hits) - missing}/{len(memory_hits)} paragraphs taken from translation memory, "
+              f"translating the other {missing}")
+        return [
+            (run_start + start, run_start + end)
+            for run_start, run_end in runs
+            for start, end in plan_window_spans(sizes[run_start:run_end + 1], window_tokens, 1, overlap_paragraphs)
+        ]
+
+    @staticmethod
+    def _borders_memory_hit(memory_hits: List[Optional[str]], start: int, end: int) -> bool:
+        """Check whether the paragraph before or after a window was taken from the translation memory"""
+        return (start > 0 and memory_hits[start - 1] is not None) or (
+            end + 1 < len(memory_hits) and memory_hits[end + 1] is not None
+        )
+
+    def _merge_around_memory_hits(
+        self,
+        windows: List[Tuple[str, int, int]],
+        translations: List[Optional[str]],
+        memory_hits: List[Optional[str]],
+        overlap_paragraphs: int,
+        result: Dict[str, Any]
+    ) -> str:
+        """
+        Merge the windows translated between translation memory hits and fill in the hits
+
+        With the "plain" protocol a run whose windows still cannot be paired with their
+        paragraphs is merged by position and kept as one block between the hits; its
+        paragraphs get no translation of their own in result["paragraph_translations"].
+
+        Args:
+            windows: List of (window_text, start_idx, end_idx) tuples in document indices
+            translations: Translation of every window
+            memory_hits: Exact hit per paragraph (None where unknown)
+            overlap_paragraphs: Number of paragraphs shared by consecutive windows of a run
+            result: Result dictionary; stores the translation per paragraph in result["paragraph_translations"]
+
+        Returns:
+            Translated text
+        """
+        num_paragraphs = len(memory_hits)
+        if self.translation_protocol == "tagged":
+            mapped = merge_tagged_translations(windows, translations, num_paragraphs)
+        else:
+            mapped = map_translated_paragraphs(windows, translations, num_paragraphs, overlap_paragraphs)
+        units = [hit if hit is not None else unit for hit, unit in zip(memory_hits, mapped)]
+        blocks: Dict[int, Tuple[int, str]] = {}
+        if self.translation_protocol != "tagged":
+            for run_start, run_end in find_changed_runs(memory_hits):
+                if all(unit is not None for unit in units[run_start:run_end + 1]):
+                    continue
+                run = [idx for idx, (_, start, _) in enumerate(windows) if run_start <= start <= run_end]
+                print(f"Warning: paragraphs {run_start + 1}-{run_end + 1} could not be paired with their "
+                      f"translation, keeping it as one block")
+                blocks[run_start] = (run_end, merge_translations(
+                    [windows[idx] for idx in run], [translations[idx] for idx in run],
+                    "paragraph", overlap_paragraphs=overlap_paragraphs
+                ))
+        else:
+            unmapped = sum(unit is None for unit in units)
+            if unmapped:
+                print(f"Warning: {unmapped} paragraph(s) missing from the tagged translations")
+        result["paragraph_translations"] = units
+
+        parts = []
+        idx = 0
+        while idx < num_paragraphs:
+            if idx in blocks:
+                end, block = blocks[idx]
+                parts.append(block)
+                idx = end + 1
+                continue
+            parts.append(units[idx])
+            idx += 1
+        return "\n\n".join(part for part in parts if part)
+
+    def _translate_pipelined(
+        self,
+        pdf_path: str,
+        source_language: str,
+        target_language: str,
+        context: Optional[str],
+        auto_extract_nouns: bool,
+        existing_glossary: Optional[Dict[str, str]],
+        use_hyperlink_format: bool,
+        result: Dict[str, Any],
+        max_concurrency: int = 1,
+        journal: Optional[RunJournal] = None,
+        tm_variant: Optional[str] = None,
+        parse_window_pages: Optional[int] = None
+    ) -> Tuple[Document, List[str], Dict[str, str], str]:
+        """
+        Parse, extract proper nouns, build the glossary and translate as overlapping stages
+
+        A parser thread puts page windows into a bounded queue. For every page window
+        the proper nouns of its paragraphs are extracted and their glossary entries
+        generated; then every translation window whose paragraphs have a settled
+        glossary is submitted to the thread pool while the next pages are still being
+        parsed. Translation windows are planned exactly like create_sliding_windows
+        plans them for the full text, and at most 2 * max_concurrency of them wait
+        in the pool, so a slow API holds back noun extraction and parsing.
+
+        Only Steps 1-4 run here: the merged translation goes through the same glossary
+        enforcement or post-edit, hyperlink fixes, paragraph attribution and translation
+        memory storage in translate_document_with_pdf as the sequential result.
+
+        Args:
+            pdf_path: Path to PDF file
+            source_language: Source language
+            target_language: Target language
+            context: Document context
+            auto_extract_nouns: Whether to extract proper nouns and generate glossary entries
+            existing_glossary: Existing glossary; its entries take precedence over generated ones
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            result: Result dictionary to store metadata
+            max_concurrency: Maximum number of windows translated in parallel (default: 1)
+            journal: Run journal for proper nouns, glossary entries and windows
+            tm_variant: Translation memory variant (used when the translation memory is enabled)
+            parse_window_pages: Pages per parser window
+                                (reads from PIPELINE_PARSE_WINDOW_PAGES env var if not provided, default: 10)
+
+        Returns:
+            Tuple of (document, proper nouns, glossary, merged translation); the document's
+            paragraphs are the ones segmented per page window
+        """
+        import os
+        parse_window_pages = parse_window_pages or int(os.getenv("PIPELINE_PARSE_WINDOW_PAGES", "10"))
+        window_tokens = get_model_token_budget(self.model).window_tokens
+        overlap_paragraphs = 0 if self.overlap_mode == "context" else TRANSLATION_OVERLAP_PARAGRAPHS
+        glossary_mode = self.glossary_mode
+        memory = self.translation_memory if tm_variant else None
+
+        glossary: Dict[str, str] = dict(existing_glossary or {})
+        proper_nouns: List[str] = []
+        page_texts: List[str] = []
+        pages: List[Dict[str, Any]] = []
+        text_length = 0
+        segments: List[Paragraph] = []
+        paragraphs: List[str] = []
+        paragraph_sizes: List[int] = []
+        tm_exact: List[Optional[str]] = []
+        tm_references: Dict[int, List[TMMatch]] = {}
+
+        windows: List[Tuple[str, int, int]] = []
+        translations: Dict[int, str] = {}
+        glossary_reports: List[Dict[str, Any]] = []
+        detected_terms_list: List[str] = []
+        futures = {}
+        tm_windows = 0
+
+        # Parser stage: page windows flow into a bounded queue
+        page_queue: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+        stop = threading.Event()
+
+        def put(item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    page_queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            try:
+                for parsed in self.iter_pdf_windows(pdf_path, window_pages=parse_window_pages):
+                    put(parsed)
+                    if stop.is_set() or not parsed.success:
+                        return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        # Translation stage: at most 2 * max_concurrency windows queued or in flight
+        executor = ContextThreadPoolExecutor(max_workers=max_concurrency)
+        window_slots = threading.BoundedSemaphore(max_concurrency * 2)
+
+        def translate_window(idx: int, window_context: Optional[str], window_glossary: Dict[str, str],
+                             detected_terms: Optional[List[str]]) -> str:
+            window_text, start, end = windows[idx]
+            translation, restored = self._translate_window(
+                window_text,
+                source_language,
+                target_language,
+                window_glossary,
+                window_context,
+                False,
+                detected_terms,
+                use_hyperlink_format,
+                glossary_mode,
+                glossary_reports[idx],
+                journal=journal,
+                glossary_digest=RunJournal.make_key(window_glossary) if journal is not None else None,
+                preceding_text=self._preceding_context(paragraphs, start),
+                paragraphs=paragraphs[start:end + 1],
+                paragraph_start=start
+            )
+            marker = "↺" if restored else "✓"
+            print(f"  {marker} Window {idx + 1} {'restored from journal' if restored else 'translated'} "
+                  f"(paragraphs {start + 1}-{end + 1})")
+            return translation
+
+        def submit_window(start: int, end: int) -> None:
+            nonlocal tm_windows
+            idx = len(windows)
+            window_text = "\n\n".join(paragraphs[start:end + 1])
+            windows.append((window_text, start, end))
+            glossary_reports.append({})
+
+            hits = tm_exact[start:end + 1] if memory is not None else []
+            if hits and all(hits):
+                translations[idx] = (
+                    tag_paragraphs(hits, start) if self.translation_protocol == "tagged" else "\n\n".join(hits)
+                )
+                tm_windows += 1
+                print(f"  ↺ Window {idx + 1} taken from translation memory (paragraphs {start + 1}-{end + 1})")
+                return
+
+            # Exact hits of a partially known window are shown as references
+            references = {i: tm_references[i] for i in range(start, end + 1) if i in tm_references}
+            for offset, hit in enumerate(hits):
+                if hit:
+                    references[start + offset] = [TMMatch(paragraphs[start + offset], hit, 1.0)]
+
+            window_glossary = dict(glossary)
+            detected_terms = None
+            if window_glossary:
+                detected_terms = self._detect_glossary_terms_in_text(window_text, window_glossary)
+                detected_terms_list.extend(detected_terms)
+            window_slots.acquire()
+            future = executor.submit(
+                translate_window, idx,
+                self._context_with_references(context, references, start, end),
+                window_glossary, detected_terms
+            )
+            future.add_done_callback(lambda _: window_slots.release())
+            futures[future] = idx
+
+        producer = threading.Thread(target=produce, name="pdf-parser", daemon=True)
+        producer.start()
+        next_start: Optional[int] = 0
+        complete = False
+        try:
+            while not complete:
+                item = page_queue.get()
+                if item is None:
+                    complete = True
+                elif isinstance(item, Exception):
+                    raise Exception(f"Failed to parse PDF: {item}")
+                elif not item.success:
+                    raise Exception(f"Failed to parse PDF: PDF parsing failed: {item.errors}")
+                else:
+                    # Noun/glossary stage for the new pages; pages and paragraphs are spans into the joined text
+                    offset = text_length + (2 if page_texts and item.full_text else 0)
+                    for page in self._page_spans(item, offset):
+                        page["page_number"] = len(pages) + 1
+                        pages.append(page)
+                    if item.full_text:
+                        page_texts.append(item.full_text)
+                        text_length = offset + len(item.full_text)
+                    new_segments = segment_paragraphs(item.full_text)
+                    new_paragraphs = [segment.text for segment in new_segments]
+                    first = len(paragraphs)
+                    segments.extend(
+                        Paragraph(segment.text, segment.start + offset, segment.end + offset)
+                        for segment in new_segments
+                    )
+                    paragraphs.extend(new_paragraphs)
+                    paragraph_sizes.extend(count_tokens(paragraph) for paragraph in new_paragraphs)
+
+                    exact = [None] * len(new_paragraphs)
+                    if memory is not None:
+                        exact = memory.lookup_exact(new_paragraphs, tm_variant, glossary)
+                        for position, hit in enumerate(exact):
+                            if hit is None:
+                                matches = memory.lookup_fuzzy(new_paragraphs[position], tm_variant)
+                                if matches:
+                                    tm_references[first + position] = matches
+                        tm_exact.extend(exact)
+
+                    new_nouns: List[str] = []
+                    noun_text = "\n\n".join(
+                        paragraph for paragraph, hit in zip(new_paragraphs, exact) if hit is None
+                    )
+                    if auto_extract_nouns and noun_text.strip():
+                        nouns = self._run_journaled(
+                            journal, "proper_nouns",
+                            lambda: (noun_text, context, self.model),
+                            lambda: self.extract_proper_nouns_from_file(
+                                noun_text,
+                                context=context,
+                                strategy="paragraph",
+                                window_char_limit=8000,
+                                overlap_paragraphs=2
+                            )
+                        )
+                        known = set(proper_nouns)
+                        new_nouns = [noun for noun in nouns if noun not in known]
+                        proper_nouns.extend(new_nouns)
+                        missing = [noun for noun in new_nouns if noun not in glossary]
+                        if missing:
+                            self.last_glossary_plan = None
+                            entries = self._run_journaled(
+                                journal, "glossary",
+                                lambda: (missing, existing_glossary, target_language, context, self.model),
+                                lambda: self.generate_glossary_from_nouns(
+                                    missing, target_language, context, False, save_glossary=False
+                                )
+                            )
+                            self._record_glossary_plan(result)
+                            for term, translation in entries.items():
+                                glossary.setdefault(term, translation)
+
+                    page_range = item.metadata.get("page_range")
+                    pages_label = f"pages {page_range[0]}-{page_range[1]}" if page_range else f"{len(item.pages)} pages"
+                    print(f"  ✓ Parsed {pages_label}: {len(new_paragraphs)} paragraphs, "
+                          f"{len(new_nouns)} new proper nouns, {len(glossary)} glossary entries")
+
+                # Submit every translation window whose paragraphs have a settled glossary
+                while next_start is not None and next_start < len(paragraphs):
+                    end = plan_next_window(paragraph_sizes, next_start, window_tokens, complete)
+                    if end is None:
+                        break
+                    submit_window(next_start, end)
+                    if end == len(paragraphs) - 1:
+                        next_start = None
+                    else:
+                        next_start += max(1, (end - next_start + 1) - overlap_paragraphs)
+
+            for future in as_completed(futures):
+                translations[futures[future]] = future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        document = Document(
+            "\n\n".join(page_texts),
+            [(page["start"], page["end"]) for page in pages if "start" in page],
+            segments
+        )
+        page_texts.clear()
+        result["parse_result"] = {
+            "success": True,
+            "file_path": str(pdf_path),
+            "total_pages": len(pages),
+            "pages": pages,
+            "metadata": {"parse_window_pages": parse_window_pages, "pipelined": True},
+            "full_text": document.text,
+            "formatting_optimized": False
+        }
+        result["num_windows"] = len(windows)
+        result["all_detected_terms"] = list(set(detected_terms_list))
+        if glossary:
+            self._summarize_glossary_pruning(windows, glossary_reports, glossary_mode, result)
+        if memory is not None:
+            exact_hits = sum(hit is not None for hit in tm_exact)
+            result["translation_memory"] = {
+                "paragraphs": len(paragraphs),
+                "exact_hits": exact_hits,
+                "fuzzy_hits": len(tm_references),
+                "exact_hit_rate": exact_hits / len(paragraphs) if paragraphs else 0.0,
+                "hit_rate": (exact_hits + len(tm_references)) / len(paragraphs) if paragraphs else 0.0,
+                "windows_from_memory": tm_windows,
+                "stored": 0
+            }
+
+        window_translations = [translations.get(idx, "") for idx in range(len(windows))]
+        if self.translation_protocol == "tagged":
+            merged = self._merge_tagged_windows(windows, window_translations, len(paragraphs), result)
+            return document, proper_nouns, glossary, merged
+        result["paragraph_translations"] = map_translated_paragraphs(
+            windows, window_translations, len(paragraphs), overlap_paragraphs=overlap_paragraphs
+        )
+        merged = merge_translations(windows, window_translations, "paragraph", overlap_paragraphs=overlap_paragraphs)
+        return document, proper_nouns, glossary, merged
+
+    def _translate_window(
+        self,
+        window_text: str,
+        source_language: str,
+        target_language: str,
+        glossary: Optional[Dict[str, str]],
+        context: Optional[str],
+        stream_print: bool,
+        detected_terms: Optional[List[str]],
+        use_hyperlink_format: bool,
+        glossary_mode: str,
+        glossary_report: Dict[str, Any],
+        journal: Optional[RunJournal] = None,
+        glossary_digest: Optional[str] = None,
+        preceding_text: Optional[str] = None,
+        paragraphs: Optional[List[str]] = None,
+        paragraph_start: int = 0
+    ) -> Tuple[str, bool]:
+        """
+        Translate one window, restoring it from the run journal when possible
+
+        Args:
+            window_text: Source text of the window
+            source_language: Source language
+            target_language: Target language
+            glossary: Translation glossary
+            context: Context of this window (document context plus references)
+            stream_print: If True, stream and print LLM output in real-time
+            detected_terms: Glossary terms found in the window
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            glossary_mode: "full" or "detected" glossary prompts
+            glossary_report: Dictionary filled with the glossary prompt statistics
+            journal: Run journal to restore from and record to
+            glossary_digest: Journal key of the glossary
+            preceding_text: Source paragraphs before the window, sent as read-only context
+            paragraphs: Source paragraphs of the window; with the "tagged" protocol they are sent with
+                        ID markers and the translation is returned tagged
+            paragraph_start: Document index of the first paragraph of the window (its ID)
+
+        Returns:
+            Tuple of (translation, whether it was restored from the journal)
+        """
+        tagged = self.translation_protocol == "tagged" and paragraphs is not None
+        if journal is not None:
+            key_parts = [
+                window_text, self.model, source_language, target_language, context,
+                use_hyperlink_format, glossary_mode, glossary_digest, preceding_text
+            ]
+            if tagged:
+                # Tagged translations carry the paragraph IDs of the window
+                key_parts.append(("tagged", paragraph_start))
+            window_key = RunJournal.make_key(*key_parts)
+            restored = journal.get("window", window_key)
+            if restored is not None:
+                glossary_report.update(restored["glossary_report"])
+                return restored["translation"], True
+
+        def translate(text: str) -> str:
+            # In batch mode the windows of all books share one limit on requests in flight
+            with self._request_slot():
+                return self.client.translate_text(
+                    self.model,
+                    text,
+                    source_language,
+                    target_language,
+                    glossary,
+                    context,
+                    stream_print,
+                    detected_terms,
+                    use_hyperlink_format,
+                    glossary_mode=glossary_mode,
+                    glossary_report=glossary_report,
+                    preceding_text=preceding_text,
+                    paragraph_tags=tagged
+                )
+
+        if tagged:
+            translation = tag_paragraphs(self._translate_tagged_paragraphs(paragraphs, paragraph_start, translate),
+                                         paragraph_start)
+        else:
+            translation = translate(window_text)
+        if journal is not None:
+            journal.put("window", window_key, {
+                "translation": translation,
+                "glossary_report": glossary_report
+            })
+        return translation, False
+
+    @staticmethod
+    def _translate_tagged_paragraphs(
+        paragraphs: List[str],
+        start: int,
+        translate: Callable[[str], str]
+    ) -> List[str]:
+        """
+        Translate paragraphs tagged with their IDs, re-requesting only the paragraphs missing from the reply
+
+        Each missing paragraph is re-requested with the paragraph before it, which
+        replaces the earlier translation of that paragraph if it may hold both.
+
+        Args:
+            paragraphs: Source paragraphs
+            start: Document index (ID) of the first paragraph
+            translate: Sends a tagged text to the model and returns its reply
+
+        Returns:
+            Translation of every paragraph (the source paragraph where the model never returned it)
+        """
+        units: Dict[int, str] = {}
+        requested = pending = list(range(start, start + len(paragraphs)))
+        for attempt in range(TAG_RETRIES + 1):
+            tagged_text = tag_paragraphs([paragraphs[idx - start] for idx in requested], ids=requested)
+            parsed = parse_tagged_translation(translate(tagged_text), requested)
+            units.update(parsed.units)
+            pending = [idx for idx in pending if idx not in parsed.units]
+            if not pending or attempt == TAG_RETRIES:
+                break
+            print(f"    → Re-requesting {len(pending)} paragraph(s) missing from the reply "
+                  f"(paragraphs {', '.join(str(idx + 1) for idx in pending[:10])}"
+                  f"{', ...' if len(pending) > 10 else ''})")
+            # A missing marker usually means the paragraph was merged into the one before it,
+            # so that paragraph is translated again as well
+            requested = sorted({idx - 1 for idx in pending if idx > start} | set(pending))
+        if pending:
+            print(f"Warning: {len(pending)} paragraph(s) not returned by the model, keeping the source text "
+                  f"(paragraphs {', '.join(str(idx + 1) for idx in pending[:10])}{', ...' if len(pending) > 10 else ''})")
+        return [units.get(idx, paragraphs[idx - start]) for idx in range(start, start + len(paragraphs))]
+
+    @staticmethod
+    def _merge_tagged_windows(
+        windows: List[Tuple[str, int, int]],
+        translations: List[Optional[str]],
+        num_paragraphs: int,
+        result: Dict[str, Any]
+    ) -> str:
+        """
+        Merge tagged window translations by paragraph ID
+
+        Args:
+            windows: List of (window_text, start_idx, end_idx) tuples
+            translations: Tagged translation of every window
+            num_paragraphs: Number of source paragraphs
+            result: Result dictionary; stores the translation per paragraph in result["paragraph_translations"]
+
+        Returns:
+            Merged translation
+        """
+        units = merge_tagged_translations(windows, translations, num_paragraphs)
+        result["paragraph_translations"] = units
+        mapped = sum(unit is not None for unit in units)
+        if mapped < num_paragraphs:
+            print(f"Warning: {num_paragraphs - mapped} paragraph(s) missing from the tagged translations")
+        return "\n\n".join(unit for unit in units if unit)
+
+    def _preceding_context(self, paragraphs: List[str], start: int) -> Optional[str]:
+        """
+        Get the paragraphs before a window that are sent as read-only context
+
+        Args:
+            paragraphs: Source paragraphs
+            start: First paragraph of the window
+
+        Returns:
+            Preceding paragraphs in context mode, None in translate mode or for the first window
+        """
+        if self.overlap_mode != "context" or start == 0:
+            return None
+        return "\n\n".join(paragraphs[max(0, start - TRANSLATION_OVERLAP_PARAGRAPHS):start])
+
+    @staticmethod
+    def _summarize_glossary_pruning(
+        windows: List[Tuple[str, int, int]],
+        glossary_reports: List[Dict[str, Any]],
+        glossary_mode: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Store per-window glossary prompt savings in result["glossary_pruning"]"""
+        total_saved = sum(report.get("tokens_saved", 0) for report in glossary_reports)
+        result["glossary_pruning"] = {
+            "glossary_mode": glossary_mode,
+            "total_tokens_saved": total_saved,
+            "windows": [
+                {"window": idx + 1, "paragraphs": [start + 1, end + 1], **glossary_reports[idx]}
+                for idx, (_, start, end) in enumerate(windows)
+            ]
+        }
+        if glossary_mode != "full":
+            print(f"  Glossary prompts ({glossary_mode} mode): ~{total_saved} prompt tokens saved "
+                  f"across {len(windows)} windows")
+
+    def _translate_changed_paragraphs(
+        self,
+        paragraphs: List[str],
+        reused: List[Optional[str]],
+        source_language: str,
+        target_language: str,
+        glossary: Optional[Dict[str, str]],
+        context: Optional[str],
+        use_hyperlink_format: bool,
+        result: Dict[str, Any],
+        max_concurrency: int = 1,
+        post_edit: bool = False,
+        references: Optional[Dict[int, List[TMMatch]]] = None
+    ) -> str:
+        """
+        Translate only new or edited paragraphs and splice in the stored translations
+
+        Consecutive changed paragraphs are translated together (split at the window
+        token budget), with the neighbouring unchanged paragraphs as context.
+
+        Args:
+            paragraphs: Source paragraphs of the revised document
+            reused: Stored translation per paragraph (None = needs translation)
+            source_language: Source language
+            target_language: Target language
+            glossary: Translation glossary
+            context: Document context
+            use_hyperlink_format: If True, format proper nouns as markdown hyperlinks
+            result: Result dictionary to store metadata
+            max_concurrency: Maximum number of segments translated in parallel (default: 1)
+            post_edit: If True, update each new translation with the glossary
+            references: Translation memory near-duplicates per paragraph index
+
+        Returns:
+            Translated text
+        """
+        window_tokens = get_model_token_budget(self.model).window_tokens
+        segments: List[Tuple[int, int]] = []
+        for start, end in find_changed_runs(reused):
+            segment_start, segment_tokens = start, 0
+            for idx in range(start, end + 1):
+                size = count_tokens(paragraphs[idx])
+                if idx > segment_start and segment_tokens + size > window_tokens:
+                    segments.append((segment_start, idx - 1))
+                    segment_start, segment_tokens = idx, 0
+                segment_tokens += size
+            segments.append((segment_start, end))
+
+        result["num_windows"] = len(segments)
+        translations: List[Optional[str]] = list(reused)
+        detected_terms_list = []
+        enforcer = GlossaryEnforcer(glossary) if post_edit and glossary and self.glossary_enforcement == "local" else None
+        tagged = self.translation_protocol == "tagged"
+
+        def translate_segment(segment_idx: int) -> List[str]:
+            start, end = segments[segment_idx]
+            segment_text = "\n\n".join(paragraphs[start:end + 1])
+            detected_terms = self._detect_glossary_terms_in_text(segment_text, glossary) if glossary else None
+            detected_terms_list.extend(detected_terms or [])
+            segment_context = self._context_with_references(
+                build_revision_context(paragraphs, reused, start, end, context), references, start, end
+            )
+
+            def translate(text: str) -> str:
+                with self._request_slot():
+                    return self.client.translate_text(
+                        self.model,
+                        text,
+                        source_language,
+                        target_language,
+                        glossary,
+                        segment_context,
+                        False,
+                        detected_terms,
+                        use_hyperlink_format,
+                        paragraph_tags=tagged
+                    )
+
+            if tagged:
+                translated = "\n\n".join(self._translate_tagged_paragraphs(paragraphs[start:end + 1], start, translate))
+            else:
+                translated = translate(segment_text)
+            if enforcer is not None:
+                translated = self._enforce_glossary(paragraphs[start:end + 1], translated, enforcer, context)
+            elif post_edit and glossary:
+                translated = self._post_edit_translation(translated, glossary, context, False)
+            units = split_into_paragraphs(translated)
+            if len(units) == end - start + 1:
+                return units
+            # Paragraph count changed: keep the segment as one block (not stored for reuse)
+            return [translated] + [""] * (end - start)
+
+        max_concurrency = max(1, min(max_concurrency, len(segments) or 1))
+        executor = ContextThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures = {executor.submit(translate_segment, idx): idx for idx in range(len(segments))}
+            for completed, future in enumerate(as_completed(futures), 1):
+                start, end = segments[futures[future]]
+                translations[start:end + 1] = future.result()
+                print(f"  ✓ Paragraphs {start + 1}-{end + 1} translated ({completed}/{len(segments)} segments)")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        result["all_detected_terms"] = list(set(detected_terms_list))
+        result["paragraph_translations"] = [translation or None for translation in translations]
+        if enforcer is not None:
+            result["glossary_enforcement"] = enforcer.to_dict()
+        return "\n\n".join(translation for translation in translations if translation)
+
+    def _enforce_glossary(
+        self,
+        paragraphs: List[str],
+        translated: str,
+        enforcer: GlossaryEnforcer,
+        context: Optional[str],
+        max_concurrency: int = 1,
+        paragraph_translations: Optional[List[Optional[str]]] = None
+    ) -> str:
+        """
+        Enforce the glossary on a translation, post-editing only unresolved paragraphs
+
+        Source and translated paragraphs are paired (one to one, or in runs anchored by
+        the paragraphs attributed to each translation window) and every pair is fixed
+        locally. Pairs still missing a glossary translation are post-edited by the LLM
+        in windows of the token budget, with only their missing terms as glossary.
+
+        Args:
+            paragraphs: Source paragraphs
+            translated: Translation of the paragraphs
+            enforcer: Glossary enforcer (collects statistics and learned variants)
+            context: Document context
+            max_concurrency: Maximum number of post-editing requests in parallel (default: 1)
+            paragraph_translations: Translation attributed to each source paragraph (None where unknown)
+
+        Returns:
+            Updated translation
+        """
+        units = split_into_paragraphs(translated)
+        unresolved: List[Tuple[int, int, List[str]]] = []
+        for (source_start, source_end), (unit_start, unit_end) in align_paragraph_segments(
+            len(paragraphs), units, paragraph_translations
+        ):
+            if source_start == source_end or unit_start == unit_end:
+                continue
+            fixed, missing = enforcer.enforce(
+                "\n\n".join(paragraphs[source_start:source_end]), "\n\n".join(units[unit_start:unit_end])
+            )
+            fixed_units = split_into_paragraphs(fixed)
+            if len(fixed_units) == unit_end - unit_start:
+                units[unit_start:unit_end] = fixed_units
+            if missing:
+                unresolved.append((unit_start, unit_end, missing))
+
+        if not unresolved:
+            return "\n\n".join(units)
+
+        # Windows of unresolved paragraphs up to the token budget
+        window_tokens = get_model_token_budget(self.model).window_tokens
+        windows: List[List[Tuple[int, int, List[str]]]] = []
+        window_size = 0
+        for segment in unresolved:
+            size = sum(count_tokens(unit) for unit in units[segment[0]:segment[1]])
+            if windows and window_size + size <= window_tokens:
+                windows[-1].append(segment)
+                window_size += size
+            else:
+                windows.append([segment])
+                window_size = size
+
+        def post_edit(window: List[Tuple[int, int, List[str]]]) -> Optional[List[str]]:
+            window_units = [unit for start, end, _ in window for unit in units[start:end]]
+            terms = {term for _, _, missing in window for term in missing}
+            updated = split_into_paragraphs(self._post_edit_translation(
+                "\n\n".join(window_units),
+                {term: enforcer.glossary[term] for term in sorted(terms)},
+                context,
+                False
+            ))
+            # Keep the local result if the paragraph structure changed
+            return updated if len(updated) == len(window_units) else None
+
+        max_concurrency = max(1, min(max_concurrency, len(windows)))
+        executor = ContextThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures = {executor.submit(post_edit, window): window for window in windows}
+            for future in as_completed(futures):
+                window = futures[future]
+                updated = future.result()
+                if updated is None:
+                    enforcer.record(llm_rejected=1)
+                    continue
+                for start, end, _ in window:
+                    units[start:end], updated = updated[:end - start], updated[end - start:]
+                enforcer.record(llm_windows=1, llm_paragraphs=sum(end - start for start, end, _ in window))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return "\n\n".join(units)
+
     def extract_proper_nouns_from_file(
         self,
         text: str,
@@ -1656,25 +3444,20 @@ class UnifiedTranslationPipeline:
         overlap_ratio: Optional[float] = None,
         window_char_limit: int = 8000,
         overlap_paragraphs: int = 2,
-        stream_print: bool = False
+        stream_print: bool = False,
+        max_workers: Optional[int] = None
     ) -> List[str]:
         """Extract proper nouns from document text using paragraph/sentence-based splitting"""
         chunks = split_text_by_strategy(text, strategy, window_char_limit=window_char_limit, overlap_paragraphs=overlap_paragraphs)
-        all_nouns = set()
-
-        for i, chunk in enumerate(chunks):
-            if len(chunk) < 100:
-                continue
-
-            nouns = self.client.extract_proper_nouns(
-                self.model,
-                chunk,
-                context or f"Chunk {i + 1} of {len(chunks)}",
-                stream_print
-            )
-            all_nouns.update(nouns)
-
-        return list(filter(None, sorted(set(all_nouns))))
+        return extract_proper_nouns_concurrently(
+            self.client,
+            self.model,
+            chunks,
+            context,
+            max_workers or get_noun_extraction_workers(self.client, self.max_concurrency),
+            stream_print,
+            self._processed_noun_chunks
+        )
 
     def generate_glossary_from_nouns(
         self,
@@ -1694,6 +3477,8 @@ class UnifiedTranslationPipeline:
         4. When 100+ terms are queued, translate them in a batch
         5. Repeat until all terms are translated
 
+        The batch plan (see plan_glossary_batches) is kept in self.last_glossary_plan.
+
         Args:
             proper_nouns: List of proper nouns
             target_language: Target language for translations
@@ -1720,61 +3505,24 @@ class UnifiedTranslationPipeline:
 
         full_glossary = {**existing_glossary}
         batch_size = 100
-        queue = []
-        already_queued = set()
+
+        # Group similar terms into batches (indexed, no pairwise comparison of all terms)
+        plan = plan_glossary_batches(new_nouns, batch_size=batch_size)
+        self.last_glossary_plan = plan
 
         if stream_print:
             print(f"Starting batch translation with {len(new_nouns)} terms (batch size: {batch_size})")
+            print(f"Planned {len(plan.batches)} batches, "
+                  f"{sum(1 for group in plan.groups if len(group) > 1)} groups of similar terms ({plan.metric})")
 
-        while new_nouns:
-            # Take the first term from alphabetically sorted list
-            term = new_nouns.pop(0)
-
-            if term in already_queued:
-                continue
-
-            # Add current term to queue
-            queue.append(term)
-            already_queued.add(term)
-
-            # Find and add similar terms for consistency
-            similar_terms = find_similar_terms(term, new_nouns, already_queued)
-            for similar_term in similar_terms:
-                queue.append(similar_term)
-                already_queued.add(similar_term)
-                # Also remove from new_nouns to avoid re-adding
-                if similar_term in new_nouns:
-                    new_nouns.remove(similar_term)
-
-            # If queue reaches batch size, translate
-            if len(queue) >= batch_size:
-                if stream_print:
-                    print(f"\nTranslating batch of {len(queue)} terms...")
-
-                batch_glossary = self.client.generate_glossary(
-                    self.model,
-                    queue,
-                    target_language,
-                    context,
-                    stream_print,
-                    existing_glossary=full_glossary  # Pass existing glossary for partial word matching
-                )
-
-                full_glossary.update(batch_glossary)
-
-                if stream_print and batch_glossary:
-                    print(f"  ✓ Translated {len(batch_glossary)} terms")
-
-                queue.clear()
-
-        # Translate remaining terms in queue
-        if queue:
+        for batch_idx, batch in enumerate(plan.batches):
             if stream_print:
-                print(f"\nTranslating final batch of {len(queue)} terms...")
+                label = "final batch" if batch_idx == len(plan.batches) - 1 else "batch"
+                print(f"\nTranslating {label} of {len(batch)} terms...")
 
             batch_glossary = self.client.generate_glossary(
                 self.model,
-                queue,
+                batch,
                 target_language,
                 context,
                 stream_print,
@@ -1840,7 +3588,7 @@ class UnifiedTranslationPipeline:
 
     def export_output(
         self,
-        result: Dict[str, Any],
+        result: Union[TranslationResult, Dict[str, Any]],
         output_type: str = "markdown",
         file_path: Optional[str] = None,
         use_llm_alignment: bool = True
@@ -1848,9 +3596,11 @@ class UnifiedTranslationPipeline:
         """
         Export translation result to file
 
+        Markdown, JSON and NDJSON are streamed to the file paragraph by paragraph.
+
         Args:
             result: Translation result from translate_document_with_pdf
-            output_type: Output format ("markdown", "json", "bilingual")
+            output_type: Output format ("markdown", "json", "ndjson", "bilingual")
             file_path: Output file path (if None, returns content as string)
             use_llm_alignment: Whether to use LLM-based alignment for bilingual output (default: True)
 
@@ -1858,24 +3608,31 @@ class UnifiedTranslationPipeline:
             File path if saved, or content as string
         """
         if output_type == "json":
-            content = json.dumps(result, ensure_ascii=False, indent=2)
+            chunks = iter_json(result)
+        elif output_type == "ndjson":
+            chunks = iter_ndjson(result)
         elif output_type == "markdown":
-            content = self._format_as_markdown(result)
+            chunks = self._iter_markdown(result)
         elif output_type == "bilingual":
-            content = self._format_as_bilingual(result, use_llm_alignment)
+            chunks = iter([self._format_as_bilingual(result, use_llm_alignment)])
         else:
             raise ValueError(f"Unknown output type: {output_type}")
 
         if file_path:
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
             with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+                for chunk in chunks:
+                    f.write(chunk)
             return file_path
         else:
-            return content
+            return "".join(chunks)
 
-    def _format_as_markdown(self, result: Dict[str, Any]) -> str:
+    def _format_as_markdown(self, result: Union[TranslationResult, Dict[str, Any]]) -> str:
         """Format result as markdown with hyperlink format info"""
+        return "".join(self._iter_markdown(result))
+
+    def _iter_markdown(self, result: Union[TranslationResult, Dict[str, Any]]) -> Iterator[str]:
+        """Stream result as markdown: header lines, then the translation paragraph by paragraph"""
         output = []
 
         output.append("# TRPG PDF 翻译结果\n")
@@ -1896,9 +3653,11 @@ class UnifiedTranslationPipeline:
             output.append("\n")
 
         output.append("## 译文\n")
-        output.append(result.get("updated_translation", result.get("translated_text", "")))
-
-        return "\n".join(output)
+        yield "\n".join(output) + "\n"
+        if isinstance(result, TranslationResult):
+            yield from result.iter_translation()
+        else:
+            yield result.get("updated_translation", result.get("translated_text", ""))
 
 
     def _format_as_bilingual(self, result: Dict[str, Any], use_llm_alignment: bool = True) -> str:
@@ -1947,16 +3706,30 @@ class UnifiedTranslationPipeline:
             output.append("> " + original_text.replace("\n", "\n> "))
             return "\n".join(output)
 
+        # Tagged translations are paired with their source paragraphs by ID, without alignment
+        sources = split_into_paragraphs(original_text)
+        paragraph_translations = result.get("paragraph_translations")
+        if paragraph_translations and len(paragraph_translations) == len(sources) and all(paragraph_translations):
+            output.append("\n\n".join(
+                render_aligned_pair([source], [target]) for source, target in zip(sources, paragraph_translations)
+            ))
+            return "\n".join(output)
+
+        if self.bilingual_alignment == "local":
+            output.append(self._align_bilingual_locally(original_text, translation_text, result.get("glossary")))
+            return "\n".join(output)
+
         # Use LLM-based alignment
         try:
-            aligned_text = self.client.align_bilingual_text(
-                model=self.model,
-                english_text=original_text,
-                chinese_text=translation_text,
-                stream_print=False,
-                window_char_limit=4000,
-                overlap_chars=500
-            )
+            with self._request_slot():
+                aligned_text = self.client.align_bilingual_text(
+                    model=self.model,
+                    english_text=original_text,
+                    chinese_text=translation_text,
+                    stream_print=False,
+                    window_char_limit=4000,
+                    overlap_chars=500
+                )
             output.append(aligned_text)
         except Exception as e:
             # Fallback to simple format if LLM alignment fails
@@ -1968,6 +3741,65 @@ class UnifiedTranslationPipeline:
 
         return "\n".join(output)
 
+    def _align_bilingual_locally(
+        self,
+        original_text: str,
+        translation_text: str,
+        glossary: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Align source and translated paragraphs locally, using the LLM only for low-confidence spans
+
+        Args:
+            original_text: Source text
+            translation_text: Translated text
+            glossary: Translation glossary used as alignment anchors
+
+        Returns:
+            Bilingual aligned markdown
+        """
+        sources = split_into_paragraphs(original_text)
+        targets = split_into_paragraphs(translation_text)
+        pairs = BilingualAligner(glossary).align(sources, targets)
+        sections = [
+            render_aligned_pair([sources[idx] for idx in pair.source], [targets[idx] for idx in pair.target])
+            for pair in pairs
+        ]
+        spans = find_low_confidence_spans(pairs)
+        print(f"  ✓ Aligned {len(sources)} source and {len(targets)} translated paragraphs locally "
+              f"({len(spans)} low-confidence spans)")
+        if not spans or not is_bilingual_llm_fallback_enabled():
+            return "\n\n".join(section for section in sections if section)
+
+        def align_span(span: Tuple[int, int]) -> str:
+            first, end = span
+            with self._request_slot():
+                return self.client.align_bilingual_text(
+                    model=self.model,
+                    english_text="\n\n".join(sources[idx] for pair in pairs[first:end] for idx in pair.source),
+                    chinese_text="\n\n".join(targets[idx] for pair in pairs[first:end] for idx in pair.target),
+                    stream_print=False
+                )
+
+        aligned_spans = 0
+        executor = ContextThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(spans))))
+        try:
+            futures = {executor.submit(align_span, span): span for span in spans}
+            for future in as_completed(futures):
+                first, end = futures[future]
+                try:
+                    aligned = future.result()
+                except Exception as e:
+                    # Keep the local alignment of this span
+                    print(f"Warning: LLM alignment of pairs {first + 1}-{end} failed ({e}), keeping local alignment")
+                    continue
+                sections[first:end] = [aligned] + [""] * (end - first - 1)
+                aligned_spans += 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        print(f"  ✓ {aligned_spans}/{len(spans)} low-confidence spans aligned by LLM")
+        return "\n\n".join(section for section in sections if section)
+
     def _save_glossary_to_file(self, glossary: Dict[str, str], file_path: str) -> bool:
         """
         保存译名表到文件
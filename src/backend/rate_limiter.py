@@ -0,0 +1,292 @@
+"""
+Rate Limiter for SiliconFlow API quotas
+
+Token-bucket limiter for requests-per-minute (RPM) and tokens-per-minute (TPM)
+quotas. Bucket state lives in a small JSON file guarded by an exclusive file lock,
+so every thread and every process on the host using the same API key draws from
+the same budget. Prompt tokens are estimated before a request is sent and
+reconciled against the usage reported at the end of the stream.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Any, Iterator, Union
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: limiter is shared between threads only
+    FCNTL_AVAILABLE = False
+
+DEFAULT_STATE_DIR = Path.home() / ".trpg_pdf_translator" / "rate_limit"
+
+# One limiter per state file, shared by all clients in the process
+_DEFAULT_LIMITERS: Dict[str, "RateLimiter"] = {}
+_DEFAULT_LIMITERS_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    """Token-bucket limiter for RPM/TPM quotas shared through a locked state file"""
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        state_path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            rpm: Requests per minute (0 or None disables the request bucket)
+            tpm: Tokens per minute (0 or None disables the token bucket)
+            state_path: Shared state file; without it the limiter only coordinates
+                        threads of the current process
+        """
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.state_path = Path(state_path).expanduser() if state_path else None
+        self.total_wait_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._memory_state: Dict[str, float] = {}
+        if self.state_path is not None:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        """True if at least one quota is configured"""
+        return self.rpm > 0 or self.tpm > 0
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, float]]:
+        """Load bucket state under the thread lock (and file lock), then persist it"""
+        with self._lock:
+            if self.state_path is None or not FCNTL_AVAILABLE:
+                yield self._memory_state
+                return
+
+            with open(self.state_path, "a+", encoding="utf-8") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    try:
+                        state = json.loads(raw) if raw.strip() else {}
+                    except json.JSONDecodeError:
+                        state = {}
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _refill(self, state: Dict[str, float], now: float) -> None:
+        """Refill both buckets for the time elapsed since the last update"""
+        updated = state.get("updated")
+        if updated is None:
+            state["requests"] = float(self.rpm)
+            state["tokens"] = float(self.tpm)
+        else:
+            elapsed = max(0.0, now - updated)
+            state["requests"] = min(float(self.rpm), state.get("requests", 0.0) + elapsed * self.rpm / 60.0)
+            state["tokens"] = min(float(self.tpm), state.get("tokens", 0.0) + elapsed * self.tpm / 60.0)
+        state["updated"] = now
+
+    def try_acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Take one request and the estimated tokens if both buckets allow it
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+
+        Returns:
+            0.0 if the request may be sent now, otherwise seconds to wait before retrying
+        """
+        if not self.enabled:
+            return 0.0
+
+        # A single request larger than the whole quota would never fit
+        if self.tpm:
+            estimated_tokens = min(estimated_tokens, self.tpm)
+
+        with self._locked_state() as state:
+            now = time.time()
+            self._refill(state, now)
+
+            wait = max(0.0, state.get("blocked_until", 0.0) - now)
+            if self.rpm and state["requests"] < 1:
+                wait = max(wait, (1 - state["requests"]) * 60.0 / self.rpm)
+            if self.tpm and state["tokens"] < estimated_tokens:
+                wait = max(wait, (estimated_tokens - state["tokens"]) * 60.0 / self.tpm)
+
+            if wait > 0:
+                return wait
+
+            if self.rpm:
+                state["requests"] -= 1
+            if self.tpm:
+                state["tokens"] -= estimated_tokens
+            return 0.0
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Block until the request fits both quotas
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+
+        Returns:
+            Total seconds waited
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(estimated_tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        self.total_wait_seconds += waited
+        return waited
+
+    async def acquire_async(self, estimated_tokens: int = 0) -> float:
+        """
+        Wait without blocking the event loop until the request fits both quotas
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+
+        Returns:
+            Total seconds waited
+        """
+        waited = 0.0
+        while True:
+            # try_acquire locks and reads the shared state file: keep it off the event loop thread
+            wait = await asyncio.to_thread(self.try_acquire, estimated_tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        self.total_wait_seconds += waited
+        return waited
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct the token bucket with the usage reported by the API
+
+        Args:
+            estimated_tokens: Tokens taken in try_acquire
+            actual_tokens: Total tokens (prompt + completion) reported by the API
+        """
+        if not self.tpm or actual_tokens <= 0:
+            return
+        estimated_tokens = min(estimated_tokens, self.tpm)
+        with self._locked_state() as state:
+            self._refill(state, time.time())
+            # May go negative: the overdraft delays the following requests
+            state["tokens"] = min(float(self.tpm), state["tokens"] + estimated_tokens - actual_tokens)
+
+    async def reconcile_async(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct the token bucket without blocking the event loop on the state file lock
+
+        Args:
+            estimated_tokens: Tokens taken in try_acquire
+            actual_tokens: Total tokens (prompt + completion) reported by the API
+        """
+        if not self.tpm or actual_tokens <= 0:
+            return
+        await asyncio.to_thread(self.reconcile, estimated_tokens, actual_tokens)
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Pause all users of this limiter, e.g. after a 429 response
+
+        Args:
+            seconds: Seconds from now during which no request is admitted
+        """
+        if not self.enabled or seconds <= 0:
+            return
+        with self._locked_state() as state:
+            state["blocked_until"] = max(state.get("blocked_until", 0.0), time.time() + seconds)
+
+    async def block_for_async(self, seconds: float) -> None:
+        """
+        Pause all users of this limiter without blocking the event loop on the state file lock
+
+        Args:
+            seconds: Seconds from now during which no request is admitted
+        """
+        if not self.enabled or seconds <= 0:
+            return
+        await asyncio.to_thread(self.block_for, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get limiter configuration and wait time of this process
+
+        Returns:
+            Dictionary with quotas, state file and total seconds waited
+        """
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "state_path": str(self.state_path) if self.state_path else None,
+            "total_wait_seconds": round(self.total_wait_seconds, 3)
+        }
+
+
+def get_default_rate_limiter(
+    api_key: Optional[str] = None,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None
+) -> Optional[RateLimiter]:
+    """
+    Get the process-wide limiter configured by SILICONFLOW_RPM / SILICONFLOW_TPM
+
+    The state file is derived from the API key, so processes using the same
+    account share one budget.
+
+    Args:
+        api_key: API key the quotas belong to
+        rpm: Requests per minute of this key (reads from SILICONFLOW_RPM env var if not provided)
+        tpm: Tokens per minute of this key (reads from SILICONFLOW_TPM env var if not provided)
+
+    Returns:
+        Shared RateLimiter instance, or None if no quota is configured
+    """
+    from_env = rpm is None and tpm is None
+    if rpm is None:
+        rpm = int(os.getenv("SILICONFLOW_RPM", "0") or 0) if from_env else 0
+    if tpm is None:
+        tpm = int(os.getenv("SILICONFLOW_TPM", "0") or 0) if from_env else 0
+    if rpm <= 0 and tpm <= 0:
+        return None
+
+    # The state file override only applies to the quotas configured in the environment
+    state_path = os.getenv("SILICONFLOW_RATE_LIMIT_STATE") if from_env else None
+    if not state_path:
+        key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        state_path = str(DEFAULT_STATE_DIR / f"{key_hash}.json")
+
+    cache_key = f"{state_path}:{rpm}:{tpm}"
+    with _DEFAULT_LIMITERS_LOCK:
+        limiter = _DEFAULT_LIMITERS.get(cache_key)
+        if limiter is None:
+            limiter = RateLimiter(rpm, tpm, state_path)
+            _DEFAULT_LIMITERS[cache_key] = limiter
+        return limiter
+
+
+__all__ = [
+    "RateLimiter",
+    "get_default_rate_limiter",
+]
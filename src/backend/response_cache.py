@@ -0,0 +1,242 @@
+"""
+Persistent Response Cache for LLM completions
+
+Content-addressed SQLite store placed in front of the chat completion calls.
+Keys are SHA-256 hashes of the request parameters (model, messages, temperature,
+top_p, max_tokens, ...), so rerunning a book only calls the API for windows whose
+prompt actually changed. The store is size-capped with least-recently-used eviction;
+triggers keep the total size and entry count in a meta table, so writes only scan
+the table when the cap is exceeded.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Any, Union
+
+# Default location shares the CLI configuration directory
+DEFAULT_CACHE_PATH = Path.home() / ".trpg_pdf_translator" / "cache" / "llm_responses.sqlite3"
+
+# One cache instance per database file, shared by all clients in the process
+_DEFAULT_CACHES: Dict[str, "ResponseCache"] = {}
+_DEFAULT_CACHES_LOCK = threading.Lock()
+
+
+class ResponseCache:
+    """SQLite-backed content-addressed cache with LRU eviction"""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_size_mb: Optional[float] = None
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            path: Database file path (reads from LLM_CACHE_PATH env var if not provided)
+            max_size_mb: Size cap for stored responses in megabytes
+                         (reads from LLM_CACHE_MAX_MB env var if not provided, default: 512)
+        """
+        self.path = Path(path or os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH).expanduser()
+        if max_size_mb is None:
+            max_size_mb = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta ("
+                " name TEXT PRIMARY KEY,"
+                " value INTEGER NOT NULL)"
+            )
+            # Running totals, computed once for stores created before the meta table existed
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value)"
+                " SELECT 'total_size', COALESCE(SUM(size), 0) FROM responses"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (name, value) SELECT 'entries', COUNT(*) FROM responses"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_totals_insert AFTER INSERT ON responses BEGIN"
+                " UPDATE cache_meta SET value = value + NEW.size WHERE name = 'total_size';"
+                " UPDATE cache_meta SET value = value + 1 WHERE name = 'entries'; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_totals_delete AFTER DELETE ON responses BEGIN"
+                " UPDATE cache_meta SET value = value - OLD.size WHERE name = 'total_size';"
+                " UPDATE cache_meta SET value = value - 1 WHERE name = 'entries'; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_totals_update AFTER UPDATE OF size ON responses BEGIN"
+                " UPDATE cache_meta SET value = value + NEW.size - OLD.size WHERE name = 'total_size'; END"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(**fields: Any) -> str:
+        """
+        Build a content-addressed key from request fields
+
+        Args:
+            **fields: JSON-serializable request fields (e.g., model, messages, temperature)
+
+        Returns:
+            Hex SHA-256 digest of the canonical JSON encoding
+        """
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response and mark it as recently used
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached response dictionary, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a response and evict least-recently-used entries over the size cap
+
+        Args:
+            key: Key from make_key
+            value: JSON-serializable response dictionary
+        """
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_size_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            # An upsert (not INSERT OR REPLACE) so the update trigger sees the replaced size
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+                " last_access = excluded.last_access",
+                (key, payload, size, now, now)
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        """Delete least-recently-used entries until the total size fits the cap"""
+        total = self._meta_locked("total_size")
+        while total > self.max_size_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                total -= size
+                if total <= self.max_size_bytes:
+                    break
+
+    def _meta_locked(self, name: str) -> int:
+        """Running total kept by the triggers"""
+        row = self._conn.execute("SELECT value FROM cache_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters of this process and store size
+        """
+        with self._lock:
+            entries, size = self._meta_locked("entries"), self._meta_locked("total_size")
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size_bytes
+        }
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def is_cache_enabled() -> bool:
+    """
+    Check the LLM_CACHE_ENABLED opt-out flag
+
+    Returns:
+        False if LLM_CACHE_ENABLED is set to 0/false/no, True otherwise
+    """
+    return os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_default_response_cache() -> ResponseCache:
+    """
+    Get the process-wide cache for the configured database path
+
+    Returns:
+        Shared ResponseCache instance
+    """
+    path = str(Path(os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH).expanduser())
+    with _DEFAULT_CACHES_LOCK:
+        cache = _DEFAULT_CACHES.get(path)
+        if cache is None:
+            cache = ResponseCache(path)
+            _DEFAULT_CACHES[path] = cache
+        return cache
+
+
+__all__ = [
+    "ResponseCache",
+    "is_cache_enabled",
+    "get_default_response_cache",
+    "DEFAULT_CACHE_PATH",
+]
@@ -0,0 +1,139 @@
+"""
+Run Journal for resumable translations
+
+Append-only JSON Lines file in the output directory that records every finished
+stage of translate_document_with_pdf: the parse result, the extracted proper
+nouns, the glossary, each translated window and the post-edited translation.
+Records are keyed by a hash of their inputs, so a resumed run reuses exactly the
+work whose inputs did not change and redoes the rest. A record cut off by a
+crash is ignored on load.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+JOURNAL_VERSION = 1
+
+
+def fingerprint_file(file_path: Union[str, Path]) -> str:
+    """
+    Hash a file's content
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """Append-only record of completed pipeline stages and windows"""
+
+    def __init__(self, path: Union[str, Path], resume: bool = False):
+        """
+        Open a journal
+
+        Args:
+            path: Journal file (JSON Lines)
+            resume: If True, load the existing records and append to them;
+                    otherwise start a new journal
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.restored = 0
+        self._records: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            self._load()
+        else:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"type": "journal", "version": JOURNAL_VERSION, "created": time.time()}) + "\n")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a content hash from the inputs of a stage
+
+        Args:
+            *parts: JSON-serializable inputs (texts, settings, glossary entries)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written record of an interrupted run
+                continue
+            if isinstance(record, dict) and "key" in record:
+                self._records[(record["type"], record["key"])] = record.get("value")
+
+        # Terminate a cut-off last line so new records start on their own line
+        if content and not content.endswith("\n"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+    def get(self, record_type: str, key: str) -> Optional[Any]:
+        """
+        Look up a completed record
+
+        Args:
+            record_type: Stage name (e.g., "parse", "window")
+            key: Key from make_key
+
+        Returns:
+            Recorded value, or None if the stage has not completed with these inputs
+        """
+        with self._lock:
+            value = self._records.get((record_type, key))
+            if value is not None:
+                self.restored += 1
+            return value
+
+    def put(self, record_type: str, key: str, value: Any) -> None:
+        """
+        Append a completed record and flush it to disk
+
+        Args:
+            record_type: Stage name (e.g., "parse", "window")
+            key: Key from make_key
+            value: JSON-serializable result of the stage
+        """
+        line = json.dumps(
+            {"type": record_type, "key": key, "time": time.time(), "value": value},
+            ensure_ascii=False, default=str
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._records[(record_type, key)] = value
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+__all__ = [
+    "RunJournal",
+    "fingerprint_file",
+]
@@ -0,0 +1,339 @@
+"""
+Vectorized Term Similarity Engine
+
+Character n-gram similarity between glossary terms computed with NumPy. Terms are
+indexed as sets of padded, case-folded character trigrams. An inverted index whose
+postings are ordered by term size turns a batch of queries into (query, candidate)
+pairs in one vectorized expansion; the size bounds of the Jaccard / cosine threshold
+prune the postings before expansion, and shared n-gram counts, scores, thresholds
+and top-k selection are array operations. Engines are cached per term list.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SIMILARITY_METRICS = ("jaccard", "cosine")
+
+# Number of (query, candidate) pairs expanded at once
+PAIR_BLOCK_SIZE = 4_000_000
+
+# Shared n-grams required between the prefixes of a candidate pair (prefix filtering)
+PREFIX_OVERLAP = 3
+
+# Number of indexed term lists kept in memory
+ENGINE_CACHE_SIZE = 4
+
+_ENGINE_CACHE: "OrderedDict[Tuple[str, ...], TermSimilarityEngine]" = OrderedDict()
+_ENGINE_CACHE_LOCK = threading.Lock()
+
+
+def char_ngrams(term: str, n: int = 3) -> List[str]:
+    """
+    Get the distinct character n-grams of a case-folded term, padded with one space at both ends
+
+    Args:
+        term: Term
+        n: N-gram length (default: 3)
+
+    Returns:
+        N-grams in order of first occurrence
+    """
+    padded = f" {term.lower()} "
+    if len(padded) < n:
+        return [padded]
+    return list(dict.fromkeys(padded[i:i + n] for i in range(len(padded) - n + 1)))
+
+
+class TermSimilarityEngine:
+    """N-gram set index with batched Jaccard / cosine neighbor search"""
+
+    def __init__(self, terms: Sequence[str], n: int = 3):
+        """
+        Index terms
+
+        Args:
+            terms: Terms to index (their positions are the indices returned by searches)
+            n: Character n-gram length (default: 3)
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for TermSimilarityEngine")
+        self.terms = list(terms)
+        self.n = n
+
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for term in self.terms:
+            for gram in char_ngrams(term, n):
+                indices.append(vocabulary.setdefault(gram, len(vocabulary)))
+            indptr.append(len(indices))
+        raw_indices = np.array(indices, dtype=np.int64)
+
+        # N-gram ids are ranks by document frequency, rarest first, so row prefixes hold the rarest n-grams
+        frequencies = np.bincount(raw_indices, minlength=len(vocabulary))
+        ranks = np.empty(len(vocabulary), dtype=np.int64)
+        ranks[np.argsort(frequencies, kind="stable")] = np.arange(len(vocabulary), dtype=np.int64)
+        self._vocabulary = {gram: int(ranks[gram_id]) for gram, gram_id in vocabulary.items()}
+        self._num_grams = max(1, len(vocabulary))
+
+        self._indptr = np.array(indptr, dtype=np.int64)
+        self.sizes = np.diff(self._indptr)
+        owners = np.repeat(np.arange(len(self.terms), dtype=np.int64), self.sizes)
+        ranked = ranks[raw_indices]
+        order = np.lexsort((ranked, owners))
+        self._indices = ranked[order]
+        # Globally sorted (term, n-gram) keys for membership tests
+        self._member_keys = owners * self._num_grams + self._indices
+        self._size_span = int(self.sizes.max(initial=0)) + 1
+        self._prefix_indexes: Dict[Tuple[float, str], Tuple["np.ndarray", "np.ndarray"]] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @staticmethod
+    def _min_overlap_fraction(threshold: float, metric: str) -> float:
+        """Fraction of a set's n-grams another set must share to reach the threshold"""
+        # J(A, B) >= t needs |A ∩ B| >= t|A|; cos(A, B) >= t needs |A ∩ B| >= t²|A|
+        return threshold if metric == "jaccard" else threshold ** 2
+
+    def _min_overlaps(self, sizes: "np.ndarray", threshold: float, metric: str) -> "np.ndarray":
+        """Shared n-grams a set of each size needs with any set to reach the threshold"""
+        return np.ceil(self._min_overlap_fraction(threshold, metric) * sizes - 1e-9).astype(np.int64)
+
+    def _prefix_lengths(self, sizes: "np.ndarray", threshold: float, metric: str) -> "np.ndarray":
+        """
+        Number of rarest n-grams of which two similar sets share PREFIX_OVERLAP
+
+        With an overlap of at least m = _min_overlaps(size), the k rarest shared n-grams
+        lie within the first size - m + k n-grams of both sets.
+        """
+        return np.minimum(sizes, sizes - self._min_overlaps(sizes, threshold, metric) + PREFIX_OVERLAP)
+
+    def _prefix_index(self, threshold: float, metric: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Postings of the row prefixes, ordered by (n-gram, term size, term) so size bounds select ranges"""
+        cache_key = (threshold, metric)
+        index = self._prefix_indexes.get(cache_key)
+        if index is None:
+            owners = np.repeat(np.arange(len(self.terms), dtype=np.int64), self.sizes)
+            positions = np.arange(len(self._indices), dtype=np.int64) - self._indptr[owners]
+            in_prefix = positions < self._prefix_lengths(self.sizes, threshold, metric)[owners]
+            grams, owners = self._indices[in_prefix], owners[in_prefix]
+            order = np.lexsort((owners, self.sizes[owners], grams))
+            index = (grams[order] * self._size_span + self.sizes[owners[order]], owners[order])
+            self._prefix_indexes[cache_key] = index
+        return index
+
+    def _size_bounds(self, sizes: "np.ndarray", threshold: float, metric: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Candidate size range that can reach the threshold for each query size"""
+        fraction = self._min_overlap_fraction(threshold, metric)
+        if fraction <= 0:
+            return np.zeros_like(sizes), np.full_like(sizes, self._size_span)
+        # |A ∩ B| <= min(|A|, |B|), so the required overlap bounds both sizes
+        low, high = fraction * sizes, sizes / fraction
+        return np.ceil(low - 1e-9).astype(np.int64), np.floor(high + 1e-9).astype(np.int64)
+
+    def _search(
+        self,
+        indptr: "np.ndarray",
+        indices: "np.ndarray",
+        threshold: float,
+        top_k: Optional[int],
+        metric: str,
+        exclude_self: bool,
+        upper_only: bool
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Scored (query, candidate) pairs at or above the threshold, best first per query
+
+        Query rows hold n-gram ranks in ascending order (-1 for n-grams unknown to the
+        index, which sort first). Candidates share PREFIX_OVERLAP n-grams (or their whole
+        required overlap, if smaller) between the query prefix and the indexed prefix
+        and pass the size bounds; their exact overlap is then counted with membership
+        tests against the indexed rows.
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError(f"Unknown similarity metric: {metric}. Supported: {', '.join(SIMILARITY_METRICS)}")
+        posting_keys, posting_terms = self._prefix_index(threshold, metric)
+        query_sizes = np.diff(indptr)
+        entry_queries = np.repeat(np.arange(len(query_sizes), dtype=np.int64), query_sizes)
+        positions = np.arange(len(indices), dtype=np.int64) - indptr[entry_queries]
+        probe = (positions < self._prefix_lengths(query_sizes, threshold, metric)[entry_queries]) & (indices >= 0)
+        low, high = self._size_bounds(query_sizes[entry_queries], threshold, metric)
+        starts = np.searchsorted(posting_keys, indices * self._size_span + np.clip(low, 0, self._size_span))
+        ends = np.searchsorted(
+            posting_keys, indices * self._size_span + np.clip(high, -1, self._size_span - 1), side="right"
+        )
+        lengths = np.where(probe, np.maximum(ends - starts, 0), 0)
+
+        pair_queries: List["np.ndarray"] = []
+        pair_terms: List["np.ndarray"] = []
+        pair_scores: List["np.ndarray"] = []
+        num_terms = max(1, len(self.terms))
+        # Blocks hold whole queries and expand to about PAIR_BLOCK_SIZE probe hits
+        query_ends = np.r_[0, np.cumsum(lengths)][indptr[1:]]
+        first_query = 0
+        while first_query < len(query_sizes):
+            offset = query_ends[first_query - 1] if first_query else 0
+            last_query = int(np.searchsorted(query_ends, offset + PAIR_BLOCK_SIZE, side="right"))
+            last_query = max(last_query, first_query + 1)
+            block_start, block_end = indptr[first_query], indptr[last_query]
+            first_query = last_query
+            block_lengths = lengths[block_start:block_end]
+            total = int(block_lengths.sum())
+            if not total:
+                continue
+
+            first = np.repeat(starts[block_start:block_end] - (np.cumsum(block_lengths) - block_lengths), block_lengths)
+            candidates = posting_terms[first + np.arange(total, dtype=np.int64)]
+            queries = np.repeat(entry_queries[block_start:block_end], block_lengths)
+            keep = candidates > queries if upper_only else candidates != queries
+            if exclude_self:
+                queries, candidates = queries[keep], candidates[keep]
+            keys, prefix_shared = np.unique(queries * num_terms + candidates, return_counts=True)
+            queries, candidates = keys // num_terms, keys % num_terms
+            required = np.minimum(
+                PREFIX_OVERLAP,
+                self._min_overlaps(np.maximum(query_sizes[queries], self.sizes[candidates]), threshold, metric)
+            )
+            keep = prefix_shared >= required
+            queries, candidates = queries[keep], candidates[keep]
+            if not len(queries):
+                continue
+
+            # Exact overlap: look up every query n-gram in the candidate's row
+            pair_sizes = query_sizes[queries]
+            pair_ends = np.cumsum(pair_sizes)
+            grams = indices[np.repeat(indptr[queries] - (pair_ends - pair_sizes), pair_sizes)
+                            + np.arange(int(pair_ends[-1]), dtype=np.int64)]
+            lookup = np.repeat(candidates * self._num_grams, pair_sizes) + grams
+            found = np.minimum(np.searchsorted(self._member_keys, lookup), len(self._member_keys) - 1)
+            hits = (self._member_keys[found] == lookup) & (grams >= 0)
+            # Hits per pair: running count read at the end of each pair's entries
+            running = np.r_[0, np.cumsum(hits)]
+            shared = running[pair_ends] - running[pair_ends - pair_sizes]
+
+            size_b = self.sizes[candidates]
+            if metric == "jaccard":
+                scores = shared / (pair_sizes + size_b - shared)
+            else:
+                scores = shared / np.sqrt(pair_sizes * size_b)
+            keep = scores >= threshold
+            pair_queries.append(queries[keep])
+            pair_terms.append(candidates[keep])
+            pair_scores.append(scores[keep])
+
+        queries = np.concatenate(pair_queries) if pair_queries else np.zeros(0, dtype=np.int64)
+        candidates = np.concatenate(pair_terms) if pair_terms else np.zeros(0, dtype=np.int64)
+        scores = np.concatenate(pair_scores) if pair_scores else np.zeros(0)
+        order = np.lexsort((candidates, -scores, queries))
+        queries, candidates, scores = queries[order], candidates[order], scores[order]
+        if top_k is not None and len(queries):
+            group_starts = np.flatnonzero(np.r_[True, queries[1:] != queries[:-1]])
+            ranks = np.arange(len(queries)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(queries)]))
+            keep = ranks < top_k
+            queries, candidates, scores = queries[keep], candidates[keep], scores[keep]
+        return queries, candidates, scores
+
+    def query(
+        self,
+        queries: Sequence[str],
+        threshold: float = 0.5,
+        top_k: Optional[int] = 5,
+        metric: str = "jaccard"
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Find the indexed terms most similar to each query
+
+        Args:
+            queries: Query strings
+            threshold: Minimum similarity (default: 0.5)
+            top_k: Maximum neighbors per query, None for all above the threshold (default: 5)
+            metric: "jaccard" or "cosine" over n-gram sets (default: "jaccard")
+
+        Returns:
+            For each query, (term index, similarity) pairs, most similar first
+        """
+        indptr = [0]
+        indices: List[int] = []
+        for query in queries:
+            indices.extend(sorted(self._vocabulary.get(gram, -1) for gram in char_ngrams(query, self.n)))
+            indptr.append(len(indices))
+        pairs = self._search(
+            np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            threshold, top_k, metric, exclude_self=False, upper_only=False
+        )
+        return self._group(pairs, len(queries))
+
+    def neighbors(
+        self,
+        threshold: float = 0.5,
+        top_k: Optional[int] = None,
+        metric: str = "jaccard",
+        later_only: bool = False
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Find the similar terms of every indexed term in one pass
+
+        Args:
+            threshold: Minimum similarity (default: 0.5)
+            top_k: Maximum neighbors per term, None for all above the threshold (default: None)
+            metric: "jaccard" or "cosine" over n-gram sets (default: "jaccard")
+            later_only: Only return neighbors with a higher index than the term
+
+        Returns:
+            For each term, (term index, similarity) pairs, most similar first
+        """
+        pairs = self._search(
+            self._indptr, self._indices, threshold, top_k, metric, exclude_self=True, upper_only=later_only
+        )
+        return self._group(pairs, len(self.terms))
+
+    @staticmethod
+    def _group(pairs: Tuple["np.ndarray", "np.ndarray", "np.ndarray"], num_queries: int) -> List[List[Tuple[int, float]]]:
+        """Split sorted (query, candidate, score) arrays into per-query lists"""
+        queries, candidates, scores = pairs
+        grouped: List[List[Tuple[int, float]]] = [[] for _ in range(num_queries)]
+        for query, candidate, score in zip(queries.tolist(), candidates.tolist(), scores.tolist()):
+            grouped[query].append((candidate, score))
+        return grouped
+
+
+def get_similarity_engine(terms: Union[Mapping[str, str], Iterable[str]]) -> TermSimilarityEngine:
+    """
+    Get the similarity engine for a term list, building it on first use
+
+    Args:
+        terms: Glossary mapping (its keys are indexed) or iterable of terms
+
+    Returns:
+        TermSimilarityEngine over the terms
+    """
+    key = tuple(terms.keys() if isinstance(terms, Mapping) else terms)
+    with _ENGINE_CACHE_LOCK:
+        engine = _ENGINE_CACHE.get(key)
+        if engine is not None:
+            _ENGINE_CACHE.move_to_end(key)
+            return engine
+
+    engine = TermSimilarityEngine(key)
+    with _ENGINE_CACHE_LOCK:
+        _ENGINE_CACHE[key] = engine
+        while len(_ENGINE_CACHE) > ENGINE_CACHE_SIZE:
+            _ENGINE_CACHE.popitem(last=False)
+    return engine
+
+
+__all__ = [
+    "TermSimilarityEngine",
+    "char_ngrams",
+    "get_similarity_engine",
+    "NUMPY_AVAILABLE",
+    "SIMILARITY_METRICS",
+]
@@ -0,0 +1,264 @@
+"""
+Term Clustering for Glossary Generation
+
+Groups extracted proper nouns into glossary batches so that similar spellings
+("Iomedae", "Iomedaean") are translated in the same request. The grouping is the
+one of the original alphabetical scan: each unqueued term pulls in the later
+unqueued terms whose SequenceMatcher ratio reaches the threshold. Instead of
+comparing every pair, candidates come from a character bigram inverted index and
+are filtered by the length and character-count upper bounds of the ratio before
+the ratio itself is computed.
+
+Blocking only misses pairs that share no bigram at all (their matching characters
+are all isolated, e.g. "Abdes" / "Kadae"), which are coincidences rather than
+spelling variants.
+
+Large term lists (more than RATIO_MAX_TERMS) are grouped by character trigram
+Jaccard similarity from the vectorized similarity engine instead, which finds the
+neighbors of every term in one pass.
+"""
+
+import os
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Handle both package and direct imports
+try:
+    from .similarity_engine import TermSimilarityEngine, SIMILARITY_METRICS, NUMPY_AVAILABLE
+except ImportError:
+    from backend.similarity_engine import TermSimilarityEngine, SIMILARITY_METRICS, NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Similarity used for grouping: SequenceMatcher "ratio" or an n-gram metric of the similarity engine
+CLUSTERING_METRICS = ("auto", "ratio") + SIMILARITY_METRICS
+
+# Default minimum similarity per metric
+DEFAULT_MIN_SIMILARITY = {"ratio": 0.6, "jaccard": 0.5, "cosine": 0.6}
+
+# "auto" groups up to this many terms by ratio, larger lists by n-gram Jaccard similarity
+RATIO_MAX_TERMS = 5000
+
+
+def term_bigrams(term: str) -> Set[str]:
+    """
+    Get the character bigrams of a lowercased term, padded at both ends
+
+    Args:
+        term: Lowercased term
+
+    Returns:
+        Set of bigrams
+    """
+    padded = f" {term} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+@dataclass
+class GlossaryBatchPlan:
+    """Glossary batches and the similarity groups they were built from"""
+    batches: List[List[str]] = field(default_factory=list)
+    groups: List[List[str]] = field(default_factory=list)
+    # Ratio computations (ratio metric) or neighbor pairs found (n-gram metrics)
+    comparisons: int = 0
+    metric: str = "ratio"
+    min_similarity: float = 0.6
+
+    @property
+    def num_terms(self) -> int:
+        return sum(len(batch) for batch in self.batches)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the plan to a JSON-serializable dictionary
+
+        Returns:
+            Dictionary with batches, groups of similar terms and the number of similarity comparisons
+        """
+        return {
+            "num_terms": self.num_terms,
+            "num_batches": len(self.batches),
+            "batches": self.batches,
+            "similar_groups": [group for group in self.groups if len(group) > 1],
+            "comparisons": self.comparisons,
+            "metric": self.metric,
+            "min_similarity": self.min_similarity
+        }
+
+
+class TermIndex:
+    """Bigram inverted index over a sorted term list"""
+
+    def __init__(self, terms: List[str]):
+        """
+        Build the index
+
+        Args:
+            terms: Terms in scan order
+        """
+        self.terms = terms
+        self.comparisons = 0
+        self._folded = [term.lower() for term in terms]
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, folded in enumerate(self._folded):
+            for bigram in term_bigrams(folded):
+                postings[bigram].append(idx)
+
+        if NUMPY_AVAILABLE:
+            self._postings = {bigram: np.array(indices, dtype=np.int64) for bigram, indices in postings.items()}
+            self._lengths = np.array([len(folded) for folded in self._folded], dtype=np.int64)
+            # Character counts per term for the multiset-intersection bound (SequenceMatcher.quick_ratio)
+            columns: Dict[str, int] = {}
+            for folded in self._folded:
+                for char in folded:
+                    columns.setdefault(char, len(columns))
+            self._char_counts = np.zeros((len(terms), max(1, len(columns))), dtype=np.int32)
+            for idx, folded in enumerate(self._folded):
+                for char, count in Counter(folded).items():
+                    self._char_counts[idx, columns[char]] = count
+        else:
+            self._postings = postings
+            self._counters = [Counter(folded) for folded in self._folded]
+
+    def _candidates(self, idx: int, taken: List[bool], min_similarity: float) -> List[int]:
+        """Later untaken terms that share a bigram and pass the ratio upper bounds"""
+        folded = self._folded[idx]
+        length = len(folded)
+
+        if NUMPY_AVAILABLE:
+            candidates = np.unique(np.concatenate([self._postings[bigram] for bigram in term_bigrams(folded)]))
+            candidates = candidates[candidates > idx]
+            candidates = candidates[~taken[candidates]]
+            totals = self._lengths[candidates] + length
+            # ratio = 2 * matches / total <= 2 * min(length) / total and <= 2 * shared characters / total
+            keep = 2 * np.minimum(self._lengths[candidates], length) >= min_similarity * totals
+            candidates, totals = candidates[keep], totals[keep]
+            shared = np.minimum(self._char_counts[candidates], self._char_counts[idx]).sum(axis=1)
+            return candidates[2 * shared >= min_similarity * totals].tolist()
+
+        candidates = set()
+        for bigram in term_bigrams(folded):
+            for other in self._postings[bigram]:
+                if other > idx and not taken[other]:
+                    candidates.add(other)
+        counter = self._counters[idx]
+        result = []
+        for other in sorted(candidates):
+            other_length = len(self._folded[other])
+            total = length + other_length
+            if 2 * min(length, other_length) < min_similarity * total:
+                continue
+            shared = sum((counter & self._counters[other]).values())
+            if 2 * shared >= min_similarity * total:
+                result.append(other)
+        return result
+
+    def similar_after(self, idx: int, taken: List[bool], min_similarity: float = 0.6) -> List[int]:
+        """
+        Find later terms that are similar to a term and not taken yet
+
+        Args:
+            idx: Index of the term
+            taken: Flags of terms already assigned to a group (a NumPy bool array when NumPy is available)
+            min_similarity: Minimum SequenceMatcher ratio (default: 0.6)
+
+        Returns:
+            Indices of similar terms in scan order
+        """
+        matcher = SequenceMatcher(None)
+        matcher.set_seq1(self._folded[idx])
+        matches = []
+        for other in self._candidates(idx, taken, min_similarity):
+            matcher.set_seq2(self._folded[other])
+            self.comparisons += 1
+            if matcher.ratio() >= min_similarity:
+                matches.append(other)
+        return matches
+
+
+def resolve_clustering_metric(metric: Optional[str], num_terms: int) -> str:
+    """
+    Resolve the grouping similarity from the argument or environment
+
+    Args:
+        metric: "auto", "ratio", "jaccard" or "cosine"
+                (reads from GLOSSARY_SIMILARITY_METRIC env var if not provided, default: "auto")
+        num_terms: Number of terms to group
+
+    Returns:
+        "ratio", "jaccard" or "cosine"
+    """
+    metric = (metric or os.getenv("GLOSSARY_SIMILARITY_METRIC", "auto")).strip().lower()
+    if metric not in CLUSTERING_METRICS:
+        raise ValueError(f"Unknown similarity metric: {metric}. Supported: {', '.join(CLUSTERING_METRICS)}")
+    if metric == "auto":
+        metric = "jaccard" if NUMPY_AVAILABLE and num_terms > RATIO_MAX_TERMS else "ratio"
+    elif metric != "ratio" and not NUMPY_AVAILABLE:
+        print(f"Warning: numpy not available, grouping glossary terms by ratio instead of {metric}")
+        metric = "ratio"
+    return metric
+
+
+def plan_glossary_batches(
+    terms: Iterable[str],
+    batch_size: int = 100,
+    min_similarity: Optional[float] = None,
+    metric: Optional[str] = None
+) -> GlossaryBatchPlan:
+    """
+    Group terms into glossary batches that keep similar terms together
+
+    Terms are scanned alphabetically. Each term not yet queued is queued together
+    with every later unqueued term whose similarity reaches min_similarity, and a
+    batch is closed once batch_size terms are queued.
+
+    Args:
+        terms: Terms to translate (duplicates and empty terms are dropped)
+        batch_size: Number of queued terms that closes a batch (default: 100)
+        min_similarity: Minimum similarity within a group (default: DEFAULT_MIN_SIMILARITY of the metric)
+        metric: "ratio" (SequenceMatcher), "jaccard" or "cosine" (character trigrams), or "auto"
+                (reads from GLOSSARY_SIMILARITY_METRIC env var if not provided, default: "auto")
+
+    Returns:
+        GlossaryBatchPlan with batches in translation order
+    """
+    sorted_terms = sorted(set(term for term in terms if term))
+    metric = resolve_clustering_metric(metric, len(sorted_terms))
+    if min_similarity is None:
+        min_similarity = DEFAULT_MIN_SIMILARITY[metric]
+    taken = np.zeros(len(sorted_terms), dtype=bool) if NUMPY_AVAILABLE else [False] * len(sorted_terms)
+    plan = GlossaryBatchPlan(metric=metric, min_similarity=min_similarity)
+    queue: List[str] = []
+
+    if metric == "ratio":
+        index = TermIndex(sorted_terms)
+        similar_after = lambda idx: index.similar_after(idx, taken, min_similarity)
+    else:
+        # Neighbors of every term in one pass; the scan keeps the later ones not taken yet
+        neighbors = TermSimilarityEngine(sorted_terms).neighbors(min_similarity, metric=metric, later_only=True)
+        plan.comparisons = sum(len(found) for found in neighbors)
+        similar_after = lambda idx: sorted(other for other, _ in neighbors[idx] if not taken[other])
+
+    for idx, term in enumerate(sorted_terms):
+        if taken[idx]:
+            continue
+        taken[idx] = True
+        group = [term]
+        for other in similar_after(idx):
+            taken[other] = True
+            group.append(sorted_terms[other])
+        plan.groups.append(group)
+        queue.extend(group)
+
+        if len(queue) >= batch_size:
+            plan.batches.append(queue)
+            queue = []
+
+    if queue:
+        plan.batches.append(queue)
+    if metric == "ratio":
+        plan.comparisons = index.comparisons
+    return plan
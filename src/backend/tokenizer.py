@@ -0,0 +1,351 @@
+"""
+Token counting and per-model token budgets
+
+Pluggable token counters used to size translation windows and max_tokens:
+- HuggingFace tokenizer.json of the served model (offline, most accurate)
+- tiktoken encodings
+- Calibrated estimator (no dependencies) that counts CJK characters, word
+  pieces, digit runs and symbols separately, so English prose, CJK output and
+  dense stat blocks are all estimated reasonably
+
+Budgets are resolved per model from a small table and environment overrides.
+"""
+
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Optional tokenizer backends
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+# Per-message overhead of the chat format (role markers, separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+
+_ESTIMATOR_PATTERN = re.compile(
+    r'(?P<cjk>[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef])'
+    r'|(?P<word>[A-Za-z\u00c0-\u024f\u0370-\u03ff\u0400-\u04ff]+)'
+    r'|(?P<digits>\d+)'
+    r'|(?P<symbol>\S)'
+)
+
+
+class TokenCounter(ABC):
+    """Base class for token counters"""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count tokens in a text
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Count prompt tokens of a chat message list
+
+        Args:
+            messages: Message list with role and content
+
+        Returns:
+            Number of prompt tokens including per-message overhead
+        """
+        return sum(self.count(message.get("content") or "") + MESSAGE_TOKEN_OVERHEAD for message in messages)
+
+
+class EstimatingTokenCounter(TokenCounter):
+    """Dependency-free token estimator calibrated for BPE tokenizers"""
+
+    name = "estimate"
+
+    def __init__(
+        self,
+        cjk_tokens_per_char: float = 1.0,
+        chars_per_word_token: float = 6.0,
+        digits_per_token: float = 3.0,
+        scale: float = 1.0
+    ):
+        """
+        Initialize estimator
+
+        Args:
+            cjk_tokens_per_char: Tokens per CJK character
+            chars_per_word_token: Letters per token inside a word (each word costs at least one token)
+            digits_per_token: Digits per token inside a number
+            scale: Overall correction factor (e.g., measured tokenizer tokens / estimated tokens)
+        """
+        self.cjk_tokens_per_char = cjk_tokens_per_char
+        self.chars_per_word_token = chars_per_word_token
+        self.digits_per_token = digits_per_token
+        self.scale = scale
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        cjk = words = digits = symbols = 0
+        for match in _ESTIMATOR_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == "cjk":
+                cjk += 1
+            elif kind == "word":
+                words += math.ceil(len(match.group()) / self.chars_per_word_token)
+            elif kind == "digits":
+                digits += math.ceil(len(match.group()) / self.digits_per_token)
+            else:
+                symbols += 1
+        return math.ceil((cjk * self.cjk_tokens_per_char + words + digits + symbols) * self.scale)
+
+
+class TiktokenCounter(TokenCounter):
+    """Token counter backed by a tiktoken encoding"""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        """
+        Initialize tiktoken counter
+
+        Args:
+            encoding_name: tiktoken encoding name
+        """
+        if not TIKTOKEN_AVAILABLE:
+            raise ImportError("tiktoken is not installed. Install with: pip install tiktoken")
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class HuggingFaceTokenCounter(TokenCounter):
+    """Token counter backed by a local tokenizer.json (e.g., the served model's tokenizer)"""
+
+    name = "huggingface"
+
+    def __init__(self, tokenizer_path: str):
+        """
+        Initialize HuggingFace tokenizer counter
+
+        Args:
+            tokenizer_path: Path to a tokenizer.json file
+        """
+        if not TOKENIZERS_AVAILABLE:
+            raise ImportError("tokenizers is not installed. Install with: pip install tokenizers")
+        self.tokenizer = HFTokenizer.from_file(str(tokenizer_path))
+        self.name = f"huggingface:{tokenizer_path}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+_DEFAULT_COUNTER: Optional[TokenCounter] = None
+_DEFAULT_COUNTER_LOCK = threading.Lock()
+
+
+def create_token_counter(spec: Optional[str] = None) -> TokenCounter:
+    """
+    Create a token counter
+
+    Args:
+        spec: "auto", "estimate", "tiktoken", "tiktoken:<encoding>" or a path to tokenizer.json
+              (reads from TOKENIZER env var if not provided, default: "auto").
+              "auto" uses TOKENIZER_PATH if set, then tiktoken, then the estimator.
+
+    Returns:
+        TokenCounter instance (falls back to the estimator if a backend cannot be loaded)
+    """
+    spec = (spec or os.getenv("TOKENIZER", "auto")).strip()
+    scale = float(os.getenv("TOKENIZER_ESTIMATE_SCALE", "1.0"))
+
+    candidates = []
+    if spec == "auto":
+        tokenizer_path = os.getenv("TOKENIZER_PATH")
+        if tokenizer_path:
+            candidates.append(lambda: HuggingFaceTokenCounter(tokenizer_path))
+        if TIKTOKEN_AVAILABLE:
+            candidates.append(lambda: TiktokenCounter())
+    elif spec.startswith("tiktoken"):
+        encoding_name = spec.split(":", 1)[1] if ":" in spec else "cl100k_base"
+        candidates.append(lambda: TiktokenCounter(encoding_name))
+    elif spec != "estimate":
+        candidates.append(lambda: HuggingFaceTokenCounter(spec))
+
+    for factory in candidates:
+        try:
+            return factory()
+        except Exception as e:
+            # Missing package or encoding files that cannot be downloaded offline
+            print(f"Warning: Tokenizer '{spec}' unavailable ({e}), using estimator")
+    return EstimatingTokenCounter(scale=scale)
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    Get the process-wide token counter configured by TOKENIZER / TOKENIZER_PATH
+
+    Returns:
+        Shared TokenCounter instance
+    """
+    global _DEFAULT_COUNTER
+    with _DEFAULT_COUNTER_LOCK:
+        if _DEFAULT_COUNTER is None:
+            _DEFAULT_COUNTER = create_token_counter()
+        return _DEFAULT_COUNTER
+
+
+def set_token_counter(counter: Optional[TokenCounter]) -> None:
+    """
+    Replace the process-wide token counter
+
+    Args:
+        counter: Counter to use, or None to re-create it from the environment on next use
+    """
+    global _DEFAULT_COUNTER
+    with _DEFAULT_COUNTER_LOCK:
+        _DEFAULT_COUNTER = counter
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with the process-wide counter
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens
+    """
+    return get_token_counter().count(text)
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Count prompt tokens of a chat message list with the process-wide counter
+
+    Args:
+        messages: Message list with role and content
+
+    Returns:
+        Number of prompt tokens
+    """
+    return get_token_counter().count_messages(messages)
+
+
+@dataclass
+class ModelTokenBudget:
+    """Token budgets for one model"""
+
+    context_window: int
+    window_tokens: int
+    max_completion_tokens: int
+
+    def completion_tokens(self, source_tokens: int, expansion: float, margin: int = 256) -> int:
+        """
+        Get max_tokens for a response proportional to its source
+
+        Args:
+            source_tokens: Tokens of the text being rewritten/translated
+            expansion: Expected output tokens per source token
+            margin: Fixed headroom added to the estimate
+
+        Returns:
+            max_tokens capped at max_completion_tokens
+        """
+        return max(1, min(self.max_completion_tokens, math.ceil(source_tokens * expansion) + margin))
+
+    def fit_to_context(self, prompt_tokens: int, max_tokens: Optional[int]) -> Optional[int]:
+        """
+        Shrink max_tokens so prompt and completion fit in the context window
+
+        Args:
+            prompt_tokens: Tokens of the request messages
+            max_tokens: Requested max_tokens (None leaves it to the API)
+
+        Returns:
+            Adjusted max_tokens
+        """
+        if max_tokens is None:
+            return None
+        available = self.context_window - prompt_tokens
+        return max(1, min(max_tokens, available)) if available > 0 else max_tokens
+
+
+# Context windows of known models (substring match on the model identifier)
+MODEL_CONTEXT_WINDOWS = {
+    "kimi-k2": 131072,
+    "deepseek-v3": 131072,
+    "deepseek-r1": 131072,
+    "qwen3": 131072,
+    "qwen2.5": 32768,
+    "glm-4": 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+
+def get_model_token_budget(model: Optional[str] = None) -> ModelTokenBudget:
+    """
+    Get token budgets for a model
+
+    Args:
+        model: Model identifier (reads from SILICONFLOW_MODEL env var if not provided)
+
+    Returns:
+        ModelTokenBudget with the context window (MODEL_CONTEXT_WINDOW overrides the table),
+        source tokens per translation window (TRANSLATION_WINDOW_TOKENS, default: 2000)
+        and the completion cap (TRANSLATION_MAX_COMPLETION_TOKENS, default: 8192)
+    """
+    model = (model or os.getenv("SILICONFLOW_MODEL", "")).lower()
+    context_window = os.getenv("MODEL_CONTEXT_WINDOW")
+    if context_window:
+        context_window = int(context_window)
+    else:
+        context_window = next(
+            (size for name, size in MODEL_CONTEXT_WINDOWS.items() if name in model),
+            DEFAULT_CONTEXT_WINDOW
+        )
+    return ModelTokenBudget(
+        context_window=context_window,
+        window_tokens=int(os.getenv("TRANSLATION_WINDOW_TOKENS", "2000")),
+        max_completion_tokens=int(os.getenv("TRANSLATION_MAX_COMPLETION_TOKENS", "8192"))
+    )
+
+
+__all__ = [
+    "TokenCounter",
+    "EstimatingTokenCounter",
+    "TiktokenCounter",
+    "HuggingFaceTokenCounter",
+    "create_token_counter",
+    "get_token_counter",
+    "set_token_counter",
+    "count_tokens",
+    "count_message_tokens",
+    "ModelTokenBudget",
+    "get_model_token_budget",
+    "TIKTOKEN_AVAILABLE",
+    "TOKENIZERS_AVAILABLE",
+]
@@ -0,0 +1,450 @@
+"""
+Translation Memory shared across books
+
+Persistent SQLite store of translated source paragraphs. Rulebooks repeat a lot
+of boilerplate (trait descriptions, conditions, action blurbs), so every book
+looks up its paragraphs before translating:
+- Exact hits (same paragraph up to whitespace) reuse the stored translation
+  without an LLM request
+- Near-duplicates are found with a MinHash index over word shingles (banded LSH
+  buckets in SQLite) and passed to the translation prompt as references
+
+Entries are separated by language pair, hyperlink format and model, since those
+change the shape of the stored translation. Each entry also records the glossary
+terms of its paragraph: an exact hit is only reused when the current glossary
+translates those terms the same way.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Handle both package and direct imports
+try:
+    from .incremental import paragraph_hash
+    from .glossary_matcher import get_glossary_matcher
+except ImportError:
+    from backend.incremental import paragraph_hash
+    from backend.glossary_matcher import get_glossary_matcher
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Default location shares the CLI configuration directory
+DEFAULT_TM_PATH = Path.home() / ".trpg_pdf_translator" / "tm" / "translation_memory.sqlite3"
+
+# MinHash signature: NUM_BANDS bands of ROWS_PER_BAND hashes
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+SHINGLE_WORDS = 3
+
+# Paragraphs shorter than this (headings, table cells, page numbers) are not looked up or stored
+MIN_PARAGRAPH_CHARS = 30
+
+_MASK64 = (1 << 64) - 1
+# Odd multipliers and offsets of the multiply-shift hash family, one pair per permutation
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "little") | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "little"))
+    for i in range(NUM_PERMUTATIONS)
+]
+if NUMPY_AVAILABLE:
+    _PERM_A = np.array([a for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+    _PERM_B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)[:, None]
+
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+
+# One memory instance per database file, shared by all pipelines in the process
+_DEFAULT_MEMORIES: Dict[str, "TranslationMemory"] = {}
+_DEFAULT_MEMORIES_LOCK = threading.Lock()
+
+
+@dataclass
+class TMMatch:
+    """Near-duplicate paragraph found in the translation memory"""
+    source: str
+    translation: str
+    similarity: float
+
+
+def shingle_hashes(paragraph: str) -> List[int]:
+    """
+    Hash the word shingles of a paragraph
+
+    Args:
+        paragraph: Paragraph text
+
+    Returns:
+        Sorted unique 64-bit shingle hashes (empty for paragraphs without words)
+    """
+    words = re.findall(r'\w+', paragraph.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    return sorted(
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in shingles
+    )
+
+
+def minhash_signature(paragraph: str) -> Optional[Tuple[int, ...]]:
+    """
+    Compute the MinHash signature of a paragraph
+
+    Args:
+        paragraph: Paragraph text
+
+    Returns:
+        NUM_PERMUTATIONS 32-bit minimum hashes, or None for paragraphs without words
+    """
+    hashes = shingle_hashes(paragraph)
+    if not hashes:
+        return None
+    if NUMPY_AVAILABLE:
+        values = np.array(hashes, dtype=np.uint64)[None, :]
+        # uint64 arithmetic wraps modulo 2**64 like the pure Python version
+        with np.errstate(over="ignore"):
+            permuted = (_PERM_A * values + _PERM_B) >> np.uint64(32)
+        return tuple(int(value) for value in permuted.min(axis=1))
+    return tuple(
+        min(((a * value + b) & _MASK64) >> 32 for value in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(signature_a: Sequence[int], signature_b: Sequence[int]) -> float:
+    """
+    Estimate the Jaccard similarity of two paragraphs from their signatures
+
+    Args:
+        signature_a: MinHash signature
+        signature_b: MinHash signature
+
+    Returns:
+        Fraction of matching signature positions (0-1)
+    """
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / NUM_PERMUTATIONS
+
+
+def _band_buckets(variant: str, signature: Sequence[int]) -> List[str]:
+    """LSH bucket of each band, namespaced by variant"""
+    return [
+        f"{variant}:{band}:" + ",".join(map(str, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(NUM_BANDS)
+    ]
+
+
+def format_tm_references(matches: Sequence[TMMatch]) -> str:
+    """
+    Format near-duplicate matches as reference translations for a prompt
+
+    Args:
+        matches: Matches to show
+
+    Returns:
+        Reference block for the translation context
+    """
+    lines = ["Reference translations of similar paragraphs from earlier books "
+             "(reuse their wording and terminology where the text is the same):"]
+    for match in matches:
+        lines.append(f"Source: {match.source}\nTranslation: {match.translation}")
+    return "\n\n".join(lines)
+
+
+class TranslationMemory:
+    """SQLite-backed paragraph store with exact and MinHash near-duplicate lookup"""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        fuzzy_threshold: Optional[float] = None
+    ):
+        """
+        Initialize translation memory
+
+        Args:
+            path: Database file path (reads from TM_PATH env var if not provided)
+            fuzzy_threshold: Minimum estimated similarity of a near-duplicate
+                             (reads from TM_FUZZY_THRESHOLD env var if not provided, default: 0.5)
+        """
+        self.path = Path(path or os.getenv("TM_PATH") or DEFAULT_TM_PATH).expanduser()
+        if fuzzy_threshold is None:
+            fuzzy_threshold = float(os.getenv("TM_FUZZY_THRESHOLD", "0.5"))
+        self.fuzzy_threshold = fuzzy_threshold
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                " key TEXT PRIMARY KEY,"
+                " variant TEXT NOT NULL,"
+                " source TEXT NOT NULL,"
+                " translation TEXT NOT NULL,"
+                " signature BLOB,"
+                " model TEXT,"
+                " terms TEXT,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " uses INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(segments)")}
+            if "terms" not in columns:
+                # Databases created before glossary terms were recorded
+                self._conn.execute("ALTER TABLE segments ADD COLUMN terms TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " bucket TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " PRIMARY KEY (bucket, key))"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_variant(
+        source_language: str,
+        target_language: str,
+        use_hyperlink_format: bool,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Build the namespace of entries that can replace each other
+
+        Args:
+            source_language: Source language
+            target_language: Target language
+            use_hyperlink_format: Whether proper nouns are formatted as markdown hyperlinks
+            model: Model that translates (None shares entries across models)
+
+        Returns:
+            Variant string
+        """
+        variant = f"{source_language}|{target_language}|{int(bool(use_hyperlink_format))}"
+        return f"{variant}|{model}" if model else variant
+
+    @staticmethod
+    def _key(variant: str, paragraph: str) -> str:
+        return hashlib.sha256(f"{variant}\n{paragraph_hash(paragraph)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _glossary_terms(paragraph: str, glossary: Optional[Mapping[str, str]]) -> Dict[str, str]:
+        """Glossary entries whose term occurs in the paragraph"""
+        if not glossary:
+            return {}
+        return {term: glossary[term] for term in get_glossary_matcher(glossary).detect(paragraph)}
+
+    @staticmethod
+    def is_eligible(paragraph: str) -> bool:
+        """
+        Check whether a paragraph is long enough to be looked up or stored
+
+        Args:
+            paragraph: Paragraph text
+
+        Returns:
+            True if the paragraph has at least MIN_PARAGRAPH_CHARS non-space characters
+        """
+        return len(re.sub(r'\s+', '', paragraph)) >= MIN_PARAGRAPH_CHARS
+
+    def lookup_exact(
+        self,
+        paragraphs: Sequence[str],
+        variant: str,
+        glossary: Optional[Mapping[str, str]] = None
+    ) -> List[Optional[str]]:
+        """
+        Find stored translations of identical paragraphs
+
+        A stored translation is not reused when a glossary term of the paragraph is
+        missing from its recorded terms or recorded with a different translation.
+
+        Args:
+            paragraphs: Source paragraphs
+            variant: Variant from make_variant
+            glossary: Glossary of the current run
+
+        Returns:
+            Stored translation per paragraph, None if unknown, not eligible or stale
+        """
+        keys = [self._key(variant, paragraph) if self.is_eligible(paragraph) else None for paragraph in paragraphs]
+        rows: Dict[str, Tuple[str, Optional[str]]] = {}
+        wanted = sorted({key for key in keys if key})
+        with self._lock:
+            for offset in range(0, len(wanted), 500):
+                chunk = wanted[offset:offset + 500]
+                for key, translation, terms in self._conn.execute(
+                    f"SELECT key, translation, terms FROM segments WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    rows[key] = (translation, terms)
+
+        found: Dict[str, str] = {}
+        for paragraph, key in zip(paragraphs, keys):
+            if key not in rows:
+                continue
+            translation, terms = rows[key]
+            stored_terms = json.loads(terms) if terms else {}
+            current_terms = self._glossary_terms(paragraph, glossary)
+            if all(stored_terms.get(term) == target for term, target in current_terms.items()):
+                found[key] = translation
+
+        if found:
+            now = time.time()
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE segments SET last_used = ?, uses = uses + 1 WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return [found.get(key) if key else None for key in keys]
+
+    def lookup_fuzzy(self, paragraph: str, variant: str, limit: int = 2) -> List[TMMatch]:
+        """
+        Find near-duplicate paragraphs through the MinHash index
+
+        Args:
+            paragraph: Source paragraph
+            variant: Variant from make_variant
+            limit: Maximum number of matches
+
+        Returns:
+            Matches above the fuzzy threshold, most similar first
+        """
+        if not self.is_eligible(paragraph):
+            return []
+        signature = minhash_signature(paragraph)
+        if signature is None:
+            return []
+        buckets = _band_buckets(variant, signature)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, translation, signature FROM segments WHERE key IN ("
+                f" SELECT DISTINCT key FROM buckets WHERE bucket IN ({','.join('?' * len(buckets))}))",
+                buckets
+            ).fetchall()
+
+        matches = []
+        for source, translation, blob in rows:
+            similarity = estimate_similarity(signature, struct.unpack(_SIGNATURE_FORMAT, blob))
+            if similarity >= self.fuzzy_threshold:
+                matches.append(TMMatch(source, translation, similarity))
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        return matches[:limit]
+
+    def add(
+        self,
+        paragraphs: Sequence[str],
+        translations: Sequence[Optional[str]],
+        variant: str,
+        model: Optional[str] = None,
+        glossary: Optional[Mapping[str, str]] = None
+    ) -> int:
+        """
+        Store translated paragraphs
+
+        Args:
+            paragraphs: Source paragraphs
+            translations: Translation per paragraph (None or empty entries are skipped)
+            variant: Variant from make_variant
+            model: Model that produced the translations
+            glossary: Glossary the translations follow; the entries found in each paragraph are recorded
+
+        Returns:
+            Number of paragraphs stored
+        """
+        now = time.time()
+        segment_rows = []
+        bucket_rows = []
+        for paragraph, translation in zip(paragraphs, translations):
+            if not translation or not self.is_eligible(paragraph):
+                continue
+            key = self._key(variant, paragraph)
+            signature = minhash_signature(paragraph)
+            blob = struct.pack(_SIGNATURE_FORMAT, *signature) if signature else None
+            terms = self._glossary_terms(paragraph, glossary)
+            segment_rows.append((
+                key, variant, paragraph.strip(), translation.strip(), blob, model,
+                json.dumps(terms, ensure_ascii=False, sort_keys=True) if terms else None, now, now
+            ))
+            if signature:
+                bucket_rows.extend((bucket, key) for bucket in _band_buckets(variant, signature))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO segments (key, variant, source, translation, signature, model, terms, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET translation = excluded.translation,"
+                " model = excluded.model, terms = excluded.terms, last_used = excluded.last_used",
+                segment_rows
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO buckets (bucket, key) VALUES (?, ?)", bucket_rows)
+            self._conn.commit()
+        return len(segment_rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all stored paragraphs"""
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.execute("DELETE FROM buckets")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def is_translation_memory_enabled() -> bool:
+    """
+    Check the TM_ENABLED opt-out flag
+
+    Returns:
+        False if TM_ENABLED is set to 0/false/no, True otherwise
+    """
+    return os.getenv("TM_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_default_translation_memory() -> TranslationMemory:
+    """
+    Get the process-wide translation memory for the configured database path
+
+    Returns:
+        Shared TranslationMemory instance
+    """
+    path = str(Path(os.getenv("TM_PATH") or DEFAULT_TM_PATH).expanduser())
+    with _DEFAULT_MEMORIES_LOCK:
+        memory = _DEFAULT_MEMORIES.get(path)
+        if memory is None:
+            memory = TranslationMemory(path)
+            _DEFAULT_MEMORIES[path] = memory
+        return memory
+
+
+__all__ = [
+    "TranslationMemory",
+    "TMMatch",
+    "minhash_signature",
+    "estimate_similarity",
+    "format_tm_references",
+    "is_translation_memory_enabled",
+    "get_default_translation_memory",
+    "DEFAULT_TM_PATH",
+]
@@ -0,0 +1,352 @@
+"""
+Translation Result
+
+Lean result of one translate_document_with_pdf run. Large texts are held once:
+the source text and the translation of every paragraph live in the Document,
+the initial (pre-post-editing) translation is referenced on disk when it was
+exported, and the final translation is only stored as a string when it cannot
+be rebuilt from the paragraph translations.
+
+The result can still be read and written like the former result dictionary
+(result["updated_translation"], result.get("glossary"), ...), so callers and
+exporters work with both. It is a Mapping, not a dict: to_dict() returns the
+former dictionary for json.dumps and code that needs a real dict.
+
+Exporters stream the result: the source and translation are written paragraph
+by paragraph instead of being assembled into one string first. The JSON export
+keeps "updated_translation"; the source text is no longer repeated as
+parse_result["full_text"] but is found in "paragraphs".
+"""
+
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    from .document import Document, PARAGRAPH_SEPARATOR
+except ImportError:
+    from backend.document import Document, PARAGRAPH_SEPARATOR
+
+# Header written above the initial translation in {pdf_filename}_translation_initial.md
+INITIAL_TRANSLATION_HEADER = "# Initial Translation (Before Post-Processing)\n\n"
+
+# Keys of the result dictionary that map to fields instead of stats
+_FIELD_KEYS = ("pdf_path", "source_language", "target_language", "model", "glossary", "proper_nouns")
+
+
+@dataclass
+class TranslationResult(Mapping):
+    """Result of one translation run, readable like the former result dictionary"""
+    pdf_path: str
+    source_language: str
+    target_language: str
+    model: str
+    document: Optional[Document] = None
+    parse: Dict[str, Any] = field(default_factory=dict)
+    glossary: Dict[str, str] = field(default_factory=dict)
+    proper_nouns: List[str] = field(default_factory=list)
+    detected_terms: List[str] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    output_files: Dict[str, str] = field(default_factory=dict)
+    paired: bool = False
+    _translation: Optional[str] = field(default=None, repr=False)
+    _initial_translation: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_run(
+        cls,
+        result: Dict[str, Any],
+        document: Optional[Document] = None,
+        output_files: Optional[Dict[str, str]] = None
+    ) -> "TranslationResult":
+        """
+        Build the result from the working dictionary of a run
+
+        The dictionary is emptied. Without a document, one is built from the parse
+        result's full text and the paragraph translations are attached when they match.
+
+        Args:
+            result: Result dictionary filled by the pipeline stages
+            document: Document of the run, with the final translation per paragraph attached
+            output_files: Files saved so far, kept by reference so later exports show up
+
+        Returns:
+            Translation result
+        """
+        parse = dict(result.pop("parse_result", None) or {})
+        full_text = parse.pop("full_text", None)
+        if document is None and full_text is not None:
+            document = Document(full_text)
+        paragraph_translations = result.pop("paragraph_translations", None)
+        if document is not None and paragraph_translations is not None and document.translations is None \
+                and len(paragraph_translations) == document.num_paragraphs:
+            document.attach_translations(paragraph_translations)
+
+        translation = result.pop("updated_translation", None)
+        initial = result.pop("translated_text", None)
+        if output_files is None:
+            output_files = result.pop("output_files", None) or {}
+        else:
+            result.pop("output_files", None)
+        if initial is not None and initial is translation:
+            initial = None
+        elif initial is not None and "initial_translation" in output_files:
+            # Exported before post-processing: read back from disk on demand
+            initial = None
+        # The final translation is rebuilt from the paragraphs when they hold exactly the same text
+        if translation is not None and document is not None and document.fully_translated \
+                and document.translated_text() == translation:
+            translation = None
+
+        return cls(
+            pdf_path=result.pop("pdf_path", ""),
+            source_language=result.pop("source_language", ""),
+            target_language=result.pop("target_language", ""),
+            model=result.pop("model", ""),
+            document=document,
+            parse=parse,
+            glossary=result.pop("glossary", None) or {},
+            proper_nouns=result.pop("proper_nouns", None) or [],
+            detected_terms=result.pop("all_detected_terms", None) or [],
+            stats=result,
+            output_files=output_files,
+            paired=paragraph_translations is not None and document is not None and document.fully_translated,
+            _translation=translation,
+            _initial_translation=initial
+        )
+
+    @property
+    def translation(self) -> str:
+        """Final translation"""
+        if self._translation is not None:
+            return self._translation
+        return self.document.translated_text() if self.document is not None else ""
+
+    @property
+    def translation_from_paragraphs(self) -> bool:
+        """Whether the final translation is exactly the paragraph translations joined"""
+        return self._translation is None and self.document is not None and self.document.fully_translated
+
+    def initial_translation(self) -> str:
+        """Translation before post-processing (read from its exported file if it was saved)"""
+        if self._initial_translation is not None:
+            return self._initial_translation
+        path = self.output_files.get("initial_translation")
+        if path and Path(path).exists():
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            return text[len(INITIAL_TRANSLATION_HEADER):] if text.startswith(INITIAL_TRANSLATION_HEADER) else text
+        return self.translation
+
+    @property
+    def parse_result(self) -> Dict[str, Any]:
+        """Parse result in the former dictionary form, full_text taken from the document"""
+        parse = dict(self.parse)
+        if self.document is not None:
+            parse["full_text"] = self.document.text
+        return parse
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Former result dictionary, with every text as a string
+
+        Returns:
+            JSON-serializable dictionary (parse_result includes full_text again)
+        """
+        return {key: self[key] for key in self}
+
+    def _keys(self) -> List[str]:
+        keys = list(_FIELD_KEYS) + ["updated_translation", "translated_text", "all_detected_terms"]
+        if self.parse or self.document is not None:
+            keys.append("parse_result")
+        if self.paired:
+            keys.append("paragraph_translations")
+        if self.output_files:
+            keys.append("output_files")
+        return keys + [key for key in self.stats if key not in keys]
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_KEYS:
+            return getattr(self, key)
+        if key == "updated_translation":
+            return self.translation
+        if key == "translated_text":
+            return self.initial_translation()
+        if key == "all_detected_terms":
+            return self.detected_terms
+        if key == "parse_result" and (self.parse or self.document is not None):
+            return self.parse_result
+        if key == "paragraph_translations" and self.paired:
+            return self.document.translations
+        if key == "output_files" and self.output_files:
+            return self.output_files
+        return self.stats[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # Every key is written where __getitem__ reads it from
+        if key in _FIELD_KEYS:
+            setattr(self, key, value)
+        elif key == "updated_translation":
+            self._translation = value
+        elif key == "translated_text":
+            self._initial_translation = value
+        elif key == "all_detected_terms":
+            self.detected_terms = value
+        elif key == "parse_result":
+            parse = dict(value)
+            full_text = parse.pop("full_text", None)
+            if full_text is not None and (self.document is None or self.document.text != full_text):
+                # New source text: the paragraph translations no longer belong to it
+                self._translation = self.translation
+                self.document = Document(full_text)
+                self.paired = False
+            self.parse = parse
+        elif key == "paragraph_translations":
+            if self.document is None:
+                raise ValueError("paragraph_translations needs the document's paragraphs")
+            # The final translation stays as it is, also when it was rebuilt from the paragraphs
+            translation = self.translation
+            self.document.attach_translations(value)
+            self.paired = True
+            if self.document.fully_translated and self.document.translated_text() == translation:
+                self._translation = None
+            else:
+                self._translation = translation
+        elif key == "output_files":
+            self.output_files = value
+        else:
+            self.stats[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def iter_translation(self) -> Iterator[str]:
+        """Final translation in chunks (one per paragraph when built from the paragraphs)"""
+        if not self.translation_from_paragraphs:
+            yield self.translation
+            return
+        for idx, translation in enumerate(self.document.translations):
+            yield PARAGRAPH_SEPARATOR + translation if idx else translation
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Everything except the texts: settings, parse metadata, glossary and statistics
+
+        Returns:
+            JSON-serializable dictionary
+        """
+        summary = {
+            "pdf_path": self.pdf_path,
+            "source_language": self.source_language,
+            "target_language": self.target_language,
+            "model": self.model,
+            "parse_result": self.parse,
+            "proper_nouns": self.proper_nouns,
+            "glossary": self.glossary,
+            "all_detected_terms": self.detected_terms
+        }
+        summary.update(self.stats)
+        if self.output_files:
+            summary["output_files"] = self.output_files
+        return summary
+
+
+def as_translation_result(result: Union[TranslationResult, Dict[str, Any]]) -> TranslationResult:
+    """Wrap a former result dictionary (left unchanged) in a TranslationResult"""
+    if isinstance(result, TranslationResult):
+        return result
+    return TranslationResult.from_run(dict(result))
+
+
+def _json_member(key: str, value: Any, first: bool) -> str:
+    """One member of the top-level object, indented like json.dumps(indent=2)"""
+    encoded = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+    return f"{'' if first else ','}\n  {json.dumps(key)}: {encoded}"
+
+
+def _iter_json_string(chunks: Iterator[str]) -> Iterator[str]:
+    """Encode text chunks as one JSON string, chunk by chunk"""
+    yield '"'
+    for chunk in chunks:
+        yield json.dumps(chunk, ensure_ascii=False)[1:-1]
+    yield '"'
+
+
+def _paragraph_records(result: TranslationResult) -> Iterator[Dict[str, Any]]:
+    """Source and translation of every paragraph"""
+    document = result.document
+    translations = document.translations or []
+    for idx, source in enumerate(document.paragraphs):
+        yield {"id": idx, "source": source, "translation": translations[idx] if translations else None}
+
+
+def iter_json(result: Union[TranslationResult, Dict[str, Any]]) -> Iterator[str]:
+    """
+    Stream the result as one JSON object
+
+    Settings, parse metadata, glossary and statistics come first, then one line per
+    paragraph under "paragraphs" and the final translation as "updated_translation",
+    written paragraph by paragraph.
+
+    Args:
+        result: Translation result or former result dictionary
+
+    Yields:
+        Chunks of the JSON document
+    """
+    result = as_translation_result(result)
+    yield "{"
+    first = True
+    for key, value in result.summary().items():
+        yield _json_member(key, value, first)
+        first = False
+    if result.document is not None:
+        yield ',\n  "paragraphs": ['
+        for record in _paragraph_records(result):
+            yield f"{'' if record['id'] == 0 else ','}\n    {json.dumps(record, ensure_ascii=False)}"
+        yield "\n  ]" if result.document.num_paragraphs else "]"
+    yield ',\n  "updated_translation": '
+    yield from _iter_json_string(result.iter_translation())
+    if result._initial_translation is not None:
+        yield _json_member("translated_text", result._initial_translation, False)
+    yield "\n}\n"
+
+
+def iter_ndjson(result: Union[TranslationResult, Dict[str, Any]]) -> Iterator[str]:
+    """
+    Stream the result as newline-delimited JSON
+
+    The first record ("type": "run") holds the settings, glossary and statistics,
+    followed by one "paragraph" record per paragraph and a "translation" record
+    with the final translation.
+
+    Args:
+        result: Translation result or former result dictionary
+
+    Yields:
+        One JSON record per line
+    """
+    result = as_translation_result(result)
+    yield json.dumps({"type": "run", **result.summary()}, ensure_ascii=False) + "\n"
+    if result.document is not None:
+        for record in _paragraph_records(result):
+            yield json.dumps({"type": "paragraph", **record}, ensure_ascii=False) + "\n"
+    yield '{"type": "translation", "text": '
+    yield from _iter_json_string(result.iter_translation())
+    yield "}\n"
+    if result._initial_translation is not None:
+        yield json.dumps({"type": "initial_translation", "text": result._initial_translation}, ensure_ascii=False) + "\n"
+
+
+__all__ = [
+    "TranslationResult",
+    "as_translation_result",
+    "iter_json",
+    "iter_ndjson",
+    "INITIAL_TRANSLATION_HEADER",
+]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark for paragraph segmentation
+Compares on a synthetic 600-page document (or the page count given on the command line):
+- The previous regex-based split_into_paragraphs, one call
+- The single-pass segmenter, one call
+- Repeated calls on the same text, as in one translation run
+- Windowing the document (create_sliding_windows / split_text_by_strategy)
+Runs offline, no API key required.
+
+Usage:
+    python benchmark_paragraph_segmenter.py [pages]
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.paragraph_segmenter import segment_paragraphs
+from backend.pipeline import create_sliding_windows, split_into_paragraphs, split_text_by_strategy
+
+
+WORDS = ("the of a and to in is that for it with as was on be by from at creature spell "
+         "temple Iomedae Absalom strike damage round level trait hazard ancient vault").split()
+
+# Calls of split_into_paragraphs on the same text in one translation run (windows, strategy, chunks)
+REPEATED_CALLS = 5
+
+
+def legacy_split_into_paragraphs(text):
+    """split_into_paragraphs before the single-pass segmenter"""
+    para_groups = re.split(r'\n\n+', text)
+
+    paragraphs = []
+    for group in para_groups:
+        lines = group.strip().split('\n')
+        if not lines:
+            continue
+
+        merged_lines = []
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
+
+            should_merge = False
+            if re.match(r'^[A-Za-z]+\s*:$', line) or re.match(r'^[A-Za-z]+\s+\(.*?\)\s*$', line):
+                should_merge = True
+            elif re.match(r'^[Hh]azard:', line):
+                should_merge = True
+            elif re.match(r'^AC\s+\d+;', line):
+                should_merge = True
+
+            if should_merge and next_line:
+                merged_lines.append(line + " " + next_line)
+                i += 2
+            else:
+                merged_lines.append(line)
+                i += 1
+
+        para = "\n".join(merged_lines)
+        para_parts = re.split(r'(?=^#{1,6}\s)', para, flags=re.MULTILINE)
+        for part in para_parts:
+            part = part.strip()
+            if part:
+                paragraphs.append(part)
+
+    return paragraphs
+
+
+def make_document(pages, seed=11):
+    """Generate PDF-extracted TRPG text: prose wrapped in lines, headings, stat blocks and split labels"""
+    rng = random.Random(seed)
+
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+
+    blocks = []
+    for page in range(pages):
+        blocks.append(f"## Chapter {page // 20 + 1}: Page {page + 1}")
+        for _ in range(rng.randint(8, 14)):
+            roll = rng.random()
+            if roll < 0.6:
+                # Prose wrapped at about 80 characters, as PDF extraction leaves it
+                words = " ".join(sentence() for _ in range(rng.randint(2, 6))).split()
+                lines, line = [], []
+                for word in words:
+                    line.append(word)
+                    if sum(len(w) + 1 for w in line) > 80:
+                        lines.append(" ".join(line))
+                        line = []
+                lines.append(" ".join(line))
+                blocks.append("\n".join(lines))
+            elif roll < 0.75:
+                blocks.append(f"### Vault Guardian\nCreature {rng.randint(1, 20)}\n"
+                              f"AC {rng.randint(15, 40)};\nFort +{rng.randint(5, 30)}, Ref +{rng.randint(5, 30)}\n"
+                              f"Strike (melee)\njaws +{rng.randint(10, 30)}, Damage 2d8+{rng.randint(1, 12)}")
+            elif roll < 0.85:
+                blocks.append(f"Description:\n{sentence()}\nDisable:\n{sentence()}")
+            elif roll < 0.92:
+                blocks.append(f"Hazard: {rng.choice(WORDS)} trap\n{sentence()}\n  \n{sentence()}")
+            else:
+                blocks.append(f"- {sentence()}\n- {sentence()}\n- {sentence()}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def timed(func, *args, **kwargs):
+    """Run a function and return its result and elapsed seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark(pages):
+    """Benchmark paragraph segmentation of one synthetic document"""
+    print("=" * 80)
+    text = make_document(pages)
+    print(f"{pages} pages, {len(text)} characters")
+    print("=" * 80)
+
+    legacy, legacy_time = timed(legacy_split_into_paragraphs, text)
+    spans, segment_time = timed(segment_paragraphs, text)
+    assert [paragraph.text for paragraph in spans] == legacy
+    print(f"  legacy split_into_paragraphs:     {legacy_time:8.3f}s  ({len(legacy)} paragraphs)")
+    print(f"  single-pass segmenter:            {segment_time:8.3f}s  ({legacy_time / segment_time:.1f}x, identical output)")
+
+    # split_into_paragraphs reuses the paragraphs of recently split texts: only the first call segments
+    _, legacy_repeated = timed(lambda: [legacy_split_into_paragraphs(text) for _ in range(REPEATED_CALLS)])
+    _, repeated = timed(lambda: [split_into_paragraphs(text) for _ in range(REPEATED_CALLS)])
+    print(f"  {REPEATED_CALLS} calls on the same text, legacy:  {legacy_repeated:8.3f}s")
+    print(f"  {REPEATED_CALLS} calls on the same text, current: {repeated:8.3f}s  ({legacy_repeated / repeated:.1f}x)")
+
+    # Windowing sizes every paragraph with the token counter; the split itself is reused
+    _, elapsed = timed(create_sliding_windows, text, "paragraph", window_token_limit=6000)
+    print(f"  create_sliding_windows:           {elapsed:8.3f}s")
+    _, elapsed = timed(split_text_by_strategy, text, "paragraph")
+    print(f"  split_text_by_strategy:           {elapsed:8.3f}s")
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark for glossary term similarity
+Compares, at 1k / 10k / 50k terms (or the sizes given on the command line):
+- Batch planning: legacy pairwise scan, indexed SequenceMatcher plan, vectorized n-gram plan
+- Similar-term lookup of 1000 new terms: SequenceMatcher top-k scan vs one batched engine query
+Quadratic timings that would take minutes are measured on a subset and extrapolated (marked "~").
+Runs offline, no API key required.
+
+Usage:
+    python benchmark_term_similarity.py [sizes...] [--full]
+"""
+
+import sys
+import time
+import heapq
+import random
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.pipeline import find_similar_terms
+from backend.similarity_engine import TermSimilarityEngine
+from backend.term_clustering import plan_glossary_batches
+
+
+CONSONANTS = list("bcdfghjklmnprstvwz") + ["th", "sh", "ch", "kr", "gr", "dr", "st", "br"]
+VOWELS = ["a", "e", "i", "o", "u", "ae", "ei", "ou", "y"]
+CODAS = ["", "", "", "n", "r", "l", "s", "th", "x", "m"]
+PREFIXES = ["Temple of", "Lord", "Lady", "Order of the", "Knights of", "River", "Tower of", "Mount", "Saint"]
+SUFFIXES = ["an", "ian", "s", "'s Rest", "ite", " Keep"]
+
+# Largest term list planned with the pairwise scan; larger sizes are extrapolated
+PAIRWISE_MAX_TERMS = 2000
+
+# Largest term list planned with the indexed ratio plan unless --full is given
+RATIO_MAX_TERMS = 10000
+
+# Queries timed with the scalar lookup; the full query set is extrapolated
+SCALAR_LOOKUP_SAMPLE = 50
+
+
+def make_terms(count, seed=7):
+    """Generate proper-noun-like terms with compound names and spelling variants"""
+    rng = random.Random(seed)
+
+    def name():
+        syllables = rng.randint(2, 3)
+        return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(syllables)).capitalize()
+
+    terms = set()
+    while len(terms) < count:
+        roll = rng.random()
+        if roll < 0.55:
+            terms.add(name())
+        elif roll < 0.8:
+            terms.add(f"{rng.choice(PREFIXES)} {name()}")
+        elif roll < 0.9:
+            terms.add(f"{name()} {name()}")
+        else:
+            base = name()
+            terms.update([base, base + rng.choice(SUFFIXES)])
+    return sorted(terms)[:count]
+
+
+def pairwise_plan(terms, batch_size=100):
+    """Legacy grouping: pop terms alphabetically and compare each with all remaining terms"""
+    remaining = sorted(set(terms))
+    queued, queue, batches = set(), [], []
+    while remaining:
+        term = remaining.pop(0)
+        if term in queued:
+            continue
+        queue.append(term)
+        queued.add(term)
+        for similar_term in find_similar_terms(term, remaining, queued):
+            queue.append(similar_term)
+            queued.add(similar_term)
+            remaining.remove(similar_term)
+        if len(queue) >= batch_size:
+            batches.append(queue)
+            queue = []
+    if queue:
+        batches.append(queue)
+    return batches
+
+
+def scalar_lookup(queries, terms, top_k=2):
+    """Top-k SequenceMatcher neighbors of each query, one pair at a time"""
+    results = []
+    for query in queries:
+        matcher = SequenceMatcher(None, query.lower())
+        scored = []
+        for term in terms:
+            matcher.set_seq2(term.lower())
+            scored.append((matcher.ratio(), term))
+        results.append(heapq.nlargest(top_k, scored))
+    return results
+
+
+def timed(func, *args, **kwargs):
+    """Run a function and return its result and elapsed seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark(size, full=False):
+    """Benchmark planning and lookup at one term list size"""
+    print("=" * 80)
+    print(f"{size} terms")
+    print("=" * 80)
+    terms = make_terms(size)
+
+    # Pairwise scan is quadratic: time a subset and scale by the number of pairs
+    subset = terms[:min(size, PAIRWISE_MAX_TERMS)]
+    _, elapsed = timed(pairwise_plan, subset)
+    if len(subset) < size:
+        elapsed *= (size * (size - 1)) / (len(subset) * (len(subset) - 1))
+        print(f"  pairwise scan (legacy):      ~{elapsed:8.2f}s  (extrapolated from {len(subset)} terms)")
+    else:
+        print(f"  pairwise scan (legacy):       {elapsed:8.2f}s")
+
+    if size <= RATIO_MAX_TERMS or full:
+        plan, elapsed = timed(plan_glossary_batches, terms, metric="ratio")
+        print(f"  indexed ratio plan:           {elapsed:8.2f}s  ({plan.comparisons} ratios, "
+              f"{len(plan.to_dict()['similar_groups'])} groups)")
+    else:
+        print("  indexed ratio plan:           skipped (use --full)")
+
+    plan, elapsed = timed(plan_glossary_batches, terms, metric="jaccard")
+    print(f"  vectorized jaccard plan:      {elapsed:8.2f}s  ({plan.comparisons} neighbor pairs, "
+          f"{len(plan.to_dict()['similar_groups'])} groups)")
+
+    engine, build = timed(TermSimilarityEngine, terms)
+    _, elapsed = timed(engine.neighbors, threshold=0.4, top_k=5)
+    print(f"  engine build / top-5 all:     {build:8.2f}s / {elapsed:.2f}s")
+
+    # Similar-term lookup of new terms against a glossary of this size
+    queries = make_terms(1000, seed=size + 1)
+    _, elapsed = timed(scalar_lookup, queries[:SCALAR_LOOKUP_SAMPLE], terms)
+    elapsed *= len(queries) / SCALAR_LOOKUP_SAMPLE
+    print(f"  lookup 1000, scalar top-2:   ~{elapsed:8.2f}s  (extrapolated from {SCALAR_LOOKUP_SAMPLE} queries)")
+    _, elapsed = timed(engine.query, queries, threshold=0.5, top_k=2)
+    print(f"  lookup 1000, engine top-2:    {elapsed:8.2f}s")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    sizes = [int(arg) for arg in args] or [1000, 10000, 50000]
+    for size in sizes:
+        benchmark(size, full="--full" in sys.argv)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible streaming stub shared by the offline tests
+
+Each test passes a respond(body) callback that turns the request body into the
+reply text; the stub streams it back as chat.completion.chunk server-sent events.
+"""
+
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+TRANSLATE_PROMPT = "Translate the following text:\n\n"
+
+
+def start_stub_server(
+    respond: Callable[[Dict[str, Any]], str],
+    status: int = 200
+) -> Tuple[ThreadingHTTPServer, str, Dict[str, int]]:
+    """
+    Start an OpenAI-compatible streaming stub on a free local port
+
+    Args:
+        respond: Called with the parsed request body, returns the reply text
+                 (runs while the request counts as in flight)
+        status: HTTP status to answer with; anything but 200 returns an error without calling respond
+
+    Returns:
+        Tuple of (server, base_url, stats) where stats tracks requests and peak concurrency
+    """
+    stats = {"requests": 0, "in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with lock:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["peak"] = max(stats["peak"], stats["in_flight"])
+            try:
+                if status != 200:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", "2")
+                    self.end_headers()
+                    self.wfile.write(b"{}")
+                    return
+                reply = respond(body)
+            finally:
+                with lock:
+                    stats["in_flight"] -= 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in [
+                {"choices": [{"index": 0, "delta": {"content": reply}, "finish_reason": None}]},
+                {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+            ]:
+                chunk.update({"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"]})
+                data = f"data: {json.dumps(chunk)}\n\n".encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            data = b"data: [DONE]\n\n"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(data), data))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
+
+
+def window_source(body: Dict[str, Any]) -> str:
+    """Text a translation request asks to translate"""
+    return body["messages"][-1]["content"].split(TRANSLATE_PROMPT, 1)[-1]
+
+
+def prefix_paragraphs(paragraphs: Iterable[str], prefix: str = "译 ") -> str:
+    """Fake translation: prefix every paragraph, keeping a leading paragraph ID marker first"""
+    return "\n\n".join(
+        re.sub(r"^(⟦\d+⟧ )?", lambda match: (match.group(1) or "") + prefix, paragraph)
+        for paragraph in paragraphs
+    )
+
+
+@contextmanager
+def env_override(**values: str) -> Iterator[None]:
+    """Set environment variables for a block or test function, restoring the previous values afterwards"""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
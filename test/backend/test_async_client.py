@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous SiliconFlow client
+Tests the following functionalities:
+- Clients on one event loop share one pooled httpx transport
+- Requests run concurrently on the event loop
+- Repeated requests are answered from the response cache
+- A rate-limited endpoint fails over to another endpoint
+Runs offline against local stub servers, no API key required.
+"""
+
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.async_client import (
+    AsyncSiliconFlowClient,
+    get_shared_async_http_client,
+    close_shared_async_http_client
+)
+from backend.endpoint_router import Endpoint, EndpointRouter
+from backend.metrics import MetricsRegistry
+from backend.response_cache import ResponseCache
+from stub_llm_server import start_stub_server
+
+
+def start_stub(reply="译文", delay=0.0, status=200):
+    """Start a stub that answers every request with reply after delay seconds"""
+    def respond(body):
+        time.sleep(delay)
+        return reply
+
+    return start_stub_server(respond, status)
+
+
+def test_shared_http_pool():
+    """Test that clients on the same event loop share one httpx transport"""
+    print("=" * 80)
+    print("Async Client Shared Pool Test")
+    print("=" * 80)
+
+    server, base_url, stats = start_stub()
+
+    async def run():
+        try:
+            first = AsyncSiliconFlowClient(api_key="test", base_url=base_url, use_cache=False)
+            second = AsyncSiliconFlowClient(api_key="test", base_url=base_url, use_cache=False)
+            pool = get_shared_async_http_client()
+            assert get_shared_async_http_client() is pool
+            assert first._get_client()._client is pool and second._get_client()._client is pool
+            assert first._get_client() is first._get_client()
+
+            translations = await asyncio.gather(
+                first.translate_text("stub-model", "First."),
+                second.translate_text("stub-model", "Second.")
+            )
+            assert translations == ["译文", "译文"] and not pool.is_closed
+        finally:
+            await close_shared_async_http_client()
+        assert pool.is_closed
+
+    asyncio.run(run())
+    assert stats["requests"] == 2
+    print("✓ Two clients sent their requests through one shared httpx pool")
+
+    server.shutdown()
+
+
+def test_concurrent_requests():
+    """Test that gathered requests are in flight at the same time"""
+    print("=" * 80)
+    print("Async Client Concurrency Test")
+    print("=" * 80)
+
+    server, base_url, stats = start_stub(delay=0.2)
+    client = AsyncSiliconFlowClient(api_key="test", base_url=base_url, use_cache=False)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        try:
+            return await asyncio.gather(*[client._stream_chat_completion("m", messages) for _ in range(6)])
+        finally:
+            await close_shared_async_http_client()
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    assert [result["content"] for result in results] == ["译文"] * 6
+    assert stats["requests"] == 6 and stats["peak"] > 1
+    assert elapsed < 6 * 0.2
+    print(f"✓ 6 requests in {elapsed:.2f}s with up to {stats['peak']} in flight")
+
+    server.shutdown()
+
+
+def test_cached_response():
+    """Test that a repeated request is answered from the cache without reaching the endpoint"""
+    print("=" * 80)
+    print("Async Client Response Cache Test")
+    print("=" * 80)
+
+    server, base_url, stats = start_stub()
+    messages = [{"role": "user", "content": "hi"}]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(Path(tmp_dir) / "cache.sqlite3")
+        metrics = MetricsRegistry()
+        client = AsyncSiliconFlowClient(api_key="test", base_url=base_url, cache=cache, use_cache=True, metrics=metrics)
+
+        async def run():
+            try:
+                first = await client._stream_chat_completion("m", messages, stage="translate")
+                second = await client._stream_chat_completion("m", messages, stage="translate")
+                return first, second
+            finally:
+                await close_shared_async_http_client()
+
+        first, second = asyncio.run(run())
+        assert first["content"] == second["content"] == "译文"
+        assert not first.get("cached") and second["cached"]
+        assert stats["requests"] == 1
+        stage = metrics.to_dict()["stages"]["translate"]
+        assert stage["requests"] == 2 and stage["cached"] == 1
+        print("✓ Second request answered from the cache and recorded as cached")
+        cache.close()
+
+    server.shutdown()
+
+
+def test_rate_limited_failover():
+    """Test that a request rejected with 429 is retried on another endpoint"""
+    print("=" * 80)
+    print("Async Client 429 Failover Test")
+    print("=" * 80)
+
+    server_a, url_a, stats_a = start_stub(status=429)
+    server_b, url_b, stats_b = start_stub(reply="from b")
+    router = EndpointRouter([
+        Endpoint(url_a, "test", name="a", weight=10),
+        Endpoint(url_b, "test", name="b"),
+    ])
+    metrics = MetricsRegistry()
+    client = AsyncSiliconFlowClient(api_key="test", router=router, use_cache=False, metrics=metrics)
+
+    async def run():
+        try:
+            return await client._stream_chat_completion("m", [{"role": "user", "content": "hi"}], stage="translate")
+        finally:
+            await close_shared_async_http_client()
+
+    result = asyncio.run(run())
+    assert result["content"] == "from b"
+    assert stats_a["requests"] >= 1 and stats_b["requests"] == 1
+    stats = router.stats()
+    # A 429 cools the endpoint down instead of counting as a failure
+    assert not stats["a"]["healthy"] and stats["a"]["failures"] == 0 and stats["b"]["requests"] == 1
+    assert metrics.to_dict()["stages"]["translate"]["retries"] == 1
+    print("✓ Rate-limited endpoint a cooled down, request failed over to endpoint b")
+
+    server_a.shutdown()
+    server_b.shutdown()
+
+
+if __name__ == "__main__":
+    test_shared_http_pool()
+    test_concurrent_requests()
+    test_cached_response()
+    test_rate_limited_failover()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Test script for batch translation of many PDFs
+Tests the following functionalities:
+- PDFs collected from a directory or a text/JSON manifest
+- Paragraphs repeated across books are extracted for proper nouns only once
+- One shared glossary for all books
+- Windows of all books share one limit on requests in flight, books are translated concurrently
+- Translation memory hits and post-edit requests stay within the same limit
+- Per-book and aggregate throughput, a failed book does not stop the batch
+- Every book's metrics count only its own requests
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.batch import BATCH_SUMMARY_FILE, collect_batch_inputs, unique_paragraphs
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline
+from backend.translation_memory import TranslationMemory
+from stub_llm_server import env_override, prefix_paragraphs, start_stub_server, window_source
+
+BOILERPLATE = "Product Identity: all trademarks, proper names and artwork are reserved."
+
+
+def test_collect_batch_inputs():
+    """Test directory and manifest inputs"""
+    print("=" * 80)
+    print("Batch Input Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        books = root / "books"
+        books.mkdir()
+        for name in ("b.pdf", "a.PDF", "notes.txt"):
+            (books / name).write_bytes(b"%PDF-1.4")
+        (books / "sub").mkdir()
+        (books / "sub" / "a.pdf").write_bytes(b"%PDF-1.4")
+
+        items = collect_batch_inputs(books)
+        assert [item.name for item in items] == ["a", "b"]
+        print("✓ Directory: PDFs sorted, other files and subdirectories ignored")
+
+        manifest = root / "line.txt"
+        manifest.write_text("# Bestiary line\nbooks/b.pdf\n\nbooks/sub/a.pdf  # errata\nbooks/a.PDF\n", encoding="utf-8")
+        items = collect_batch_inputs(manifest)
+        assert [item.name for item in items] == ["b", "a", "a_2"]
+        assert items[1].pdf_path == str(root / "books" / "sub" / "a.pdf")
+        print("✓ Text manifest: comments skipped, relative paths resolved, repeated names made unique")
+
+        manifest = root / "line.json"
+        manifest.write_text(json.dumps([
+            {"pdf": "books/a.PDF", "context": "Pathfinder bestiary", "name": "bestiary"}, "books/b.pdf"
+        ]), encoding="utf-8")
+        items = collect_batch_inputs(manifest)
+        assert [(item.name, item.context) for item in items] == [("bestiary", "Pathfinder bestiary"), ("b", None)]
+        print("✓ JSON manifest with per-book context and name")
+
+        manifest.write_text(json.dumps(["books/missing.pdf"]), encoding="utf-8")
+        for source in (manifest, root / "nothing"):
+            try:
+                collect_batch_inputs(source)
+                raise AssertionError("Expected FileNotFoundError")
+            except FileNotFoundError:
+                pass
+        empty = root / "empty"
+        empty.mkdir()
+        try:
+            collect_batch_inputs(empty)
+            raise AssertionError("Expected ValueError")
+        except ValueError:
+            pass
+        print("✓ Missing PDFs and empty directories rejected")
+
+    unique, total = unique_paragraphs([["A  b", "C"], ["A b", "D", "C"]])
+    assert unique == ["A  b", "C", "D"] and total == 5
+    print("✓ Paragraphs repeated across books removed, whitespace ignored")
+
+
+def start_translation_stub(in_flight, events):
+    """Start a streaming stub that records the requests in flight and which book each window belongs to"""
+    lock = threading.Lock()
+
+    def respond(body):
+        source = window_source(body)
+        book = source.split("Book ", 1)[1][0] if "Book " in source else "?"
+        with lock:
+            in_flight.append(book)
+            events.append(list(in_flight))
+        time.sleep(0.1)
+        with lock:
+            in_flight.remove(book)
+        return prefix_paragraphs(source.split("\n\n"))
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def make_book_text(book):
+    """Pages of a book: its own paragraphs plus the boilerplate every book of the line repeats"""
+    pages = []
+    for page in range(4):
+        paragraphs = [f"Book {book} page {page} paragraph {i}: the Vault Guardian of Absalom. " * 4 for i in range(6)]
+        pages.append("\n\n".join(paragraphs + [BOILERPLATE]))
+    return "\n\n".join(pages)
+
+
+@env_override(TRANSLATION_WINDOW_TOKENS="200")
+def test_translate_batch():
+    """Test shared glossary, deduplicated noun extraction and the global request limit"""
+    print("=" * 80)
+    print("Batch Translation Test")
+    print("=" * 80)
+
+    in_flight, events = [], []
+    server, base_url = start_translation_stub(in_flight, events)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False,
+        glossary_enforcement="local",
+        translation_protocol="tagged"
+    )
+
+    parse_calls = []
+
+    def parse_pdf(pdf_path, **kwargs):
+        name = Path(pdf_path).stem
+        parse_calls.append(name)
+        if name == "broken":
+            raise Exception("Failed to parse PDF: MinerU task failed")
+        time.sleep(0.2)  # MinerU round trip
+        return {"full_text": make_book_text(name[-1]), "total_pages": 4, "pages": []}
+
+    noun_texts = []
+
+    def extract_proper_nouns_from_file(text, **kwargs):
+        noun_texts.append(text)
+        return ["Vault Guardian", "Absalom"]
+
+    glossary_requests = []
+
+    def generate_glossary_from_nouns(nouns, *args, **kwargs):
+        glossary_requests.append(list(nouns))
+        return {noun: "译" + noun for noun in nouns}
+
+    pipeline.parse_pdf = parse_pdf
+    pipeline.extract_proper_nouns_from_file = extract_proper_nouns_from_file
+    pipeline.generate_glossary_from_nouns = generate_glossary_from_nouns
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books = Path(tmp_dir) / "books"
+        books.mkdir()
+        for name in ("book1", "book2", "book3", "broken"):
+            (books / f"{name}.pdf").write_bytes(b"%PDF-1.4 " + name.encode())
+        output_dir = Path(tmp_dir) / "out"
+
+        start = time.perf_counter()
+        summary = pipeline.translate_batch(
+            str(books), str(output_dir), existing_glossary={"Absalom": "阿卜萨隆"},
+            max_concurrency=2, parse_workers=4, active_books=3
+        )
+        elapsed = time.perf_counter() - start
+
+        # Parsing is concurrent: four 0.2s parses take about 0.2s, not 0.8s
+        assert sorted(parse_calls) == ["book1", "book2", "book3", "broken"]
+        assert summary["throughput"]["aggregate"]["stage_seconds"]["parse"] < 0.6
+        print(f"✓ 4 PDFs parsed concurrently in {summary['throughput']['aggregate']['stage_seconds']['parse']:.2f}s")
+
+        assert len(noun_texts) == 1 and noun_texts[0].count(BOILERPLATE) == 1
+        assert summary["paragraphs"] == {"total": 3 * 4 * 7, "unique": 3 * 4 * 6 + 1}
+        assert glossary_requests == [["Vault Guardian"]]
+        assert summary["glossary"] == {"Absalom": "阿卜萨隆", "Vault Guardian": "译Vault Guardian"}
+        print(f"✓ Proper nouns extracted once from {summary['paragraphs']['unique']}/"
+              f"{summary['paragraphs']['total']} unique paragraphs, one shared glossary")
+
+        # One limit across books: never more than 2 requests in flight, windows of different books interleave
+        assert max(len(snapshot) for snapshot in events) <= 2
+        assert any(len(set(snapshot)) > 1 for snapshot in events)
+        assert pipeline.request_limiter is None
+        print(f"✓ {len(events)} window requests, at most 2 in flight across books, books translated concurrently")
+
+        books_by_name = {book["name"]: book for book in summary["throughput"]["books"]}
+        assert books_by_name["broken"]["status"] == "failed" and "MinerU" in books_by_name["broken"]["error"]
+        for name in ("book1", "book2", "book3"):
+            book = books_by_name[name]
+            assert book["status"] == "translated" and book["windows"] > 1
+            assert book["characters_per_second"] > 0
+            book_dir = output_dir / name
+            translation = (book_dir / f"{name}.md").read_text(encoding="utf-8")
+            assert f"译 Book {name[-1]} page 3 paragraph 5" in translation
+            glossary_text = (book_dir / f"{name}_glossary.txt").read_text(encoding="utf-8")
+            assert "译Vault Guardian" in glossary_text
+            # The last book in each snapshot is the one whose request just arrived
+            metrics = json.loads((book_dir / f"{name}_metrics.json").read_text(encoding="utf-8"))
+            assert metrics["document"] == f"{name}.pdf"
+            assert metrics["stages"]["translate"]["requests"] == sum(
+                snapshot[-1] == name[-1] for snapshot in events
+            )
+        aggregate = summary["throughput"]["aggregate"]
+        assert aggregate["translated"] == 3 and aggregate["failed"] == 1 and aggregate["characters"] > 0
+        assert json.loads((output_dir / BATCH_SUMMARY_FILE).read_text(encoding="utf-8"))["throughput"] == summary["throughput"]
+        assert (output_dir / "batch_glossary.txt").exists()
+        print("✓ Metrics of every book count only its own requests")
+        print(f"✓ 3 books translated, 1 failed, {aggregate['characters_per_second']} chars/s aggregate "
+              f"({aggregate['books_in_parallel']} books in parallel, batch took {elapsed:.1f}s)")
+
+    server.shutdown()
+
+
+@env_override(TRANSLATION_WINDOW_TOKENS="200")
+def test_batch_limit_with_memory_hits():
+    """Test that books with memory hits and LLM post-editing keep to the shared request limit"""
+    print("=" * 80)
+    print("Batch Request Limit Test")
+    print("=" * 80)
+
+    kinds = []
+
+    def respond(body):
+        user = body["messages"][-1]["content"]
+        if "Update this translation:\n\n" in user:
+            kinds.append("post_edit")
+            reply = user.split("Update this translation:\n\n", 1)[1]
+        else:
+            kinds.append("translate")
+            reply = prefix_paragraphs(window_source(body).split("\n\n"))
+        time.sleep(0.1)
+        return reply
+
+    server, base_url, stats = start_stub_server(respond)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = UnifiedTranslationPipeline(
+            model="stub-model",
+            client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+            translation_memory=TranslationMemory(Path(tmp_dir) / "tm.sqlite3"),
+            use_translation_memory=True,
+            glossary_enforcement="llm"
+        )
+        pipeline.parse_pdf = lambda pdf_path, **kwargs: {
+            "full_text": make_book_text(Path(pdf_path).stem[-1]), "total_pages": 4, "pages": []
+        }
+        books = Path(tmp_dir) / "books"
+        books.mkdir()
+        for name in ("book1", "book2", "book3"):
+            (books / f"{name}.pdf").write_bytes(b"%PDF-1.4 " + name.encode())
+
+        summaries = []
+        for run in ("first", "second"):
+            kinds.clear()
+            summaries.append(pipeline.translate_batch(
+                str(books), str(Path(tmp_dir) / run), auto_extract_nouns=False,
+                existing_glossary={"Absalom": "阿卜萨隆"}, use_hyperlink_format=False,
+                max_concurrency=2, active_books=3
+            ))
+        summary = summaries[-1]
+        assert all(book["status"] == "translated" for book in summary["throughput"]["books"])
+        translation = (Path(tmp_dir) / "second" / "book1" / "book1.md").read_text(encoding="utf-8")
+        assert BOILERPLATE in translation and "译 Book 1 page 3 paragraph 5" in translation
+        # Second run: every paragraph is a memory hit, only the post-edits of the three books go out
+        assert kinds == ["post_edit"] * 3 and stats["peak"] <= 2
+        print(f"✓ {stats['requests']} requests, second run translated from memory and post-edited, "
+              f"at most {stats['peak']} in flight")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_collect_batch_inputs()
+    test_translate_batch()
+    test_batch_limit_with_memory_hits()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for the local bilingual aligner
+Tests the following functionalities:
+- Paragraphs are paired by length and glossary / hyperlink / number anchors, including merged paragraphs
+- Headings are merged and source paragraphs quoted in the bilingual output
+- Bilingual export aligns a book-sized text locally in seconds
+- Only low-confidence spans are sent to the LLM
+Runs offline against a local stub server, no API key required.
+"""
+
+import os
+import sys
+import time
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.bilingual_aligner import AlignedPair, BilingualAligner, find_low_confidence_spans, render_aligned_pair
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline
+from stub_llm_server import start_stub_server
+
+
+GLOSSARY = {"Iomedae": "艾奥梅黛", "Absalom": "押沙龙", "Armored Cave Bear": "披甲洞穴熊"}
+
+WORDS = "the of a and to in is that for it with as was on be by from at".split()
+
+
+def make_book(num_paragraphs, seed=1):
+    """Generate source paragraphs and translations with merged paragraphs; returns the expected pairs"""
+    rng = random.Random(seed)
+    terms = [f"Name{i}" for i in range(300)]
+    glossary = {term: f"名{i}号" for i, term in enumerate(terms)}
+    sources, targets, expected = [], [], []
+    for idx in range(num_paragraphs):
+        used = rng.sample(terms, rng.randint(0, 2))
+        source = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 150))) + " " + " ".join(used)
+        if rng.random() < 0.2:
+            source = f"Level {rng.randint(1, 20)}: {source}"
+        target = ("文" * int(len(source) * 0.35 * rng.uniform(0.8, 1.2))
+                  + "".join(glossary[term] for term in used) + "".join(c for c in source if c.isdigit()))
+        sources.append(source)
+        if targets and rng.random() < 0.05:
+            # Translator merged this paragraph into the previous one
+            targets[-1] += target
+            expected[-1][0].append(idx)
+        else:
+            targets.append(target)
+            expected.append(([idx], [len(targets) - 1]))
+    return sources, targets, glossary, expected
+
+
+def test_alignment_with_anchors():
+    """Test pairing, merged paragraphs and rendering"""
+    print("=" * 80)
+    print("Bilingual Alignment Test")
+    print("=" * 80)
+
+    sources = [
+        "## ARMORED CAVE BEAR",
+        "Armored cave bears roam the tunnels below Absalom and attack anything that enters their lair.",
+        "Priests of Iomedae hunt them.",
+        "They strike twice each round.",
+        "Perception +17; low-light vision, scent 30 feet",
+    ]
+    targets = [
+        "## [披甲洞穴熊](Armored_Cave_Bear)",
+        "披甲洞穴熊在押沙龙地下的隧道中游荡，攻击任何进入巢穴的东西。",
+        "[艾奥梅黛](Iomedae)的牧师猎杀它们。它们每轮攻击两次。",
+        "察觉 +17；昏暗视觉，嗅觉 30 英尺",
+    ]
+    pairs = BilingualAligner(GLOSSARY).align(sources, targets)
+    assert [(pair.source, pair.target) for pair in pairs] == [([0], [0]), ([1], [1]), ([2, 3], [2]), ([4], [3])]
+    assert all(pair.confident for pair in pairs)
+    print("✓ Paragraphs paired, merged translation aligned as one 2-1 pair")
+
+    assert render_aligned_pair(sources[:1], targets[:1]) == "## [披甲洞穴熊](Armored_Cave_Bear) (ARMORED CAVE BEAR)"
+    assert render_aligned_pair(sources[4:], targets[3:]) == "> " + sources[4] + "\n\n" + targets[3]
+    print("✓ Headings merged, source paragraphs quoted")
+
+    # Low-confidence pairs separated by at most one confident pair form one span
+    flags = [True, False, True, False, True, True, False, True]
+    pairs = [AlignedPair([idx], [idx], 0.0, confident) for idx, confident in enumerate(flags)]
+    assert find_low_confidence_spans(pairs) == [(1, 4), (6, 7)]
+    assert find_low_confidence_spans(pairs, max_gap=0) == [(1, 2), (3, 4), (6, 7)]
+    print("✓ Low-confidence pairs grouped into spans")
+
+
+def test_book_sized_alignment():
+    """Test that a book-sized text aligns locally in seconds"""
+    print("=" * 80)
+    print("Book-Sized Alignment Test")
+    print("=" * 80)
+
+    sources, targets, glossary, expected = make_book(6000)
+    start = time.perf_counter()
+    pairs = BilingualAligner(glossary).align(sources, targets)
+    elapsed = time.perf_counter() - start
+    found = {(tuple(pair.source), tuple(pair.target)) for pair in pairs}
+    correct = len(found & {(tuple(source), tuple(target)) for source, target in expected})
+    assert correct >= 0.97 * len(expected)
+    assert elapsed < 30
+    print(f"✓ {len(sources)} source / {len(targets)} translated paragraphs aligned in {elapsed:.2f}s, "
+          f"{correct}/{len(expected)} pairs correct")
+
+
+def start_alignment_stub(requests):
+    """Start an OpenAI-compatible streaming stub that answers every alignment request with a marker"""
+    def respond(body):
+        requests.append(body["messages"])
+        return "LLM-ALIGNED"
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def test_bilingual_export():
+    """Test bilingual export with the LLM used only for low-confidence spans"""
+    print("=" * 80)
+    print("Bilingual Export Test")
+    print("=" * 80)
+
+    requests = []
+    server, base_url = start_alignment_stub(requests)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False
+    )
+    assert pipeline.bilingual_alignment == "local"
+
+    sources, targets, glossary, _ = make_book(300, seed=4)
+    # The translation has one paragraph with no counterpart in the source
+    targets.insert(150, "（译者注：此段为补充说明，原文中没有对应的内容，仅供参考，请读者留意。）" * 3)
+    result = {
+        "source_language": "English", "target_language": "中文", "model": "stub-model",
+        "parse_result": {"full_text": "\n\n".join(sources)},
+        "updated_translation": "\n\n".join(targets),
+        "glossary": glossary,
+    }
+
+    os.environ["BILINGUAL_LLM_FALLBACK"] = "0"
+    try:
+        local_only = pipeline.export_output(result, "bilingual")
+    finally:
+        del os.environ["BILINGUAL_LLM_FALLBACK"]
+    assert not requests
+    assert local_only.count("\n> ") >= len(sources) - 1 and "LLM-ALIGNED" not in local_only
+    print("✓ Bilingual export aligned without any LLM request")
+
+    with_fallback = pipeline.export_output(result, "bilingual")
+    assert 1 <= len(requests) <= 3 and "LLM-ALIGNED" in with_fallback
+    assert "译者注" in requests[0][-1]["content"] and sources[0] not in requests[0][-1]["content"]
+    print(f"✓ Low-confidence span sent to the LLM in {len(requests)} request(s), the rest aligned locally")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_alignment_with_anchors()
+    test_book_sized_alignment()
+    test_bilingual_export()
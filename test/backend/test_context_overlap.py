@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for context-only window overlap
+Tests the following functionalities:
+- Windows do not overlap and are merged by concatenation
+- The paragraphs before a window are sent as read-only context, not as text to translate
+- Every source paragraph is translated exactly once
+- Overlapping windows smaller than the overlap (one large paragraph per window) lose no paragraph
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.document import plan_window_spans
+from backend.pipeline import (
+    TRANSLATION_OVERLAP_PARAGRAPHS, UnifiedTranslationPipeline, merge_translations, split_into_paragraphs
+)
+from stub_llm_server import prefix_paragraphs, start_stub_server, window_source
+
+
+def start_translation_stub(prompts):
+    """Start an OpenAI-compatible streaming stub that tags every paragraph it is asked to translate"""
+    def respond(body):
+        prompts.append(body["messages"])
+        # Paragraph ID markers are echoed in front of each translated paragraph
+        return prefix_paragraphs(split_into_paragraphs(window_source(body)))
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def test_concatenating_merge():
+    """Test that windows without overlap are merged by concatenation"""
+    print("=" * 80)
+    print("Concatenating Merge Test")
+    print("=" * 80)
+
+    windows = [("A\n\nB", 0, 1), ("C", 2, 2), ("D\n\nE", 3, 4)]
+    merged = merge_translations(windows, ["甲\n\n乙\n", "丙", "丁\n\n戊"], "paragraph", overlap_paragraphs=0)
+    assert merged == "甲\n\n乙\n\n丙\n\n丁\n\n戊"
+    print("✓ Non-overlapping windows concatenated")
+
+
+def test_overlapping_merge_small_windows():
+    """Test that windows holding fewer paragraphs than the overlap are merged without losses"""
+    print("=" * 80)
+    print("Small Window Overlap Merge Test")
+    print("=" * 80)
+
+    overlap = TRANSLATION_OVERLAP_PARAGRAPHS
+    for sizes, limit in (([100] * 180, 100), ([100] + [10] * 8 + [100] + [10] * 3, 35)):
+        spans = plan_window_spans(sizes, limit, 1, overlap)
+        windows = [("", start, end) for start, end in spans]
+        translations = ["\n\n".join(f"段{idx}" for idx in range(start, end + 1)) for start, end in spans]
+        merged = merge_translations(windows, translations, "paragraph", overlap_paragraphs=overlap)
+        assert merged.split("\n\n") == [f"段{idx}" for idx in range(len(sizes))]
+        print(f"✓ {len(sizes)} paragraphs in {len(spans)} windows of at most "
+              f"{max(end - start + 1 for start, end in spans)} paragraphs merged in order")
+
+
+def test_context_only_overlap():
+    """Test that overlap paragraphs are sent as context and translated only once"""
+    print("=" * 80)
+    print("Context-Only Overlap Test")
+    print("=" * 80)
+
+    prompts = []
+    server, base_url = start_translation_stub(prompts)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False,
+        overlap_mode="context"
+    )
+
+    paragraphs = [f"Paragraph {i} of the adventure in Absalom. " * 12 for i in range(60)]
+    result = {}
+    merged = pipeline._translate_with_sliding_window_and_glossary(
+        "\n\n".join(paragraphs), "English", "中文", {}, None, False, False, result, max_concurrency=2
+    )
+
+    assert result["num_windows"] > 1
+    assert split_into_paragraphs(merged) == ["译 " + paragraph.strip() for paragraph in paragraphs]
+    assert result["paragraph_translations"] == ["译 " + paragraph.strip() for paragraph in paragraphs]
+
+    requested = [
+        messages[-1]["content"].split("Translate the following text:\n\n", 1)[-1] for messages in prompts
+    ]
+    assert sum(len(split_into_paragraphs(text)) for text in requested) == len(paragraphs)
+    with_context = [messages for messages in prompts if "<preceding_context>" in messages[-1]["content"]]
+    assert len(with_context) == result["num_windows"] - 1
+    assert all("do not translate" in messages[0]["content"] for messages in with_context)
+    print(f"✓ {result['num_windows']} windows, each paragraph requested once, "
+          f"{len(with_context)} windows with read-only context")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concatenating_merge()
+    test_overlapping_merge_small_windows()
+    test_context_only_overlap()
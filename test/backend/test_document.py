@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the span-based Document model
+Tests the following functionalities:
+- Pages located in the parser's full text as spans
+- Paragraphs segmented once, sizes computed once per counter
+- Window spans planned exactly like create_sliding_windows
+- Translations attached per paragraph
+Runs offline, no API key required.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.document import Document
+from backend.parsers.base import PageResult, ParseResult
+from backend.pipeline import UnifiedTranslationPipeline, create_sliding_windows, split_into_paragraphs
+from backend.tokenizer import count_tokens
+from benchmark_paragraph_segmenter import make_document
+
+
+def make_parse_result(page_texts):
+    """Build a parse result whose full text joins the pages like the MinerU extractor"""
+    return ParseResult(
+        success=True,
+        file_path="book.pdf",
+        total_pages=len(page_texts),
+        pages=[PageResult(page_number=i + 1, text=text) for i, text in enumerate(page_texts)],
+        full_text="\n\n".join(page_texts).strip()
+    )
+
+
+def test_page_spans():
+    """Test that pages are located in the full text"""
+    print("=" * 80)
+    print("Page Span Test")
+    print("=" * 80)
+
+    parse_result = make_parse_result(["\n  First page.\n", "", "Second page.\n\n## Heading", "Last page.  \n"])
+    spans = parse_result.page_spans()
+    assert spans[1] is None
+    assert [parse_result.full_text[start:end] for start, end in (spans[0], spans[2], spans[3])] == [
+        "First page.", "Second page.\n\n## Heading", "Last page."
+    ]
+    print("✓ Pages located in full_text, empty page reported as None")
+
+    # A page changed after the full text was built is kept as text
+    parse_result.pages[2].text = "Rewritten page."
+    pages = UnifiedTranslationPipeline._page_spans(parse_result)
+    assert pages[2] == {"page_number": 3, "text": "Rewritten page."}
+    assert pages[3]["start"] == spans[3][0]
+    print("✓ Pages not found in full_text keep their text")
+
+    document = Document.from_parse_result({"full_text": parse_result.full_text, "pages": pages})
+    assert document.num_pages == 2 and document.page_text(1) == "Last page."
+    assert Document.from_parse_result({
+        "full_text": "optimized", "pages": pages, "formatting_optimized": True
+    }).num_pages == 0
+    print("✓ Document takes over the page spans of the parse result")
+
+    document = Document.from_pages(["A", "B\n\nC", ""])
+    assert document.text == "A\n\nB\n\nC\n\n"
+    assert [document.page_text(i) for i in range(3)] == ["A", "B\n\nC", ""]
+    print("✓ Document built from page texts")
+
+
+def test_paragraphs_cached():
+    """Test that paragraphs are segmented once and match split_into_paragraphs"""
+    print("=" * 80)
+    print("Paragraph Cache Test")
+    print("=" * 80)
+
+    text = make_document(20)
+    document = Document(text)
+    assert document.paragraphs == split_into_paragraphs(text)
+    assert document.segments is document.segments and document.paragraphs is document.paragraphs
+    for segment in document.segments[:50]:
+        assert text[segment.start:segment.end].split() == segment.text.split()
+    print(f"✓ {document.num_paragraphs} paragraphs segmented once, offsets point into the text")
+
+    sizes = document.paragraph_sizes(count_tokens)
+    assert document.paragraph_sizes(count_tokens) is sizes
+    assert document.paragraph_sizes() == [len(paragraph) for paragraph in document.paragraphs]
+    print("✓ Paragraph sizes computed once per counter")
+
+
+def test_windows_match_create_sliding_windows():
+    """Test that window spans are planned like create_sliding_windows"""
+    print("=" * 80)
+    print("Window Span Test")
+    print("=" * 80)
+
+    text = make_document(30)
+    document = Document(text)
+    for limit, overlap in [(2000, 5), (600, 0), (50, 3), (100000, 2)]:
+        expected = create_sliding_windows(text, "paragraph", overlap_paragraphs=overlap, window_token_limit=limit)
+        spans = document.windows(limit, overlap, count_tokens)
+        assert spans == [(start, end) for _, start, end in expected]
+        assert [document.window_text(start, end) for start, end in spans] == [window for window, _, _ in expected]
+
+        expected = create_sliding_windows(text, "paragraph", window_char_limit=limit, overlap_paragraphs=overlap)
+        assert document.windows(limit, overlap) == [(start, end) for _, start, end in expected]
+    print("✓ Token- and character-limited windows identical to create_sliding_windows")
+
+    assert Document("").windows(100, 2) == []
+    print("✓ Empty document has no windows")
+
+
+def test_translations():
+    """Test that translations are attached per paragraph"""
+    print("=" * 80)
+    print("Paragraph Translation Test")
+    print("=" * 80)
+
+    document = Document("A\n\nB\n\nC")
+    assert document.translated_text() == "" and not document.fully_translated
+    try:
+        document.attach_translations(["甲", "乙"])
+        raise AssertionError("Expected ValueError")
+    except ValueError:
+        pass
+    document.attach_translations(["甲", None, "丙"])
+    assert document.translated_text() == "甲\n\n丙" and not document.fully_translated
+    document.attach_translations(["甲", "乙", "丙"])
+    assert document.fully_translated
+    print("✓ Translations attached per paragraph, count mismatch rejected")
+
+
+if __name__ == "__main__":
+    test_page_spans()
+    test_paragraphs_cached()
+    test_windows_match_create_sliding_windows()
+    test_translations()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-endpoint routing
+Tests the following functionalities:
+- Weighted spreading of requests with per-endpoint concurrency caps
+- Failover and ejection of a failing endpoint
+- Ejection of an endpoint much slower than the others
+- Cached responses keyed on the model the endpoint actually sends
+Runs offline against local stub servers, no API key required.
+"""
+
+import sys
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.endpoint_router import Endpoint, EndpointRouter
+from backend.response_cache import ResponseCache
+from stub_llm_server import start_stub_server
+
+
+def start_stub(reply="OK", delay=0.0, status=200):
+    """Start a stub that answers every request with reply after delay seconds"""
+    def respond(body):
+        time.sleep(delay)
+        return reply
+
+    return start_stub_server(respond, status)
+
+
+def make_client(router):
+    return SiliconFlowClient(api_key="test", router=router, use_cache=False)
+
+
+def test_weighted_spreading():
+    """Test that requests follow weights and respect concurrency caps"""
+    print("=" * 80)
+    print("Endpoint Router Weighted Spreading Test")
+    print("=" * 80)
+
+    server_a, url_a, stats_a = start_stub(delay=0.2)
+    server_b, url_b, stats_b = start_stub(delay=0.2)
+    router = EndpointRouter([
+        Endpoint(url_a, "test", name="a", weight=2, max_concurrency=4),
+        Endpoint(url_b, "test", name="b", weight=1, max_concurrency=2),
+    ])
+    client = make_client(router)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=router.total_concurrency) as executor:
+        list(executor.map(lambda _: client._stream_chat_completion("m", [{"role": "user", "content": "hi"}]), range(24)))
+    elapsed = time.time() - start
+
+    assert stats_a["requests"] + stats_b["requests"] == 24
+    assert stats_a["requests"] > stats_b["requests"] > 0
+    assert stats_a["peak"] <= 4 and stats_b["peak"] <= 2
+    # 24 requests of 0.2s over 6 slots take about 4 rounds
+    assert elapsed < 24 * 0.2 / 3
+    print(f"✓ a: {stats_a['requests']} requests, b: {stats_b['requests']} requests in {elapsed:.2f}s")
+
+    server_a.shutdown()
+    server_b.shutdown()
+
+
+def test_failover_and_ejection():
+    """Test that a failing endpoint is skipped and ejected"""
+    print("=" * 80)
+    print("Endpoint Router Failover Test")
+    print("=" * 80)
+
+    server_ok, url_ok, stats_ok = start_stub(reply="fine")
+    server_bad, url_bad, stats_bad = start_stub(status=503)
+    router = EndpointRouter([
+        Endpoint(url_bad, "test", name="bad"),
+        Endpoint(url_ok, "test", name="ok"),
+    ], failure_threshold=2, ejection_seconds=60)
+    client = make_client(router)
+    # No SDK-level retries so every failure reaches the router
+    for openai_client in client._endpoint_clients.values():
+        openai_client.max_retries = 0
+
+    for _ in range(6):
+        result = client._stream_chat_completion("m", [{"role": "user", "content": "hi"}])
+        assert result["content"] == "fine"
+
+    stats = router.stats()
+    assert stats["bad"]["ejections"] == 1 and not stats["bad"]["healthy"]
+    assert stats_bad["requests"] == 2
+    assert stats_ok["requests"] == 6
+    print(f"✓ Failing endpoint ejected after {stats_bad['requests']} failures, all requests answered")
+
+    server_ok.shutdown()
+    server_bad.shutdown()
+
+
+def test_slow_endpoint_ejection():
+    """Test that an endpoint much slower than the others is ejected"""
+    print("=" * 80)
+    print("Endpoint Router Slow Endpoint Test")
+    print("=" * 80)
+
+    fast = Endpoint("http://fast/v1", "test", name="fast")
+    slow = Endpoint("http://slow/v1", "test", name="slow")
+    router = EndpointRouter([fast, slow], slow_factor=3.0, min_latency_samples=3)
+
+    for _ in range(3):
+        router.release(router.acquire(exclude={"slow"}), latency=0.1)
+    for _ in range(3):
+        router.release(router.acquire(exclude={"fast"}), latency=1.0)
+
+    assert not router.stats()["slow"]["healthy"]
+    assert router.acquire(exclude={"fast"}) is fast
+    print("✓ Slow endpoint ejected, requests routed to the fast endpoint")
+
+
+def test_cache_keyed_on_sent_model():
+    """Test that a response cached for one endpoint's model is not served for another's"""
+    print("=" * 80)
+    print("Endpoint Router Response Cache Test")
+    print("=" * 80)
+
+    server_a, url_a, stats_a = start_stub(reply="from a")
+    server_b, url_b, stats_b = start_stub(reply="from b")
+    messages = [{"role": "user", "content": "hi"}]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(Path(tmp_dir) / "cache.db")
+        router = EndpointRouter([
+            Endpoint(url_a, "test", name="a", model="model-a"),
+            Endpoint(url_b, "test", name="b", model="model-b"),
+        ])
+        assert router.resolve_model("m") is None
+        client = SiliconFlowClient(api_key="test", router=router, cache=cache, use_cache=True)
+
+        # The first request goes to a; b (no latency recorded yet) is preferred for the second
+        assert client._stream_chat_completion("m", messages)["content"] == "from a"
+        second = client._stream_chat_completion("m", messages)
+        assert second["content"] == "from b" and not second.get("cached")
+        assert stats_a["requests"] == stats_b["requests"] == 1
+        print("✓ Response cached for model-a not served to the model-b endpoint")
+
+        router = EndpointRouter([Endpoint(url_a, "test", name="a", model="model-a")])
+        assert router.resolve_model("m") == "model-a"
+        client = SiliconFlowClient(api_key="test", router=router, cache=cache, use_cache=True)
+        assert client._stream_chat_completion("other", messages).get("cached")
+        assert stats_a["requests"] == 1 and router.stats()["a"]["requests"] == 0
+        print("✓ Single-model router answered from the cache without reserving an endpoint")
+
+    server_a.shutdown()
+    server_b.shutdown()
+
+
+if __name__ == "__main__":
+    test_weighted_spreading()
+    test_failover_and_ejection()
+    test_slow_endpoint_ejection()
+    test_cache_keyed_on_sent_model()
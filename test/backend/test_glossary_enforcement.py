@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for local glossary enforcement
+Tests the following functionalities:
+- Untranslated terms and variant transliterations are fixed without the LLM
+- Variants corrected once are reused in later paragraphs
+- Other glossary translations and unrelated text are left alone, ambiguous variants are not replaced
+- Source and translated paragraphs are paired by the window attribution when counts differ
+- Only paragraphs that stay unresolved are post-edited, with only their missing terms
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.glossary_enforcer import GlossaryEnforcer, align_paragraph_segments, find_variant_spans
+from backend.pipeline import UnifiedTranslationPipeline
+from stub_llm_server import start_stub_server
+
+
+GLOSSARY = {
+    "Iomedae": "艾奥梅黛",
+    "Absalom": "押沙龙",
+    "Sarenrae": "沙伦蕾",
+    "Lastwall": "终壁",
+}
+
+
+def test_local_fixes():
+    """Test deterministic fixes of missing glossary translations"""
+    print("=" * 80)
+    print("Local Glossary Enforcement Test")
+    print("=" * 80)
+
+    enforcer = GlossaryEnforcer(GLOSSARY)
+
+    fixed, missing = enforcer.enforce("Iomedae watches over Absalom.", "Iomedae守望着押沙龙。")
+    assert (fixed, missing) == ("艾奥梅黛守望着押沙龙。", [])
+    print("✓ Untranslated term replaced")
+
+    fixed, missing = enforcer.enforce("Priests of Iomedae and Sarenrae.", "艾欧梅黛与沙伦蕾的牧师。")
+    assert (fixed, missing) == ("艾奥梅黛与沙伦蕾的牧师。", [])
+    fixed, missing = enforcer.enforce("Iomedae rose.", "艾梅黛崛起了。")
+    assert (fixed, missing) == ("艾奥梅黛崛起了。", [])
+    print("✓ Substituted and shortened transliterations replaced")
+
+    # A variant learned once is found again even where fuzzy matching is not needed
+    fixed, _ = enforcer.enforce("Iomedae, Iomedae!", "艾奥梅黛，艾欧梅黛！")
+    assert fixed == "艾奥梅黛，艾奥梅黛！"
+    assert enforcer.variants["Iomedae"]["艾欧梅黛"] == 2
+    print("✓ Learned variant reused")
+
+    # Unrelated text and the translations of other terms are not touched
+    fixed, missing = enforcer.enforce("Sarenrae and Iomedae.", "沙伦蕾和她的同伴。")
+    assert fixed == "沙伦蕾和她的同伴。" and missing == ["Iomedae"]
+    fixed, missing = enforcer.enforce("Lastwall is far.", "终点很远。")
+    assert fixed == "终点很远。" and missing == ["Lastwall"]
+    assert find_variant_spans("沙伦蕾的神殿", "沙伦蕾") == []
+    print("✓ Unresolvable terms reported, other text unchanged")
+
+    # Ordinary words one character away from a short translation are not variants
+    paladin = GlossaryEnforcer({"Paladin": "圣武士"})
+    fixed, missing = paladin.enforce("The paladin raised a holy weapon.", "这位骑士举起了圣武器。")
+    assert (fixed, missing) == ("这位骑士举起了圣武器。", ["Paladin"])
+    # Two candidates for one missing translation: left for the LLM
+    fixed, missing = GlossaryEnforcer(GLOSSARY).enforce("Iomedae spoke.", "艾欧梅黛对艾奥梅戴说。")
+    assert fixed == "艾欧梅黛对艾奥梅戴说。" and missing == ["Iomedae"]
+    print("✓ Short translations and ambiguous variants left unresolved")
+
+    stats = enforcer.to_dict()
+    assert stats["untranslated_fixed"] == 1 and stats["segments_unresolved"] == 2
+    print(f"✓ Statistics: {stats}")
+
+
+def test_segment_alignment():
+    """Test pairing of source and translated paragraphs"""
+    print("=" * 80)
+    print("Paragraph Segment Alignment Test")
+    print("=" * 80)
+
+    assert align_paragraph_segments(2, ["a", "b"]) == [((0, 1), (0, 1)), ((1, 2), (1, 2))]
+    # Paragraphs 1-2 were merged into one translated paragraph: they form one segment
+    units = ["甲", "乙丙", "丁"]
+    assert align_paragraph_segments(4, units, ["甲", None, None, "丁"]) == [
+        ((0, 1), (0, 1)), ((1, 3), (1, 2)), ((3, 4), (2, 3))
+    ]
+    assert align_paragraph_segments(4, units) == [((0, 4), (0, 3))]
+    print("✓ One-to-one, anchored and whole-document pairing")
+
+
+# Renderings the stub LLM recognizes as a term
+PLACEHOLDERS = {"Iomedae": "那位神", "Lastwall": "那座城"}
+
+
+def start_post_edit_stub(requests):
+    """Start an OpenAI-compatible streaming stub that replaces placeholder renderings of the requested terms"""
+    def respond(body):
+        requests.append(body["messages"])
+        system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+        reply = user.split("Update this translation:\n\n", 1)[-1]
+        for line in system.split("GLOSSARY:\n", 1)[-1].split("\n\n", 1)[0].splitlines():
+            term, translation = line[2:].split(": ", 1)
+            reply = reply.replace(PLACEHOLDERS[term], translation)
+        return reply
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def test_unresolved_paragraphs_post_edited():
+    """Test that only unresolved paragraphs go to the LLM"""
+    print("=" * 80)
+    print("Unresolved Paragraph Post-Edit Test")
+    print("=" * 80)
+
+    requests = []
+    server, base_url = start_post_edit_stub(requests)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False
+    )
+    assert pipeline.glossary_enforcement == "local"
+
+    paragraphs = [f"Paragraph {i}: pilgrims of Iomedae travel to Absalom." for i in range(40)]
+    translations = [f"第{i}段：艾欧梅黛的朝圣者前往押沙龙。" for i in range(40)]
+    paragraphs[7] = "Nobody in Lastwall prays to Sarenrae."
+    translations[7] = "那座城的信徒不在这里，没有人向沙伦蕾祈祷。"
+    translations[31] = "第31段：那位神的朝圣者前往押沙龙。"
+
+    enforcer = GlossaryEnforcer(GLOSSARY)
+    updated = pipeline._enforce_glossary(paragraphs, "\n\n".join(translations), enforcer, None, max_concurrency=2)
+    units = updated.split("\n\n")
+    assert len(units) == 40
+    assert units[0] == "第0段：艾奥梅黛的朝圣者前往押沙龙。"
+    assert units[7] == "终壁的信徒不在这里，没有人向沙伦蕾祈祷。"
+    assert units[31] == "第31段：艾奥梅黛的朝圣者前往押沙龙。"
+
+    # Both unresolved paragraphs fit in one window; the request carries only them and their missing terms
+    assert len(requests) == 1
+    system, user = requests[0][0]["content"], requests[0][-1]["content"]
+    assert "第0段" not in user and "第31段" in user
+    assert "Lastwall: 终壁" in system and "Iomedae: 艾奥梅黛" in system and "Absalom" not in system
+    stats = enforcer.to_dict()
+    assert stats["llm_paragraphs"] == 2 and stats["variants_fixed"] == 38
+    print(f"✓ 38 paragraphs fixed locally, {stats['llm_paragraphs']} post-edited in {stats['llm_windows']} request")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_local_fixes()
+    test_segment_alignment()
+    test_unresolved_paragraphs_post_edited()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled glossary matcher
+Tests the following functionalities:
+- Case-insensitive whole-word term detection
+- Longest-match-first replacement in one pass
+- Partial word matches for new glossary terms
+- Equivalence with per-term regex matching on the default glossary
+Runs offline, no API key required.
+"""
+
+import re
+import sys
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.glossary_matcher import GlossaryMatcher, get_glossary_matcher
+
+GLOSSARY = {
+    "Gorum": "古拉姆",
+    "Bear": "熊",
+    "Golden Bear": "金熊",
+    "Absalom": "艾巴萨罗姆",
+    "Hit Points": "生命值",
+}
+
+
+def test_detect_and_replace():
+    """Test detection, word boundaries and longest-match-first replacement"""
+    print("=" * 80)
+    print("Glossary Matcher Detection/Replacement Test")
+    print("=" * 80)
+
+    matcher = GlossaryMatcher(GLOSSARY)
+    text = "The GOLDEN BEAR of absalom prays to Gorum, not to bearing gods. Hit Points: 20."
+
+    # Results follow glossary order; "bearing" is not a whole-word match of "Bear"
+    assert matcher.detect(text) == ["Gorum", "Bear", "Golden Bear", "Absalom", "Hit Points"]
+    assert matcher.replace(text, GLOSSARY) == "The 金熊 of 艾巴萨罗姆 prays to 古拉姆, not to bearing gods. 生命值: 20."
+    print("✓ Detection and replacement match expectations")
+
+    partial = matcher.find_partial_word_matches(["Golden Bear Cult", "Bearing"])
+    assert partial == {"Golden Bear Cult": ["Golden Bear", "Bear"]}
+    print("✓ Partial word matches ordered longest first")
+
+    assert get_glossary_matcher(GLOSSARY) is get_glossary_matcher(dict(GLOSSARY))
+    print("✓ Compiled matcher reused for the same glossary")
+
+
+def test_regex_equivalence():
+    """Compare against per-term regex matching on the default glossary"""
+    print("=" * 80)
+    print("Glossary Matcher Regex Equivalence Test")
+    print("=" * 80)
+
+    try:
+        import pandas as pd
+    except ImportError:
+        print("pandas not installed, skipping")
+        return
+
+    glossary_path = Path(__file__).parent.parent.parent / "doc" / "glossary" / "default.parquet"
+    df = pd.read_parquet(glossary_path).dropna()
+    glossary = dict(zip(df["original"], df["translation"]))
+    terms = list(glossary)
+
+    random.seed(0)
+    filler = "the of a and to in is it that with for as on was".split()
+    words = []
+    for _ in range(5000):
+        if random.random() < 0.2:
+            term = random.choice(terms)
+            words.append(random.choice([term, term.lower(), term.upper(), term + "'s", term + "s"]))
+        else:
+            words.append(random.choice(filler))
+    text = " ".join(words)
+
+    expected = [
+        term for term in terms
+        if re.search(r'\b' + re.escape(term.lower()) + r'\b', text.lower())
+    ]
+    assert get_glossary_matcher(glossary).detect(text) == expected
+    print(f"✓ Detected {len(expected)} terms, identical to regex matching")
+
+
+if __name__ == "__main__":
+    test_detect_and_replace()
+    test_regex_equivalence()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental retranslation of revised PDFs
+Tests the following functionalities:
+- Translated windows are attributed to their source paragraphs
+- Paragraph maps round-trip through JSON and survive whitespace changes
+- Only new or edited paragraphs are reported as changed runs
+Runs offline, no API key required.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.incremental import ParagraphMap, find_changed_runs, build_revision_context
+from backend.pipeline import create_sliding_windows, map_translated_paragraphs
+
+
+def test_paragraph_attribution():
+    """Test mapping window translations back to source paragraphs"""
+    print("=" * 80)
+    print("Paragraph Attribution Test")
+    print("=" * 80)
+
+    paragraphs = [f"Paragraph {i} of the adventure. " * 20 for i in range(30)]
+    windows = create_sliding_windows("\n\n".join(paragraphs), "paragraph", window_char_limit=4000, overlap_paragraphs=2)
+    translations = [
+        "\n\n".join(f"译文 {idx}" for idx in range(start, end + 1))
+        for _, start, end in windows
+    ]
+    # A window whose translation merged two paragraphs cannot be attributed
+    _, bad_start, bad_end = windows[1]
+    translations[1] = "\n\n".join(f"译文 {idx}" for idx in range(bad_start, bad_end))
+
+    mapped = map_translated_paragraphs(windows, translations, len(paragraphs), overlap_paragraphs=2)
+    assert all(mapped[idx] == f"译文 {idx}" for idx in range(len(paragraphs)) if mapped[idx] is not None)
+    assert mapped[0] == "译文 0" and mapped[-1] == f"译文 {len(paragraphs) - 1}"
+    missing = [idx for idx, translation in enumerate(mapped) if translation is None]
+    assert missing and all(bad_start <= idx <= bad_end for idx in missing)
+    print(f"✓ {len(paragraphs) - len(missing)}/{len(paragraphs)} paragraphs attributed")
+
+
+def test_changed_runs():
+    """Test detecting edited and inserted paragraphs against a stored map"""
+    print("=" * 80)
+    print("Paragraph Map Diff Test")
+    print("=" * 80)
+
+    old = [f"Paragraph {i}." for i in range(10)]
+    settings = {"model": "m", "source_language": "English", "target_language": "中文", "use_hyperlink_format": True}
+    paragraph_map = ParagraphMap.from_paragraphs(old, [f"段落 {i}" for i in range(10)], **settings)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paragraph_map.save(Path(tmp_dir) / "book_paragraphs.json")
+        loaded = ParagraphMap.load(tmp_dir)
+    assert len(loaded) == 10
+    assert loaded.mismatched_settings(**settings) == []
+    assert loaded.mismatched_settings(**{**settings, "target_language": "日本語"}) == ["target_language"]
+
+    new = list(old)
+    new[3] = "Paragraph 3, revised."
+    new.insert(7, "A new paragraph.")
+    new[0] = "Paragraph  0.\n"  # Whitespace-only change from a re-parse
+    reused = loaded.lookup(new)
+    assert reused[0] == "段落 0"
+    assert find_changed_runs(reused) == [(3, 3), (7, 7)]
+
+    context = build_revision_context(new, reused, 3, 3)
+    assert "Paragraph 2." in context and "段落 2" in context and "Paragraph 4." in context
+    print("✓ Edited and inserted paragraphs detected, 9 translations reused")
+
+
+if __name__ == "__main__":
+    test_paragraph_attribution()
+    test_changed_runs()
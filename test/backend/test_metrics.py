@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the request metrics registry
+Tests the following functionalities:
+- Per-stage latency, time-to-first-token and throughput histograms
+- Cached and failed requests counted separately
+- Step timings and JSON export
+- Run registries receive only the requests of their own run, also from thread pools
+Runs offline, no API key required.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.metrics import ContextThreadPoolExecutor, MetricsRegistry, run_in_own_context
+
+
+def test_stage_metrics():
+    """Test per-stage request metrics"""
+    print("=" * 80)
+    print("Metrics Registry Stage Test")
+    print("=" * 80)
+
+    registry = MetricsRegistry()
+    for latency in (1.0, 2.0, 3.0, 4.0):
+        registry.record_request(
+            "translate",
+            latency=latency,
+            ttft=latency / 4,
+            prompt_tokens=100,
+            completion_tokens=200,
+            generation_seconds=latency / 2,
+            retries=1,
+            usage_reported=True
+        )
+    registry.record_cached("translate")
+    registry.record_error("glossary", retries=3)
+
+    stages = registry.to_dict()["stages"]
+    translate = stages["translate"]
+    assert translate["requests"] == 5
+    assert translate["cached"] == 1
+    assert translate["retries"] == 4
+    assert translate["completion_tokens"] == 800
+    assert translate["latency_seconds"]["p50"] == 2.0
+    assert translate["latency_seconds"]["p90"] == 4.0
+    assert translate["ttft_seconds"]["count"] == 4
+    # 200 tokens in 0.5s is the fastest request
+    assert translate["output_tokens_per_second"]["max"] == 400.0
+    assert stages["glossary"]["errors"] == 1
+    print(f"✓ Latency p50 {translate['latency_seconds']['p50']}s, "
+          f"{translate['output_tokens_per_second']['mean']} tokens/s on average")
+
+
+def test_steps_and_export():
+    """Test step timings and JSON export"""
+    print("=" * 80)
+    print("Metrics Registry Export Test")
+    print("=" * 80)
+
+    registry = MetricsRegistry()
+    clock = registry.step_clock()
+    clock.step("parse")
+    clock.step("translate")
+    clock.stop()
+    registry.record_step("translate", 1.5)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = registry.dump_json(Path(tmp_dir) / "metrics.json")
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+    assert set(data["steps_seconds"]) == {"parse", "translate"}
+    assert data["steps_seconds"]["translate"] >= 1.5
+    registry.reset()
+    assert registry.to_dict()["stages"] == {}
+    print("✓ Step timings exported to JSON")
+
+
+def test_run_registries():
+    """Test that every run registry gets only its own requests"""
+    print("=" * 80)
+    print("Run Registry Test")
+    print("=" * 80)
+
+    client_metrics = MetricsRegistry()
+
+    @run_in_own_context
+    def run(document, requests):
+        metrics = MetricsRegistry(document=document)
+        metrics.activate()
+        with ContextThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(requests):
+                executor.submit(client_metrics.record_request, "translate", latency=1.0)
+        client_metrics.record_cached("glossary")
+        return metrics.to_dict()
+
+    with ContextThreadPoolExecutor(max_workers=2) as executor:
+        first, second = executor.map(run, ["a.pdf", "b.pdf"], [3, 5])
+    assert first["document"] == "a.pdf" and first["stages"]["translate"]["requests"] == 3
+    assert second["document"] == "b.pdf" and second["stages"]["translate"]["requests"] == 5
+    assert first["stages"]["glossary"]["cached"] == 1
+    # The client registry keeps the process-wide totals; no run registry is left active
+    assert client_metrics.to_dict()["stages"]["translate"]["requests"] == 8
+    assert "document" not in client_metrics.to_dict()
+    assert run("c.pdf", 1)["stages"]["translate"]["requests"] == 1
+    print("✓ Concurrent runs recorded separately, run registry ends with its run")
+
+
+if __name__ == "__main__":
+    test_stage_metrics()
+    test_steps_and_export()
+    test_run_registries()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel proper noun extraction
+Tests the following functionalities:
+- Chunks are extracted concurrently and their nouns merged
+- Chunks already processed in this run are skipped
+- Chunks processed by an earlier run are restored from the response cache
+Runs offline against a local stub server, no API key required.
+"""
+
+import re
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline
+from backend.response_cache import ResponseCache
+from stub_llm_server import start_stub_server
+
+
+def start_noun_stub():
+    """Start an OpenAI-compatible streaming stub that returns the capitalized place names of a chunk"""
+    def respond(body):
+        time.sleep(0.1)
+        return json.dumps(sorted(set(re.findall(r"\bCity[A-Z]\w*", body["messages"][-1]["content"]))))
+
+    return start_stub_server(respond)
+
+
+def test_parallel_extraction_with_dedupe():
+    """Test concurrent extraction, in-run dedupe and reuse across runs"""
+    print("=" * 80)
+    print("Parallel Proper Noun Extraction Test")
+    print("=" * 80)
+
+    server, base_url, stats = start_noun_stub()
+    text = "\n\n".join(
+        f"Paragraph {i} describes City{chr(65 + i % 26)}{i} and the roads around it. " * 8
+        for i in range(24)
+    )
+    expected = sorted({f"City{chr(65 + i % 26)}{i}" for i in range(24)})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(Path(tmp_dir) / "cache.sqlite3")
+
+        def make_pipeline():
+            client = SiliconFlowClient(api_key="test", base_url=base_url, cache=cache, use_cache=True)
+            return UnifiedTranslationPipeline(model="stub-model", client=client, use_translation_memory=False)
+
+        pipeline = make_pipeline()
+        nouns = pipeline.extract_proper_nouns_from_file(text, window_char_limit=2500, max_workers=4)
+        first_requests = stats["requests"]
+        assert nouns == expected
+        assert first_requests > 1 and stats["peak"] > 1, "chunks should be extracted concurrently"
+        print(f"✓ {first_requests} chunks extracted, up to {stats['peak']} in flight")
+
+        # Same text again in this run: every chunk hash was already processed
+        assert pipeline.extract_proper_nouns_from_file(text, window_char_limit=2500, max_workers=4) == expected
+        assert stats["requests"] == first_requests
+        print("✓ Repeated chunks skipped within the run")
+
+        # A new pipeline (later run) restores chunks from the cache, even with a different chunk label
+        other = make_pipeline()
+        appended = text + "\n\n" + "A new chapter set in CityNew with many more words. " * 8
+        nouns = other.extract_proper_nouns_from_file(appended, window_char_limit=2500, max_workers=4)
+        assert nouns == sorted(expected + ["CityNew"])
+        assert stats["requests"] - first_requests <= 2, "only chunks with new text are sent"
+        print(f"✓ Later run sent {stats['requests'] - first_requests} new chunks, others restored from cache")
+        cache.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_parallel_extraction_with_dedupe()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass paragraph segmenter
+Tests the following functionalities:
+- Output identical to the previous split_into_paragraphs on edge cases and random documents
+- Paragraph offsets point into the original text
+- Repeated splits of the same text return independent lists, the cache stays bounded
+Runs offline, no API key required.
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend import paragraph_segmenter
+from backend.paragraph_segmenter import SEGMENT_CACHE_SIZE, segment_paragraphs
+from backend.pipeline import split_into_paragraphs
+from benchmark_paragraph_segmenter import legacy_split_into_paragraphs, make_document
+
+
+EDGE_CASES = [
+    "",
+    "\n\n\n",
+    "One paragraph.",
+    "\nLeading newline\n",
+    "First\n\nSecond\n\n\n\nThird",
+    "Wrapped line one\nwrapped line two\n\nNext",
+    "Line\n   \nafter a whitespace-only line",
+    "Trailing whitespace line\n   \n\nNext",
+    "Windows\r\n\r\nline endings\r\n",
+    "Description:\nThe trap fires.\nDisable:\n\nnothing follows",
+    "Description:\n   \nblank line after label",
+    "Strike (melee)\njaws +20\nStrike (ranged) \n",
+    "Hazard: pit\nThe floor opens.\nAC 20;\nFort +10",
+    "AC 20; Fort +10\n## Heading after merge",
+    "Text\n## Heading\nBody\n### Sub\nMore",
+    "## Heading at the start",
+    "#######  Seven marks is not a heading\n#NoSpace\n# Real",
+    "Text\n##\nafter bare marks",
+    "Text\n##",
+    "Text\n##\n   ",
+    "Text\n##\n  \nmore",
+    "Description:\n## Heading consumed by the label",
+    "  indented  \n\t tabbed \t\n\n　全角空格　",
+    "Label :\nvalue\nWord (x) y\nnext",
+]
+
+
+def test_identical_output():
+    """Test that the segmenter matches the previous implementation"""
+    print("=" * 80)
+    print("Identical Output Test")
+    print("=" * 80)
+
+    for text in EDGE_CASES:
+        assert [p.text for p in segment_paragraphs(text)] == legacy_split_into_paragraphs(text), repr(text)
+    print(f"✓ {len(EDGE_CASES)} edge cases identical")
+
+    # Random documents built from the characters the segmenter treats specially
+    rng = random.Random(5)
+    pieces = ["\n", "\n\n", " ", "  \n", "\t", "\r", "#", "## ", "Description:", "Hazard:", "AC 12;",
+              "Strike (melee)", "word", "文字", ":", "(x)", "Label :"]
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+        assert [p.text for p in segment_paragraphs(text)] == legacy_split_into_paragraphs(text), repr(text)
+    print("✓ 3000 random documents identical")
+
+    text = make_document(40)
+    assert split_into_paragraphs(text) == legacy_split_into_paragraphs(text)
+    print("✓ 40-page synthetic document identical")
+
+
+def test_offsets():
+    """Test that paragraph offsets span the paragraph in the original text"""
+    print("=" * 80)
+    print("Paragraph Offset Test")
+    print("=" * 80)
+
+    text = make_document(10) + "\nDescription:\n  The trap fires.  \n\n  ## Heading\nBody"
+    paragraphs = segment_paragraphs(text)
+    previous_end = 0
+    for paragraph in paragraphs:
+        assert previous_end <= paragraph.start < paragraph.end <= len(text)
+        region = text[paragraph.start:paragraph.end]
+        assert region == region.strip()
+        # Same content apart from whitespace and the joins of split lines
+        assert region.split() == paragraph.text.split()
+        previous_end = paragraph.end
+    assert text[paragraphs[-1].start:paragraphs[-1].end] == "## Heading\nBody"
+    assert text[paragraphs[-2].start:paragraphs[-2].end] == "Description:\n  The trap fires."
+    assert paragraphs[-2].text == "Description: The trap fires."
+    print(f"✓ Offsets of {len(paragraphs)} paragraphs point into the original text")
+
+
+def test_cached_splits_are_independent():
+    """Test that callers can modify the list returned for a cached text"""
+    print("=" * 80)
+    print("Cached Split Test")
+    print("=" * 80)
+
+    text = "A\n\nB\n\nC"
+    first = split_into_paragraphs(text)
+    first[0] = "changed"
+    assert split_into_paragraphs(text) == ["A", "B", "C"]
+    print("✓ Repeated splits return independent lists")
+
+    for i in range(3 * SEGMENT_CACHE_SIZE):
+        split_into_paragraphs(f"Book {i}\n\n" + "Page text. " * 1000)
+    assert len(paragraph_segmenter._SEGMENT_CACHE) == SEGMENT_CACHE_SIZE
+    assert all(isinstance(key[1], bytes) for key in paragraph_segmenter._SEGMENT_CACHE)
+    print(f"✓ Cache holds the paragraphs of at most {SEGMENT_CACHE_SIZE} texts, keyed by digest")
+
+
+if __name__ == "__main__":
+    test_identical_output()
+    test_offsets()
+    test_cached_splits_are_independent()
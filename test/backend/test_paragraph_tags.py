@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the paragraph-ID tagged translation protocol
+Tests the following functionalities:
+- Tagged replies are parsed by paragraph ID, including merged, split and missing paragraphs
+- Window translations are merged by ID, the first window covering a paragraph wins
+- Only paragraphs missing from a reply are re-requested, with the paragraph before each
+- Bilingual export pairs tagged translations with their source paragraphs without alignment
+Runs offline against a local stub server, no API key required.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.paragraph_tags import TAG_RETRIES, merge_tagged_translations, parse_tagged_translation, tag_paragraphs
+from backend.pipeline import UnifiedTranslationPipeline, split_into_paragraphs
+from stub_llm_server import start_stub_server, window_source
+
+
+def test_parse_tagged_translation():
+    """Test parsing of tagged replies"""
+    print("=" * 80)
+    print("Tagged Reply Parsing Test")
+    print("=" * 80)
+
+    assert tag_paragraphs(["A", "B"], 7) == "⟦7⟧ A\n\n⟦8⟧ B"
+    assert tag_paragraphs(["A", "B"], ids=[3, 9]) == "⟦3⟧ A\n\n⟦9⟧ B"
+
+    # Merged into one paragraph but with both markers, split into two, one paragraph dropped
+    parsed = parse_tagged_translation("⟦10⟧ 甲。⟦11⟧ 乙。\n\n⟦12⟧ 丙一\n\n丙二\n\n⟦99⟧ 多余", range(10, 14))
+    assert parsed.units == {10: "甲。", 11: "乙。", 12: "丙一\n丙二"}
+    assert parsed.missing == [13] and parsed.unexpected == [99]
+    print("✓ Merged paragraphs split by marker, split paragraph joined, missing paragraph reported")
+
+    parsed = parse_tagged_translation("⟦1⟧ 甲\n\n⟦1⟧ 甲again\n\n⟦2⟧", [1, 2])
+    assert parsed.units == {1: "甲"} and parsed.duplicates == [1] and parsed.missing == [2]
+    print("✓ Duplicate and empty markers handled")
+
+    # Replies without markers are only mapped when unambiguous
+    assert parse_tagged_translation("甲\n\n乙", [4, 5]).units == {4: "甲", 5: "乙"}
+    assert parse_tagged_translation("甲\n\n乙", [4]).units == {4: "甲\n乙"}
+    assert parse_tagged_translation("甲乙", [4, 5]).missing == [4, 5]
+    print("✓ Untagged replies mapped by position only when the paragraph count matches")
+
+    windows = [("", 0, 2), ("", 2, 3)]
+    units = merge_tagged_translations(windows, ["⟦0⟧ a\n\n⟦1⟧ b\n\n⟦2⟧ c", "⟦2⟧ c2\n\n⟦3⟧ d"], 5)
+    assert units == ["a", "b", "c", "d", None]
+    print("✓ Window translations merged by ID")
+
+
+def start_tagged_stub(requests, drop_always=()):
+    """Start an OpenAI-compatible stub that echoes markers, but merges paragraph 3 into 2 and drops 6 on first sight"""
+    def respond(body):
+        paragraphs = re.findall(r"⟦(\d+)⟧ ([^\n]*)", window_source(body))
+        first_request = not requests
+        requests.append([int(idx) for idx, _ in paragraphs])
+        parts = []
+        for idx, text in paragraphs:
+            idx = int(idx)
+            if idx in drop_always or (first_request and idx == 6):
+                continue
+            if first_request and idx == 3:
+                parts[-1] += " 译" + text
+            else:
+                parts.append(f"⟦{idx}⟧ 译{text}")
+        return "\n\n".join(parts)
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def make_pipeline(base_url):
+    """Create a pipeline talking to the stub server"""
+    return UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False,
+        translation_protocol="tagged"
+    )
+
+
+def test_missing_paragraphs_re_requested():
+    """Test that only missing paragraphs are re-requested and the merge is exact"""
+    print("=" * 80)
+    print("Missing Paragraph Re-Request Test")
+    print("=" * 80)
+
+    requests = []
+    server, base_url = start_tagged_stub(requests)
+    pipeline = make_pipeline(base_url)
+    assert pipeline.translation_protocol == "tagged"
+
+    paragraphs = [f"Paragraph {i} of the adventure." for i in range(10)]
+    result = {}
+    merged = pipeline._translate_with_sliding_window_and_glossary(
+        "\n\n".join(paragraphs), "English", "中文", {}, None, False, False, result
+    )
+    expected = ["译" + paragraph for paragraph in paragraphs]
+    assert requests == [list(range(10)), [2, 3, 5, 6]]
+    assert result["paragraph_translations"] == expected
+    assert split_into_paragraphs(merged) == expected
+    print(f"✓ Merged and dropped paragraphs re-requested with the paragraph before them ({requests[1]}), merge is exact")
+
+    # The bilingual export pairs paragraphs by ID, without alignment requests
+    result.update({
+        "source_language": "English", "target_language": "中文", "model": "stub-model",
+        "parse_result": {"full_text": "\n\n".join(paragraphs)}, "updated_translation": merged
+    })
+    bilingual = pipeline.export_output(result, "bilingual")
+    assert len(requests) == 2
+    assert f"> {paragraphs[3]}\n\n{expected[3]}\n\n> {paragraphs[4]}" in bilingual
+    print("✓ Bilingual export paired by paragraph ID without LLM requests")
+
+    server.shutdown()
+
+
+def test_unreturned_paragraph_keeps_source():
+    """Test that a paragraph the model never returns is retried a bounded number of times"""
+    print("=" * 80)
+    print("Unreturned Paragraph Test")
+    print("=" * 80)
+
+    requests = []
+    server, base_url = start_tagged_stub(requests, drop_always=(8,))
+    pipeline = make_pipeline(base_url)
+
+    paragraphs = [f"Paragraph {i} of the adventure." for i in range(10)]
+    result = {}
+    pipeline._translate_with_sliding_window_and_glossary(
+        "\n\n".join(paragraphs), "English", "中文", {}, None, False, False, result
+    )
+    assert len(requests) == 1 + TAG_RETRIES and requests[-1] == [7, 8]
+    assert result["paragraph_translations"][8] == paragraphs[8]
+    assert result["paragraph_translations"][9] == "译" + paragraphs[9]
+    print(f"✓ Paragraph re-requested {TAG_RETRIES} times, source text kept")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_parse_tagged_translation()
+    test_missing_paragraphs_re_requested()
+    test_unreturned_paragraph_keeps_source()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script for pipelined stage execution
+Tests the following functionalities:
+- Incremental window planning matches create_sliding_windows (and keeps the last paragraph)
+- MinerU page windows are yielded as they are parsed, without duplicated overlap pages
+- Translation starts before parsing finishes and matches the sequential result
+- Glossary enforcement runs on the merged pipelined translation
+Runs offline against a local stub server, no API key required.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.pipeline import (
+    UnifiedTranslationPipeline, create_sliding_windows, plan_next_window, split_into_paragraphs
+)
+from backend.parsers.base import ParseResult, PageResult
+from backend.parsers.mineru.extractor import MinerUExtractor
+from backend.tokenizer import count_tokens
+from stub_llm_server import start_stub_server, window_source
+
+
+def start_translation_stub(translate_times):
+    """Start an OpenAI-compatible streaming stub that tags every source paragraph"""
+    def respond(body):
+        translate_times.append(time.time())
+        time.sleep(0.05)
+        return "\n\n".join("译 " + paragraph[:24] for paragraph in split_into_paragraphs(window_source(body)))
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+def test_window_planning():
+    """Test that incremental planning reproduces create_sliding_windows"""
+    print("=" * 80)
+    print("Incremental Window Planning Test")
+    print("=" * 80)
+
+    text = "\n\n".join(f"Paragraph {i} " + "word " * (20 + (i * 7) % 60) for i in range(120))
+    units = split_into_paragraphs(text)
+    sizes = [count_tokens(unit) for unit in units]
+    expected = [(start, end) for _, start, end in create_sliding_windows(
+        text, "paragraph", overlap_paragraphs=5, window_token_limit=400
+    )]
+
+    planned = []
+    start = 0
+    while start is not None:
+        end = plan_next_window(sizes, start, 400, complete=True)
+        planned.append((start, end))
+        start = None if end == len(units) - 1 else start + max(1, (end - start + 1) - 5)
+
+    assert planned == expected
+    assert expected[-1][1] == len(units) - 1
+    # A window is not final until the unit that overflows it has arrived
+    assert plan_next_window(sizes[:3], 0, 400, complete=False) is None
+    print(f"✓ {len(planned)} windows planned incrementally, last paragraph included")
+
+
+def test_mineru_window_stream():
+    """Test that overlapping MinerU windows are yielded without duplicate pages"""
+    print("=" * 80)
+    print("MinerU Window Stream Test")
+    print("=" * 80)
+
+    class PageRangeExtractor(MinerUExtractor):
+        def _parse_window(self, source, start_page, end_page, is_url=False, **kwargs):
+            pages = [PageResult(page_number=n, text=f"Text of page {n}") for n in range(start_page, end_page + 1)]
+            return ParseResult(True, source, 12, pages, "\n\n".join(p.text for p in pages))
+
+    extractor = PageRangeExtractor(client=SimpleNamespace(model_version="vlm", timeout=1))
+    windows = list(extractor.iter_sliding_window("book.pdf", window_size=5, overlap_pages=1))
+    page_numbers = [page.page_number for window in windows for page in window.pages]
+    assert page_numbers == list(range(1, 13))
+    assert [window.metadata["page_range"] for window in windows] == [(1, 5), (5, 9), (9, 12)]
+    merged = extractor.parse_with_sliding_window("book.pdf", window_size=5, overlap_pages=1)
+    assert "\n\n".join(window.full_text for window in windows) == merged.full_text
+    print(f"✓ {len(windows)} windows streamed, {len(page_numbers)} unique pages")
+
+
+def test_pipelined_translation():
+    """Test that translation overlaps parsing and matches the sequential result"""
+    print("=" * 80)
+    print("Pipelined Translation Test")
+    print("=" * 80)
+
+    translate_times = []
+    server, base_url = start_translation_stub(translate_times)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False
+    )
+
+    pages = [
+        "\n\n".join(f"Page {page} paragraph {i} of the adventure in Absalom. " * 12 for i in range(6))
+        for page in range(30)
+    ]
+    parse_times = []
+
+    def iter_pdf_windows(pdf_path, window_pages=10, **kwargs):
+        for first in range(0, len(pages), 5):
+            time.sleep(0.2)  # MinerU round trip
+            parse_times.append(time.time())
+            window = [PageResult(page_number=first + n + 1, text=pages[first + n]) for n in range(5)]
+            yield ParseResult(True, pdf_path, 5, window, "\n\n".join(page.text for page in window),
+                              metadata={"page_range": (first + 1, first + 5)})
+
+    pipeline.iter_pdf_windows = iter_pdf_windows
+    pipeline.parse_pdf = lambda pdf_path, **kwargs: {"full_text": "\n\n".join(pages), "total_pages": len(pages)}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "adventure.pdf")
+        pipelined = pipeline.translate_document_with_pdf(
+            pdf_path, auto_extract_nouns=False, max_concurrency=4, pipelined=True
+        )
+        assert min(translate_times) < max(parse_times), "translation should start while parsing"
+
+        sequential = pipeline.translate_document_with_pdf(
+            pdf_path, auto_extract_nouns=False, max_concurrency=4, pipelined=False
+        )
+
+    assert pipelined["num_windows"] == sequential["num_windows"]
+    assert pipelined["updated_translation"] == sequential["updated_translation"]
+    assert len(split_into_paragraphs(pipelined["updated_translation"])) == 30 * 6
+    parsed = pipelined["parse_result"]
+    assert [parsed["full_text"][page["start"]:page["end"]] for page in parsed["pages"]] == [
+        page.strip() for page in pages
+    ]
+    print(f"✓ First translation {max(parse_times) - min(translate_times):.2f}s before parsing finished, "
+          f"{pipelined['num_windows']} windows identical to sequential run")
+
+    server.shutdown()
+
+
+def test_pipelined_glossary_enforcement():
+    """Test that the pipelined translation is glossary-enforced like the sequential one"""
+    print("=" * 80)
+    print("Pipelined Glossary Enforcement Test")
+    print("=" * 80)
+
+    def respond(body):
+        # Variant transliteration the local enforcer has to correct
+        return "\n\n".join(
+            "译 " + paragraph.replace("Iomedae", "艾欧梅黛")
+            for paragraph in split_into_paragraphs(window_source(body))
+        )
+
+    server, base_url, _ = start_stub_server(respond)
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False
+    )
+    pages = [f"Page {page}: pilgrims of Iomedae arrive." for page in range(12)]
+
+    def iter_pdf_windows(pdf_path, window_pages=10, **kwargs):
+        for first in range(0, len(pages), 4):
+            window = [PageResult(page_number=first + n + 1, text=pages[first + n]) for n in range(4)]
+            yield ParseResult(True, pdf_path, 4, window, "\n\n".join(page.text for page in window))
+
+    pipeline.iter_pdf_windows = iter_pdf_windows
+    pipeline.parse_pdf = lambda pdf_path, **kwargs: {"full_text": "\n\n".join(pages), "total_pages": len(pages)}
+
+    results = [
+        pipeline.translate_document_with_pdf(
+            "book.pdf", auto_extract_nouns=False, existing_glossary={"Iomedae": "艾奥梅黛"},
+            use_hyperlink_format=False, max_concurrency=2, pipelined=pipelined
+        )
+        for pipelined in (True, False)
+    ]
+    pipelined, sequential = results
+    assert pipelined["updated_translation"] == sequential["updated_translation"]
+    assert pipelined["updated_translation"].count("艾奥梅黛") == 12 and "艾欧梅黛" not in pipelined["updated_translation"]
+    assert pipelined["glossary_enforcement"]["variants_fixed"] == 12
+    print(f"✓ {pipelined['glossary_enforcement']['variants_fixed']} variants fixed in the pipelined translation")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_window_planning()
+    test_mineru_window_stream()
+    test_pipelined_translation()
+    test_pipelined_glossary_enforcement()
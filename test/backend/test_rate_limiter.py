@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared RPM/TPM rate limiter
+Tests the following functionalities:
+- Request and token buckets admit bursts up to the quota, then ask to wait
+- Reconciliation against reported usage refunds or overdraws the token bucket
+- Bucket state is shared across processes through the locked state file
+- acquire_async keeps the locked state file access off the event loop
+- The async client reconciles usage and pauses the limiter off the event loop
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.async_client import AsyncSiliconFlowClient, close_shared_async_http_client
+from backend.rate_limiter import RateLimiter
+from backend.tokenizer import count_message_tokens
+from stub_llm_server import start_stub_server
+
+
+def test_request_bucket():
+    """Test that the request bucket admits a burst of rpm requests"""
+    print("=" * 80)
+    print("Rate Limiter Request Bucket Test")
+    print("=" * 80)
+
+    limiter = RateLimiter(rpm=3)
+    assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.try_acquire()
+    # One request refills every 20 seconds at 3 RPM
+    assert 19.0 < wait <= 20.0
+    print(f"✓ 4th request must wait {wait:.1f}s")
+
+
+def test_token_reconciliation():
+    """Test that usage reconciliation corrects the estimated tokens"""
+    print("=" * 80)
+    print("Rate Limiter Token Reconciliation Test")
+    print("=" * 80)
+
+    messages = [{"role": "user", "content": "Translate this paragraph. " * 40}]
+    estimated = count_message_tokens(messages)
+    assert estimated > 0
+
+    limiter = RateLimiter(tpm=1000)
+    assert limiter.try_acquire(600) == 0.0
+    assert limiter.try_acquire(600) > 0
+
+    # The first request only used 100 tokens: 500 are refunded
+    limiter.reconcile(600, 100)
+    assert limiter.try_acquire(600) == 0.0
+
+    # An overdraft delays the next request
+    limiter.reconcile(600, 1500)
+    assert limiter.try_acquire(1) > 0
+    print(f"✓ Estimated {estimated} prompt tokens, reconciliation adjusts the bucket")
+
+
+def _take_requests(state_path: str, count: int, queue) -> None:
+    limiter = RateLimiter(rpm=4, state_path=state_path)
+    queue.put([limiter.try_acquire() == 0.0 for _ in range(count)])
+
+
+def test_cross_process_sharing():
+    """Test that two processes draw from one request bucket"""
+    print("=" * 80)
+    print("Rate Limiter Cross-Process Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = str(Path(tmp_dir) / "limits.json")
+        queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_take_requests, args=(state_path, 3, queue))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        admitted = sum(sum(queue.get(timeout=30)) for _ in workers)
+        for worker in workers:
+            worker.join()
+
+        # 6 attempts against a 4 RPM budget shared by both processes
+        assert admitted == 4
+        print(f"✓ {admitted}/6 requests admitted across 2 processes")
+
+
+def test_acquire_async_off_loop():
+    """Test that a slow state file lock does not stall other coroutines"""
+    print("=" * 80)
+    print("Rate Limiter Async Acquire Test")
+    print("=" * 80)
+
+    class SlowLockLimiter(RateLimiter):
+        def try_acquire(self, estimated_tokens: int = 0) -> float:
+            time.sleep(0.3)  # contended flock
+            return super().try_acquire(estimated_tokens)
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        start = time.perf_counter()
+        await asyncio.gather(SlowLockLimiter(rpm=10).acquire_async(), ticker())
+        return [tick - start for tick in ticks]
+
+    ticks = asyncio.run(run())
+    # All ticks run while the lock is held instead of after it
+    assert ticks[-1] < 0.25
+    print(f"✓ Event loop kept running while the limiter waited for its lock ({ticks[-1]:.2f}s)")
+
+
+def test_async_client_limiter_off_loop():
+    """Test that the async client never touches the state file lock on the event loop thread"""
+    print("=" * 80)
+    print("Async Client Rate Limiter Test")
+    print("=" * 80)
+
+    class SlowLockLimiter(RateLimiter):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.threads = {}
+
+        def reconcile(self, estimated_tokens, actual_tokens):
+            self.threads["reconcile"] = threading.get_ident()
+            time.sleep(0.3)  # contended flock
+            super().reconcile(estimated_tokens, actual_tokens)
+
+        def block_for(self, seconds):
+            self.threads["block_for"] = threading.get_ident()
+            time.sleep(0.3)
+            super().block_for(seconds)
+
+    server, base_url, _ = start_stub_server(lambda body: "译文")
+    limiter = SlowLockLimiter(rpm=100, tpm=100000)
+    client = AsyncSiliconFlowClient(api_key="test", base_url=base_url, use_cache=False, rate_limiter=limiter)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        ticks = []
+
+        async def ticker():
+            for _ in range(40):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def request_then_pause():
+            translation = await client.translate_text("stub-model", "Text.")
+            await limiter.block_for_async(0.01)
+            return translation
+
+        try:
+            # The first request also opens the connection and loads the tokenizer
+            await client.translate_text("stub-model", "Warm up.")
+            translation, _ = await asyncio.gather(request_then_pause(), ticker())
+        finally:
+            await close_shared_async_http_client()
+        gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+        return translation, loop_thread, max(gaps)
+
+    translation, loop_thread, max_gap = asyncio.run(run())
+    assert translation == "译文"
+    assert set(limiter.threads) == {"reconcile", "block_for"} and loop_thread not in limiter.threads.values()
+    # No 0.3s stall of the event loop while the lock was held
+    assert max_gap < 0.2
+    print(f"✓ reconcile and block_for ran off the event loop (longest loop stall {max_gap:.2f}s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_request_bucket()
+    test_token_reconciliation()
+    test_cross_process_sharing()
+    test_acquire_async_off_loop()
+    test_async_client_limiter_off_loop()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent LLM response cache
+Tests the following functionalities:
+- Content-addressed keys (same request -> same key, any changed field -> new key)
+- Hit/miss counters
+- Size cap with least-recently-used eviction, running size totals kept by triggers
+- Persistence across cache instances
+Runs offline, no API key required.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.response_cache import ResponseCache
+
+
+def _request_key(cache: ResponseCache, content: str, temperature: float = 0.4) -> str:
+    return cache.make_key(
+        model="test-model",
+        messages=[{"role": "user", "content": content}],
+        temperature=temperature,
+        max_tokens=100,
+        top_p=0.7
+    )
+
+
+def test_hits_and_misses():
+    """Test key derivation and hit/miss counters"""
+    print("=" * 80)
+    print("Response Cache Hit/Miss Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(Path(tmp_dir) / "cache.sqlite3")
+
+        key = _request_key(cache, "Hello")
+        assert key == _request_key(cache, "Hello")
+        assert key != _request_key(cache, "Hello", temperature=0.5)
+
+        assert cache.get(key) is None
+        cache.put(key, {"content": "你好", "finish_reason": "stop"})
+        assert cache.get(key)["content"] == "你好"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["entries"] == 1
+        print(f"✓ Stats: {stats['hits']} hits / {stats['misses']} misses")
+        cache.close()
+
+        # Entries persist across instances
+        reopened = ResponseCache(Path(tmp_dir) / "cache.sqlite3")
+        assert reopened.get(key)["content"] == "你好"
+        reopened.close()
+        print("✓ Cached response persisted to disk")
+
+
+def test_lru_eviction():
+    """Test that the least-recently-used entries are evicted over the size cap"""
+    print("=" * 80)
+    print("Response Cache LRU Eviction Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # ~2.5 KB cap, each entry is ~1 KB
+        cache = ResponseCache(Path(tmp_dir) / "cache.sqlite3", max_size_mb=2.5 / 1024)
+        keys = [_request_key(cache, f"paragraph {i}") for i in range(3)]
+
+        cache.put(keys[0], {"content": "a" * 1000})
+        cache.put(keys[1], {"content": "b" * 1000})
+        # Touch the first entry so the second becomes least recently used
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[2], {"content": "c" * 1000})
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["size_bytes"] <= stats["max_size_bytes"]
+        print(f"✓ Evicted {stats['evictions']} entry, {stats['entries']} remaining")
+
+        # Running totals follow replaced entries and match the stored rows
+        cache.put(keys[2], {"content": "c" * 10})
+        entries, size = cache._conn.execute("SELECT COUNT(*), SUM(size) FROM responses").fetchone()
+        stats = cache.stats()
+        assert entries == 2 and (stats["entries"], stats["size_bytes"]) == (entries, size)
+        cache.clear()
+        assert (cache.stats()["entries"], cache.stats()["size_bytes"]) == (0, 0)
+        print("✓ Size and entry totals kept by triggers, no table scan per write")
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_hits_and_misses()
+    test_lru_eviction()
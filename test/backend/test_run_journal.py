@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the resume journal
+Tests the following functionalities:
+- Completed records are restored by content hash
+- A record cut off by a crash is ignored and later records stay readable
+- A new run starts an empty journal
+- A pipeline run stopped partway resumes without repeating finished LLM calls
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline, split_into_paragraphs
+from backend.run_journal import RunJournal
+from stub_llm_server import TRANSLATE_PROMPT, env_override, prefix_paragraphs, start_stub_server, window_source
+
+
+def test_resume_after_crash():
+    """Test restoring records from an interrupted journal"""
+    print("=" * 80)
+    print("Run Journal Resume Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "book_journal.jsonl"
+        journal = RunJournal(path)
+        parse_key = RunJournal.make_key("pdf-hash", "mineru", False)
+        window_keys = [RunJournal.make_key(f"window {i}", "model", "中文") for i in range(3)]
+
+        journal.put("parse", parse_key, {"full_text": "text", "total_pages": 2})
+        for idx, key in enumerate(window_keys[:2]):
+            journal.put("window", key, {"translation": f"译文 {idx}", "glossary_report": {}})
+
+        # Crash while writing the third window
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"type": "window", "key": "' + window_keys[2] + '", "val')
+
+        resumed = RunJournal(path, resume=True)
+        assert resumed.get("parse", parse_key)["total_pages"] == 2
+        assert resumed.get("window", window_keys[1])["translation"] == "译文 1"
+        assert resumed.get("window", window_keys[2]) is None
+        assert resumed.get("window", RunJournal.make_key("window 0", "other-model", "中文")) is None
+        assert resumed.restored == 2
+
+        resumed.put("window", window_keys[2], {"translation": "译文 2", "glossary_report": {}})
+        assert RunJournal(path, resume=True).get("window", window_keys[2])["translation"] == "译文 2"
+        print("✓ Completed records restored, cut-off record redone")
+
+        assert len(RunJournal(path)) == 0
+        print("✓ New run starts an empty journal")
+
+
+class ConnectionLost(Exception):
+    """Raised to stop a run partway"""
+
+
+def start_pipeline_stub(requests):
+    """Start a streaming stub answering noun extraction, glossary and translation requests"""
+    def respond(body):
+        user = body["messages"][-1]["content"]
+        if TRANSLATE_PROMPT in user:
+            requests.append(("translate", window_source(body)))
+            return prefix_paragraphs(split_into_paragraphs(window_source(body)))
+        if "proper nouns:\n\n" in user:
+            requests.append(("glossary", user))
+            return json.dumps({"Absalom": "阿卜萨隆", "Vault Guardian": "宝库守卫"}, ensure_ascii=False)
+        requests.append(("proper_nouns", user))
+        return json.dumps(["Absalom", "Vault Guardian"])
+
+    server, base_url, _ = start_stub_server(respond)
+    return server, base_url
+
+
+@env_override(TRANSLATION_WINDOW_TOKENS="200")
+def test_pipeline_resume():
+    """Test that a stopped run resumes where it stopped"""
+    print("=" * 80)
+    print("Pipeline Resume Test")
+    print("=" * 80)
+
+    requests = []
+    server, base_url = start_pipeline_stub(requests)
+    paragraphs = [f"Paragraph {i}: the Vault Guardian watches over Absalom. " * 3 for i in range(30)]
+
+    def make_pipeline():
+        # A fresh pipeline and client for every run, as after a restart
+        pipeline = UnifiedTranslationPipeline(
+            model="stub-model",
+            client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+            use_translation_memory=False
+        )
+        pipeline.parse_pdf = lambda pdf_path, **kwargs: {"full_text": "\n\n".join(paragraphs), "total_pages": 2}
+        return pipeline
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = Path(tmp_dir) / "adventure.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+
+        def run(name, pipeline, **kwargs):
+            return pipeline.translate_document_with_pdf(
+                str(pdf_path), output_dir=str(Path(tmp_dir) / name), max_concurrency=1, **kwargs
+            )
+
+        complete = run("complete", make_pipeline())
+        windows = complete["num_windows"]
+        assert windows > 4 and [kind for kind, _ in requests].count("translate") == windows
+        requests.clear()
+
+        # The connection drops after the third window
+        stopped = make_pipeline()
+        translate_text = stopped.client.translate_text
+
+        def translate_until_stopped(*args, **kwargs):
+            if sum(kind == "translate" for kind, _ in requests) == 3:
+                raise ConnectionLost("connection lost")
+            return translate_text(*args, **kwargs)
+
+        stopped.client.translate_text = translate_until_stopped
+        try:
+            run("stopped", stopped)
+            raise AssertionError("Expected ConnectionLost")
+        except ConnectionLost:
+            pass
+        finished = [source for kind, source in requests if kind == "translate"]
+        assert len(finished) == 3 and {"proper_nouns", "glossary"} <= {kind for kind, _ in requests}
+        print(f"✓ Run stopped after nouns, glossary and 3/{windows} windows")
+
+        requests.clear()
+        resumed = run("stopped", make_pipeline(), resume=True)
+        kinds = [kind for kind, _ in requests]
+        assert "proper_nouns" not in kinds and "glossary" not in kinds
+        assert kinds.count("translate") == windows - 3
+        assert not set(finished) & {source for _, source in requests}
+        # Parse, proper nouns, glossary and the 3 finished windows
+        assert resumed["journal_restored"] == 3 + 3
+        print(f"✓ Resumed run skipped noun extraction and glossary, sent only the other {windows - 3} windows")
+
+        assert resumed["updated_translation"] == complete["updated_translation"]
+        assert resumed["glossary"] == complete["glossary"]
+        print("✓ Resumed translation identical to an uninterrupted run")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_resume_after_crash()
+    test_pipeline_resume()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized term similarity engine
+Tests the following functionalities:
+- Batched neighbor search finds exactly the pairs of a brute-force Jaccard / cosine comparison
+- Top-k and later-only neighbor selection
+- Query lookup of unindexed strings and similar-spelling glossary hints
+- Glossary batch planning on the engine keeps every term once and groups variants
+Runs offline, no API key required.
+"""
+
+import sys
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+import backend.similarity_engine as similarity_engine
+from backend.client import SiliconFlowClient
+from backend.similarity_engine import TermSimilarityEngine, char_ngrams, get_similarity_engine
+from backend.term_clustering import plan_glossary_batches
+
+
+SYLLABLES = ["ab", "sa", "lom", "io", "me", "dae", "kor", "vash", "an", "ur", "gol", "ka", "rin", "thar", "el"]
+
+
+def make_terms(count, seed=3):
+    """Generate proper-noun-like terms with suffix variants"""
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        terms.add(name + rng.choice(["", "", "an", " Keep"]))
+    return sorted(terms)
+
+
+def brute_force_similarity(a, b, metric):
+    """Reference similarity of two n-gram sets"""
+    grams_a, grams_b = set(char_ngrams(a)), set(char_ngrams(b))
+    shared = len(grams_a & grams_b)
+    if metric == "jaccard":
+        return shared / len(grams_a | grams_b)
+    return shared / (len(grams_a) * len(grams_b)) ** 0.5
+
+
+def brute_force_neighbors(terms, threshold, metric):
+    """Reference neighbors of every term, most similar first"""
+    neighbors = []
+    for idx, term in enumerate(terms):
+        scored = [(other, brute_force_similarity(term, terms[other], metric)) for other in range(len(terms))]
+        found = [(other, score) for other, score in scored if other != idx and score >= threshold]
+        neighbors.append(sorted(found, key=lambda item: (-item[1], item[0])))
+    return neighbors
+
+
+def test_neighbors_match_brute_force():
+    """Test that neighbor search is exact for both metrics and any block size"""
+    print("=" * 80)
+    print("Similarity Engine Neighbors Test")
+    print("=" * 80)
+
+    terms = make_terms(500)
+    original_block_size = similarity_engine.PAIR_BLOCK_SIZE
+    try:
+        for metric in ("jaccard", "cosine"):
+            expected = brute_force_neighbors(terms, 0.4, metric)
+            for block_size in (original_block_size, 50):
+                similarity_engine.PAIR_BLOCK_SIZE = block_size
+                found = TermSimilarityEngine(terms).neighbors(threshold=0.4, metric=metric)
+                assert [[idx for idx, _ in row] for row in found] == [[idx for idx, _ in row] for row in expected]
+                assert all(abs(a - b) < 1e-9 for x, y in zip(found, expected) for (_, a), (_, b) in zip(x, y))
+
+            later = TermSimilarityEngine(terms).neighbors(threshold=0.4, top_k=2, metric=metric, later_only=True)
+            assert [[idx for idx, _ in row] for row in later] == [
+                [other for other, _ in row if other > idx][:2] for idx, row in enumerate(expected)
+            ]
+            print(f"✓ {metric}: {sum(map(len, expected))} neighbor pairs identical to brute force")
+    finally:
+        similarity_engine.PAIR_BLOCK_SIZE = original_block_size
+
+
+def test_query_and_hints():
+    """Test query lookup and similar-spelling hints for glossary requests"""
+    print("=" * 80)
+    print("Similarity Engine Query Test")
+    print("=" * 80)
+
+    glossary = {"Iomedae": "艾奥梅黛", "Absalom": "押沙龙", "Sarenrae": "沙伦蕾", "Golarion": "格拉利昂"}
+    engine = get_similarity_engine(glossary)
+    assert get_similarity_engine(dict(glossary)) is engine
+
+    found = engine.query(["Iomedaean", "Qwxyz", "absalom"], threshold=0.4, top_k=1)
+    assert [engine.terms[idx] for idx, _ in found[0]] == ["Iomedae"]
+    assert found[1] == []
+    assert found[2][0] == (engine.terms.index("Absalom"), 1.0)
+    print("✓ Variants found, unrelated strings ignored, lookup is case-insensitive")
+
+    client = SiliconFlowClient(api_key="test", use_cache=False)
+    _, messages, _ = client._prepare_glossary_request(["Iomedaean", "Golarion Sea"], existing_glossary=glossary)
+    system_prompt = messages[0]["content"]
+    assert "'Iomedaean' is spelled like 'Iomedae'" in system_prompt
+    assert "'Golarion Sea' contains 'Golarion'" in system_prompt
+    assert "'Golarion Sea' is spelled like" not in system_prompt
+    print("✓ Glossary request hints similar spellings next to partial word matches")
+
+
+def test_engine_batch_plan():
+    """Test glossary batch planning with the n-gram metrics"""
+    print("=" * 80)
+    print("Similarity Engine Batch Plan Test")
+    print("=" * 80)
+
+    terms = make_terms(1500, seed=5)
+    for metric in ("jaccard", "cosine"):
+        plan = plan_glossary_batches(terms, batch_size=100, metric=metric)
+        assert plan.metric == metric
+        assert sorted(term for batch in plan.batches for term in batch) == sorted(terms)
+        assert all(len(batch) >= 100 for batch in plan.batches[:-1])
+        grouped = plan.to_dict()["similar_groups"]
+        assert grouped
+        print(f"✓ {metric}: {len(plan.batches)} batches, {len(grouped)} groups of similar terms")
+
+    plan = plan_glossary_batches(["Iomedae", "Iomedaean", "Absalom"], metric="jaccard")
+    assert ["Iomedae", "Iomedaean"] in plan.groups
+    print("✓ Spelling variants grouped together")
+
+
+if __name__ == "__main__":
+    test_neighbors_match_brute_force()
+    test_query_and_hints()
+    test_engine_batch_plan()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for glossary term clustering
+Tests the following functionalities:
+- Indexed batch planning groups similar terms like the pairwise alphabetical scan
+- Batches close at the batch size and keep every term exactly once
+- Planning thousands of terms does not compare every pair
+Runs offline, no API key required.
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.pipeline import find_similar_terms
+from backend.term_clustering import plan_glossary_batches
+
+
+SYLLABLES = ["ab", "sa", "lom", "io", "me", "dae", "kor", "vash", "an", "ur", "gol", "ka", "rin", "thar", "el"]
+PREFIXES = ["Temple of", "Lord", "Lady", "Order of the", "Knights of", "River", "Tower of"]
+
+
+def make_terms(count, seed=7):
+    """Generate proper-noun-like terms with spelling variants"""
+    rng = random.Random(seed)
+
+    def name():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    terms = set()
+    while len(terms) < count:
+        roll = rng.random()
+        if roll < 0.5:
+            terms.add(name())
+        elif roll < 0.8:
+            terms.add(f"{rng.choice(PREFIXES)} {name()}")
+        else:
+            base = name()
+            terms.update([base, base + rng.choice(["an", "ian", "s", "'s Rest"])])
+    return list(terms)
+
+
+def pairwise_batches(terms, batch_size=100):
+    """Reference grouping: pop terms alphabetically and scan all remaining terms"""
+    remaining = sorted(set(terms))
+    queued, queue, batches = set(), [], []
+    while remaining:
+        term = remaining.pop(0)
+        if term in queued:
+            continue
+        queue.append(term)
+        queued.add(term)
+        for similar_term in find_similar_terms(term, remaining, queued):
+            queue.append(similar_term)
+            queued.add(similar_term)
+            remaining.remove(similar_term)
+        if len(queue) >= batch_size:
+            batches.append(queue)
+            queue = []
+    if queue:
+        batches.append(queue)
+    return batches
+
+
+def test_same_grouping_as_pairwise_scan():
+    """Test that the indexed plan reproduces the pairwise grouping"""
+    print("=" * 80)
+    print("Term Clustering Equivalence Test")
+    print("=" * 80)
+
+    terms = make_terms(1200)
+    plan = plan_glossary_batches(terms + ["", terms[0]], batch_size=100, metric="ratio")
+    assert plan.batches == pairwise_batches(terms, batch_size=100)
+    assert sorted(term for batch in plan.batches for term in batch) == sorted(terms)
+    assert all(len(batch) >= 100 for batch in plan.batches[:-1])
+
+    grouped = plan.to_dict()["similar_groups"]
+    assert any("Iomedae" in group for group in plan_glossary_batches(["Iomedae", "Iomedaean", "Absalom"], metric="ratio").groups)
+    print(f"✓ {len(plan.batches)} batches identical to the pairwise scan, {len(grouped)} groups of similar terms")
+
+
+def test_planning_scales():
+    """Test that large term lists are planned without pairwise comparison"""
+    print("=" * 80)
+    print("Term Clustering Scale Test")
+    print("=" * 80)
+
+    terms = make_terms(6000, seed=11)
+    start = time.perf_counter()
+    plan = plan_glossary_batches(terms, metric="ratio")
+    elapsed = time.perf_counter() - start
+    pairs = len(terms) * (len(terms) - 1) // 2
+    assert plan.num_terms == len(terms)
+    assert plan.comparisons < pairs / 50
+    print(f"✓ {len(terms)} terms planned in {elapsed:.2f}s with {plan.comparisons} ratio computations "
+          f"({pairs} pairs)")
+
+
+if __name__ == "__main__":
+    test_same_grouping_as_pairwise_scan()
+    test_planning_scales()
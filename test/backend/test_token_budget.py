@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for token counting and token-budget windowing
+Tests the following functionalities:
+- Calibrated token estimator for English, CJK and stat-block text
+- Sliding windows sized by token budget instead of characters
+- max_tokens derived from source tokens and fitted to the context window
+Runs offline, no API key required.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.tokenizer import EstimatingTokenCounter, ModelTokenBudget, TokenCounter, set_token_counter, count_tokens
+from backend.pipeline import create_sliding_windows
+
+
+def test_estimator():
+    """Test the dependency-free estimator on different kinds of text"""
+    print("=" * 80)
+    print("Token Estimator Test")
+    print("=" * 80)
+
+    counter = EstimatingTokenCounter()
+    english = counter.count("The quick brown fox jumps over the lazy dog.")
+    chinese = counter.count("敏捷的棕色狐狸跳过了懒狗。")
+    stat_block = counter.count("AC 25; Fort +12, Ref +15, Will +18; HP 180")
+
+    assert 9 <= english <= 13
+    # CJK text costs about one token per character
+    assert chinese == 13
+    # Symbols and numbers make stat blocks denser than their character count suggests
+    assert stat_block > len("AC 25; Fort +12, Ref +15, Will +18; HP 180") / 4
+    print(f"✓ English: {english}, Chinese: {chinese}, stat block: {stat_block} tokens")
+
+    try:
+        TokenCounter()
+        raise AssertionError("Expected TypeError")
+    except TypeError:
+        pass
+    print("✓ TokenCounter is abstract, counters must implement count")
+
+
+def test_token_windows():
+    """Test that windows respect the token limit"""
+    print("=" * 80)
+    print("Token Budget Windowing Test")
+    print("=" * 80)
+
+    set_token_counter(EstimatingTokenCounter())
+    try:
+        paragraphs = [f"Paragraph {i}: " + "The goblins attack the caravan at dawn. " * 10 for i in range(40)]
+        paragraphs += ["敌人在黎明时分袭击了商队。" * 20 for _ in range(10)]
+        text = "\n\n".join(paragraphs)
+
+        windows = create_sliding_windows(text, "paragraph", overlap_paragraphs=2, window_token_limit=600)
+        assert len(windows) > 1
+        for window_text, start, end in windows:
+            assert count_tokens(window_text) <= 600 or start == end
+        assert windows[-1][2] == len(paragraphs) - 1
+        print(f"✓ {len(windows)} windows, all within 600 tokens")
+    finally:
+        set_token_counter(None)
+
+
+def test_completion_budget():
+    """Test max_tokens derivation and context fitting"""
+    print("=" * 80)
+    print("Completion Budget Test")
+    print("=" * 80)
+
+    budget = ModelTokenBudget(context_window=8192, window_tokens=2000, max_completion_tokens=4096)
+    assert budget.completion_tokens(1000, 1.5) == 1756
+    assert budget.completion_tokens(5000, 1.5) == 4096
+    assert budget.fit_to_context(6000, 4096) == 2192
+    assert budget.fit_to_context(1000, None) is None
+    print("✓ Completion budgets scale with source tokens and fit the context window")
+
+
+if __name__ == "__main__":
+    test_estimator()
+    test_token_windows()
+    test_completion_budget()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test script for the translation memory
+Tests the following functionalities:
+- Exact hits ignore whitespace differences and persist across instances
+- Near-duplicates are found through the MinHash index, unrelated text is not
+- Entries are separated by language pair, hyperlink format and model
+- Exact hits whose glossary terms changed are not reused
+- Exact hits are filled into the sliding-window run, which keeps its journal and post-editing
+- Windows next to a hit see its translation; only a window that cannot be paired is translated again
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline, split_into_paragraphs
+from backend.translation_memory import TranslationMemory, minhash_signature, estimate_similarity
+from stub_llm_server import prefix_paragraphs, start_stub_server, window_source
+
+
+TRAITS = [
+    "Flourish: Actions with the flourish trait are special techniques that require too much exertion "
+    "to perform frequently. You can use only 1 action with the flourish trait per turn.",
+    "Off-Guard: You're distracted or otherwise unable to focus your full attention on defense. "
+    "You take a -2 circumstance penalty to AC.",
+    "Press: Actions with this trait allow you to follow up earlier attacks. An action with the press "
+    "trait can be used only if you are currently affected by a multiple attack penalty.",
+]
+
+
+def test_exact_and_fuzzy_lookup():
+    """Test exact reuse and near-duplicate retrieval"""
+    print("=" * 80)
+    print("Translation Memory Lookup Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "tm.sqlite3"
+        variant = TranslationMemory.make_variant("English", "中文", True)
+        memory = TranslationMemory(path)
+        stored = memory.add(TRAITS + ["Page 12"], ["华丽", "措手不及", "紧逼", "第12页"], variant, model="m")
+        assert stored == 3, "short paragraphs are not stored"
+        memory.close()
+
+        memory = TranslationMemory(path)
+        revised = TRAITS[1].replace("You take a -2 circumstance penalty to AC.",
+                                    "You take a -2 circumstance penalty to AC and to Reflex saves.")
+        exact = memory.lookup_exact([TRAITS[0].replace(" ", "\n", 3), revised, "Page 12"], variant)
+        assert exact == ["华丽", None, None]
+        print("✓ Exact hit reused across instances, edited paragraph missed")
+
+        matches = memory.lookup_fuzzy(revised, variant)
+        assert matches and matches[0].translation == "措手不及"
+        assert matches[0].similarity >= memory.fuzzy_threshold
+        assert memory.lookup_fuzzy("A completely unrelated paragraph about dragons and their hoards of gold.", variant) == []
+        print(f"✓ Near-duplicate found (similarity {matches[0].similarity:.2f}), unrelated text ignored")
+
+        other_variant = TranslationMemory.make_variant("English", "中文", False)
+        assert memory.lookup_exact(TRAITS, other_variant) == [None, None, None]
+        assert memory.lookup_fuzzy(revised, other_variant) == []
+        print("✓ Entries separated by hyperlink format")
+
+        model_variant = TranslationMemory.make_variant("English", "中文", True, "model-b")
+        assert memory.lookup_exact(TRAITS, model_variant) == [None, None, None]
+        print("✓ Entries separated by model")
+
+
+def test_glossary_terms():
+    """Test that exact hits are only reused when the glossary agrees with the stored terms"""
+    print("=" * 80)
+    print("Translation Memory Glossary Test")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = TranslationMemory(Path(tmp_dir) / "tm.sqlite3")
+        variant = TranslationMemory.make_variant("English", "中文", False, "m")
+        memory.add(TRAITS[:2], ["华丽：……", "措手不及：……"], variant, model="m", glossary={"Flourish": "华丽"})
+
+        assert memory.lookup_exact(TRAITS[:2], variant) == ["华丽：……", "措手不及：……"]
+        assert memory.lookup_exact(TRAITS[:2], variant, {"Flourish": "华丽", "Dragon": "龙"}) == ["华丽：……", "措手不及：……"]
+        print("✓ Hits reused when the paragraph's glossary terms are unchanged")
+
+        assert memory.lookup_exact(TRAITS[:2], variant, {"Flourish": "炫技"}) == [None, "措手不及：……"]
+        assert memory.lookup_exact(TRAITS[:2], variant, {"Off-Guard": "失衡"}) == ["华丽：……", None]
+        print("✓ Hits skipped when a term of the paragraph is translated differently or was not in the glossary")
+
+
+def test_signature_similarity():
+    """Test that MinHash estimates track shingle overlap"""
+    print("=" * 80)
+    print("MinHash Signature Test")
+    print("=" * 80)
+
+    base = minhash_signature(TRAITS[2])
+    assert estimate_similarity(base, minhash_signature(TRAITS[2].upper())) == 1.0
+    assert estimate_similarity(base, minhash_signature(TRAITS[2] + " It has the attack trait.")) > 0.6
+    assert estimate_similarity(base, minhash_signature(TRAITS[0])) < 0.3
+    assert minhash_signature("—") is None
+    print("✓ Signatures are case-insensitive and separate unrelated paragraphs")
+
+
+def test_hits_filled_into_windows():
+    """Test that a run with memory hits only sends the other paragraphs and keeps journal and post-edit"""
+    print("=" * 80)
+    print("Translation Memory Pipeline Test")
+    print("=" * 80)
+
+    sent = []
+
+    def respond(body):
+        source = window_source(body)
+        sent.append(source)
+        return prefix_paragraphs(split_into_paragraphs(source))
+
+    server, base_url, stats = start_stub_server(respond)
+    unique = [f"Chapter {i}: the caravan crosses the dunes toward the sunken temple of the old kings." for i in range(6)]
+    books = {"a": TRAITS + unique[:3], "b": unique[3:5] + TRAITS + unique[5:]}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = UnifiedTranslationPipeline(
+            model="stub-model",
+            client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+            translation_memory=TranslationMemory(Path(tmp_dir) / "tm.sqlite3"),
+            use_translation_memory=True,
+            translation_protocol="plain",
+            glossary_enforcement="local"
+        )
+        pipeline.parse_pdf = lambda pdf_path, **kwargs: {
+            "full_text": "\n\n".join(books[Path(pdf_path).stem]), "total_pages": 1
+        }
+
+        def run(name, **kwargs):
+            pdf_path = Path(tmp_dir) / f"{name}.pdf"
+            pdf_path.write_bytes(b"%PDF-1.4")
+            return pipeline.translate_document_with_pdf(
+                str(pdf_path), auto_extract_nouns=False, existing_glossary={"Flourish": "华丽"},
+                use_hyperlink_format=False, output_dir=str(Path(tmp_dir) / name), **kwargs
+            )
+
+        run("a")
+        # Memory as of before book B, so the resumed run below gets the same hits
+        pipeline.translation_memory.close()
+        shutil.copy(Path(tmp_dir) / "tm.sqlite3", Path(tmp_dir) / "tm_a.sqlite3")
+        pipeline.translation_memory = TranslationMemory(Path(tmp_dir) / "tm.sqlite3")
+        sent.clear()
+        result = run("b")
+        assert result["translation_memory"]["exact_hits"] == len(TRAITS)
+        assert sent and not any(trait[:20] in text for text in sent for trait in TRAITS)
+        units = split_into_paragraphs(result["updated_translation"])
+        assert len(units) == 6 and units[2].startswith("译 华丽") and units[5] == "译 " + unique[5]
+        print(f"✓ {len(TRAITS)} paragraphs filled from memory, only the other 3 sent")
+
+        assert "glossary_enforcement" in result
+        print("✓ Glossary post-editing still runs on the filled translation")
+
+        pipeline.translation_memory = TranslationMemory(Path(tmp_dir) / "tm_a.sqlite3")
+        requests = stats["requests"]
+        resumed = run("b", resume=True)
+        assert stats["requests"] == requests and resumed["updated_translation"] == result["updated_translation"]
+        print("✓ Resumed run restored its windows from the journal")
+
+    server.shutdown()
+
+
+def test_unpaired_window_retranslated():
+    """Test that an unpaired window is translated again on its own, not the whole document"""
+    print("=" * 80)
+    print("Translation Memory Unpaired Window Test")
+    print("=" * 80)
+
+    sent = []
+
+    def respond(body):
+        source = window_source(body)
+        sent.append((source, body["messages"][0]["content"] + body["messages"][-1]["content"]))
+        units = prefix_paragraphs(split_into_paragraphs(source))
+        # The model merges the paragraphs of the first chapter window
+        return units.replace("\n\n", " ") if "Chapter 0" in source else units
+
+    server, base_url, _ = start_stub_server(respond)
+    chapters = [f"Chapter {i}: the caravan crosses the dunes toward the sunken temple." for i in range(3)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = TranslationMemory(Path(tmp_dir) / "tm.sqlite3")
+        pipeline = UnifiedTranslationPipeline(
+            model="stub-model",
+            client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+            translation_memory=memory,
+            use_translation_memory=True,
+            translation_protocol="plain"
+        )
+        variant = memory.make_variant("English", "中文", False, "stub-model")
+        memory.add(TRAITS, ["记忆 " + trait for trait in TRAITS], variant, model="stub-model")
+        pipeline.parse_pdf = lambda pdf_path, **kwargs: {
+            "full_text": "\n\n".join(chapters[:2] + TRAITS + chapters[2:]), "total_pages": 1
+        }
+        result = pipeline.translate_document_with_pdf(
+            str(Path(tmp_dir) / "book.pdf"), auto_extract_nouns=False, use_hyperlink_format=False
+        )
+
+    sources = [source for source, _ in sent]
+    assert sources == ["\n\n".join(chapters[:2]), chapters[2], "\n\n".join(chapters[:2])]
+    print("✓ Only the unpaired window was sent again, the memory hits never")
+
+    # The window after the hits is shown their memory translation
+    assert "记忆 " + TRAITS[-1] in next(prompt for source, prompt in sent if source == chapters[2])
+    print("✓ Windows next to a hit get its translation as context")
+
+    units = split_into_paragraphs(result["updated_translation"])
+    assert units == ["译 " + chapters[0] + " 译 " + chapters[1]] + ["记忆 " + trait for trait in TRAITS] + ["译 " + chapters[2]]
+    # Chapters 0 and 1 have no translation of their own to store
+    assert result["translation_memory"]["stored"] == len(TRAITS) + 1
+    print("✓ Unpaired paragraphs kept as one block in place, the others stored per paragraph")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_exact_and_fuzzy_lookup()
+    test_glossary_terms()
+    test_signature_similarity()
+    test_hits_filled_into_windows()
+    test_unpaired_window_retranslated()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test script for the lean translation result and streaming exports
+Tests the following functionalities:
+- TranslationResult keeps every text once and still reads like the former result dictionary
+- Keys written to the result read back the same, to_dict() returns the former dictionary
+- Initial translation referenced on disk instead of held in memory
+- JSON and NDJSON exports streamed paragraph by paragraph
+- translate_document_with_pdf returns a TranslationResult and writes valid exports
+Runs offline against a local stub server, no API key required.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src directory to path
+src_dir = Path(__file__).parent.parent.parent / "src"
+sys.path.insert(0, str(src_dir))
+sys.path.insert(0, str(src_dir / "backend"))
+
+from backend.client import SiliconFlowClient
+from backend.pipeline import UnifiedTranslationPipeline
+from backend.translation_result import INITIAL_TRANSLATION_HEADER, TranslationResult, iter_json, iter_ndjson
+from stub_llm_server import env_override, prefix_paragraphs, start_stub_server, window_source
+
+PARAGRAPHS = [f"Paragraph {i}: the Vault Guardian of Absalom." for i in range(5)]
+TRANSLATIONS = [f"第{i}段：阿卜萨隆的宝库守护者。" for i in range(5)]
+
+
+def make_run(**overrides):
+    """Result dictionary as filled by the pipeline stages"""
+    run = {
+        "pdf_path": "book.pdf",
+        "source_language": "English",
+        "target_language": "中文",
+        "model": "stub-model",
+        "parse_result": {"full_text": "\n\n".join(PARAGRAPHS), "total_pages": 1, "pages": [
+            {"page_number": 1, "start": 0, "end": 10}
+        ]},
+        "glossary": {"Absalom": "阿卜萨隆"},
+        "proper_nouns": ["Absalom"],
+        "translated_text": "initial",
+        "updated_translation": "\n\n".join(TRANSLATIONS),
+        "paragraph_translations": list(TRANSLATIONS),
+        "num_windows": 2,
+        "translation_errors": []
+    }
+    run.update(overrides)
+    return run
+
+
+def test_result_mapping():
+    """Test that texts are held once and the result reads like the former dictionary"""
+    print("=" * 80)
+    print("Translation Result Test")
+    print("=" * 80)
+
+    result = TranslationResult.from_run(make_run())
+    assert result._translation is None and result.translation_from_paragraphs
+    assert result.document.translations == TRANSLATIONS
+    assert "full_text" not in result.parse
+    print("✓ Final translation rebuilt from the paragraph translations, full text held by the document")
+
+    assert result["updated_translation"] == "\n\n".join(TRANSLATIONS)
+    assert result["translated_text"] == "initial"
+    assert result["parse_result"]["full_text"] == "\n\n".join(PARAGRAPHS)
+    assert result["paragraph_translations"] == TRANSLATIONS
+    assert result.get("num_windows") == 2 and result.get("missing", "default") == "default"
+    assert "translation_errors" in result and "output_files" not in result
+    result["output_files"] = {"markdown": "book.md"}
+    assert dict(result)["output_files"] == {"markdown": "book.md"}
+    print("✓ Former dictionary keys readable, unknown keys fall back to the default")
+
+    edited = TranslationResult.from_run(make_run(updated_translation="重新排版的译文"))
+    assert edited["updated_translation"] == "重新排版的译文" and not edited.translation_from_paragraphs
+    print("✓ Post-edited translation that differs from the paragraphs is kept as text")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        initial_path = Path(tmp_dir) / "book_translation_initial.md"
+        initial_path.write_text(INITIAL_TRANSLATION_HEADER + "初译", encoding="utf-8")
+        result = TranslationResult.from_run(make_run(), output_files={"initial_translation": str(initial_path)})
+        assert result._initial_translation is None
+        assert result["translated_text"] == "初译"
+    print("✓ Initial translation read back from its exported file on demand")
+
+
+def test_result_writes():
+    """Test that written keys read back and to_dict() gives the former dictionary"""
+    print("=" * 80)
+    print("Translation Result Write Test")
+    print("=" * 80)
+
+    result = TranslationResult.from_run(make_run())
+    former = result.to_dict()
+    assert isinstance(former, dict) and json.loads(json.dumps(former, ensure_ascii=False)) == former
+    assert former["parse_result"]["full_text"] == "\n\n".join(PARAGRAPHS)
+    assert former["updated_translation"] == "\n\n".join(TRANSLATIONS) and former["num_windows"] == 2
+    print("✓ to_dict() is JSON-serializable and includes the full text")
+
+    result["translated_text"] = "新初译"
+    result["all_detected_terms"] = ["Absalom"]
+    result["num_windows"] = 3
+    assert result["translated_text"] == "新初译" and result["all_detected_terms"] == ["Absalom"]
+    assert result["num_windows"] == 3 and "translated_text" not in result.stats
+
+    translations = ["译" + translation for translation in TRANSLATIONS]
+    result["paragraph_translations"] = translations
+    assert result["paragraph_translations"] == translations
+    # The final translation is not changed by new paragraph translations
+    assert result["updated_translation"] == "\n\n".join(TRANSLATIONS)
+    result["updated_translation"] = "\n\n".join(translations)
+    assert result.translation_from_paragraphs is False and result["updated_translation"] == "\n\n".join(translations)
+
+    result["parse_result"] = {"full_text": "New text.", "total_pages": 2}
+    assert result["parse_result"] == {"full_text": "New text.", "total_pages": 2}
+    assert "paragraph_translations" not in result and result["updated_translation"] == "\n\n".join(translations)
+    try:
+        result["paragraph_translations"] = translations
+        raise AssertionError("Expected ValueError")
+    except ValueError:
+        pass
+    print("✓ Every key written to the result reads back the same")
+
+
+def test_streaming_exports():
+    """Test that JSON and NDJSON exports are valid and carry every paragraph"""
+    print("=" * 80)
+    print("Streaming Export Test")
+    print("=" * 80)
+
+    result = TranslationResult.from_run(make_run())
+    chunks = list(iter_json(result))
+    data = json.loads("".join(chunks))
+    assert len(chunks) > len(PARAGRAPHS)
+    assert [(p["source"], p["translation"]) for p in data["paragraphs"]] == list(zip(PARAGRAPHS, TRANSLATIONS))
+    assert data["glossary"] == {"Absalom": "阿卜萨隆"} and data["parse_result"]["total_pages"] == 1
+    assert data["updated_translation"] == "\n\n".join(TRANSLATIONS) and data["translated_text"] == "initial"
+    assert "full_text" not in data["parse_result"]
+    print(f"✓ JSON streamed in {len(chunks)} chunks, final translation streamed paragraph by paragraph")
+
+    # A plain dictionary is exported the same way and left unchanged
+    run = make_run(updated_translation="重新排版的译文")
+    data = json.loads("".join(iter_json(run)))
+    assert data["updated_translation"] == "重新排版的译文" and len(data["paragraphs"]) == len(PARAGRAPHS)
+    assert run["parse_result"]["full_text"] and run["updated_translation"] == "重新排版的译文"
+    empty = json.loads("".join(iter_json({"source_language": "English", "target_language": "中文",
+                                           "model": "m", "parse_result": {"full_text": ""}})))
+    assert empty["paragraphs"] == [] and empty["updated_translation"] == ""
+    print("✓ Result dictionaries exported without being modified")
+
+    records = [json.loads(line) for line in "".join(iter_ndjson(run)).splitlines()]
+    assert [record["type"] for record in records] == (
+        ["run"] + ["paragraph"] * len(PARAGRAPHS) + ["translation", "initial_translation"]
+    )
+    assert records[0]["num_windows"] == 2 and records[1]["id"] == 0 and records[-2]["text"] == "重新排版的译文"
+    records = [json.loads(line) for line in "".join(iter_ndjson(make_run(translated_text=None))).splitlines()]
+    assert records[-1] == {"type": "translation", "text": "\n\n".join(TRANSLATIONS)}
+    print(f"✓ NDJSON: {len(records)} records, one per paragraph")
+
+
+def start_translation_stub():
+    """Start a streaming stub that prefixes every paragraph of the window"""
+    server, base_url, _ = start_stub_server(lambda body: prefix_paragraphs(window_source(body).split("\n\n")))
+    return server, base_url
+
+
+@env_override(TRANSLATION_WINDOW_TOKENS="200")
+def test_pipeline_exports():
+    """Test that a pipeline run returns a TranslationResult and writes valid exports"""
+    print("=" * 80)
+    print("Pipeline Export Test")
+    print("=" * 80)
+
+    server, base_url = start_translation_stub()
+    pipeline = UnifiedTranslationPipeline(
+        model="stub-model",
+        client=SiliconFlowClient(api_key="test", base_url=base_url, use_cache=False),
+        use_translation_memory=False,
+        glossary_enforcement="local",
+        translation_protocol="tagged"
+    )
+    paragraphs = [f"Paragraph {i} of the adventure in Absalom. " * 4 for i in range(40)]
+    pipeline.parse_pdf = lambda pdf_path, **kwargs: {"full_text": "\n\n".join(paragraphs), "total_pages": 3}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_dir = Path(tmp_dir) / "out"
+        pdf_path = Path(tmp_dir) / "adventure.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+        result = pipeline.translate_document_with_pdf(
+            str(pdf_path), auto_extract_nouns=False,
+            existing_glossary={"Absalom": "阿卜萨隆"}, output_dir=str(output_dir)
+        )
+        assert isinstance(result, TranslationResult)
+        assert result.translation_from_paragraphs and result._initial_translation is None
+        assert result["translated_text"].startswith("译 Paragraph 0")
+        print(f"✓ Result holds {result.document.num_paragraphs} paragraph translations, "
+              f"initial translation referenced on disk")
+
+        data = json.loads(Path(result["output_files"]["json"]).read_text(encoding="utf-8"))
+        assert len(data["paragraphs"]) == len(paragraphs)
+        assert data["paragraphs"][39]["translation"].startswith("译 Paragraph 39")
+        assert data["num_windows"] == result["num_windows"] > 1
+        assert data["updated_translation"] == result["updated_translation"]
+        markdown = Path(result["output_files"]["markdown"]).read_text(encoding="utf-8")
+        assert markdown == pipeline.export_output(result, "markdown")
+        assert markdown.endswith(result["updated_translation"]) and "**模型:** stub-model" in markdown
+        ndjson_path = pipeline.export_output(result, "ndjson", str(output_dir / "adventure.ndjson"))
+        assert len(Path(ndjson_path).read_text(encoding="utf-8").splitlines()) == 2 + len(paragraphs)
+        print("✓ Markdown, JSON and NDJSON exports written from the result")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_result_mapping()
+    test_result_writes()
+    test_streaming_exports()
+    test_pipeline_exports()